@@ -61,6 +61,18 @@ from keyboard_helpers import (
 )
 from user_guide import get_user_guide_pdf
 from hl_adapter import HLAdapter
+from core.hl_adapter_pool import get_hl_adapter
+from core.db_executor import adb
+from core.metrics import metrics, track_signal_latency, observe_signal_to_order
+from core.optimizations import TTLBoundedDict, bounded_cache, cache_cleanup_scheduler
+from core.multitenancy_queries import (
+    fetch_user_config,
+    fetch_user_credentials,
+    fetch_all_user_credentials,
+    fetch_active_positions,
+    fetch_pending_limit_orders,
+    fetch_strategy_settings,
+)
 from services.notification_service import init_notification_service
 from services.notification_service import init_notification_service
 from db import (
@@ -891,8 +903,10 @@ DCA_LAST_LEG_EXTRA_PCT = float(os.getenv("DCA_LAST_LEG_EXTRA_PCT", "0.8"))
 
 PRIVACY_PATH = os.path.join(os.path.dirname(__file__), "privacy.txt")
 
-_last_notice: dict[tuple[int, str, str], int] = {}  
-_skip_until:  dict[tuple[int, str], int] = {} 
+# once_per() timestamps; each entry lives as long as its own window
+_last_notice: TTLBoundedDict = bounded_cache("bot.last_notice", max_size=20000, ttl=NOTICE_WINDOW)
+# (uid, symbol) -> mute-until timestamp after "disk full" log errors
+_skip_until: TTLBoundedDict = bounded_cache("bot.skip_until", max_size=10000, ttl=MUTE_TTL)
 
 # ============================================================================
 # CACHES WITH SIZE LIMITS (prevent memory leaks)
@@ -940,12 +954,9 @@ else:
     _expired_api_keys_cache: dict[tuple[int, str], float] = {}
 EXPIRED_API_KEYS_CACHE_TTL = 3600  # 1 hour - don't retry for 1 hour after auth error
 
-# Cache for position mode per user (one-way vs hedge)
-# Max 1k users, TTL 1 hour
-if _USE_TTLCACHE:
-    _position_mode_cache: TTLCache = TTLCache(maxsize=1000, ttl=3600)
-else:
-    _position_mode_cache: dict[tuple[int, str], str] = {}
+# Cache for position mode per (user, symbol, account_type) (one-way vs hedge)
+# Max 20k entries, TTL 1 hour
+_position_mode_cache: TTLBoundedDict = bounded_cache("bot.position_mode", max_size=20000, ttl=3600)
 
 
 def clear_expired_api_cache(user_id: int, account_type: str = None):
@@ -1317,15 +1328,10 @@ def log_calls(func):
 
 def once_per(key: tuple, seconds: int) -> bool:
     now = int(time.time())
-    if len(_last_notice) > 5000:
-        cutoff = now - max(NOTICE_WINDOW, 3600)
-        for k, ts in list(_last_notice.items()):
-            if ts < cutoff:
-                _last_notice.pop(k, None)
     t = _last_notice.get(key, 0)
     if now - t < seconds:
         return False
-    _last_notice[key] = now
+    _last_notice.set(key, now, ttl=seconds)
     return True
 
 def is_db_full_error(e: Exception) -> bool:
@@ -3314,24 +3320,20 @@ async def cmd_spot_portfolio(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             )
             return
         
-        # Get prices for all coins in parallel
+        # Value all holdings
         total_usd_value = 0.0
         holdings_data = []
         
         # Filter coins with balance
         filtered_balances = {c: amt for c, amt in balances.items() if amt > 0.00001}
         
-        # Fetch prices in parallel
-        price_tasks = {}
-        for coin in filtered_balances:
-            if coin != "USDT":
-                symbol = f"{coin}USDT"
-                price_tasks[coin] = asyncio.create_task(get_spot_ticker(uid, symbol, account_type))
+        # Fetch all prices in one request
+        priced_coins = [coin for coin in filtered_balances if coin != "USDT"]
+        spot_tickers = await get_spot_tickers(uid, priced_coins, account_type)
         
-        # Wait for all prices
-        for coin, task in price_tasks.items():
+        for coin in priced_coins:
             try:
-                ticker = await task
+                ticker = spot_tickers.get(coin)
                 price = float(ticker.get("lastPrice", 0)) if ticker else 0
                 price_change_24h = float(ticker.get("price24hPcnt", 0)) * 100 if ticker else 0
                 amount = filtered_balances[coin]
@@ -3764,24 +3766,20 @@ async def on_spot_settings_cb(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         
         await q.answer("Loading portfolio...")
         
-        # Get prices for all coins in parallel
+        # Value all holdings
         total_usd_value = 0.0
         holdings_data = []
         
         # Filter coins with balance
         filtered_balances = {c: amt for c, amt in balances.items() if amt > 0.00001}
         
-        # Fetch prices in parallel
-        price_tasks = {}
-        for coin in filtered_balances:
-            if coin != "USDT":
-                symbol = f"{coin}USDT"
-                price_tasks[coin] = asyncio.create_task(get_spot_ticker(uid, symbol, account_type))
+        # Fetch all prices in one request
+        priced_coins = [coin for coin in filtered_balances if coin != "USDT"]
+        spot_tickers = await get_spot_tickers(uid, priced_coins, account_type)
         
-        # Wait for all prices
-        for coin, task in price_tasks.items():
+        for coin in priced_coins:
             try:
-                ticker = await task
+                ticker = spot_tickers.get(coin)
                 price = float(ticker.get("lastPrice", 0)) if ticker else 0
                 price_change_24h = float(ticker.get("price24hPcnt", 0)) * 100 if ticker else 0
                 amount = filtered_balances[coin]
@@ -4246,11 +4244,8 @@ async def on_spot_settings_cb(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         # Get purchase history for PnL calculation
         purchase_history = spot_settings.get("purchase_history", {})
         
-        # Fetch all prices in parallel
-        price_tasks = {}
-        for coin in sellable:
-            symbol = f"{coin}USDT"
-            price_tasks[coin] = asyncio.create_task(get_spot_ticker(uid, symbol, account_type))
+        # Fetch all prices in one request
+        spot_tickers = await get_spot_tickers(uid, list(sellable), account_type)
         
         # Build detailed sell menu
         mode_label = "🧪 Demo" if account_type == "demo" else "💰 Real"
@@ -4266,7 +4261,7 @@ async def on_spot_settings_cb(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         
         for coin, qty in sorted(sellable.items(), key=lambda x: x[0]):
             try:
-                ticker = await price_tasks[coin]
+                ticker = spot_tickers.get(coin)
                 price = float(ticker.get("lastPrice", 0)) if ticker else 0
                 price_change = float(ticker.get("price24hPcnt", 0)) * 100 if ticker else 0
                 value = qty * price
@@ -5872,7 +5867,6 @@ def extract_image_from_summary(summary_html: str) -> str | None:
     m = re.search(r'<img[^>]+src="([^"]+)"', summary_html)
     return unescape(m.group(1)) if m else None
 
-_position_mode_cache: dict[tuple[int, str], str] = {} 
 _atr_triggered: dict[tuple[int, str, str], bool] = {}  # (uid, symbol, account_type)
 _atr_was_enabled: dict[tuple[int, str, str], bool] = {}  # Track if ATR was enabled for (uid, symbol, account_type) - for detecting when ATR gets disabled
 _atr_tp_removal_done: dict[tuple[int, str, str], float] = {}  # (uid, symbol, account_type) -> timestamp of last successful TP removal (inc. retCode 34040)
@@ -5880,11 +5874,12 @@ _be_triggered: dict[tuple[int, str, str], bool] = {}  # Track if BE (break-even)
 _close_all_cooldown: dict[int, float] = {}  # uid -> timestamp when cooldown ends
 _notification_retry_after: dict[int, float] = {}  # uid -> timestamp when Telegram rate limit expires
 _chat_not_found_users: dict[int, float] = {}  # uid -> timestamp when "Chat not found" was detected (suppress for 1 hour)
-_telegram_id_cache: dict[int, int | None] = {}  # uid -> telegram_id (None = no telegram linked)
+# uid -> telegram_id (None = no telegram linked); expires so newly linked accounts are picked up
+_telegram_id_cache: TTLBoundedDict = bounded_cache("bot.telegram_id", max_size=50000, ttl=3600)
 # HyperLiquid SL cache - HL API doesn't return stopLoss field, so we track what we set
 # Key: (uid, symbol), Value: sl_price that was last set
 # This prevents repeated API calls when SL is already set
-_hl_sl_cache: dict[tuple[int, str], float] = {}
+_hl_sl_cache: TTLBoundedDict = bounded_cache("bot.hl_sl", max_size=50000, ttl=86400)
 
 # HyperLiquid SL/TP fail cooldown - prevents retrying set_tp_sl every 20s when it fails
 # Key: (uid, symbol), Value: timestamp of last failure
@@ -5892,6 +5887,8 @@ _hl_sl_cache: dict[tuple[int, str], float] = {}
 _hl_sl_fail_cooldown: dict[tuple[int, str], float] = {}
 _HL_SL_FAIL_COOLDOWN_SEC = 300  # 5 minutes
 
+_MISSING = object()  # Cache miss sentinel - cached values may legitimately be None
+
 
 def get_telegram_id_for_notifications(uid: int) -> int | None:
     """
@@ -5903,9 +5900,10 @@ def get_telegram_id_for_notifications(uid: int) -> int | None:
     Returns:
         telegram_id if available, None if user has no Telegram linked
     """
-    # Check cache first
-    if uid in _telegram_id_cache:
-        return _telegram_id_cache[uid]
+    # Check cache first (single lookup - the entry may expire between a check and a read)
+    cached = _telegram_id_cache.get(uid, _MISSING)
+    if cached is not _MISSING:
+        return cached
     
     # For positive user_id, it's a Telegram user - their ID is the telegram_id
     if uid > 0:
@@ -6816,7 +6814,8 @@ def _canon_query(params: dict | None) -> str:
 @log_calls
 async def _bybit_request(user_id: int, method: str, path: str,
                          params: dict = None, body: dict = None,
-                         retries: int = 3, account_type: str = None) -> dict:
+                         retries: int = 3, account_type: str = None,
+                         raw: bool = False) -> dict:
     """Make a request to Bybit API.
     
     Args:
@@ -6827,6 +6826,7 @@ async def _bybit_request(user_id: int, method: str, path: str,
         body: JSON body for POST requests
         retries: Number of retry attempts
         account_type: 'demo', 'real', or None (auto-detect from trading_mode)
+        raw: Return the full response (retCode/result/retExtInfo) instead of result
     """
     # CRITICAL FIX: Normalize 'both' mode to 'demo' since Bybit API doesn't support 'both'
     # 'both' is a trading config that means "trade on demo AND real", but API needs specific mode
@@ -6886,6 +6886,7 @@ async def _bybit_request(user_id: int, method: str, path: str,
 
     last_exc = None
     for attempt in range(1, retries + 1):
+        started = time.perf_counter()
         try:
             if method == "GET":
                 async with _session.get(url, headers=headers) as resp:
@@ -6895,6 +6896,9 @@ async def _bybit_request(user_id: int, method: str, path: str,
                 async with _session.post(url, data=body_json, headers=headers) as resp:
                     resp.raise_for_status()
                     data = await resp.json(content_type=None)
+            metrics.exchange_latency.observe(
+                (time.perf_counter() - started) * 1000, exchange="bybit", endpoint=path
+            )
 
             if path == "/v5/position/trading-stop" and data.get("retCode") == 34040:
                 logger.info(f"{path}: not modified (retCode=34040) for user {user_id} — body was: {body_json}")
@@ -6943,10 +6947,13 @@ async def _bybit_request(user_id: int, method: str, path: str,
                     logger.error(f"Bybit error for user {user_id} on {path}: {data}")
                     raise RuntimeError(f"Bybit error {path}: {data}")
 
+            if raw:
+                return data
             return data.get("result") or data
 
         except (asyncio.TimeoutError, aiohttp.ClientError) as e:
             last_exc = e
+            metrics.exchange_errors.inc(exchange="bybit", endpoint=path)
             logger.warning(f"Request {path} failed ({attempt}/{retries}): {e}")
             if attempt < retries:
                 await asyncio.sleep(2 ** attempt)
@@ -8151,10 +8158,7 @@ async def manual_order_text(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         if q < min_qty:
             q = min_qty
 
-        inst = await _bybit_request(
-            uid, "GET", "/v5/market/instruments-info",
-            params={"category": "linear", "symbol": symbol}
-        )
+        inst = await _linear_instrument(uid, symbol)
         inst_list = inst.get("list", [])
         if not inst_list:
             await update.message.reply_text(
@@ -8624,6 +8628,8 @@ async def _place_order_impl(
         else:
             raise
 
+    if not reduce_only:
+        observe_signal_to_order("bybit")
     logger.info(f"Order placed [{account_type or 'auto'}]: {res}")
     return res
 
@@ -8938,11 +8944,8 @@ async def place_order_for_targets(
                     continue
                 
                 # Create adapter - let it auto-discover main wallet via userRole API
-                adapter = HLAdapter(
-                    private_key=hl_private_key,
-                    testnet=is_testnet
-                    # vault_address and main_wallet_address auto-discovered
-                )
+                # Pooled adapter - main wallet and asset meta already warm after first use
+                adapter = await get_hl_adapter(hl_private_key, testnet=is_testnet, user_id=user_id)
                 
                 try:
                     # Ensure adapter is fully initialized (auto-discovery + dynamic mapping)
@@ -9047,11 +9050,7 @@ async def place_order_for_targets(
                             wallet_address_for_price = hl_creds.get("hl_mainnet_wallet_address") or hl_creds.get("hl_wallet_address")
                         
                         if hl_private_key:
-                            adapter = HLAdapter(
-                                private_key=hl_private_key,
-                                testnet=is_testnet_for_price
-                                # main_wallet_address auto-discovered
-                            )
+                            adapter = await get_hl_adapter(hl_private_key, testnet=is_testnet_for_price, user_id=user_id)
                             try:
                                 await adapter.initialize()  # CRITICAL: auto-discover main wallet
                                 # Try to get actual position entry price
@@ -9175,7 +9174,7 @@ async def place_order_for_targets(
 _hl_coins_cache = {"coins": set(), "timestamp": 0, "ttl": 300}  # 5 min cache
 
 async def get_hl_available_coins() -> set:
-    """Get set of available coin symbols on HyperLiquid."""
+    """Get set of available coin symbols on HyperLiquid (BTCUSDT format)."""
     import time
     now = time.time()
     
@@ -9183,15 +9182,10 @@ async def get_hl_available_coins() -> set:
         return _hl_coins_cache["coins"]
     
     try:
-        from hyperliquid import HyperLiquidClient
-        # Use read-only client just to get coin list
-        client = HyperLiquidClient(testnet=False)
-        await client.initialize()
-        mids = await client.get_all_mids()
-        await client.close()
-        
-        # Convert to USDT format for comparison (HL uses BTC, we compare BTCUSDT)
-        coins = {f"{coin}USDT" for coin in mids.keys()}
+        from core.symbol_universe import symbol_universe
+        coins = await symbol_universe.symbols("hyperliquid")
+        if not coins:
+            return set()
         _hl_coins_cache["coins"] = coins
         _hl_coins_cache["timestamp"] = now
         return coins
@@ -9371,13 +9365,9 @@ async def place_order_hyperliquid(
         hl_tp = hl_settings.get("tp_percent", tp_percent or 3.0)
         hl_leverage = hl_settings.get("leverage", leverage or 10)
         
-        # Create adapter - main wallet will be auto-discovered if this is an agent wallet
+        # Pooled adapter - main wallet is auto-discovered once per key and reused
         # No need to pass vault_address or main_wallet_address anymore!
-        adapter = HLAdapter(
-            private_key=hl_private_key,
-            testnet=testnet,
-            # vault_address and main_wallet_address will be auto-discovered from userRole API
-        )
+        adapter = await get_hl_adapter(hl_private_key, testnet=testnet, user_id=user_id)
         
         async with adapter:
             # Get current price
@@ -9427,6 +9417,8 @@ async def place_order_hyperliquid(
                 sz=hl_qty,
                 slippage=0.01  # 1% slippage
             )
+            if result.get("status") == "ok":
+                observe_signal_to_order("hyperliquid")
             
             # Set TP/SL if provided
             if result.get("status") == "ok" and (hl_tp or hl_sl):
@@ -12511,11 +12503,7 @@ async def fetch_realized_pnl(uid: int, days: int = 1, account_type: str | None =
                     private_key = creds.get("hl_private_key")
                     is_testnet = bool(creds.get("hl_testnet", False))
                 if private_key:
-                    adapter = HLAdapter(
-                        private_key=private_key,
-                        testnet=is_testnet
-                        # vault_address and main_wallet_address auto-discovered
-                    )
+                    adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=uid)
                     try:
                         await adapter.initialize()
                         
@@ -13107,6 +13095,56 @@ async def get_spot_ticker(user_id: int, symbol: str, account_type: str = None, e
     return {}
 
 
+async def get_spot_tickers(user_id: int, coins: list, account_type: str = None, exchange: str = None) -> dict:
+    """Get spot tickers for many coins with one request.
+    
+    Args:
+        user_id: Telegram user ID
+        coins: Base coins like ["BTC", "ETH"] (HL: token names)
+        account_type: Account type
+        exchange: 'bybit' or 'hyperliquid' (auto-detected if None)
+    
+    Returns:
+        {coin: ticker} in get_spot_ticker() format; coins without a price are omitted
+    """
+    from core.spot_portfolio import fetch_bybit_spot_tickers, fetch_hl_spot_tickers
+    
+    if exchange is None:
+        exchange = db.get_exchange_type(user_id) or "bybit"
+    
+    exchange = exchange.lower()
+    coins = [c for c in coins if c]
+    if not coins:
+        return {}
+    
+    try:
+        if exchange == "hyperliquid":
+            hl_creds = db.get_hl_credentials(user_id)
+            if not hl_creds:
+                return {}
+            
+            is_testnet = account_type in ("testnet", "demo", None)
+            private_key = hl_creds.get("hl_testnet_private_key" if is_testnet else "hl_mainnet_private_key")
+            if not private_key:
+                private_key = hl_creds.get("hl_private_key")
+                is_testnet = hl_creds.get("hl_testnet", False)
+            
+            if not private_key:
+                return {}
+            
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
+            return await fetch_hl_spot_tickers(adapter, coins)
+        
+        async def bybit_call(method, path, params=None, body=None):
+            return await _bybit_request(user_id, method, path, params=params, body=body,
+                                        account_type=account_type, raw=True)
+        
+        return await fetch_bybit_spot_tickers(bybit_call, coins)
+    except Exception as e:
+        logger.error(f"get_spot_tickers {exchange} error for {len(coins)} coins: {e}")
+        return {}
+
+
 # Cache for Fear & Greed Index (updates every hour)
 _fear_greed_cache = {"value": 50, "timestamp": 0}
 
@@ -13598,6 +13636,7 @@ async def execute_spot_dca_buy(
     usdt_amount: float,
     account_type: str = None,
     exchange: str = None,
+    price: float = None,
 ) -> dict:
     """Execute a DCA buy for a specific coin.
     
@@ -13607,6 +13646,7 @@ async def execute_spot_dca_buy(
         usdt_amount: Amount in USDT/USDC to spend
         account_type: 'demo', 'real' (Bybit) or 'testnet', 'mainnet' (HL)
         exchange: 'bybit' or 'hyperliquid' (auto-detected if None)
+        price: Current price if already known (skips the ticker request)
         
     Returns:
         dict with result info
@@ -13624,11 +13664,13 @@ async def execute_spot_dca_buy(
         symbol = f"{coin}USDT"  # Bybit uses COINUSDT format
     
     # Get current price
-    ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
-    if not ticker:
-        return {"success": False, "error": f"Could not get price for {symbol}"}
+    if price is None:
+        ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
+        if not ticker:
+            return {"success": False, "error": f"Could not get price for {symbol}"}
+        price = float(ticker.get("lastPrice", 0))
     
-    current_price = float(ticker.get("lastPrice", 0))
+    current_price = float(price)
     if current_price <= 0:
         return {"success": False, "error": f"Invalid price for {symbol}"}
     
@@ -13713,6 +13755,7 @@ async def execute_spot_sell(
     sell_pct: float = None,
     account_type: str = None,
     exchange: str = None,
+    price: float = None,
 ) -> dict:
     """Execute a spot sell for a specific coin.
     
@@ -13723,6 +13766,7 @@ async def execute_spot_sell(
         sell_pct: Percentage of holdings to sell (0-100). Used if qty is None.
         account_type: 'demo', 'real' (Bybit) or 'testnet', 'mainnet' (HL)
         exchange: 'bybit' or 'hyperliquid' (auto-detected if None)
+        price: Current price if already known (skips the ticker request)
         
     Returns:
         dict with result info
@@ -13763,11 +13807,13 @@ async def execute_spot_sell(
         return {"success": False, "error": "Invalid quantity"}
     
     # Get current price
-    ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
-    if not ticker:
-        return {"success": False, "error": f"Could not get price for {symbol}"}
+    if price is None:
+        ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
+        if not ticker:
+            return {"success": False, "error": f"Could not get price for {symbol}"}
+        price = float(ticker.get("lastPrice", 0))
     
-    current_price = float(ticker.get("lastPrice", 0))
+    current_price = float(price)
     if current_price <= 0:
         return {"success": False, "error": f"Invalid price for {symbol}"}
     
@@ -13936,16 +13982,22 @@ async def rebalance_spot_portfolio(
     user_id: int,
     account_type: str = None,
     exchange: str = None,
+    dry_run: bool = False,
 ) -> dict:
     """Rebalance spot portfolio to match target allocation.
     
-    Sells over-allocated coins and buys under-allocated coins.
+    Sells over-allocated coins and buys under-allocated coins. Prices for
+    all coins come from one bulk ticker request; sells run concurrently
+    first, then buys (see core.spot_portfolio).
     
     Args:
         user_id: Telegram user ID
         account_type: Account type
         exchange: 'bybit' or 'hyperliquid' (auto-detected if None)
+        dry_run: Only return the plan, place no orders
     """
+    from core.spot_portfolio import plan_rebalance, execute_rebalance
+    
     # Detect exchange if not provided
     if exchange is None:
         exchange = db.get_exchange_type(user_id) or "bybit"
@@ -13965,83 +14017,49 @@ async def rebalance_spot_portfolio(
     if not allocation:
         return {"success": False, "error": "No target allocation defined"}
     
-    # Get current holdings
-    balances = await fetch_spot_balance(user_id, account_type=account_type, exchange=exchange)
-    
-    # Calculate current portfolio value
-    total_value = 0.0
-    coin_values = {}
-    
     # Determine quote currency based on exchange
     quote_currency = "USDC" if exchange == "hyperliquid" else "USDT"
     
-    for coin in allocation.keys():
-        qty = balances.get(coin, 0)
-        if qty > 0:
-            symbol = coin if exchange == "hyperliquid" else f"{coin}USDT"
-            ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
-            if ticker:
-                price = float(ticker.get("lastPrice", 0))
-                value = qty * price
-                coin_values[coin] = value
-                total_value += value
-    
-    # Add quote currency as available cash
-    quote_balance = balances.get(quote_currency, 0)
-    total_portfolio = total_value + quote_balance
-    
-    if total_portfolio < 10:  # Minimum $10 to rebalance
-        return {"success": False, "error": "Portfolio too small to rebalance"}
+    # Current holdings and all prices in two requests
+    balances, tickers = await asyncio.gather(
+        fetch_spot_balance(user_id, account_type=account_type, exchange=exchange),
+        get_spot_tickers(user_id, list(allocation), account_type, exchange),
+    )
     
-    # Calculate target values and differences
-    trades = {"buy": [], "sell": []}
+    plan = plan_rebalance(allocation, balances, tickers, quote_balance=balances.get(quote_currency, 0))
+    if plan.error:
+        return {"success": False, "error": plan.error, "plan": plan.to_dict()}
+    if plan.unpriced:
+        logger.warning(f"[{user_id}] Rebalance: no {exchange} price for {', '.join(plan.unpriced)}, skipped")
     
-    for coin, target_pct in allocation.items():
-        target_value = total_portfolio * (target_pct / 100.0)
-        current_value = coin_values.get(coin, 0)
-        diff = target_value - current_value
-        
-        # Only rebalance if difference is more than 5% of target
-        if abs(diff) < target_value * 0.05:
-            continue
-        
-        if diff > 5:  # Need to buy at least $5
-            trades["buy"].append({"coin": coin, "usdt": diff})
-        elif diff < -5:  # Need to sell at least $5 worth
-            trades["sell"].append({"coin": coin, "usdt": abs(diff)})
+    if dry_run:
+        return {
+            "success": True,
+            "dry_run": True,
+            "sells": [f"Sell ${t.usd:.2f} ({t.qty:.6f}) {t.coin}" for t in plan.sells],
+            "buys": [f"Buy ${t.usd:.2f} {t.coin}" for t in plan.buys],
+            "total_rebalanced": 0.0,
+            "plan": plan.to_dict(),
+        }
     
-    results = {"sells": [], "buys": [], "total_rebalanced": 0.0}
+    async def sell(trade):
+        return await execute_spot_sell(user_id, trade.coin, qty=trade.qty, account_type=account_type,
+                                       exchange=exchange, price=trade.price)
     
-    # Execute sells first to free up quote currency
-    for trade in trades["sell"]:
-        coin = trade["coin"]
-        usdt_to_sell = trade["usdt"]
-        
-        symbol = coin if exchange == "hyperliquid" else f"{coin}USDT"
-        ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
-        if not ticker:
-            continue
-        
-        price = float(ticker.get("lastPrice", 0))
-        qty_to_sell = usdt_to_sell / price if price > 0 else 0
-        
-        result = await execute_spot_sell(user_id, coin, qty=qty_to_sell, account_type=account_type, exchange=exchange)
-        if result.get("success"):
-            results["sells"].append(f"Sold {qty_to_sell:.6f} {coin}")
-            results["total_rebalanced"] += result.get("usdt_received", 0)
+    async def buy(trade):
+        return await execute_spot_dca_buy(user_id, trade.coin, trade.usd, account_type=account_type,
+                                          exchange=exchange, price=trade.price)
     
-    # Execute buys
-    for trade in trades["buy"]:
-        coin = trade["coin"]
-        usdt_to_buy = trade["usdt"]
-        
-        result = await execute_spot_dca_buy(user_id, coin, usdt_to_buy, account_type=account_type, exchange=exchange)
-        if result.get("success"):
-            results["buys"].append(f"Bought {result.get('qty', 0):.6f} {coin}")
-            results["total_rebalanced"] += result.get("usdt_spent", 0)
+    report = await execute_rebalance(plan, sell, buy, exchange=exchange, limiter_key=str(user_id))
     
-    results["success"] = True
-    return results
+    return {
+        "success": True,
+        "sells": [f"Sold {t.qty:.6f} {t.coin}" for t, r in report.sells if r.get("success")],
+        "buys": [f"Bought {r.get('qty', 0):.6f} {t.coin}" for t, r in report.buys if r.get("success")],
+        "total_rebalanced": report.total_rebalanced,
+        "plan": plan.to_dict(),
+        "elapsed_ms": report.elapsed_ms,
+    }
 
 
 # ==================== SPOT TRAILING TP ====================
@@ -14736,8 +14754,12 @@ async def get_spot_portfolio_stats(user_id: int, account_type: str = None, excha
     purchase_history = spot_settings.get("purchase_history", {})
     total_invested = spot_settings.get("total_invested", 0)
     
-    # Get current balances and prices
-    balances = await fetch_spot_balance(user_id, account_type=account_type, exchange=exchange)
+    # Get current balances and prices (one bulk ticker request, BTC included for HODL comparison)
+    btc_coin = "BTC"
+    balances, tickers = await asyncio.gather(
+        fetch_spot_balance(user_id, account_type=account_type, exchange=exchange),
+        get_spot_tickers(user_id, list({*purchase_history, btc_coin}), account_type, exchange),
+    )
     
     coins_stats = []
     total_current_value = 0
@@ -14754,14 +14776,8 @@ async def get_spot_portfolio_stats(user_id: int, account_type: str = None, excha
         # Get actual balance (may differ if user traded outside bot)
         actual_qty = balances.get(coin, 0)
         
-        # Build symbol based on exchange
-        if exchange == "hyperliquid":
-            symbol = coin  # HL uses just the token name
-        else:
-            symbol = f"{coin}USDT"  # Bybit uses COINUSDT format
-        
         try:
-            ticker = await get_spot_ticker(user_id, symbol, account_type, exchange)
+            ticker = tickers.get(coin)
             if not ticker:
                 continue
             
@@ -14804,8 +14820,7 @@ async def get_spot_portfolio_stats(user_id: int, account_type: str = None, excha
     btc_comparison = None
     if total_invested > 0:
         try:
-            btc_symbol = "BTC" if exchange == "hyperliquid" else "BTCUSDT"
-            btc_ticker = await get_spot_ticker(user_id, btc_symbol, account_type, exchange)
+            btc_ticker = tickers.get(btc_coin)
             if btc_ticker:
                 btc_price = float(btc_ticker.get("lastPrice") or btc_ticker.get("mid_price") or btc_ticker.get("mark_price") or 0)
                 # Get historical price when user started (approximation using first purchase)
@@ -15102,16 +15117,15 @@ async def fetch_open_positions(user_id, *args, exchange: str = None, **kwargs) -
         return None  # Return None on API error to prevent phantom position removal
 
 async def _create_hl_adapter_for_account(uid: int, account_type: str):
-    """Create and initialize HL adapter for given user and account_type (testnet/mainnet).
+    """Get an initialized pooled HL adapter for given user and account_type (testnet/mainnet).
     Returns (adapter, is_testnet) or (None, False) if credentials missing.
-    Caller MUST call adapter.close() when done."""
+    adapter.close() is safe to call but a no-op - the pool owns the adapter."""
     from core.account_utils import get_hl_credentials_for_account
     hl_creds = get_hl_credentials(uid)
     private_key, is_testnet, _wallet = get_hl_credentials_for_account(hl_creds, account_type)
     if not private_key:
         return None, is_testnet
-    adapter = HLAdapter(private_key=private_key, testnet=is_testnet)
-    await adapter.initialize()
+    adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=uid)
     return adapter, is_testnet
 
 
@@ -19149,11 +19163,7 @@ async def normalize_qty_price(
     tick_size = float(filt["tickSize"])
     min_price = float(filt["minPrice"])
 
-    inst = await _bybit_request(
-        user_id, "GET", "/v5/market/instruments-info",
-        params={"category": "linear", "symbol": symbol},
-        account_type=account_type
-    )
+    inst = await _linear_instrument(user_id, symbol, account_type=account_type)
     if not inst.get("list"):
         raise ValueError(f"Symbol {symbol} not found")
     lot = inst["list"][0]["lotSizeFilter"]
@@ -19189,10 +19199,31 @@ async def normalize_qty_price(
 
     return qty_str, price_str, min_qty, max_qty, tick_size
 
+async def _linear_instrument(user_id: int, symbol: str, account_type: str = None) -> dict:
+    """Linear instrument info in instruments-info result shape ({"list": [...]}).
+
+    Served from the symbol universe; falls back to the API for symbols it
+    doesn't know yet (fresh listings) or when it isn't loaded.
+    """
+    from core.symbol_universe import symbol_universe
+    try:
+        info = await symbol_universe.get("bybit", symbol)
+    except Exception as e:
+        logger.debug(f"Symbol universe lookup failed for {symbol}: {e}")
+        info = None
+    if info is not None and info.raw:
+        return {"category": "linear", "list": [info.raw]}
+    return await _bybit_request(
+        user_id, "GET", "/v5/market/instruments-info",
+        params={"category": "linear", "symbol": symbol},
+        account_type=account_type
+    )
+
 @log_calls
 async def get_symbol_filters(user_id: int, symbol: str, account_type: str = None, exchange: str = None) -> dict:
     """Get symbol trading filters with caching (1 hour TTL).
     
+    Served from the symbol universe. Fallbacks for symbols it doesn't know:
     For HyperLiquid: Uses local constants for size decimals (no API call needed).
     For Bybit: Fetches from Bybit API instruments-info.
     """
@@ -19209,6 +19240,17 @@ async def get_symbol_filters(user_id: int, symbol: str, account_type: str = None
         if now - ts < SYMBOL_FILTERS_CACHE_TTL:
             return cached
     
+    # Symbol universe - filters for both exchanges without an API call
+    from core.symbol_universe import symbol_universe
+    try:
+        filters = await symbol_universe.filters(exchange, symbol)
+    except Exception as e:
+        logger.debug(f"Symbol universe lookup failed for {cache_key}: {e}")
+        filters = None
+    if filters is not None:
+        _symbol_filters_cache[cache_key] = (now, filters)
+        return filters
+    
     # HyperLiquid - use local constants
     if exchange == "hyperliquid":
         from hyperliquid.constants import get_size_decimals, DEFAULT_SIZE_DECIMALS
@@ -19281,11 +19323,7 @@ async def place_limit_order(
     if qty_q < min_qty:
         qty_q = min_qty
 
-    inst = await _bybit_request(
-        user_id, "GET", "/v5/market/instruments-info",
-        params={"category": "linear", "symbol": symbol},
-        account_type=account_type
-    )
+    inst = await _linear_instrument(user_id, symbol, account_type=account_type)
     if not inst.get("list"):
         raise ValueError(f"Symbol {symbol} not found")
     lot = inst["list"][0]["lotSizeFilter"]
@@ -19498,10 +19536,8 @@ async def place_ladder_limit_orders(
     
     # Get instrument info for qty normalization
     try:
-        inst = await _bybit_request(
-            user_id, "GET", "/v5/market/instruments-info",
-            params={"category": "linear", "symbol": symbol},
-            account_type=account_types[0]
+        inst = await _linear_instrument(
+            user_id, symbol, account_type=account_types[0]
         )
         if not inst.get("list"):
             logger.error(f"[{user_id}] Symbol {symbol} not found in instruments")
@@ -19692,11 +19728,7 @@ async def calc_qty(
     # ═══════════════════════════════════════════════════════════════
     # BYBIT: Query instrument info for precise lot sizes
     # ═══════════════════════════════════════════════════════════════
-    inst = await _bybit_request(
-        user_id, "GET", "/v5/market/instruments-info",
-        params={"category":"linear", "symbol": symbol},
-        account_type=account_type
-    )
+    inst = await _linear_instrument(user_id, symbol, account_type=account_type)
     if not inst.get("list"):
         raise ValueError(f"Symbol {symbol} not found")
     lot      = inst["list"][0]["lotSizeFilter"]
@@ -20658,6 +20690,7 @@ async def on_mystrat_callback(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
 
 @log_calls
+@track_signal_latency
 async def on_channel_post(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     logger.info(f"📨 Received channel post from chat_id={update.channel_post.chat_id if update.channel_post else 'None'}")
     try:
@@ -22543,34 +22576,38 @@ async def monitor_positions_loop(app: Application):
     global _close_all_cooldown
     bot = app.bot
     
+    # Bookkeeping below is bounded (size + TTL) so it cannot grow for the
+    # lifetime of the process; entries are refreshed or popped as positions change.
+    
     # Track previous open symbols per user to avoid spam notifications
-    _open_syms_prev = {}
+    # Key: "uid:exchange:account_type", refreshed every cycle
+    _open_syms_prev = bounded_cache("monitor.open_syms_prev", max_size=20000, ttl=86400)
     
     # Track SL notifications already sent to avoid spam
     # Key: (uid, symbol), Value: timestamp when last notification was sent
-    _sl_notified = {}
+    _sl_notified = bounded_cache("monitor.sl_notified", max_size=50000, ttl=7 * 86400)
     
     # Track last stale cleanup time per user (run every 5 minutes)
     _last_stale_cleanup = {}
     
     # Track deep loss notifications (position without SL in deep loss)
     # Key: (uid, symbol), Value: timestamp when notification was sent
-    _deep_loss_notified = {}
+    _deep_loss_notified = bounded_cache("monitor.deep_loss_notified", max_size=50000, ttl=7 * 86400)
     
     # Track close position notifications already sent to avoid spam
     # Key: (uid, symbol, account_type), Value: timestamp when notification was sent
     # Prevents duplicate close notifications when remove_active_position() fails (e.g., entry_price mismatch)
-    _close_notified = {}
+    _close_notified = bounded_cache("monitor.close_notified", max_size=50000, ttl=3600)
     
     # Track already processed closures to prevent duplicate logging
     # Key: (uid, symbol, entry_price_rounded, pnl_rounded), Value: timestamp
     # This is a second layer of protection (first layer is in add_trade_log)
-    _processed_closures = {}
+    _processed_closures = bounded_cache("monitor.processed_closures", max_size=50000, ttl=86400)
     
     # Track new position notifications to prevent flood
     # Key: (uid, symbol, account_type), Value: timestamp
     # Prevents duplicate "СДЕЛКА ИСПОЛНЕНА" notifications
-    _new_position_notified = {}
+    _new_position_notified = bounded_cache("monitor.new_position_notified", max_size=50000, ttl=3600)
     
     # Cooldown for new position notifications (5 minutes = 300 seconds)
     NEW_POSITION_NOTIFY_COOLDOWN = 300
@@ -22581,8 +22618,9 @@ async def monitor_positions_loop(app: Application):
     _MONITOR_API_TIMEOUT = 30
 
     while True:
+        _loop_iteration += 1
+        _cycle_started = time.perf_counter()
         try:
-            _loop_iteration += 1
             if _loop_iteration % 10 == 1:  # Log heartbeat every ~250s (10 iterations * 25s)
                 active_users = get_active_trading_users()
                 logger.info(f"[MONITOR-HEARTBEAT] iteration={_loop_iteration} users={len(active_users)}")
@@ -22593,7 +22631,7 @@ async def monitor_positions_loop(app: Application):
                     if GLOBAL_PAUSED:
                         continue
                     
-                    cfg  = get_user_config(uid)  # Cached
+                    cfg  = await fetch_user_config(uid)  # Cached
                     
                     # Skip banned users
                     if cfg.get("is_banned"):
@@ -22608,12 +22646,12 @@ async def monitor_positions_loop(app: Application):
                     
                     # Fallback to legacy if no targets from unified
                     if not user_targets:
-                        user_trading_mode = get_trading_mode(uid) or "demo"
-                        user_exchange = db.get_exchange_type(uid) or "bybit"
+                        user_trading_mode = await adb.get_trading_mode(uid) or "demo"
+                        user_exchange = await adb.get_exchange_type(uid) or "bybit"
                         
                         if user_exchange == "hyperliquid":
                             # HL user — check HL credentials
-                            hl_creds = db.get_all_user_credentials(uid) or {}
+                            hl_creds = await fetch_all_user_credentials(uid) or {}
                             hl_key = hl_creds.get("hl_testnet_private_key") or hl_creds.get("hl_mainnet_private_key") or hl_creds.get("hl_private_key")
                             if not hl_key:
                                 continue
@@ -22625,7 +22663,7 @@ async def monitor_positions_loop(app: Application):
                                 targets_to_check = [("hyperliquid", "testnet")]
                         else:
                             # Bybit user — check Bybit credentials
-                            k, s = get_user_credentials(uid)
+                            k, s = await fetch_user_credentials(uid)
                             if not k or not s:
                                 continue
                             if user_trading_mode == "both":
@@ -22660,7 +22698,7 @@ async def monitor_positions_loop(app: Application):
                             continue
                         
                         open_positions = [p for p in open_positions if p["symbol"] not in BLACKLIST]
-                        active = get_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
+                        active = await fetch_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
                         
                         existing_syms = {ap.get("symbol") for ap in active if ap.get("symbol")}
                         tf_map = {ap.get('symbol'): ap.get('timeframe', '24h') for ap in active if ap.get('symbol')}
@@ -22674,7 +22712,7 @@ async def monitor_positions_loop(app: Application):
                         if current_exchange == 'hyperliquid':
                             await asyncio.sleep(1.5)  # 1.5s delay between HL users
                         
-                        pending = get_pending_limit_orders(uid, exchange=current_exchange)
+                        pending = await fetch_pending_limit_orders(uid, exchange=current_exchange)
                         if pending:
                             try:
                                 open_orders = await fetch_open_orders(uid, account_type=current_account_type)
@@ -22695,7 +22733,7 @@ async def monitor_positions_loop(app: Application):
                                         if pos:
                                             # P0.5: Get use_atr from strategy settings
                                             strat_name = po.get("strategy") or "unknown"
-                                            cfg_pending = get_user_config(uid) or {}
+                                            cfg_pending = await fetch_user_config(uid) or {}
                                             trade_params_pending = get_strategy_trade_params(
                                                 uid, cfg_pending, sym, strat_name,
                                                 side=po["side"], account_type=current_account_type,
@@ -22740,7 +22778,7 @@ async def monitor_positions_loop(app: Application):
                                         remove_pending_limit_order(uid, order_id, exchange=current_exchange)
 
                         # Refresh active positions for this account type
-                        active = get_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
+                        active = await fetch_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
                         existing_syms = {ap.get("symbol") for ap in active if ap.get("symbol")}
                                     
                         for p in open_positions:
@@ -22832,7 +22870,7 @@ async def monitor_positions_loop(app: Application):
                                 if not detected_strategy:
                                     try:
                                         other_exchange = 'bybit' if current_exchange == 'hyperliquid' else 'hyperliquid'
-                                        other_positions = get_active_positions(uid, exchange=other_exchange)
+                                        other_positions = await fetch_active_positions(uid, exchange=other_exchange)
                                         for other_pos in other_positions:
                                             if other_pos.get('symbol') == sym:
                                                 other_strat = other_pos.get('strategy')
@@ -22850,7 +22888,7 @@ async def monitor_positions_loop(app: Application):
                                 final_strategy = detected_strategy or None
                                 
                                 # P0.5: Get use_atr from strategy settings
-                                cfg_detected = get_user_config(uid) or {}
+                                cfg_detected = await fetch_user_config(uid) or {}
                                 trade_params_detected = get_strategy_trade_params(
                                     uid, cfg_detected, sym, final_strategy,
                                     side=side, account_type=current_account_type
@@ -22987,7 +23025,7 @@ async def monitor_positions_loop(app: Application):
                             
                                 # Determine use_atr: strategy-specific takes priority over global
                                 if strategy:
-                                    strat_settings = db.get_strategy_settings(uid, strategy, exchange=current_exchange, account_type=current_account_type)
+                                    strat_settings = await fetch_strategy_settings(uid, strategy, exchange=current_exchange, account_type=current_account_type)
                                     strat_use_atr = strat_settings.get("use_atr")
                                     pos_use_atr = bool(strat_use_atr) if strat_use_atr is not None else use_atr
                                 else:
@@ -23134,7 +23172,7 @@ async def monitor_positions_loop(app: Application):
                                     if "no open positions" not in str(e).lower():
                                         logger.error(f"Errors with SL/TP for {sym}: {e}")
 
-                        active = get_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
+                        active = await fetch_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
 
                         for ap in active:
                             sym = ap.get("symbol")
@@ -23255,8 +23293,8 @@ async def monitor_positions_loop(app: Application):
                                     now_ts = int(time.time())
                                     CLOSURE_COOLDOWN = 86400  # 24 hours
                                     
-                                    if closure_key in _processed_closures:
-                                        last_processed = _processed_closures[closure_key]
+                                    last_processed = _processed_closures.get(closure_key)
+                                    if last_processed is not None:
                                         if now_ts - last_processed < CLOSURE_COOLDOWN:
                                             logger.debug(
                                                 f"[{uid}] Skipping already processed closure: {sym} "
@@ -23269,11 +23307,7 @@ async def monitor_positions_loop(app: Application):
                                     
                                     # NOTE: _processed_closures is set AFTER successful log_exit_and_remove_position
                                     # to allow retry on failure (moved from here to after line ~21185)
-                                    
-                                    # Cleanup old entries (keep last 24 hours only)
-                                    if len(_processed_closures) > 1000:
-                                        cutoff = now_ts - CLOSURE_COOLDOWN
-                                        _processed_closures = {k: v for k, v in _processed_closures.items() if v > cutoff}
+                                    # Entries expire after CLOSURE_COOLDOWN (24h)
                                 
                                     # Determine strategy: from position or fallback to signal detection
                                     # CRITICAL FIX: If position has signal_id but strategy is "manual",
@@ -23534,7 +23568,7 @@ async def monitor_positions_loop(app: Application):
                                         _hl_sl_cache.pop((uid, sym), None)  # Clear HL SL cache
                                         _hl_sl_fail_cooldown.pop((uid, sym), None)  # Clear HL SL fail cooldown
 
-                        active = get_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
+                        active = await fetch_active_positions(uid, account_type=current_account_type, exchange=current_exchange)
                         tf_map = { ap['symbol']: ap.get('timeframe','15m') for ap in active }  # Default 15m
                         strategy_map = { ap['symbol']: ap.get('strategy') for ap in active }
                         # Use current_account_type as fallback instead of hardcoded 'demo'
@@ -23577,7 +23611,7 @@ async def monitor_positions_loop(app: Application):
                                 if entry_diff_pct > 0.1:  # Entry changed by >0.1%
                                     try:
                                         pos_account_type = account_type_map.get(sym, current_account_type)
-                                        if db.sync_position_entry_price(uid, sym, entry, pos_account_type, exchange=current_exchange):
+                                        if await adb.sync_position_entry_price(uid, sym, entry, pos_account_type, exchange=current_exchange):
                                             logger.info(f"[{uid}] {sym}: Entry synced {db_entry:.6f} → {entry:.6f} (diff={entry_diff_pct:.2f}%)")
                                             entry_changed = True
                                     except Exception as e:
@@ -23662,7 +23696,7 @@ async def monitor_positions_loop(app: Application):
                         
                             # Get ATR params: priority is side-specific > strategy settings > timeframe defaults
                             if pos_strategy:
-                                strat_settings = db.get_strategy_settings(uid, pos_strategy, exchange=current_exchange, account_type=pos_account_type)
+                                strat_settings = await fetch_strategy_settings(uid, pos_strategy, exchange=current_exchange, account_type=pos_account_type)
                                 side_prefix = "long" if side == "Buy" else "short"
                             
                                 # Get side-specific ATR settings, fallback to user globals, then timeframe defaults
@@ -23780,7 +23814,7 @@ async def monitor_positions_loop(app: Application):
 
                             # --- DCA при -dca_pct_1% против нас (только если DCA включён) ---
                             if dca_enabled and move_pct <= -dca_pct_1:
-                                if not get_dca_flag(uid, sym, 10, account_type=pos_account_type, exchange=current_exchange):
+                                if not await adb.get_dca_flag(uid, sym, 10, account_type=pos_account_type, exchange=current_exchange):
                                     try:
                                         # Use strategy-specific percent if available
                                         if risk_pct_for_dca > 0:
@@ -23830,7 +23864,7 @@ async def monitor_positions_loop(app: Application):
                             # --- DCA при -dca_pct_2% против нас (только если DCA включён) ---
                             # CRITICAL: Only fire Leg 2 if Leg 1 is already done — prevents 2x accumulation on flash crashes
                             if dca_enabled and move_pct <= -dca_pct_2:
-                                if get_dca_flag(uid, sym, 10, account_type=pos_account_type, exchange=current_exchange) and not get_dca_flag(uid, sym, 25, account_type=pos_account_type, exchange=current_exchange):
+                                if await adb.get_dca_flag(uid, sym, 10, account_type=pos_account_type, exchange=current_exchange) and not await adb.get_dca_flag(uid, sym, 25, account_type=pos_account_type, exchange=current_exchange):
                                     try:
                                         # Use strategy-specific percent if available
                                         if risk_pct_for_dca > 0:
@@ -23917,7 +23951,7 @@ async def monitor_positions_loop(app: Application):
                                         _be_triggered[key] = True
                                         
                                         # Update SL in database so it persists across bot restarts
-                                        db.update_position_sltp(uid, sym, sl_price=be_sl_quantized, account_type=pos_account_type, exchange=current_exchange, respect_manual_override=False)
+                                        await adb.update_position_sltp(uid, sym, sl_price=be_sl_quantized, account_type=pos_account_type, exchange=current_exchange, respect_manual_override=False)
                                         
                                         logger.info(f"[BE-ACTIVATED] {sym} uid={uid} - SL moved to BE+{be_offset_pct}% @ {be_sl_quantized:.6f} (entry={entry:.6f}, was {current_sl}, move_pct={move_pct:.2f}%)")
                                         
@@ -23950,7 +23984,7 @@ async def monitor_positions_loop(app: Application):
                             # Works for both strategy positions AND manual positions (uses "manual" strategy settings)
                             # ═══════════════════════════════════════════════════════════════════
                             # For manual positions, load settings from "manual" strategy
-                            ptp_strat_settings = strat_settings if (pos_strategy and strat_settings) else db.get_strategy_settings(uid, "manual", exchange=current_exchange, account_type=pos_account_type)
+                            ptp_strat_settings = strat_settings if (pos_strategy and strat_settings) else await fetch_strategy_settings(uid, "manual", exchange=current_exchange, account_type=pos_account_type)
                             if ptp_strat_settings:
                                 side_prefix = "long" if side == "Buy" else "short"
                                 
@@ -23987,7 +24021,7 @@ async def monitor_positions_loop(app: Application):
                                     close_side = "Sell" if side == "Buy" else "Buy"
                                     
                                     # === STEP 1: Close ptp_1_close% at ptp_1_trigger% profit ===
-                                    if move_pct >= ptp_1_trigger and not get_ptp_flag(uid, sym, 1, account_type=pos_account_type, exchange=current_exchange):
+                                    if move_pct >= ptp_1_trigger and not await adb.get_ptp_flag(uid, sym, 1, account_type=pos_account_type, exchange=current_exchange):
                                         try:
                                             close_qty = pos_size * (ptp_1_close / 100)
                                             # Get symbol filters for qty step
@@ -24074,7 +24108,7 @@ async def monitor_positions_loop(app: Application):
                                             logger.error(f"[{uid}] {sym}: Partial TP step 1 failed: {e}", exc_info=True)
                                     
                                     # === STEP 2: Close ptp_2_close% at ptp_2_trigger% profit ===
-                                    if move_pct >= ptp_2_trigger and not get_ptp_flag(uid, sym, 2, account_type=pos_account_type, exchange=current_exchange):
+                                    if move_pct >= ptp_2_trigger and not await adb.get_ptp_flag(uid, sym, 2, account_type=pos_account_type, exchange=current_exchange):
                                         try:
                                             # Recalculate size: if Step 1 just fired in this cycle,
                                             # open_positions still has the STALE pre-Step1 size.
@@ -24083,7 +24117,7 @@ async def monitor_positions_loop(app: Application):
                                             if current_pos:
                                                 current_size = float(current_pos["size"])
                                                 # If Step 1 was done (possibly just now), adjust size
-                                                if get_ptp_flag(uid, sym, 1, account_type=pos_account_type, exchange=current_exchange):
+                                                if await adb.get_ptp_flag(uid, sym, 1, account_type=pos_account_type, exchange=current_exchange):
                                                     step1_closed = pos_size * (ptp_1_close / 100)
                                                     filt_adj = await asyncio.wait_for(get_symbol_filters(uid, sym, exchange=current_exchange), timeout=_MONITOR_API_TIMEOUT)
                                                     qty_step_adj = float(filt_adj.get("qtyStep", 0.001))
@@ -24595,11 +24629,13 @@ async def monitor_positions_loop(app: Application):
                     else:
                         logger.error(f"Monitoring error for {uid}: {e}", exc_info=True)
 
-            await asyncio.sleep(CHECK_INTERVAL)
-
         except Exception as e:
             logger.exception(f"Critical error in loop, restart after {CHECK_INTERVAL}s: {e}")
-            await asyncio.sleep(CHECK_INTERVAL)
+        finally:
+            # Failed and cancelled cycles are timed too
+            metrics.monitor_cycle.observe((time.perf_counter() - _cycle_started) * 1000)
+
+        await asyncio.sleep(CHECK_INTERVAL)
 
 
 async def spot_tp_rebalance_loop(app: Application):
@@ -25192,9 +25228,15 @@ async def _close_all_positions_for_exchange(uid: int, exchange: str, cfg: dict,
     """
     Close all positions for a user on a specific exchange.
     
+    Live positions of every enabled account are closed concurrently with
+    batched reduce-only orders (see core.bulk_close).
+    
     Returns the number of positions closed.
     """
+    from core.bulk_close import close_accounts, close_bybit_account, close_hl_account
+    
     closed_count = 0
+    adapters = []
     
     try:
         # Get account types for this exchange
@@ -25211,53 +25253,54 @@ async def _close_all_positions_for_exchange(uid: int, exchange: str, cfg: dict,
             else:
                 account_types = ["testnet" if hl_testnet else "mainnet"]
         
+        closers = {}
         for account_type in account_types:
-            try:
-                # Get positions for this account
-                positions = db.get_active_positions(uid, exchange=exchange)
-                
-                for pos in positions:
-                    try:
-                        symbol = pos.get("symbol")
-                        side = pos.get("side")
-                        size = pos.get("size", 0)
-                        pos_account_type = pos.get("account_type", account_type)
-                        
-                        if not symbol or not side or size <= 0:
-                            continue
-                        
-                        # Close position
-                        close_side = "Sell" if side == "Buy" else "Buy"
-                        
-                        if exchange == "bybit":
-                            result = await place_order(
-                                uid, symbol, close_side, "Market", size,
-                                account_type=pos_account_type, reduce_only=True
-                            )
-                        else:
-                            result = await place_order_hyperliquid(
-                                uid, symbol, close_side, "Market", size,
-                                account_type=pos_account_type, is_close=True
-                            )
-                        
-                        if result and result.get("success"):
-                            closed_count += 1
-                            logger.info(f"[AUTO-CLOSE] {uid} {exchange} {symbol} {side} closed successfully")
-                            
-                            # Remove from active positions
-                            db.remove_active_position(uid, symbol, account_type=pos_account_type, exchange=exchange)
-                        else:
-                            logger.warning(f"[AUTO-CLOSE] {uid} {exchange} {symbol} close failed: {result}")
-                    
-                    except Exception as e:
-                        logger.error(f"[AUTO-CLOSE] Error closing {pos.get('symbol')} for {uid}: {e}")
-            
-            except Exception as e:
-                logger.error(f"[AUTO-CLOSE] Error getting positions for {uid} {exchange} {account_type}: {e}")
+            if exchange == "bybit":
+                async def bybit_call(method, path, params=None, body=None, _acct=account_type):
+                    # Single attempt: order submission must not be replayed
+                    return await _bybit_request(uid, method, path, params=params, body=body,
+                                                retries=1, account_type=_acct, raw=True)
+                closers[account_type] = functools.partial(
+                    close_bybit_account, bybit_call, account_type, limiter_key=str(uid)
+                )
+            else:
+                adapter, _is_testnet = await _create_hl_adapter_for_account(uid, account_type)
+                if not adapter:
+                    continue
+                adapters.append(adapter)
+                closers[account_type] = functools.partial(
+                    close_hl_account, adapter, account_type, limiter_key=str(uid)
+                )
+        
+        report = await close_accounts(closers)
+        
+        for account_type, error in report.errors.items():
+            logger.error(f"[AUTO-CLOSE] Error closing positions for {uid} {exchange} {account_type}: {error}")
+        
+        for result in report.results:
+            if result.success:
+                closed_count += 1
+                logger.info(f"[AUTO-CLOSE] {uid} {exchange} {result.symbol} {result.side} closed successfully "
+                            f"({result.latency_ms:.0f}ms)")
+                try:
+                    db.remove_active_position(uid, result.symbol, account_type=result.account_type, exchange=exchange)
+                except Exception as e:
+                    logger.error(f"[AUTO-CLOSE] Error removing {result.symbol} for {uid}: {e}")
+            else:
+                logger.warning(f"[AUTO-CLOSE] {uid} {exchange} {result.symbol} close failed: {result.error}")
+        
+        logger.info(f"[AUTO-CLOSE] {uid} {exchange}: closed {closed_count}/{report.total} in {report.elapsed_ms:.0f}ms")
     
     except Exception as e:
         logger.error(f"[AUTO-CLOSE] Critical error for {uid} {exchange}: {e}")
     
+    finally:
+        for adapter in adapters:
+            try:
+                await adapter.close()
+            except Exception:
+                pass
+    
     return closed_count
 
 
@@ -25367,6 +25410,41 @@ async def start_monitoring(app: Application):
 
     auto_close_task.add_done_callback(_on_auto_close_done)
 
+    # Evict idle pooled HyperLiquid adapters
+    from core.hl_adapter_pool import periodic_hl_pool_cleanup
+    app.bot_data["hl_pool_cleanup_task"] = asyncio.create_task(
+        periodic_hl_pool_cleanup(), name="hl_adapter_pool_cleanup"
+    )
+
+    # Instrument filters / HL coin list served from memory
+    from core.symbol_universe import symbol_universe
+    await symbol_universe.start()
+
+    # Event loop lag / slow callback profiling
+    from core.loop_profiler import loop_profiler
+    await loop_profiler.start()
+
+    # Expire entries of the bounded monitor / notice caches
+    await cache_cleanup_scheduler.start()
+
+    # Config changes made by the webapp invalidate this process's cached configs
+    from core.config_cache import config_cache
+    config_cache.start_listener()
+
+    # Prometheus scrape endpoint (BOT_METRICS_PORT=0 disables), plus
+    # /debug/memory with per-cache sizes
+    metrics_port = int(os.getenv("BOT_METRICS_PORT", "9108"))
+    if metrics_port:
+        from core.metrics import start_metrics_server
+        from core.optimizations import get_memory_stats
+        try:
+            app.bot_data["metrics_runner"] = await start_metrics_server(
+                os.getenv("BOT_METRICS_HOST", "127.0.0.1"), metrics_port,
+                json_routes={"/debug/memory": get_memory_stats},
+            )
+        except OSError as e:
+            logger.error(f"Metrics endpoint not started on port {metrics_port}: {e}")
+
 @with_texts
 @log_calls
 @_catch_not_modified
@@ -34709,6 +34787,9 @@ async def _shutdown(app: Application):
         with contextlib.suppress(asyncio.CancelledError):
             await task
 
+    from core.metrics import stop_metrics_server
+    await stop_metrics_server(app.bot_data.pop("metrics_runner", None))
+
     global _session
     if _session is not None:
         await _session.close()
@@ -34731,6 +34812,7 @@ def main():
         .token(BOT_TOKEN)
         .request(request)
         .post_init(start_monitoring)   
+        .post_shutdown(_shutdown)
         .build()
     )
     
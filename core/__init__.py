@@ -124,6 +124,10 @@ from .metrics import (
     count_calls,
     count_errors,
     get_health_status,
+    mark_signal_received,
+    track_signal_latency,
+    observe_signal_to_order,
+    PROMETHEUS_CONTENT_TYPE,
 )
 
 # Unified exchange client
@@ -159,6 +163,8 @@ from .optimizations import (
     log_exceptions,
     CacheCleanupScheduler,
     cache_cleanup_scheduler,
+    bounded_cache,
+    get_memory_stats,
     metrics as opt_metrics,
     batch_query,
     retry_with_backoff,
@@ -329,6 +335,10 @@ __all__ = [
     "count_calls",
     "count_errors",
     "get_health_status",
+    "mark_signal_received",
+    "track_signal_latency",
+    "observe_signal_to_order",
+    "PROMETHEUS_CONTENT_TYPE",
     
     # Unified exchange client
     "ExchangeType",
@@ -406,6 +416,8 @@ __all__ = [
     "log_exceptions",
     "CacheCleanupScheduler",
     "cache_cleanup_scheduler",
+    "bounded_cache",
+    "get_memory_stats",
     "opt_metrics",
     "batch_query",
     "retry_with_backoff",
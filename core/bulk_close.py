@@ -0,0 +1,362 @@
+"""
+Bulk Close Engine
+=================
+Flattens every open position of a user as fast as the exchanges allow.
+
+- Bybit: reduce-only market orders go out through /v5/order/create-batch
+  (up to BYBIT_BATCH_LIMIT orders per request), batches run concurrently
+  and fill prices are read back with a single /v5/order/history call.
+- HyperLiquid: all reduce-only IOC orders are signed into one multi-order
+  action via HLAdapter.close_positions().
+- Accounts (demo/real, testnet/mainnet) are closed concurrently; a failure
+  on one account never blocks the others.
+
+Every position gets a CloseResult with its own latency, so callers can log
+trades and report per-symbol outcomes.
+
+Usage:
+    from core.bulk_close import close_accounts, close_bybit_account
+
+    report = await close_accounts({
+        "demo": lambda: close_bybit_account(demo_request, "demo"),
+        "real": lambda: close_bybit_account(real_request, "real"),
+    })
+    print(report.closed, report.total_pnl, report.elapsed_ms)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.rate_limiter import bybit_limiter, hl_limiter
+
+logger = logging.getLogger(__name__)
+
+# Bybit v5 accepts up to 20 linear orders per create-batch request
+BYBIT_BATCH_LIMIT = 20
+# Concurrent batch requests per account (Bybit allows 10 batch requests/s per UID)
+BYBIT_MAX_CONCURRENT_BATCHES = 4
+# Pause before reading fills back from order history
+FILL_LOOKUP_DELAY = 0.2
+
+# request(method, path, params=None, body=None) -> full Bybit response envelope
+BybitRequest = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# RESULT TYPES
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class ClosePosition:
+    """Snapshot of a position to close"""
+    symbol: str
+    side: str  # Position side: Buy (long) / Sell (short)
+    size: float
+    entry_price: float = 0.0
+    mark_price: float = 0.0
+    account_type: str = ""
+    position_idx: int = 0
+
+    @property
+    def close_side(self) -> str:
+        return "Sell" if self.side == "Buy" else "Buy"
+
+
+@dataclass
+class CloseResult:
+    """Outcome of closing one position"""
+    symbol: str
+    account_type: str
+    side: str
+    size: float
+    entry_price: float = 0.0
+    success: bool = False
+    exit_price: float = 0.0
+    filled_size: float = 0.0
+    pnl: float = 0.0
+    pnl_pct: float = 0.0
+    order_id: str = ""
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BulkCloseReport:
+    """Results of a close-all across one or more accounts"""
+    results: List[CloseResult] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)  # account_type -> error
+    elapsed_ms: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def closed(self) -> int:
+        return sum(1 for r in self.results if r.success)
+
+    @property
+    def total_pnl(self) -> float:
+        return sum(r.pnl for r in self.results if r.success)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "closed": self.closed,
+            "total": self.total,
+            "total_pnl": round(self.total_pnl, 2),
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "results": [r.to_dict() for r in self.results],
+            "errors": self.errors or None,
+        }
+
+
+def positions_from_list(raw_positions: List[Dict[str, Any]], account_type: str = "") -> List[ClosePosition]:
+    """Build close snapshots from Bybit-style position entries (size > 0 only)"""
+    positions = []
+    for pos in raw_positions:
+        size = _to_float(pos.get("size"))
+        if size <= 0 or not pos.get("symbol"):
+            continue
+        positions.append(ClosePosition(
+            symbol=pos["symbol"],
+            side=pos.get("side") or "Buy",
+            size=size,
+            entry_price=_to_float(pos.get("avgPrice") or pos.get("entryPrice")),
+            mark_price=_to_float(pos.get("markPrice")),
+            account_type=account_type,
+            position_idx=int(_to_float(pos.get("positionIdx"))),
+        ))
+    return positions
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _settle(position: ClosePosition, started: float, order_id: str = "",
+            exit_price: float = 0.0, filled_size: float = 0.0,
+            error: Optional[str] = None) -> CloseResult:
+    """CloseResult with PnL computed from the fill (mark price as fallback)"""
+    result = CloseResult(
+        symbol=position.symbol,
+        account_type=position.account_type,
+        side=position.side,
+        size=position.size,
+        entry_price=position.entry_price,
+        order_id=order_id,
+        latency_ms=(time.perf_counter() - started) * 1000,
+    )
+    if error:
+        result.error = error
+        return result
+
+    direction = 1 if position.side == "Buy" else -1
+    result.success = True
+    result.exit_price = exit_price or position.mark_price
+    result.filled_size = filled_size or position.size
+    if position.entry_price > 0 and result.exit_price > 0:
+        result.pnl = (result.exit_price - position.entry_price) * result.filled_size * direction
+        result.pnl_pct = (result.exit_price / position.entry_price - 1) * 100 * direction
+    return result
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# BYBIT
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+async def fetch_bybit_positions(request: BybitRequest, account_type: str = "") -> List[ClosePosition]:
+    """Open USDT linear positions for one Bybit account"""
+    data = await request("GET", "/v5/position/list", params={"category": "linear", "settleCoin": "USDT"})
+    return positions_from_list(data.get("result", {}).get("list", []), account_type)
+
+
+async def close_bybit_positions(
+    request: BybitRequest,
+    positions: List[ClosePosition],
+    limiter_key: str = "default",
+    max_concurrent: int = BYBIT_MAX_CONCURRENT_BATCHES,
+) -> List[CloseResult]:
+    """
+    Close positions with reduce-only market orders via the batch endpoint.
+
+    Args:
+        request: Signed request function bound to one account
+        positions: Snapshots to close
+        limiter_key: Rate limiter key (usually the user id)
+        max_concurrent: Batch requests in flight at once
+    """
+    if not positions:
+        return []
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max_concurrent)
+    chunks = [positions[i:i + BYBIT_BATCH_LIMIT] for i in range(0, len(positions), BYBIT_BATCH_LIMIT)]
+
+    async def submit(chunk: List[ClosePosition]) -> List[tuple]:
+        """(position, order_id, error, ack_ms) per order in the chunk"""
+        orders = [
+            {
+                "symbol": p.symbol,
+                "side": p.close_side,
+                "orderType": "Market",
+                "qty": str(p.size),
+                "reduceOnly": True,  # Never opens a reverse position
+                "timeInForce": "IOC",
+                "positionIdx": p.position_idx,
+                "orderLinkId": f"closeall_{uuid.uuid4().hex[:10]}",
+            }
+            for p in chunk
+        ]
+        async with semaphore:
+            await bybit_limiter.acquire(limiter_key, "order")
+            try:
+                data = await request("POST", "/v5/order/create-batch", body={"category": "linear", "request": orders})
+            except Exception as e:
+                ack_ms = (time.perf_counter() - started) * 1000
+                return [(p, "", str(e), ack_ms) for p in chunk]
+        ack_ms = (time.perf_counter() - started) * 1000
+
+        placed = data.get("result", {}).get("list", [])
+        ext = data.get("retExtInfo", {}).get("list", [])
+        outcome = []
+        for i, p in enumerate(chunk):
+            order_id = placed[i].get("orderId", "") if i < len(placed) else ""
+            info = ext[i] if i < len(ext) else {}
+            if info.get("code", 0) != 0 or not order_id:
+                outcome.append((p, "", info.get("msg") or "Order not accepted", ack_ms))
+            else:
+                outcome.append((p, order_id, None, ack_ms))
+        return outcome
+
+    submitted = [item for chunk in await asyncio.gather(*(submit(c) for c in chunks)) for item in chunk]
+
+    # One history call covers every order we just placed
+    fills: Dict[str, Dict[str, Any]] = {}
+    if any(order_id for _, order_id, _, _ in submitted):
+        try:
+            await asyncio.sleep(FILL_LOOKUP_DELAY)
+            history = await request(
+                "GET", "/v5/order/history",
+                params={"category": "linear", "limit": 50},
+            )
+            fills = {o.get("orderId"): o for o in history.get("result", {}).get("list", [])}
+        except Exception as e:
+            logger.debug(f"Bulk close fill lookup failed: {e}")
+
+    results = []
+    for p, order_id, error, ack_ms in submitted:
+        fill = fills.get(order_id, {}) if order_id else {}
+        result = _settle(
+            p, started, order_id=order_id,
+            exit_price=_to_float(fill.get("avgPrice")),
+            filled_size=_to_float(fill.get("cumExecQty")),
+            error=error,
+        )
+        # Latency is time to exchange acknowledgement, not including the fill lookup
+        result.latency_ms = ack_ms
+        results.append(result)
+    return results
+
+
+async def close_bybit_account(
+    request: BybitRequest,
+    account_type: str,
+    limiter_key: str = "default",
+) -> List[CloseResult]:
+    """Fetch and close every open position of one Bybit account"""
+    positions = await fetch_bybit_positions(request, account_type)
+    return await close_bybit_positions(request, positions, limiter_key=limiter_key)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# HYPERLIQUID
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+async def close_hl_positions(
+    adapter: Any,
+    positions: List[ClosePosition],
+    limiter_key: str = "default",
+) -> List[CloseResult]:
+    """Close positions with a single HyperLiquid multi-order action"""
+    if not positions:
+        return []
+
+    started = time.perf_counter()
+    await hl_limiter.acquire(limiter_key, "order")
+    response = await adapter.close_positions([
+        {"symbol": p.symbol, "side": p.side, "size": p.size, "markPrice": p.mark_price}
+        for p in positions
+    ])
+
+    if response.get("retCode") != 0:
+        error = response.get("retMsg") or "Close failed"
+        return [_settle(p, started, error=error) for p in positions]
+
+    statuses = response.get("result", {}).get("list", [])
+    results = []
+    for i, p in enumerate(positions):
+        status = statuses[i] if i < len(statuses) else {"error": "No order status returned"}
+        results.append(_settle(
+            p, started,
+            order_id=status.get("orderId", ""),
+            exit_price=_to_float(status.get("avgPrice")),
+            filled_size=_to_float(status.get("cumExecQty")),
+            error=status.get("error") or None,
+        ))
+    return results
+
+
+async def close_hl_account(
+    adapter: Any,
+    account_type: str,
+    limiter_key: str = "default",
+) -> List[CloseResult]:
+    """Fetch and close every open position of one HyperLiquid account"""
+    data = await adapter.fetch_positions()
+    if data.get("retCode") != 0:
+        raise RuntimeError(data.get("retMsg") or "Failed to fetch positions")
+    positions = positions_from_list(data.get("result", {}).get("list", []), account_type)
+    return await close_hl_positions(adapter, positions, limiter_key=limiter_key)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# MULTI-ACCOUNT
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+async def close_accounts(
+    closers: Dict[str, Callable[[], Awaitable[List[CloseResult]]]],
+) -> BulkCloseReport:
+    """
+    Run per-account closers concurrently.
+
+    Args:
+        closers: {account_type: coroutine factory returning CloseResults}
+
+    Returns:
+        BulkCloseReport; an account that raised is listed in report.errors
+    """
+    started = time.perf_counter()
+    accounts = list(closers)
+    outcomes = await asyncio.gather(*(closers[a]() for a in accounts), return_exceptions=True)
+
+    report = BulkCloseReport()
+    for account_type, outcome in zip(accounts, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning(f"Bulk close failed for {account_type}: {outcome}")
+            report.errors[account_type] = str(outcome)
+        else:
+            report.results.extend(outcome)
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
@@ -0,0 +1,376 @@
+"""
+Tiered User Config Cache
+========================
+Caches db.get_user_config() results for the bot and webapp processes:
+
+- L1: per-process, trusted for l1_ttl while this process is subscribed to
+  invalidations, otherwise only for fallback_ttl (the old 30s behaviour)
+- L2: Redis (JSON, l2_ttl), shared by all processes, so a config loaded by
+  one process is warm in the others
+- Invalidation: invalidate(user_id) bumps the user's version in Redis,
+  drops L1 and L2 and publishes the user id on a Redis channel; each
+  process's listener thread drops its L1 copy. Invalidations that could not
+  be sent are retried (listener thread / next invalidate) until delivered.
+  db.invalidate_user_cache() goes through here, so set_user_field,
+  set_strategy_setting and the settings_sync service all push invalidations.
+
+Redis is optional: without it the cache is L1-only with the short TTL.
+
+A load that overlaps an invalidation of the same user is not stored
+(begin_load() / set(token=...)), so a slow read cannot re-cache old data:
+L1 checks this process's invalidation generation, and L2 is written by a
+Lua script only if the Redis version read by begin_load() is unchanged,
+which also covers invalidations made by other processes.
+
+Usage:
+    from core.config_cache import config_cache
+
+    config_cache.start_listener()        # startup hook (bot and webapp)
+    cfg = config_cache.get(uid)
+    token = config_cache.begin_load(uid)
+    cfg = load_from_db(uid)
+    config_cache.set(uid, cfg, token)
+    config_cache.invalidate(uid)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from core.optimizations import TTLBoundedDict
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CACHE_CONFIG = {
+    "l1_ttl": float(os.getenv("USER_CONFIG_L1_TTL", "900")),   # With live invalidations
+    "fallback_ttl": 30.0,                                       # Without (listener down / no Redis)
+    "l2_ttl": int(os.getenv("USER_CONFIG_L2_TTL", "3600")),
+    "max_entries": 50000,
+    "use_redis": os.getenv("USER_CONFIG_CACHE_REDIS", "1") == "1",
+    "redis_timeout": 0.25,        # Seconds; L2 must stay cheaper than the DB read it replaces
+    "redis_retry": 30.0,          # Seconds to skip Redis after an error
+    "key_prefix": "user_config:",
+    "version_prefix": "user_config_version:",
+    "channel": "user_config:invalidate",
+    "max_pending": 1000,          # Unsent invalidations beyond this collapse into "all users"
+}
+
+ALL_USERS = "*"
+
+# SETEX KEYS[1] only if the user (KEYS[2]) and global (KEYS[3]) versions still
+# match the ones read before the database load (missing key = "0")
+_GUARDED_SETEX = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] and (redis.call('GET', KEYS[3]) or '0') == ARGV[2] then
+    redis.call('SETEX', KEYS[1], ARGV[3], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+
+class TieredUserConfigCache:
+    """Per-process L1 + Redis L2 with pub/sub invalidation"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, redis_client=None):
+        self.config = {**CONFIG_CACHE_CONFIG, **(config or {})}
+        # user_id -> (stored_at, cfg); age is checked against the current TTL on read
+        self._l1: TTLBoundedDict = TTLBoundedDict(
+            max_size=self.config["max_entries"], ttl=self.config["l1_ttl"]
+        )
+        # Invalidation generations: per user (short-lived) and global epoch
+        self._generations: TTLBoundedDict = TTLBoundedDict(max_size=self.config["max_entries"], ttl=300.0)
+        self._epoch = 0
+        self._gen_lock = threading.Lock()
+        self._redis = redis_client
+        self._redis_down_until = 0.0
+        self._listener: Optional[threading.Thread] = None
+        self._listener_stop = threading.Event()
+        self.listening = False
+        # Invalidations not yet delivered to Redis (user ids or ALL_USERS)
+        self._pending: set = set()
+        self._pending_lock = threading.Lock()
+        self.stats_counters = {
+            "l1_hits": 0, "l2_hits": 0, "misses": 0, "stale_loads": 0,
+            "invalidations_sent": 0, "invalidations_received": 0, "redis_errors": 0,
+        }
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Redis
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def _new_client(self, socket_timeout: Optional[float]):
+        import redis
+
+        return redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379"),
+            decode_responses=True,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=self.config["redis_timeout"],
+            health_check_interval=30,
+        )
+
+    def _client(self):
+        """Redis client for L2, or None while disabled / backing off after an error"""
+        if not self.config["use_redis"] or time.time() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = self._new_client(self.config["redis_timeout"])
+            except ImportError:
+                self.config["use_redis"] = False
+                return None
+        return self._redis
+
+    def _redis_failed(self, op: str, e: Exception):
+        self.stats_counters["redis_errors"] += 1
+        self._redis_down_until = time.time() + self.config["redis_retry"]
+        logger.warning(f"User config cache: Redis {op} failed, L1 only for {self.config['redis_retry']:.0f}s: {e}")
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.config['key_prefix']}{user_id}"
+
+    def _version_key(self, target) -> str:
+        return f"{self.config['version_prefix']}{target}"
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Read / write
+    # ───────────────────────────────────────────────────────────────────────────
+
+    @property
+    def l1_ttl(self) -> float:
+        return self.config["l1_ttl"] if self.listening else self.config["fallback_ttl"]
+
+    def get(self, user_id: int, shared: bool = True) -> Optional[dict]:
+        """
+        Copy of the cached config, or None.
+
+        shared=False skips L2 (for callers on the event loop thread, where a
+        blocking Redis round trip is not wanted).
+        """
+        entry = self._l1.get(user_id)
+        if entry is not None and time.time() - entry[0] < self.l1_ttl:
+            self.stats_counters["l1_hits"] += 1
+            return entry[1].copy()
+
+        client = self._client() if shared else None
+        if client is not None:
+            token = self._local_token(user_id)
+            try:
+                raw = client.get(self._key(user_id))
+            except Exception as e:
+                self._redis_failed("get", e)
+                raw = None
+            if raw:
+                cfg = json.loads(raw)
+                self._store_l1(user_id, cfg, token)
+                self.stats_counters["l2_hits"] += 1
+                return cfg.copy()
+
+        self.stats_counters["misses"] += 1
+        return None
+
+    def _local_token(self, user_id: int) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(user_id, 0)
+
+    def begin_load(self, user_id: int, shared: bool = True) -> Tuple:
+        """
+        Token to pass to set() after loading user_id from the database.
+
+        With shared=True it also carries the user's Redis version; without
+        one (shared=False, Redis unavailable) set() only fills L1.
+        """
+        versions = None
+        client = self._client() if shared else None
+        if client is not None:
+            if self._pending:
+                self.flush_invalidations()
+            try:
+                user_ver, all_ver = client.mget([self._version_key(user_id), self._version_key(ALL_USERS)])
+                versions = (user_ver or "0", all_ver or "0")
+            except Exception as e:
+                self._redis_failed("version read", e)
+        return (*self._local_token(user_id), versions)
+
+    def _store_l1(self, user_id: int, cfg: dict, token: Optional[Tuple]) -> bool:
+        with self._gen_lock:
+            if token is not None and token[:2] != self._local_token(user_id):
+                self.stats_counters["stale_loads"] += 1
+                return False
+            self._l1[user_id] = (time.time(), cfg)
+        return True
+
+    def set(self, user_id: int, cfg: dict, token: Optional[Tuple] = None, shared: bool = True):
+        """
+        Cache cfg unless user_id was invalidated since token was taken.
+        L2 is only written with a begin_load() token that holds a Redis version.
+        """
+        if not self._store_l1(user_id, cfg, token):
+            return
+        versions = token[2] if token is not None and len(token) > 2 else None
+        client = self._client() if shared and versions is not None else None
+        if client is None:
+            return
+        try:
+            payload = json.dumps(cfg)
+        except (TypeError, ValueError):
+            return  # Not JSON-safe; keep it process-local
+        try:
+            written = client.eval(
+                _GUARDED_SETEX, 3,
+                self._key(user_id), self._version_key(user_id), self._version_key(ALL_USERS),
+                versions[0], versions[1], self.config["l2_ttl"], payload,
+            )
+        except Exception as e:
+            self._redis_failed("set", e)
+            return
+        if not written:
+            # Invalidated by some process while we were loading
+            self.stats_counters["stale_loads"] += 1
+            with self._gen_lock:
+                entry = self._l1.get(user_id)
+                if entry is not None and entry[1] is cfg:
+                    self._l1.pop(user_id, None)
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Invalidation
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def _drop_local(self, user_id: Optional[int]):
+        with self._gen_lock:
+            if user_id is None:
+                self._epoch += 1
+                self._l1.clear()
+            else:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+                self._l1.pop(user_id, None)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop user_id (or everyone) here, in Redis and in every subscribed process"""
+        self._drop_local(user_id)
+        if not self.config["use_redis"]:
+            return
+        with self._pending_lock:
+            self._pending.add(ALL_USERS if user_id is None else user_id)
+            if len(self._pending) > self.config["max_pending"]:
+                self._pending = {ALL_USERS}
+        self.flush_invalidations()
+
+    def flush_invalidations(self) -> bool:
+        """
+        Send queued invalidations; on failure they stay queued and are
+        retried by the listener thread and the next invalidate().
+        """
+        client = self._client()
+        if client is None:
+            return not self._pending
+        with self._pending_lock:
+            targets, self._pending = self._pending, set()
+        if not targets:
+            return True
+        if ALL_USERS in targets:
+            targets = {ALL_USERS}
+        try:
+            pipe = client.pipeline(transaction=True)
+            for target in targets:
+                # Version first: a load that read the old version can no longer write L2
+                pipe.incr(self._version_key(target))
+                pipe.expire(self._version_key(target), self.config["l2_ttl"])
+                if target == ALL_USERS:
+                    for key in client.scan_iter(match=f"{self.config['key_prefix']}*", count=500):
+                        pipe.delete(key)
+                else:
+                    pipe.delete(self._key(target))
+                pipe.publish(self.config["channel"], str(target))
+            pipe.execute()
+            self.stats_counters["invalidations_sent"] += len(targets)
+            return True
+        except Exception as e:
+            with self._pending_lock:
+                self._pending |= targets
+            self._redis_failed("invalidate", e)
+            return False
+
+    def handle_message(self, data: str):
+        """Apply an invalidation published by any process (including this one)"""
+        self.stats_counters["invalidations_received"] += 1
+        if data == ALL_USERS:
+            self._drop_local(None)
+            return
+        try:
+            user_id = int(data)
+        except (TypeError, ValueError):
+            logger.debug(f"User config cache: ignoring invalidation {data!r}")
+            return
+        self._drop_local(user_id)
+        try:
+            # Other per-user process caches (credentials, balances) follow the same change
+            from core.cache import invalidate_user_caches
+            invalidate_user_caches(user_id)
+        except Exception as e:
+            logger.debug(f"invalidate_user_caches failed: {e}")
+
+    def _listen(self):
+        while not self._listener_stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self._new_client(None).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.config["channel"])
+                # Invalidations may have been missed while unsubscribed
+                self._drop_local(None)
+                self.listening = True
+                logger.info("User config cache: listening for invalidations")
+                while not self._listener_stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle_message(message["data"])
+                    if self._pending:
+                        self.flush_invalidations()
+            except Exception as e:
+                if self.listening:
+                    logger.warning(f"User config cache: invalidation listener disconnected: {e}")
+                else:
+                    logger.debug(f"User config cache: invalidation listener unavailable: {e}")
+            finally:
+                self.listening = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._listener_stop.wait(self.config["redis_retry"])
+
+    def start_listener(self):
+        """Subscribe to invalidations in a daemon thread (no-op without Redis)"""
+        if not self.config["use_redis"] or self._listener is not None:
+            return
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            return
+        self._listener_stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="config-cache-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        if self._listener is not None:
+            self._listener_stop.set()
+            self._listener = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1_size": len(self._l1),
+            "l1_ttl": self.l1_ttl,
+            "listening": self.listening,
+            "pending_invalidations": len(self._pending),
+            "redis": self.config["use_redis"] and time.time() >= self._redis_down_until,
+            **self.stats_counters,
+        }
+
+
+config_cache = TieredUserConfigCache()
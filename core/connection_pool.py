@@ -306,4 +306,7 @@ def on_credentials_changed(user_id: int) -> None:
     Invalidates all cached connections for the user.
     """
     connection_pool.invalidate_user(user_id)
+    
+    from core.hl_adapter_pool import hl_adapter_pool
+    hl_adapter_pool.invalidate_user(user_id)
     logger.info(f"Invalidated connections for user {user_id}")
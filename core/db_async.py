@@ -106,6 +106,12 @@ async def get_user_config(user_id: int) -> Optional[Dict[str, Any]]:
         return dict(row) if row else None
 
 
+async def _invalidate_user_config(user_id: int):
+    """Drop cached get_user_config results (Redis publish runs off the loop)"""
+    from core.config_cache import config_cache
+    await asyncio.to_thread(config_cache.invalidate, user_id)
+
+
 async def set_user_field(user_id: int, field: str, value: Any):
     """Update single user field"""
     async with get_connection() as conn:
@@ -113,6 +119,7 @@ async def set_user_field(user_id: int, field: str, value: Any):
             f"UPDATE users SET {field} = $1 WHERE user_id = $2",
             value, user_id
         )
+    await _invalidate_user_config(user_id)
 
 
 async def get_user_lang(user_id: int) -> str:
@@ -600,6 +607,7 @@ async def set_exchange_type(user_id: int, exchange_type: str):
         await conn.execute("""
             UPDATE users SET exchange_type = $1 WHERE user_id = $2
         """, exchange_type, user_id)
+    await _invalidate_user_config(user_id)
 
 
 async def get_trading_mode(user_id: int) -> str:
@@ -617,6 +625,7 @@ async def set_trading_mode(user_id: int, mode: str):
         await conn.execute("""
             UPDATE users SET trading_mode = $1 WHERE user_id = $2
         """, mode, user_id)
+    await _invalidate_user_config(user_id)
 
 
 # ═══════════════════════════════════════════════════════════════════════
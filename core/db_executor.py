@@ -0,0 +1,253 @@
+"""
+Async DB Executor
+=================
+Runs synchronous db.py / db_postgres calls on a dedicated, bounded thread
+pool so one slow query no longer stalls every coroutine in the process.
+
+- Worker count follows the psycopg2 pool (PG_POOL_MAX minus a reserve for
+  code that still calls db.* directly), so workers never hit pool exhaustion
+- Per-function timing plus queue wait in a QueryStatsCollector
+- Sync DB calls made on an event-loop thread are counted per call site and
+  logged (rate limited), which shows what still needs migrating
+
+Usage:
+    from core.db_executor import adb, db_executor
+
+    cfg = await adb.get_user_config(uid)              # any db.py function
+    rows = await db_executor.run(sync_fn, arg, name="reports.daily")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from core.metrics import metrics
+from core.multitenancy_queries import QueryStatsCollector
+
+logger = logging.getLogger(__name__)
+
+DB_EXECUTOR_CONFIG = {
+    "reserved_connections": 10,    # psycopg2 connections left for direct sync callers
+    "loop_warn_interval": 300.0,   # Per call site warning period (seconds)
+}
+
+# Stats key for time spent waiting for a free worker
+QUEUE_WAIT = "<queue_wait>"
+
+
+def default_workers() -> int:
+    """Worker count: DB_EXECUTOR_WORKERS or the psycopg2 pool size minus the reserve"""
+    env = os.getenv("DB_EXECUTOR_WORKERS")
+    if env:
+        return max(1, int(env))
+    from core.db_postgres import PG_POOL_MAX
+    return max(4, PG_POOL_MAX - DB_EXECUTOR_CONFIG["reserved_connections"])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# LOOP-THREAD DETECTION
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+# Sync calls on the loop thread warn by default; DB_LOOP_THREAD_WARN=0 turns it off
+LOOP_THREAD_WARN = os.getenv("DB_LOOP_THREAD_WARN", "1") != "0"
+
+_DB_MODULE_FILES = {"db.py", "db_postgres.py", "db_executor.py", "contextlib.py"}
+_loop_calls: Dict[str, int] = {}
+_loop_warned_at: Dict[str, float] = {}
+_loop_calls_lock = threading.Lock()
+
+
+def _call_site() -> str:
+    """First frame outside the DB layer, as 'file:line (function)'"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _DB_MODULE_FILES:
+            return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "unknown"
+
+
+def report_loop_thread_call() -> None:
+    """
+    Called by db_postgres before checking out a connection.
+
+    Does nothing off the loop thread; on it, counts the caller and logs
+    at most once per loop_warn_interval per call site.
+    """
+    if not LOOP_THREAD_WARN or asyncio._get_running_loop() is None:
+        return
+
+    site = _call_site()
+    now = time.time()
+    with _loop_calls_lock:
+        _loop_calls[site] = _loop_calls.get(site, 0) + 1
+        last = _loop_warned_at.get(site, 0.0)
+        if now - last < DB_EXECUTOR_CONFIG["loop_warn_interval"]:
+            return
+        _loop_warned_at[site] = now
+        count = _loop_calls[site]
+    logger.warning(
+        f"Sync DB call on event loop thread from {site} ({count} so far); "
+        f"use core.db_executor.adb"
+    )
+
+
+def get_loop_thread_calls(limit: int = 50) -> Dict[str, int]:
+    """Call sites with the most sync DB calls on the loop thread"""
+    with _loop_calls_lock:
+        top = sorted(_loop_calls.items(), key=lambda kv: kv[1], reverse=True)
+    return dict(top[:limit])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# EXECUTOR
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+class DBExecutor:
+    """Bounded thread pool for sync DB work with per-call timing"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.query_stats = QueryStatsCollector(metrics.histogram(
+            "db_executor_call_latency_ms",
+            "DB executor call time (query=<queue_wait> is time waiting for a worker)",
+        ))
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.timeouts = 0
+
+    @property
+    def max_workers(self) -> int:
+        if self._max_workers is None:
+            self._max_workers = default_workers()
+        return self._max_workers
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="db-exec"
+                    )
+        return self._executor
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        name: Optional[str] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run func(*args, **kwargs) on a DB worker thread.
+
+        Args:
+            func: Synchronous function
+            name: Stats key (defaults to module.qualname)
+            timeout: Seconds to wait for the result. The worker keeps running
+                after a timeout (threads cannot be cancelled); only the
+                caller stops waiting.
+        """
+        name = name or f"{func.__module__}.{func.__qualname__}"
+        stats = self.query_stats
+        submitted = time.perf_counter()
+
+        def call():
+            stats.record_sync(QUEUE_WAIT, (time.perf_counter() - submitted) * 1000)
+            with stats.track(name):
+                return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            future = loop.run_in_executor(self._get_executor(), call)
+            if timeout is None:
+                return await future
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def stop(self):
+        """Stop the worker threads (pending calls finish)"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        queries = self.query_stats.get_stats()
+        wait = queries.pop(QUEUE_WAIT, None)
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "timeouts": self.timeouts,
+            "queue_wait": wait.to_dict() if wait else None,
+            "calls": [s.to_dict() for s in sorted(queries.values(), key=lambda s: s.total_time_ms, reverse=True)],
+            "loop_thread_calls": get_loop_thread_calls(),
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# db.py FACADE
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+class AsyncDB:
+    """
+    Awaitable view of db.py: ``await adb.get_user_config(uid)`` runs
+    ``db.get_user_config(uid)`` on the DB executor.
+    """
+
+    def __init__(self, executor: DBExecutor):
+        self._executor = executor
+        self._wrappers: Dict[str, Callable[..., Any]] = {}
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        wrapper = self._wrappers.get(attr)
+        if wrapper is None:
+            import db
+
+            func = getattr(db, attr)
+            if not callable(func):
+                raise AttributeError(f"db.{attr} is not callable")
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                # Resolve at call time so patched db functions are honoured
+                return await self._executor.run(getattr(db, attr), *args, name=f"db.{attr}", **kwargs)
+
+            self._wrappers[attr] = wrapper
+        return wrapper
+
+
+db_executor = DBExecutor()
+adb = AsyncDB(db_executor)
+
+_in_flight_gauge = metrics.gauge("db_executor_in_flight", "DB executor calls submitted and not yet finished")
+_timeouts_gauge = metrics.gauge("db_executor_timeouts", "DB executor calls the caller stopped waiting for")
+
+
+def _collect_executor_gauges():
+    _in_flight_gauge.set(db_executor.in_flight)
+    _timeouts_gauge.set(db_executor.timeouts)
+
+
+metrics.register_collector(_collect_executor_gauges)
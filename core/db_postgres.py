@@ -7,19 +7,23 @@ Usage:
     Set USE_POSTGRES=1 in environment to switch from SQLite.
 """
 
+import asyncio
 import os
 import psycopg2
 import psycopg2.extras
 import psycopg2.pool
 import threading
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from contextlib import contextmanager
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 # Connection pool
+PG_POOL_MIN = 5
+PG_POOL_MAX = 50
 _pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
 _pool_lock = threading.Lock()
 
@@ -42,14 +46,21 @@ def get_pool() -> psycopg2.pool.ThreadedConnectionPool:
         
         logger.info(f"Creating PostgreSQL connection pool...")
         _pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=5,
-            maxconn=50,
+            minconn=PG_POOL_MIN,
+            maxconn=PG_POOL_MAX,
             dsn=DATABASE_URL
         )
         logger.info("PostgreSQL connection pool created")
         return _pool
 
 
+def _check_loop_thread():
+    """Report sync connection checkouts made on an event loop thread."""
+    if asyncio._get_running_loop() is not None:
+        from core.db_executor import report_loop_thread_call
+        report_loop_thread_call()
+
+
 def _sqlite_to_pg(query: str) -> str:
     """Convert SQLite query syntax to PostgreSQL.
     
@@ -263,6 +274,7 @@ def get_conn():
     Returns SQLiteCompatConnection for backward compatibility with
     existing db.py code that uses conn.execute("...?...", (param,))
     """
+    _check_loop_thread()
     pool = get_pool()
     pg_conn = pool.getconn()
     conn = SQLiteCompatConnection(pg_conn)
@@ -281,6 +293,7 @@ def execute(query: str, params: tuple = None) -> List[Dict]:
     
     ВАЖНО: Автоматически делает commit для INSERT/UPDATE/DELETE запросов!
     """
+    _check_loop_thread()
     pool = get_pool()
     pg_conn = pool.getconn()
     try:
@@ -329,6 +342,29 @@ def execute_write(query: str, params: tuple = None) -> int:
             return cur.rowcount
 
 
+def iter_query(query: str, params: tuple = None, batch_size: int = 1000) -> Iterator[Dict]:
+    """Stream query results as dicts through a server-side (named) cursor.
+    
+    Rows are pulled from PostgreSQL `batch_size` at a time, so memory stays
+    constant regardless of result size. The pooled connection is held until
+    the generator is exhausted or closed - consume it promptly.
+    """
+    _check_loop_thread()
+    pool = get_pool()
+    pg_conn = pool.getconn()
+    try:
+        name = f"stream_{uuid.uuid4().hex[:16]}"
+        with pg_conn.cursor(name=name, cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.itersize = batch_size
+            cur.execute(_sqlite_to_pg(query), params)
+            for row in cur:
+                yield dict(row)
+    finally:
+        # Read-only: ending the transaction also releases the named cursor
+        pg_conn.rollback()
+        pool.putconn(pg_conn)
+
+
 def pg_init_db():
     """Initialize PostgreSQL database schema.
     
@@ -591,6 +627,27 @@ def pg_init_db():
         cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_symbol_ts ON trade_logs(symbol, ts DESC)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_strategy ON trade_logs(user_id, strategy)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_account_type ON trade_logs(user_id, account_type)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_keyset ON trade_logs(user_id, exchange, account_type, ts DESC, id DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_user_ts_id ON trade_logs(user_id, ts DESC, id DESC)")
+        # No NULL exchange/account_type: list queries filter them with plain equality
+        # (legacy rows are backfilled by migration 031)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION trade_logs_default_scope()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                NEW.exchange := COALESCE(NEW.exchange, 'bybit');
+                NEW.account_type := COALESCE(NEW.account_type, 'demo');
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_trade_logs_default_scope ON trade_logs")
+        cur.execute("""
+            CREATE TRIGGER trg_trade_logs_default_scope
+            BEFORE INSERT OR UPDATE OF exchange, account_type ON trade_logs
+            FOR EACH ROW
+            EXECUTE FUNCTION trade_logs_default_scope()
+        """)
         
         # Add fee column to existing trade_logs if missing
         cur.execute("ALTER TABLE trade_logs ADD COLUMN IF NOT EXISTS fee REAL DEFAULT 0")
@@ -1070,6 +1127,12 @@ def pg_ensure_user(user_id: int) -> Dict:
             return dict(cur.fetchone())
 
 
+def _invalidate_user_config(user_id: int):
+    """Drop cached get_user_config results in every process"""
+    from core.config_cache import config_cache
+    config_cache.invalidate(user_id)
+
+
 def pg_set_user_field(user_id: int, field: str, value: Any):
     """Set single user field"""
     # Ensure user exists first
@@ -1118,6 +1181,7 @@ def pg_set_user_field(user_id: int, field: str, value: Any):
     
     query = f"UPDATE users SET {field} = %s, updated_at = NOW() WHERE user_id = %s"
     execute_write(query, (value, user_id))
+    _invalidate_user_config(user_id)
 
 
 def pg_get_user_field(user_id: int, field: str, default: Any = None) -> Any:
@@ -1905,119 +1969,80 @@ def pg_get_strategy_settings_db(user_id: int, strategy: str, exchange: str = "by
     return pg_get_strategy_settings(user_id, strategy)
 
 
-def pg_get_strategy_settings(user_id: int, strategy: str, exchange: str = None, account_type: str = None) -> Dict:
+def dedupe_rows_by_side(rows: List[Dict]) -> List[Dict]:
+    """Keep only the first (most recent) row per side."""
+    seen_sides = set()
+    deduplicated = []
+    for row in rows:
+        side = row.get('side', 'long')
+        if side not in seen_sides:
+            seen_sides.add(side)
+            deduplicated.append(row)
+    return deduplicated
+
+
+def build_strategy_settings(rows: List[Dict], exchange: str) -> Dict:
     """
-    Get settings for a specific strategy.
-    4D SCHEMA: PRIMARY KEY is (user_id, strategy, side, exchange).
-    Each side (long/short) and exchange has its own row with independent settings.
-    Returns both LONG and SHORT settings as long_* and short_* fields.
+    Build pg_get_strategy_settings() result from user_strategy_settings rows.
     
     Args:
-        user_id: User ID
-        strategy: Strategy name
-        exchange: Exchange name ('bybit' or 'hyperliquid'). If None, uses user's active exchange.
-        account_type: Kept for API compatibility
+        rows: Row mappings (at most one per side)
+        exchange: Exchange reported in the result
     """
     from coin_params import STRATEGY_DEFAULTS
     
-    # Get user's active exchange if not specified
-    if not exchange:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT exchange_type FROM users WHERE user_id = %s", (user_id,))
-                row = cur.fetchone()
-                exchange = row[0] if row and row[0] else "bybit"
-    
     result = {}
     trading_mode = "demo"  # Default trading mode
     direction = "all"  # Default direction
     coins_group = "ALL"  # Default coins group
     
-    with get_conn() as conn:
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            # 4D SCHEMA: Query for both long and short rows for specific exchange
-            cur.execute("""
-                SELECT * FROM user_strategy_settings 
-                WHERE user_id = %s AND strategy = %s AND exchange = %s
-            """, (user_id, strategy, exchange))
-            rows = cur.fetchall()
-            
-            # If no rows found for this exchange, try ANY other exchange as fallback
-            # CRITICAL FIX (Feb 15, 2026): Was one-directional (only non-bybit→bybit).
-            # Now bidirectional: if user has settings only for HL, they work on bybit targets too.
-            if not rows:
-                cur.execute("""
-                    SELECT * FROM user_strategy_settings 
-                    WHERE user_id = %s AND strategy = %s AND exchange != %s
-                    ORDER BY updated_at DESC
-                """, (user_id, strategy, exchange))
-                fallback_rows = cur.fetchall()
-                
-                if fallback_rows:
-                    # Deduplicate by side — keep only the most recent row per side
-                    seen_sides = set()
-                    deduplicated = []
-                    for row in fallback_rows:
-                        side = row.get('side', 'long')
-                        if side not in seen_sides:
-                            seen_sides.add(side)
-                            deduplicated.append(row)
-                    
-                    fallback_exchange = fallback_rows[0].get('exchange', '?')
-                    logger.info(
-                        f"[pg_get_strategy_settings] uid={user_id} strategy={strategy}: "
-                        f"No rows for exchange={exchange}, using fallback from {fallback_exchange} "
-                        f"({len(deduplicated)} rows)"
-                    )
-                    rows = deduplicated
-            
-            # Group rows by side
-            rows_by_side = {}
-            for row in rows:
-                side = row.get('side', 'long')
-                rows_by_side[side] = row
-                
-                # Get strategy-level settings from any row (they should be same)
-                if row.get('trading_mode'):
-                    trading_mode = row.get('trading_mode')
-                if row.get('direction'):
-                    direction = row.get('direction')
-                if row.get('coins_group'):
-                    coins_group = row.get('coins_group')
-            
-            # Build result from each side's row
-            for side in ["long", "short"]:
-                prefix = f"{side}_"
-                row = rows_by_side.get(side)
-                
-                if row:
-                    result[f"{prefix}enabled"] = row.get('enabled', True)
-                    result[f"{prefix}percent"] = row.get('percent')
-                    result[f"{prefix}sl_percent"] = row.get('sl_percent')
-                    result[f"{prefix}tp_percent"] = row.get('tp_percent')
-                    result[f"{prefix}leverage"] = row.get('leverage')
-                    result[f"{prefix}use_atr"] = row.get('use_atr')
-                    result[f"{prefix}atr_periods"] = row.get('atr_periods')
-                    result[f"{prefix}atr_multiplier_sl"] = row.get('atr_multiplier_sl')
-                    result[f"{prefix}atr_trigger_pct"] = row.get('atr_trigger_pct')
-                    result[f"{prefix}atr_step_pct"] = row.get('atr_step_pct')
-                    result[f"{prefix}order_type"] = row.get('order_type', 'market')
-                    result[f"{prefix}limit_offset_pct"] = row.get('limit_offset_pct', 0.1)
-                    result[f"{prefix}dca_enabled"] = row.get('dca_enabled', False)
-                    result[f"{prefix}dca_pct_1"] = row.get('dca_pct_1', 10.0)
-                    result[f"{prefix}dca_pct_2"] = row.get('dca_pct_2', 25.0)
-                    result[f"{prefix}max_positions"] = row.get('max_positions', 0)
-                    result[f"{prefix}coins_group"] = row.get('coins_group', 'ALL')
-                    # Break-Even settings
-                    result[f"{prefix}be_enabled"] = row.get('be_enabled', False)
-                    result[f"{prefix}be_trigger_pct"] = row.get('be_trigger_pct', 1.0)
-                    result[f"{prefix}be_offset_pct"] = row.get('be_offset_pct', 0.15)
-                    # Partial Take Profit settings (срез маржи в 2 шага)
-                    result[f"{prefix}partial_tp_enabled"] = row.get('partial_tp_enabled', False)
-                    result[f"{prefix}partial_tp_1_trigger_pct"] = row.get('partial_tp_1_trigger_pct', 2.0)
-                    result[f"{prefix}partial_tp_1_close_pct"] = row.get('partial_tp_1_close_pct', 30.0)
-                    result[f"{prefix}partial_tp_2_trigger_pct"] = row.get('partial_tp_2_trigger_pct', 5.0)
-                    result[f"{prefix}partial_tp_2_close_pct"] = row.get('partial_tp_2_close_pct', 30.0)
+    # Group rows by side
+    rows_by_side = {}
+    for row in rows:
+        side = row.get('side', 'long')
+        rows_by_side[side] = row
+
+        # Get strategy-level settings from any row (they should be same)
+        if row.get('trading_mode'):
+            trading_mode = row.get('trading_mode')
+        if row.get('direction'):
+            direction = row.get('direction')
+        if row.get('coins_group'):
+            coins_group = row.get('coins_group')
+
+    # Build result from each side's row
+    for side in ["long", "short"]:
+        prefix = f"{side}_"
+        row = rows_by_side.get(side)
+
+        if row:
+            result[f"{prefix}enabled"] = row.get('enabled', True)
+            result[f"{prefix}percent"] = row.get('percent')
+            result[f"{prefix}sl_percent"] = row.get('sl_percent')
+            result[f"{prefix}tp_percent"] = row.get('tp_percent')
+            result[f"{prefix}leverage"] = row.get('leverage')
+            result[f"{prefix}use_atr"] = row.get('use_atr')
+            result[f"{prefix}atr_periods"] = row.get('atr_periods')
+            result[f"{prefix}atr_multiplier_sl"] = row.get('atr_multiplier_sl')
+            result[f"{prefix}atr_trigger_pct"] = row.get('atr_trigger_pct')
+            result[f"{prefix}atr_step_pct"] = row.get('atr_step_pct')
+            result[f"{prefix}order_type"] = row.get('order_type', 'market')
+            result[f"{prefix}limit_offset_pct"] = row.get('limit_offset_pct', 0.1)
+            result[f"{prefix}dca_enabled"] = row.get('dca_enabled', False)
+            result[f"{prefix}dca_pct_1"] = row.get('dca_pct_1', 10.0)
+            result[f"{prefix}dca_pct_2"] = row.get('dca_pct_2', 25.0)
+            result[f"{prefix}max_positions"] = row.get('max_positions', 0)
+            result[f"{prefix}coins_group"] = row.get('coins_group', 'ALL')
+            # Break-Even settings
+            result[f"{prefix}be_enabled"] = row.get('be_enabled', False)
+            result[f"{prefix}be_trigger_pct"] = row.get('be_trigger_pct', 1.0)
+            result[f"{prefix}be_offset_pct"] = row.get('be_offset_pct', 0.15)
+            # Partial Take Profit settings (срез маржи в 2 шага)
+            result[f"{prefix}partial_tp_enabled"] = row.get('partial_tp_enabled', False)
+            result[f"{prefix}partial_tp_1_trigger_pct"] = row.get('partial_tp_1_trigger_pct', 2.0)
+            result[f"{prefix}partial_tp_1_close_pct"] = row.get('partial_tp_1_close_pct', 30.0)
+            result[f"{prefix}partial_tp_2_trigger_pct"] = row.get('partial_tp_2_trigger_pct', 5.0)
+            result[f"{prefix}partial_tp_2_close_pct"] = row.get('partial_tp_2_close_pct', 30.0)
     
     # Add strategy-level settings to result
     result["trading_mode"] = trading_mode
@@ -2074,6 +2099,64 @@ def pg_get_strategy_settings(user_id: int, strategy: str, exchange: str = None,
     return result
 
 
+def pg_get_strategy_settings(user_id: int, strategy: str, exchange: str = None, account_type: str = None) -> Dict:
+    """
+    Get settings for a specific strategy.
+    4D SCHEMA: PRIMARY KEY is (user_id, strategy, side, exchange).
+    Each side (long/short) and exchange has its own row with independent settings.
+    Returns both LONG and SHORT settings as long_* and short_* fields.
+    
+    Args:
+        user_id: User ID
+        strategy: Strategy name
+        exchange: Exchange name ('bybit' or 'hyperliquid'). If None, uses user's active exchange.
+        account_type: Kept for API compatibility
+    """
+    from core.multitenancy_queries import track_query
+    
+    # Get user's active exchange if not specified
+    if not exchange:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT exchange_type FROM users WHERE user_id = %s", (user_id,))
+                row = cur.fetchone()
+                exchange = row[0] if row and row[0] else "bybit"
+    
+    with track_query("db.get_strategy_settings"):
+        with get_conn() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                # 4D SCHEMA: Query for both long and short rows for specific exchange
+                cur.execute("""
+                    SELECT * FROM user_strategy_settings 
+                    WHERE user_id = %s AND strategy = %s AND exchange = %s
+                """, (user_id, strategy, exchange))
+                rows = cur.fetchall()
+            
+                # If no rows found for this exchange, try ANY other exchange as fallback
+                # CRITICAL FIX (Feb 15, 2026): Was one-directional (only non-bybit→bybit).
+                # Now bidirectional: if user has settings only for HL, they work on bybit targets too.
+                if not rows:
+                    cur.execute("""
+                        SELECT * FROM user_strategy_settings 
+                        WHERE user_id = %s AND strategy = %s AND exchange != %s
+                        ORDER BY updated_at DESC
+                    """, (user_id, strategy, exchange))
+                    fallback_rows = cur.fetchall()
+                
+                    if fallback_rows:
+                        deduplicated = dedupe_rows_by_side(fallback_rows)
+                    
+                        fallback_exchange = fallback_rows[0].get('exchange', '?')
+                        logger.info(
+                            f"[pg_get_strategy_settings] uid={user_id} strategy={strategy}: "
+                            f"No rows for exchange={exchange}, using fallback from {fallback_exchange} "
+                            f"({len(deduplicated)} rows)"
+                        )
+                        rows = deduplicated
+    
+    return build_strategy_settings(rows, exchange)
+
+
 def _pg_copy_settings_to_exchange(cur, user_id: int, strategy: str, side: str, 
                                    source_row: dict, target_exchange: str):
     """Copy settings from source row to target exchange."""
@@ -2447,6 +2530,7 @@ def pg_set_trading_mode(user_id: int, mode: str):
         "UPDATE users SET trading_mode = %s WHERE user_id = %s",
         (mode, user_id)
     )
+    _invalidate_user_config(user_id)
 
 
 def pg_set_hl_enabled(user_id: int, enabled: bool):
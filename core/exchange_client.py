@@ -154,17 +154,17 @@ class UnifiedExchangeClient:
             if not self.credentials.private_key:
                 raise ValueError("HyperLiquid private_key is required")
             
-            from hl_adapter import HLAdapter
+            from core.hl_adapter_pool import get_hl_adapter
             # DO NOT pass main_wallet_address - let HLAdapter auto-discover via userRole API
             # wallet_address in DB is API wallet (derived from private key)
             # main wallet (where funds are) is discovered via userRole API call
-            self._client = HLAdapter(
-                private_key=self.credentials.private_key,
+            # Pooled: discovery and asset meta are paid once per key, close() is a no-op
+            self._client = await get_hl_adapter(
+                self.credentials.private_key,
                 testnet=(self.credentials.mode == AccountMode.TESTNET),
-                vault_address=self.credentials.vault_address
-                # main_wallet_address=None allows auto-discovery
+                vault_address=self.credentials.vault_address,
+                user_id=self.credentials.user_id
             )
-            await self._client.initialize()
         else:
             # Validate Bybit credentials
             if not self.credentials.api_key or not self.credentials.api_secret:
@@ -0,0 +1,312 @@
+"""
+HyperLiquid Adapter Pool
+Shares initialized HLAdapter instances process-wide so API handlers and bot
+loops skip the meta / userRole requests that a fresh adapter pays for.
+
+- One adapter per (private key fingerprint, network, vault)
+- One pooled aiohttp session shared by every pooled adapter
+- Asset meta comes from the global per-network table in hyperliquid.client
+- Idle / aged adapters are evicted by cleanup()
+- invalidate_user() / invalidate_key() drop adapters after credential changes
+
+Pooled adapters are shared, not borrowed: callers must not rely on exclusive
+use, and adapter.close() is a no-op while the pool owns the adapter.
+
+Usage:
+    adapter = await get_hl_adapter(private_key, testnet=True, user_id=uid)
+    positions = await adapter.fetch_positions()
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledAdapter:
+    """Pool entry for one signing key on one network"""
+    adapter: Any
+    key: Tuple[str, bool, str]
+    user_ids: Set[int] = field(default_factory=set)
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    use_count: int = 0
+
+    def touch(self) -> None:
+        self.last_used = time.time()
+        self.use_count += 1
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    @property
+    def idle_time(self) -> float:
+        return time.time() - self.last_used
+
+
+def key_fingerprint(private_key: str) -> str:
+    """Stable, non-reversible pool key for a private key"""
+    normalized = private_key.lower().removeprefix("0x")
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+class HLAdapterPool:
+    """
+    Process-wide pool of initialized HLAdapter instances.
+
+    Usage:
+        pool = HLAdapterPool(max_idle_seconds=600)
+        adapter = await pool.get(private_key, testnet=False, user_id=uid)
+    """
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        max_idle_seconds: float = 600.0,
+        max_age_seconds: float = 3600.0,
+    ):
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.max_age_seconds = max_age_seconds
+
+        self._pool: Dict[Tuple[str, bool, str], PooledAdapter] = {}
+        self._creating: Dict[Tuple[str, bool, str], asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session (keep-alive connections to both HL networks)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            )
+        return self._session
+
+    async def get(
+        self,
+        private_key: str,
+        testnet: bool = False,
+        vault_address: Optional[str] = None,
+        main_wallet_address: Optional[str] = None,
+        user_id: Optional[int] = None,
+    ):
+        """
+        Get an initialized adapter for a key, creating it on first use.
+
+        Concurrent first requests for the same key share one initialization.
+        """
+        key = (key_fingerprint(private_key), bool(testnet), (vault_address or "").lower())
+
+        async with self._lock:
+            entry = self._pool.get(key)
+            if entry is not None and entry.age < self.max_age_seconds:
+                self._hits += 1
+                entry.touch()
+                if user_id is not None:
+                    entry.user_ids.add(user_id)
+                adapter = entry.adapter
+                if main_wallet_address and adapter._main_wallet_address is None:
+                    adapter._main_wallet_address = main_wallet_address
+                return adapter
+
+            pending = self._creating.get(key)
+            if pending is None:
+                self._misses += 1
+                pending = asyncio.get_running_loop().create_future()
+                self._creating[key] = pending
+                creator = True
+            else:
+                creator = False
+
+        if not creator:
+            adapter = await asyncio.shield(pending)
+            if user_id is not None and key in self._pool:
+                self._pool[key].user_ids.add(user_id)
+            return adapter
+
+        try:
+            adapter = await self._create_adapter(private_key, testnet, vault_address, main_wallet_address)
+        except BaseException as e:
+            async with self._lock:
+                self._creating.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                pending.cancel()
+            else:
+                pending.set_exception(e)
+                # Mark retrieved so a failure with no waiters is not logged as unhandled
+                pending.exception()
+            raise
+
+        stale = None
+        async with self._lock:
+            self._creating.pop(key, None)
+            stale = self._pool.pop(key, None)
+            entry = PooledAdapter(adapter=adapter, key=key)
+            entry.touch()
+            if user_id is not None:
+                entry.user_ids.add(user_id)
+            self._pool[key] = entry
+            evicted = self._evict_lru() if len(self._pool) > self.max_size else None
+        pending.set_result(adapter)
+
+        for old in (stale, evicted):
+            if old is not None:
+                await self._close_entry(old)
+        return adapter
+
+    async def _create_adapter(
+        self,
+        private_key: str,
+        testnet: bool,
+        vault_address: Optional[str],
+        main_wallet_address: Optional[str],
+    ):
+        """Create and initialize an adapter on the shared session"""
+        from hl_adapter import HLAdapter
+        adapter = HLAdapter(
+            private_key=private_key,
+            testnet=testnet,
+            vault_address=vault_address,
+            main_wallet_address=main_wallet_address,
+            session=self._get_session(),
+        )
+        await adapter.initialize()
+        adapter._pool_owned = True
+        return adapter
+
+    def _evict_lru(self) -> Optional[PooledAdapter]:
+        """Remove the least recently used entry (caller holds the lock)"""
+        if not self._pool:
+            return None
+        oldest_key = min(self._pool, key=lambda k: self._pool[k].last_used)
+        self._evictions += 1
+        return self._pool.pop(oldest_key)
+
+    async def _close_entry(self, entry: PooledAdapter) -> None:
+        """Close an entry that is no longer reachable from the pool"""
+        entry.adapter._pool_owned = False
+        try:
+            await entry.adapter.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled HL adapter: {e}")
+
+    async def cleanup(self) -> int:
+        """Remove idle and expired adapters"""
+        async with self._lock:
+            expired = [
+                k for k, entry in self._pool.items()
+                if entry.idle_time > self.max_idle_seconds or entry.age > self.max_age_seconds
+            ]
+            removed = [self._pool.pop(k) for k in expired]
+
+        for entry in removed:
+            await self._close_entry(entry)
+        if removed:
+            logger.info(f"HL adapter pool cleanup: removed {len(removed)} idle adapters")
+        return len(removed)
+
+    async def close_all(self) -> None:
+        """Close all adapters and the shared session"""
+        async with self._lock:
+            entries = list(self._pool.values())
+            self._pool.clear()
+        for entry in entries:
+            await self._close_entry(entry)
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        logger.info("HL adapter pool closed")
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every adapter used by a user (after credential change)"""
+        keys = [k for k, entry in self._pool.items() if user_id in entry.user_ids]
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def invalidate_key(self, private_key: str, testnet: Optional[bool] = None) -> int:
+        """Drop adapters signing with a key (both networks unless testnet is given)"""
+        fingerprint = key_fingerprint(private_key)
+        keys = [
+            k for k in self._pool
+            if k[0] == fingerprint and (testnet is None or k[1] == bool(testnet))
+        ]
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def _discard(self, key: Tuple[str, bool, str]) -> None:
+        """
+        Remove an entry without awaiting.
+
+        The adapter rides on the pool session, so in-flight callers keep
+        working; it is simply never handed out again.
+        """
+        entry = self._pool.pop(key, None)
+        if entry is not None:
+            entry.adapter._pool_owned = False
+            from hyperliquid.client import invalidate_main_wallet_cache
+            invalidate_main_wallet_cache(entry.adapter.address)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        lookups = self._hits + self._misses
+        return {
+            "adapters": len(self._pool),
+            "unique_users": len(set().union(*(e.user_ids for e in self._pool.values()))) if self._pool else 0,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0,
+            "evictions": self._evictions,
+            "max_size": self.max_size,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# GLOBAL POOL INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+hl_adapter_pool = HLAdapterPool()
+
+
+async def get_hl_adapter(
+    private_key: str,
+    testnet: bool = False,
+    vault_address: Optional[str] = None,
+    main_wallet_address: Optional[str] = None,
+    user_id: Optional[int] = None,
+):
+    """Get a pooled, initialized HLAdapter (do not rely on close())"""
+    return await hl_adapter_pool.get(
+        private_key,
+        testnet=testnet,
+        vault_address=vault_address,
+        main_wallet_address=main_wallet_address,
+        user_id=user_id,
+    )
+
+
+async def periodic_hl_pool_cleanup(interval: float = 60.0):
+    """Background task for periodic HL adapter pool cleanup"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await hl_adapter_pool.cleanup()
+        except Exception as e:
+            logger.error(f"HL adapter pool cleanup error: {e}")
@@ -0,0 +1,297 @@
+"""
+Event Loop Profiler
+===================
+Measures event-loop responsiveness and attributes blocking time to the
+callbacks and tasks that caused it. Cheap enough to stay on in production.
+
+- Lag: a sampler coroutine measures how late the loop wakes it up
+- Hot spots: every loop callback is timed (two perf_counter calls); those
+  above track_ms are attributed by task name (safe_create_task(name=...))
+  or callback qualname, and those above slow_ms are logged
+- Stacks (optional, LOOP_PROFILER_STACKS=1): a watchdog thread samples the
+  loop thread's stack while a single callback has been running longer than
+  stall_ms, so a blocking call shows up with its file and line
+
+Everything is exported through core.metrics (event_loop_lag_ms,
+event_loop_slow_callbacks_total) and snapshot() for the admin API.
+
+Usage:
+    from core.loop_profiler import loop_profiler
+
+    await loop_profiler.start()      # startup hook
+    loop_profiler.snapshot()         # lag, slowest callbacks/tasks, stacks
+    await loop_profiler.stop()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import asyncio.events
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_PROFILER_CONFIG = {
+    "lag_interval": 0.25,      # Lag sample period (seconds)
+    "lag_warn_ms": 250.0,      # Log lag above this
+    "lag_window": 240,         # Recent lag samples kept for avg/p99 (1 minute)
+    "track_ms": 5.0,           # Callbacks at least this long are attributed by name
+    "slow_ms": 100.0,          # Callbacks above this are logged and counted as slow
+    "max_names": 500,          # Distinct callback/task names tracked
+    "stack_interval": 0.05,    # Watchdog poll period (seconds)
+    "stall_ms": 200.0,         # Sample the stack once a callback runs this long
+    "stack_depth": 12,         # Innermost frames kept per stack sample
+    "max_stacks": 200,         # Distinct stacks tracked
+}
+
+# Stack sampling is opt-in (adds a thread polling every stack_interval)
+LOOP_PROFILER_STACKS = os.getenv("LOOP_PROFILER_STACKS", "0") == "1"
+
+OTHER = "<other>"
+_DEFAULT_TASK_NAME = re.compile(r"^Task-\d+$")
+
+_lag_hist = metrics.histogram("event_loop_lag_ms", "Event loop wake-up lag in milliseconds")
+_lag_gauge = metrics.gauge("event_loop_lag_current_ms", "Most recent event loop lag in milliseconds")
+_slow_counter = metrics.counter("event_loop_slow_callbacks_total", "Loop callbacks slower than slow_ms")
+
+
+@dataclass
+class CallbackStats:
+    """Blocking time attributed to one callback or task name"""
+    name: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow_count: int = 0
+    last_at: float = 0.0
+
+    def record(self, elapsed_ms: float, slow: bool):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.slow_count += slow
+        self.last_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "count": self.count,
+            "slow": self.slow_count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_at": self.last_at,
+        }
+
+
+def callback_name(callback) -> str:
+    """Stable name for a loop callback: task name, coroutine or function qualname"""
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        name = owner.get_name()
+        if _DEFAULT_TASK_NAME.match(name):
+            coro = owner.get_coro()
+            name = getattr(coro, "__qualname__", None) or type(coro).__name__
+        return f"task:{name}"
+    func = getattr(callback, "func", callback)  # functools.partial
+    return f"cb:{getattr(func, '__qualname__', None) or type(func).__name__}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# Handle._run instrumentation (installed once per process)
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+_original_run = asyncio.events.Handle._run
+_active: Optional["LoopProfiler"] = None
+
+
+def _timed_run(handle):
+    profiler = _active
+    # Only the profiled loop's thread: asyncio.run() in worker threads must not
+    # pollute the stats or overwrite _current
+    if profiler is None or threading.get_ident() != profiler._loop_thread_id:
+        return _original_run(handle)
+    started = time.perf_counter()
+    profiler._current = (started, handle)
+    try:
+        return _original_run(handle)
+    finally:
+        profiler._current = None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= profiler.track_ms:
+            profiler._record_callback(handle, elapsed_ms)
+
+
+class LoopProfiler:
+    """Loop lag sampler, callback hot-spot tracker and optional stack sampler"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, stacks: bool = LOOP_PROFILER_STACKS):
+        self.config = {**LOOP_PROFILER_CONFIG, **(config or {})}
+        self.track_ms = self.config["track_ms"]
+        self.stacks_enabled = stacks
+        self._callbacks: Dict[str, CallbackStats] = {}
+        self._stacks: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._current: Optional[Tuple[float, Any]] = None
+        self._lag = deque(maxlen=self.config["lag_window"])
+        self.lag_ms = 0.0
+        self.lag_max_ms = 0.0
+        self._lag_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Instrumentation
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def install(self):
+        """Route loop callbacks of the calling thread's loop through this profiler"""
+        global _active
+        self._loop_thread_id = threading.get_ident()
+        _active = self
+        asyncio.events.Handle._run = _timed_run
+
+    def uninstall(self):
+        global _active
+        if _active is self:
+            _active = None
+            asyncio.events.Handle._run = _original_run
+
+    def _record_callback(self, handle, elapsed_ms: float):
+        name = callback_name(handle._callback)
+        slow = elapsed_ms >= self.config["slow_ms"]
+        with self._lock:
+            stats = self._callbacks.get(name)
+            if stats is None:
+                if len(self._callbacks) >= self.config["max_names"]:
+                    name = OTHER
+                stats = self._callbacks.setdefault(name, CallbackStats(name))
+            stats.record(elapsed_ms, slow)
+        if slow:
+            _slow_counter.inc()
+            logger.warning(f"Slow event loop callback {name}: {elapsed_ms:.0f}ms")
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Lag sampler
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def record_lag(self, lag_ms: float):
+        self.lag_ms = lag_ms
+        self.lag_max_ms = max(self.lag_max_ms, lag_ms)
+        self._lag.append(lag_ms)
+        _lag_hist.observe(lag_ms)
+        _lag_gauge.set(lag_ms)
+        if lag_ms > self.config["lag_warn_ms"]:
+            logger.warning(f"Event loop lag {lag_ms:.0f}ms")
+
+    async def _sample_lag(self):
+        interval = self.config["lag_interval"]
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.record_lag(max(0.0, (loop.time() - expected) * 1000))
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Stack watchdog
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def _sample_stack(self, now: float) -> bool:
+        """Sample the loop thread's stack if the running callback has stalled"""
+        current = self._current
+        if current is None or (now - current[0]) * 1000 < self.config["stall_ms"]:
+            return False
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return False
+        summary = traceback.extract_stack(frame)[-self.config["stack_depth"]:]
+        stack = " <- ".join(
+            f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in reversed(summary)
+        )
+        key = (callback_name(current[1]._callback), stack)
+        with self._lock:
+            if key in self._stacks or len(self._stacks) < self.config["max_stacks"]:
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+        return True
+
+    def _watch(self):
+        interval = self.config["stack_interval"]
+        while not self._watchdog_stop.wait(interval):
+            try:
+                self._sample_stack(time.perf_counter())
+            except Exception as e:
+                logger.debug(f"Loop stack sample failed: {e}")
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Lifecycle
+    # ───────────────────────────────────────────────────────────────────────────
+
+    async def start(self):
+        """Install instrumentation and start the sampler (and watchdog if enabled)"""
+        self.install()
+        if self._lag_task is None or self._lag_task.done():
+            from core.tasks import safe_create_task
+            self._lag_task = safe_create_task(self._sample_lag(), name="loop_profiler_lag")
+        if self.stacks_enabled and self._watchdog is None:
+            self._watchdog_stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-profiler", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._watchdog is not None:
+            self._watchdog_stop.set()
+            self._watchdog = None
+        self.uninstall()
+
+    def reset(self):
+        with self._lock:
+            self._callbacks.clear()
+            self._stacks.clear()
+        self._lag.clear()
+        self.lag_max_ms = 0.0
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # Reporting
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def snapshot(self, limit: int = 20) -> Dict[str, Any]:
+        """Lag summary, slowest callbacks/tasks and most frequent stall stacks"""
+        with self._lock:
+            callbacks = list(self._callbacks.values())
+            stacks = sorted(self._stacks.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        recent = sorted(self._lag)
+        tasks = [c for c in callbacks if c.name.startswith("task:")]
+        return {
+            "running": self._lag_task is not None,
+            "lag": {
+                "current_ms": round(self.lag_ms, 1),
+                "max_ms": round(self.lag_max_ms, 1),
+                "avg_ms": round(sum(recent) / len(recent), 2) if recent else 0.0,
+                "p99_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.99))], 1) if recent else 0.0,
+            },
+            "slowest": [c.to_dict() for c in sorted(callbacks, key=lambda c: c.max_ms, reverse=True)[:limit]],
+            "busiest": [c.to_dict() for c in sorted(callbacks, key=lambda c: c.total_ms, reverse=True)[:limit]],
+            "tasks": [c.to_dict() for c in sorted(tasks, key=lambda c: c.total_ms, reverse=True)[:limit]],
+            "stacks": [
+                {"callback": name, "samples": count, "stack": stack}
+                for (name, stack), count in stacks
+            ] if self.stacks_enabled else None,
+        }
+
+
+loop_profiler = LoopProfiler()
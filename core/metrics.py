@@ -7,12 +7,14 @@ from __future__ import annotations
 import time
 import logging
 import asyncio
+import contextvars
+import json
+import re
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Callable
-from collections import defaultdict, deque
+from bisect import bisect_left
+from typing import Dict, List, Optional, Any, Callable, Sequence, Tuple
 from functools import wraps
 import threading
-import statistics
 
 
 logger = logging.getLogger(__name__)
@@ -26,29 +28,74 @@ class MetricSample:
     labels: Dict[str, str] = field(default_factory=dict)
 
 
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Default latency buckets (milliseconds), Prometheus-style upper bounds
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000,
+)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _ThreadShards:
+    """
+    Per-thread storage for lock-free updates.
+    
+    Each thread only ever writes its own shard, so increments need no lock
+    and never lose updates; readers merge shard snapshots.
+    """
+    
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._shards: Dict[int, Any] = {}
+    
+    def local(self) -> Any:
+        tid = threading.get_ident()
+        shard = self._shards.get(tid)
+        if shard is None:
+            shard = self._shards.setdefault(tid, self._factory())
+        return shard
+    
+    def all(self) -> List[Any]:
+        return list(self._shards.values())
+    
+    def clear(self) -> None:
+        self._shards.clear()
+
+
 class Counter:
-    """Thread-safe counter metric"""
+    """Monotonic counter metric, optionally labelled (lock-free per-thread shards)"""
     
     def __init__(self, name: str, description: str = ""):
         self.name = name
         self.description = description
-        self._value = 0.0
-        self._lock = threading.Lock()
-        self._by_label: Dict[str, float] = defaultdict(float)
+        self._shards = _ThreadShards(dict)
     
     def inc(self, value: float = 1.0, **labels) -> None:
-        with self._lock:
-            self._value += value
-            if labels:
-                key = ":".join(f"{k}={v}" for k, v in sorted(labels.items()))
-                self._by_label[key] += value
+        shard = self._shards.local()
+        key = _label_key(labels) if labels else ()
+        shard[key] = shard.get(key, 0.0) + value
+    
+    def series(self) -> Dict[LabelKey, float]:
+        """Merged {label key: value}; the unlabelled series has key ()"""
+        merged: Dict[LabelKey, float] = {}
+        for shard in self._shards.all():
+            for key, value in dict(shard).items():
+                merged[key] = merged.get(key, 0.0) + value
+        return merged
     
     @property
     def value(self) -> float:
-        return self._value
+        return sum(self.series().values())
     
     def get_by_labels(self) -> Dict[str, float]:
-        return dict(self._by_label)
+        return {
+            ":".join(f"{k}={v}" for k, v in key): value
+            for key, value in self.series().items() if key
+        }
 
 
 class Gauge:
@@ -61,8 +108,7 @@ class Gauge:
         self._lock = threading.Lock()
     
     def set(self, value: float) -> None:
-        with self._lock:
-            self._value = value
+        self._value = value
     
     def inc(self, value: float = 1.0) -> None:
         with self._lock:
@@ -77,67 +123,121 @@ class Gauge:
         return self._value
 
 
+class _HistogramSeries:
+    """Bucket counts for one label set in one thread"""
+    
+    __slots__ = ("counts", "sum", "count", "min", "max")
+    
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+
 class Histogram:
     """
-    Histogram for measuring distributions (latency, sizes, etc.)
-    Keeps recent samples for percentile calculations.
+    Fixed-bucket histogram for distributions (latency, sizes, etc.)
+    
+    observe() is a bisect over the bucket bounds plus a few additions on
+    the calling thread's shard - O(log buckets), no lock, no sample storage.
+    Percentiles are interpolated within the matching bucket.
     """
     
-    def __init__(self, name: str, description: str = "", max_samples: int = 10000):
+    def __init__(self, name: str, description: str = "",
+                 buckets: Optional[Sequence[float]] = None):
         self.name = name
         self.description = description
-        self._samples: deque = deque(maxlen=max_samples)
-        self._lock = threading.Lock()
-        self._total_count = 0
-        self._total_sum = 0.0
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets or DEFAULT_LATENCY_BUCKETS_MS))
+        n = len(self.buckets)
+        self._shards = _ThreadShards(dict)
+        self._new_series = lambda: _HistogramSeries(n)
     
     def observe(self, value: float, **labels) -> None:
-        with self._lock:
-            self._samples.append(MetricSample(value=value, labels=labels))
-            self._total_count += 1
-            self._total_sum += value
+        shard = self._shards.local()
+        key = _label_key(labels) if labels else ()
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = self._new_series()
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+        if value < series.min:
+            series.min = value
+        if value > series.max:
+            series.max = value
+    
+    def series(self) -> Dict[LabelKey, _HistogramSeries]:
+        """Merged per-label series across threads"""
+        merged: Dict[LabelKey, _HistogramSeries] = {}
+        for shard in self._shards.all():
+            for key, part in dict(shard).items():
+                total = merged.get(key)
+                if total is None:
+                    total = merged[key] = self._new_series()
+                total.counts = [a + b for a, b in zip(total.counts, part.counts)]
+                total.sum += part.sum
+                total.count += part.count
+                total.min = min(total.min, part.min)
+                total.max = max(total.max, part.max)
+        return merged
+    
+    def _combined(self) -> _HistogramSeries:
+        combined = self._new_series()
+        for part in self.series().values():
+            combined.counts = [a + b for a, b in zip(combined.counts, part.counts)]
+            combined.sum += part.sum
+            combined.count += part.count
+            combined.min = min(combined.min, part.min)
+            combined.max = max(combined.max, part.max)
+        return combined
     
     @property
     def count(self) -> int:
-        return self._total_count
+        return self._combined().count
     
     @property
     def sum(self) -> float:
-        return self._total_sum
+        return self._combined().sum
     
     @property
     def avg(self) -> float:
-        if self._total_count == 0:
+        combined = self._combined()
+        return combined.sum / combined.count if combined.count else 0.0
+    
+    def _quantile(self, series: _HistogramSeries, p: float) -> float:
+        if series.count == 0:
             return 0.0
-        return self._total_sum / self._total_count
+        rank = series.count * p / 100
+        seen = 0
+        for i, bucket_count in enumerate(series.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else min(series.min, self.buckets[0])
+                upper = self.buckets[i] if i < len(self.buckets) else series.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, series.min), series.max)
+            seen += bucket_count
+        return series.max
     
     def percentile(self, p: float) -> float:
-        """Get percentile value (p between 0 and 100)"""
-        with self._lock:
-            if not self._samples:
-                return 0.0
-            values = sorted(s.value for s in self._samples)
-            idx = int(len(values) * p / 100)
-            return values[min(idx, len(values) - 1)]
+        """Estimated percentile (p between 0 and 100)"""
+        return self._quantile(self._combined(), p)
     
     def get_stats(self) -> Dict[str, float]:
         """Get common statistics"""
-        with self._lock:
-            if not self._samples:
-                return {"count": 0, "avg": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
-            
-            values = [s.value for s in self._samples]
-            sorted_values = sorted(values)
-            
-            return {
-                "count": len(values),
-                "avg": statistics.mean(values),
-                "p50": sorted_values[len(sorted_values) // 2],
-                "p95": sorted_values[int(len(sorted_values) * 0.95)],
-                "p99": sorted_values[int(len(sorted_values) * 0.99)],
-                "max": max(values),
-                "min": min(values),
-            }
+        combined = self._combined()
+        if combined.count == 0:
+            return {"count": 0, "avg": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
+        return {
+            "count": combined.count,
+            "avg": combined.sum / combined.count,
+            "p50": self._quantile(combined, 50),
+            "p95": self._quantile(combined, 95),
+            "p99": self._quantile(combined, 99),
+            "max": combined.max,
+            "min": combined.min,
+        }
 
 
 class Timer:
@@ -253,6 +353,26 @@ class MetricsRegistry:
             "handler_latency_ms",
             "Telegram handler execution time in milliseconds"
         )
+        self.exchange_latency = self.histogram(
+            "exchange_request_latency_ms",
+            "Exchange HTTP request latency in milliseconds"
+        )
+        self.exchange_errors = self.counter(
+            "exchange_request_errors_total",
+            "Exchange HTTP requests that failed at the transport level"
+        )
+        self.monitor_cycle = self.histogram(
+            "monitor_cycle_duration_ms",
+            "Position monitor loop cycle duration in milliseconds",
+            buckets=(100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000),
+        )
+        self.signal_to_order = self.histogram(
+            "signal_to_order_latency_ms",
+            "Time from receiving a signal to the exchange accepting the order in milliseconds"
+        )
+        
+        # Callables run before each export to refresh gauges
+        self._collectors: List[Callable[[], None]] = []
     
     def counter(self, name: str, description: str = "") -> Counter:
         if name not in self._counters:
@@ -264,11 +384,52 @@ class MetricsRegistry:
             self._gauges[name] = Gauge(name, description)
         return self._gauges[name]
     
-    def histogram(self, name: str, description: str = "") -> Histogram:
+    def histogram(self, name: str, description: str = "",
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
         if name not in self._histograms:
-            self._histograms[name] = Histogram(name, description)
+            self._histograms[name] = Histogram(name, description, buckets=buckets)
         return self._histograms[name]
     
+    def register_collector(self, collect: Callable[[], None]) -> None:
+        """Run collect() before every export (e.g. to set gauges from pool stats)"""
+        if collect not in self._collectors:
+            self._collectors.append(collect)
+    
+    def _collect(self) -> None:
+        for collect in list(self._collectors):
+            try:
+                collect()
+            except Exception as e:
+                logger.debug(f"Metrics collector {collect!r} failed: {e}")
+    
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        self._collect()
+        lines: List[str] = []
+        
+        for name, c in sorted(self._counters.items()):
+            _header(lines, name, c.description, "counter")
+            for key, value in sorted((c.series() or {(): 0.0}).items()):
+                lines.append(f"{_metric_name(name)}{_format_labels(key)} {_format_value(value)}")
+        
+        for name, g in sorted(self._gauges.items()):
+            _header(lines, name, g.description, "gauge")
+            lines.append(f"{_metric_name(name)} {_format_value(g.value)}")
+        
+        for name, h in sorted(self._histograms.items()):
+            _header(lines, name, h.description, "histogram")
+            metric = _metric_name(name)
+            for key, series in sorted(h.series().items()):
+                cumulative = 0
+                for bound, bucket_count in zip(h.buckets, series.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_format_labels(key, le=_format_value(bound))} {cumulative}")
+                lines.append(f'{metric}_bucket{_format_labels(key, le="+Inf")} {series.count}')
+                lines.append(f"{metric}_sum{_format_labels(key)} {_format_value(series.sum)}")
+                lines.append(f"{metric}_count{_format_labels(key)} {series.count}")
+        
+        return "\n".join(lines) + "\n"
+    
     def get_all_metrics(self) -> Dict[str, Any]:
         """Get all metrics in a single dict for monitoring/export"""
         result = {
@@ -289,10 +450,128 @@ class MetricsRegistry:
         return result
 
 
+# ═══════════════════════════════════════════════════════════════
+# PROMETHEUS TEXT EXPOSITION
+# ═══════════════════════════════════════════════════════════════
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _metric_name(name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", name)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{_metric_name(k)}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _header(lines: List[str], name: str, description: str, kind: str) -> None:
+    metric = _metric_name(name)
+    if description:
+        lines.append(f"# HELP {metric} {_escape(description)}")
+    lines.append(f"# TYPE {metric} {kind}")
+
+
 # Global registry instance
 metrics = MetricsRegistry()
 
 
+# ═══════════════════════════════════════════════════════════════
+# SIGNAL-TO-ORDER TIMING
+# ═══════════════════════════════════════════════════════════════
+
+_signal_received_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "signal_received_at", default=None
+)
+
+
+def mark_signal_received() -> contextvars.Token:
+    """Start the signal-to-order clock for the current context (and tasks it spawns)"""
+    return _signal_received_at.set(time.perf_counter())
+
+
+def track_signal_latency(func: Callable) -> Callable:
+    """
+    Decorator for signal handlers: orders placed while the handler runs
+    (or from tasks it spawns) report signal-to-order latency.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = mark_signal_received()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _signal_received_at.reset(token)
+    return wrapper
+
+
+def observe_signal_to_order(exchange: str) -> None:
+    """Record signal-to-order latency if the current order was triggered by a signal"""
+    started = _signal_received_at.get()
+    if started is not None:
+        metrics.signal_to_order.observe((time.perf_counter() - started) * 1000, exchange=exchange)
+
+
+# ═══════════════════════════════════════════════════════════════
+# SCRAPE SERVER (processes without a web framework, e.g. the bot)
+# ═══════════════════════════════════════════════════════════════
+
+async def start_metrics_server(host: str = "127.0.0.1", port: int = 9108,
+                               json_routes: Optional[Dict[str, Callable[[], Any]]] = None):
+    """
+    Serve GET /metrics in the Prometheus text format.
+    
+    json_routes maps extra GET paths to functions returning JSON-serialisable
+    data (e.g. {"/debug/memory": get_memory_stats}).
+    
+    Returns the aiohttp AppRunner; pass it to stop_metrics_server().
+    """
+    from aiohttp import web
+    
+    async def handle_metrics(request):
+        return web.Response(
+            body=metrics.render_prometheus().encode(),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
+    
+    def json_handler(func):
+        async def handle(request):
+            return web.json_response(func(), dumps=lambda obj: json.dumps(obj, default=str))
+        return handle
+    
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    for path, func in (json_routes or {}).items():
+        app.router.add_get(path, json_handler(func))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+    return runner
+
+
+async def stop_metrics_server(runner) -> None:
+    if runner is not None:
+        await runner.cleanup()
+
+
 # ═══════════════════════════════════════════════════════════════
 # DECORATORS FOR AUTOMATIC METRICS
 # ═══════════════════════════════════════════════════════════════
@@ -14,6 +14,10 @@ Best Practices Applied:
 4. Query result caching integration
 5. Connection pool integration
 
+- Hot-read fast path: db.py's hottest reads as named prepared statements
+  on the asyncpg pool, with automatic fallback to the sync path
+- Per-query latency statistics
+
 Usage:
     from core.multitenancy_queries import (
         get_user_settings_optimized,
@@ -27,14 +31,23 @@ Usage:
     
     # Batch position fetch for monitoring
     positions = await get_positions_for_monitoring(user_ids)
+    
+    # Hot reads from async code (same results as the db.py functions)
+    positions = await fetch_active_positions(uid, account_type="demo", exchange="bybit")
 """
 
 import asyncio
 import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple, Set
 from enum import Enum
 
+from core.metrics import Histogram, metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -283,6 +296,81 @@ PREPARED_STATEMENTS = {
         param_types=('bigint', 'text', 'text', 'real', 'real', 'text', 
                      'real', 'real', 'text', 'text', 'real', 'real', 'text')
     ),
+    
+    # ── Hot reads (db.py fast path) ──
+    
+    # Full user row for get_user_config (columns resolved from the row)
+    'get_user_row': PreparedStatement(
+        name='get_user_row',
+        query="""
+            SELECT * FROM users WHERE user_id = $1
+        """,
+        param_types=('bigint',)
+    ),
+    
+    # Bybit credentials + routing fields
+    'get_user_credentials': PreparedStatement(
+        name='get_user_credentials',
+        query="""
+            SELECT demo_api_key, demo_api_secret, real_api_key, real_api_secret,
+                   trading_mode, exchange_type, last_viewed_account, lang
+            FROM users
+            WHERE user_id = $1
+        """,
+        param_types=('bigint',)
+    ),
+    
+    # Strategy settings rows (both sides) for one exchange
+    'get_strategy_settings': PreparedStatement(
+        name='get_strategy_settings',
+        query="""
+            SELECT * FROM user_strategy_settings
+            WHERE user_id = $1 AND strategy = $2 AND exchange = $3
+        """,
+        param_types=('bigint', 'text', 'text')
+    ),
+    
+    # Strategy settings rows from other exchanges (fallback)
+    'get_strategy_settings_fallback': PreparedStatement(
+        name='get_strategy_settings_fallback',
+        query="""
+            SELECT * FROM user_strategy_settings
+            WHERE user_id = $1 AND strategy = $2 AND exchange != $3
+            ORDER BY updated_at DESC
+        """,
+        param_types=('bigint', 'text', 'text')
+    ),
+    
+    # Active positions with optional filters (column order matches db.get_active_positions)
+    'get_active_positions': PreparedStatement(
+        name='get_active_positions',
+        query="""
+            SELECT symbol, side, entry_price, size, open_ts, timeframe, signal_id,
+                   COALESCE(dca_10_done, 0), COALESCE(dca_25_done, 0), strategy, account_type,
+                   source, opened_by, exchange, sl_price, tp_price,
+                   manual_sltp_override, manual_sltp_ts,
+                   atr_activated, atr_activation_price, atr_last_stop_price, atr_last_update_ts,
+                   leverage, client_order_id, exchange_order_id, env, COALESCE(use_atr, 0) as use_atr,
+                   applied_sl_pct, applied_tp_pct
+            FROM active_positions
+            WHERE user_id = $1
+              AND ($2::text IS NULL OR account_type = $2)
+              AND ($3::text IS NULL OR exchange = $3)
+              AND ($4::text IS NULL OR env = $4)
+        """,
+        param_types=('bigint', 'text', 'text', 'text')
+    ),
+    
+    # Pending limit orders for one exchange, newest first
+    'get_pending_limit_orders': PreparedStatement(
+        name='get_pending_limit_orders',
+        query="""
+            SELECT * FROM pending_limit_orders
+            WHERE user_id = $1 AND exchange = $2
+            ORDER BY created_ts DESC
+        """,
+        param_types=('bigint', 'text')
+    ),
 }
 
 
@@ -292,52 +380,63 @@ PREPARED_STATEMENTS = {
 
 class PreparedStatementManager:
     """
-    Manages prepared statements for asyncpg connections.
+    Runs PREPARED_STATEMENTS on asyncpg connections.
     
-    Prepared statements are cached per-connection to avoid re-preparation overhead.
-    Uses connection's prepare() method which is automatically cached by asyncpg.
+    run() passes the statement text to conn.fetch/fetchrow/fetchval, so
+    asyncpg's own statement cache prepares each query once per physical
+    connection and keeps it across pool acquires. PreparedStatement objects
+    from get_prepared() belong to the current acquire only: asyncpg rejects
+    them once the connection has been released back to the pool.
     """
     
     def __init__(self):
-        self._prepared: Dict[int, Set[str]] = {}  # conn_id -> set of prepared names
-        self._lock = asyncio.Lock()
+        self.prepares = 0
+        self.executions = 0
+    
+    @staticmethod
+    def _statement(stmt_name: str) -> "PreparedStatement":
+        if stmt_name not in PREPARED_STATEMENTS:
+            raise ValueError(f"Unknown prepared statement: {stmt_name}")
+        return PREPARED_STATEMENTS[stmt_name]
     
     async def get_prepared(self, conn, stmt_name: str):
         """
-        Get or create a prepared statement for the connection.
+        Prepare a statement for use within the current acquire of conn.
         
         Args:
             conn: asyncpg connection
             stmt_name: Name of the prepared statement from PREPARED_STATEMENTS
             
         Returns:
-            Prepared statement object
+            Prepared statement object (do not keep it past the acquire)
         """
-        if stmt_name not in PREPARED_STATEMENTS:
-            raise ValueError(f"Unknown prepared statement: {stmt_name}")
-        
-        stmt = PREPARED_STATEMENTS[stmt_name]
-        conn_id = id(conn)
-        
-        # Check if already prepared for this connection
-        if conn_id in self._prepared and stmt_name in self._prepared[conn_id]:
-            # asyncpg caches prepared statements internally
-            return await conn.prepare(stmt.query)
+        stmt = self._statement(stmt_name)
+        self.prepares += 1
+        return await conn.prepare(stmt.query)
+    
+    async def run(self, conn, stmt_name: str, *args: Any, method: str = "fetch"):
+        """
+        Execute a named statement through the connection's statement cache.
         
-        # Prepare the statement
-        async with self._lock:
-            if conn_id not in self._prepared:
-                self._prepared[conn_id] = set()
-            
-            prepared = await conn.prepare(stmt.query)
-            self._prepared[conn_id].add(stmt_name)
-            
-            return prepared
+        Args:
+            conn: asyncpg connection
+            stmt_name: Name of the prepared statement from PREPARED_STATEMENTS
+            *args: Statement parameters
+            method: 'fetch', 'fetchrow' or 'fetchval'
+        """
+        stmt = self._statement(stmt_name)
+        self.executions += 1
+        return await getattr(conn, method)(stmt.query, *args)
     
     def on_connection_close(self, conn):
-        """Called when a connection is closed to cleanup tracking"""
-        conn_id = id(conn)
-        self._prepared.pop(conn_id, None)
+        """Nothing is tracked per connection - asyncpg drops its cache with it"""
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "prepares": self.prepares,
+            "executions": self.executions,
+        }
 
 
 # Singleton instance
@@ -382,8 +481,10 @@ async def get_user_settings_optimized(
             return cached
     
     async with pool.acquire() as conn:
-        prepared = await _stmt_manager.get_prepared(conn, 'get_user_settings')
-        row = await prepared.fetchrow(user_id, strategy.lower(), exchange, account_type)
+        row = await _stmt_manager.run(
+            conn, 'get_user_settings', user_id, strategy.lower(), exchange, account_type,
+            method='fetchrow',
+        )
         
         if row:
             result = dict(row)
@@ -411,8 +512,7 @@ async def get_user_enabled_strategies(
         List of enabled strategy configs
     """
     async with pool.acquire() as conn:
-        prepared = await _stmt_manager.get_prepared(conn, 'get_user_enabled_strategies')
-        rows = await prepared.fetch(user_id)
+        rows = await _stmt_manager.run(conn, 'get_user_enabled_strategies', user_id)
         return [dict(row) for row in rows]
 
 
@@ -497,8 +597,8 @@ async def upsert_user_settings(
         Updated settings dict
     """
     async with pool.acquire() as conn:
-        prepared = await _stmt_manager.get_prepared(conn, 'upsert_user_settings')
-        row = await prepared.fetchrow(
+        row = await _stmt_manager.run(
+            conn, 'upsert_user_settings',
             user_id,
             strategy.lower(),
             exchange,
@@ -507,7 +607,8 @@ async def upsert_user_settings(
             settings.get('percent'),
             settings.get('sl_percent'),
             settings.get('tp_percent'),
-            settings.get('leverage')
+            settings.get('leverage'),
+            method='fetchrow',
         )
         
         result = dict(row) if row else {}
@@ -535,8 +636,7 @@ async def get_user_global_settings(
         Global settings dict or None
     """
     async with pool.acquire() as conn:
-        prepared = await _stmt_manager.get_prepared(conn, 'get_user_global_settings')
-        row = await prepared.fetchrow(user_id)
+        row = await _stmt_manager.run(conn, 'get_user_global_settings', user_id, method='fetchrow')
         return dict(row) if row else None
 
 
@@ -818,41 +918,87 @@ class QueryStats:
     avg_time_ms: float = 0.0
     min_time_ms: float = float('inf')
     max_time_ms: float = 0.0
+    error_count: int = 0
     
-    def record(self, time_ms: float):
+    def record(self, time_ms: float, error: bool = False):
         """Record a query execution time"""
         self.execution_count += 1
         self.total_time_ms += time_ms
         self.avg_time_ms = self.total_time_ms / self.execution_count
         self.min_time_ms = min(self.min_time_ms, time_ms)
         self.max_time_ms = max(self.max_time_ms, time_ms)
+        if error:
+            self.error_count += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "query": self.query_name,
+            "count": self.execution_count,
+            "errors": self.error_count,
+            "total_ms": round(self.total_time_ms, 2),
+            "avg_ms": round(self.avg_time_ms, 3),
+            "min_ms": round(self.min_time_ms, 3) if self.execution_count else 0.0,
+            "max_ms": round(self.max_time_ms, 3),
+        }
 
 
 class QueryStatsCollector:
-    """Collects query execution statistics for monitoring"""
+    """Collects query execution statistics for monitoring (async and worker-thread callers)"""
     
-    def __init__(self):
+    def __init__(self, histogram: Optional[Histogram] = None):
         self._stats: Dict[str, QueryStats] = {}
-        self._lock = asyncio.Lock()
+        self._lock = threading.Lock()
+        # Optional Prometheus histogram fed with every execution (label: query)
+        self._histogram = histogram
+    
+    def record_sync(self, query_name: str, time_ms: float, error: bool = False):
+        """Record query execution time from any thread"""
+        with self._lock:
+            stats = self._stats.get(query_name)
+            if stats is None:
+                stats = self._stats[query_name] = QueryStats(query_name)
+            stats.record(time_ms, error)
+        if self._histogram is not None:
+            self._histogram.observe(time_ms, query=query_name)
     
     async def record(self, query_name: str, time_ms: float):
         """Record query execution time"""
-        async with self._lock:
-            if query_name not in self._stats:
-                self._stats[query_name] = QueryStats(query_name)
-            self._stats[query_name].record(time_ms)
+        self.record_sync(query_name, time_ms)
+    
+    @contextmanager
+    def track(self, query_name: str):
+        """Time the enclosed block as one execution of query_name"""
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record_sync(query_name, (time.perf_counter() - started) * 1000, error)
     
     def get_stats(self) -> Dict[str, QueryStats]:
         """Get all query statistics"""
-        return dict(self._stats)
+        with self._lock:
+            return dict(self._stats)
     
     def get_slow_queries(self, threshold_ms: float = 100.0) -> List[QueryStats]:
         """Get queries with average time above threshold"""
-        return [s for s in self._stats.values() if s.avg_time_ms > threshold_ms]
+        return [s for s in self.get_stats().values() if s.avg_time_ms > threshold_ms]
+    
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
 
 
 # Global stats collector
-_query_stats = QueryStatsCollector()
+_query_stats = QueryStatsCollector(metrics.db_query_latency)
+
+
+def track_query(query_name: str):
+    """Context manager recording a sync query's latency in the global collector"""
+    return _query_stats.track(query_name)
 
 
 async def get_query_stats() -> Dict[str, QueryStats]:
@@ -863,3 +1009,182 @@ async def get_query_stats() -> Dict[str, QueryStats]:
 async def get_slow_queries(threshold_ms: float = 100.0) -> List[QueryStats]:
     """Get slow queries above threshold"""
     return _query_stats.get_slow_queries(threshold_ms)
+
+
+# =============================================================================
+# HOT READ FAST PATH (asyncpg + prepared statements)
+# =============================================================================
+
+# DB_ASYNC_FAST_PATH=0 keeps every hot read on the sync psycopg2 path
+FAST_PATH_ENABLED = os.getenv("DB_ASYNC_FAST_PATH", "1") != "0"
+# After a pool/connection failure, stay on the sync path this long
+FAST_PATH_RETRY_SECONDS = 60.0
+
+_fast_path_down_until = 0.0
+_broken_statements: Set[str] = set()
+
+
+async def run_prepared(stmt_name: str, *args: Any, method: str = "fetch"):
+    """
+    Execute a named prepared statement on the UnifiedPoolManager asyncpg pool.
+    
+    Latency is recorded in the global QueryStatsCollector under stmt_name.
+    
+    Args:
+        stmt_name: Key of PREPARED_STATEMENTS
+        *args: Statement parameters
+        method: 'fetch', 'fetchrow' or 'fetchval'
+    """
+    from .pool_manager import get_pool_manager
+    
+    with _query_stats.track(stmt_name):
+        async with get_pool_manager().async_connection() as conn:
+            return await _stmt_manager.run(conn, stmt_name, *args, method=method)
+
+
+async def _fast_read(stmt_name: str, *args: Any, method: str = "fetch"):
+    """
+    run_prepared() for hot reads; returns None when the fast path is unavailable.
+    
+    Connection failures disable the fast path for FAST_PATH_RETRY_SECONDS;
+    a statement the server rejects (schema drift) is disabled for good.
+    Callers fall back to the sync db.py function (on the DB executor) on None.
+    """
+    global _fast_path_down_until
+    
+    if not FAST_PATH_ENABLED or stmt_name in _broken_statements:
+        return None
+    if time.time() < _fast_path_down_until:
+        return None
+    
+    try:
+        return await run_prepared(stmt_name, *args, method=method)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        try:
+            import asyncpg
+            server_error = isinstance(e, asyncpg.PostgresError)
+        except ImportError:
+            server_error = False
+        if server_error:
+            _broken_statements.add(stmt_name)
+            logger.warning(f"Fast path statement {stmt_name} disabled: {e}")
+        else:
+            _fast_path_down_until = time.time() + FAST_PATH_RETRY_SECONDS
+            logger.warning(f"Async DB fast path unavailable for {FAST_PATH_RETRY_SECONDS:.0f}s: {e}")
+        return None
+
+
+async def _sync_fallback(func, *args):
+    """Run the sync db.py implementation on the DB executor"""
+    from .db_executor import db_executor
+    return await db_executor.run(func, *args, name=f"db.{func.__name__}")
+
+
+async def fetch_user_config(user_id: int) -> dict:
+    """Async db.get_user_config (shares its cache)"""
+    import db
+    
+    # Process cache only: a Redis round trip would block the loop thread
+    cached = db._get_cached_user_config(user_id, shared=False)
+    if cached is not None:
+        return cached
+    
+    from .config_cache import config_cache
+    token = config_cache.begin_load(user_id, shared=False)
+    row = await _fast_read('get_user_row', user_id, method='fetchrow')
+    if row is None:
+        # Unknown user (sync path creates it) or fast path unavailable
+        return await _sync_fallback(db.get_user_config, user_id)
+    
+    data = dict(row)
+    cols = db._user_config_columns(lambda col: col in data)
+    cfg = db._build_user_config({col: data[col] for col in cols})
+    db._store_cached_user_config(user_id, cfg, token, shared=False)
+    return cfg.copy()
+
+
+async def fetch_user_credentials(user_id: int, account_type: str = None) -> Tuple[Optional[str], Optional[str]]:
+    """Async db.get_user_credentials"""
+    import db
+    
+    row = await _fast_read('get_user_credentials', user_id, method='fetchrow')
+    if row is None:
+        return await _sync_fallback(db.get_user_credentials, user_id, account_type)
+    return db._select_credentials(row['demo_api_key'], row['demo_api_secret'], row['real_api_key'],
+                                  row['real_api_secret'], row['trading_mode'], account_type)
+
+
+async def fetch_all_user_credentials(user_id: int) -> dict:
+    """Async db.get_all_user_credentials"""
+    import db
+    
+    row = await _fast_read('get_user_credentials', user_id, method='fetchrow')
+    if row is None:
+        return await _sync_fallback(db.get_all_user_credentials, user_id)
+    return db._all_credentials_from_row(tuple(row))
+
+
+async def fetch_strategy_settings(
+    user_id: int,
+    strategy: str,
+    exchange: str = None,
+    account_type: str = None
+) -> dict:
+    """Async db.get_strategy_settings"""
+    import db
+    from core.db_postgres import build_strategy_settings, dedupe_rows_by_side
+    
+    if exchange is None:
+        cfg = await fetch_user_config(user_id)
+        exchange = cfg.get("exchange_type") or "bybit"
+    
+    rows = await _fast_read('get_strategy_settings', user_id, strategy, exchange)
+    if rows is None:
+        return await _sync_fallback(db.get_strategy_settings, user_id, strategy, exchange, account_type)
+    
+    rows = [dict(r) for r in rows]
+    if not rows:
+        fallback = await _fast_read('get_strategy_settings_fallback', user_id, strategy, exchange)
+        if fallback is None:
+            return await _sync_fallback(db.get_strategy_settings, user_id, strategy, exchange, account_type)
+        rows = dedupe_rows_by_side([dict(r) for r in fallback])
+    return build_strategy_settings(rows, exchange)
+
+
+async def fetch_active_positions(
+    user_id: int,
+    account_type: Optional[str] = None,
+    exchange: Optional[str] = None,
+    env: Optional[str] = None
+) -> List[dict]:
+    """Async db.get_active_positions"""
+    import db
+    
+    account_type = db._normalize_both_account_type(account_type, exchange=exchange or 'bybit')
+    rows = await _fast_read('get_active_positions', user_id, account_type or None, exchange or None, env or None)
+    if rows is None:
+        return await _sync_fallback(db.get_active_positions, user_id, account_type, exchange, env)
+    return [db._position_from_row(r) for r in rows]
+
+
+async def fetch_pending_limit_orders(user_id: int, exchange: str = "bybit") -> List[dict]:
+    """Async db.get_pending_limit_orders"""
+    import db
+    
+    rows = await _fast_read('get_pending_limit_orders', user_id, exchange)
+    if rows is None:
+        return await _sync_fallback(db.get_pending_limit_orders, user_id, exchange)
+    return [db._pending_order_from_dict(dict(r)) for r in rows]
+
+
+def get_fast_path_status() -> Dict[str, Any]:
+    """Fast path state for admin/system views"""
+    return {
+        "enabled": FAST_PATH_ENABLED,
+        "available": time.time() >= _fast_path_down_until,
+        "retry_in_seconds": max(0.0, round(_fast_path_down_until - time.time(), 1)),
+        "broken_statements": sorted(_broken_statements),
+        "prepared": _stmt_manager.stats,
+    }
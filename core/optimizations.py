@@ -13,6 +13,7 @@ Contains:
 from __future__ import annotations
 
 import asyncio
+import os
 import time
 import logging
 import threading
@@ -112,6 +113,10 @@ class TTLBoundedDict(Generic[T]):
     Thread-safe dictionary with TTL and max size.
     Entries expire after TTL seconds and oldest are evicted at max_size.
     
+    Also supports the dict protocol (d[k] = v, k in d, d.get, d.pop, len,
+    iteration), so it can replace a plain dict without touching call sites.
+    Expired entries behave as missing.
+    
     Example:
         cache = TTLBoundedDict[dict](max_size=500, ttl=60.0)
         cache.set("user:123", {"balance": 1000})
@@ -119,14 +124,15 @@ class TTLBoundedDict(Generic[T]):
     """
     
     def __init__(self, max_size: int = 500, ttl: float = 60.0):
-        self._data: OrderedDict[str, TTLEntry[T]] = OrderedDict()
+        self._data: OrderedDict[Any, TTLEntry[T]] = OrderedDict()
         self._max_size = max_size
         self._default_ttl = ttl
         self._lock = threading.RLock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
     
-    def set(self, key: str, value: T, ttl: float = None) -> None:
+    def set(self, key: Any, value: T, ttl: float = None) -> None:
         ttl = ttl if ttl is not None else self._default_ttl
         with self._lock:
             if key in self._data:
@@ -134,8 +140,54 @@ class TTLBoundedDict(Generic[T]):
             else:
                 while len(self._data) >= self._max_size:
                     self._data.popitem(last=False)
+                    self._evictions += 1
             self._data[key] = TTLEntry(value=value, expires_at=time.time() + ttl)
     
+    def __setitem__(self, key: Any, value: T) -> None:
+        self.set(key, value)
+    
+    def __getitem__(self, key: Any) -> T:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.is_expired:
+                if entry is not None:
+                    del self._data[key]
+                raise KeyError(key)
+            return entry.value
+    
+    def __delitem__(self, key: Any) -> None:
+        if not self.delete(key):
+            raise KeyError(key)
+    
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not entry.is_expired
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for v in self._data.values() if not v.is_expired)
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def pop(self, key: Any, default: T = None) -> T:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        if entry is None or entry.is_expired:
+            return default
+        return entry.value
+    
+    def keys(self) -> list:
+        """Snapshot of live keys"""
+        with self._lock:
+            return [k for k, v in self._data.items() if not v.is_expired]
+    
+    def items(self) -> list:
+        """Snapshot of live (key, value) pairs"""
+        with self._lock:
+            return [(k, v.value) for k, v in self._data.items() if not v.is_expired]
+    
     def get(self, key: str, default: T = None) -> T:
         with self._lock:
             entry = self._data.get(key)
@@ -173,10 +225,12 @@ class TTLBoundedDict(Generic[T]):
         with self._lock:
             total = self._hits + self._misses
             return {
-                "size": len(self._data),
+                "size": len(self),
                 "max_size": self._max_size,
+                "ttl": self._default_ttl,
                 "hits": self._hits,
                 "misses": self._misses,
+                "evictions": self._evictions,
                 "hit_rate": self._hits / total if total > 0 else 0.0
             }
 
@@ -272,13 +326,29 @@ class CacheCleanupScheduler:
     
     def __init__(self):
         self._caches: list[tuple[Any, float]] = []
+        self._named: Dict[str, Any] = {}
         self._running = False
         self._task: Optional[asyncio.Task] = None
     
-    def register(self, cache: Any, cleanup_interval: float = 300.0) -> None:
-        """Register a cache for periodic cleanup."""
-        if hasattr(cache, 'cleanup_expired'):
-            self._caches.append((cache, cleanup_interval))
+    def register(self, cache: Any, cleanup_interval: float = 300.0, name: Optional[str] = None) -> None:
+        """
+        Register a cache for periodic cleanup.
+        
+        Named caches are listed by cache_stats(); registering a name again
+        replaces the previous cache (e.g. when a loop restarts).
+        """
+        if not hasattr(cache, 'cleanup_expired'):
+            return
+        if name is not None:
+            previous = self._named.get(name)
+            if previous is not None:
+                self._caches = [(c, i) for c, i in self._caches if c is not previous]
+            self._named[name] = cache
+        self._caches.append((cache, cleanup_interval))
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Stats (size, max_size, ...) of every named cache"""
+        return {name: cache.stats for name, cache in sorted(self._named.items())}
     
     async def start(self) -> None:
         """Start the cleanup scheduler."""
@@ -328,6 +398,44 @@ class CacheCleanupScheduler:
 cache_cleanup_scheduler = CacheCleanupScheduler()
 
 
+def bounded_cache(name: str, max_size: int, ttl: float, cleanup_interval: float = 300.0) -> TTLBoundedDict:
+    """
+    TTLBoundedDict registered with the global cleanup scheduler under name.
+    
+    Example:
+        _sl_notified = bounded_cache("monitor.sl_notified", max_size=50000, ttl=7 * 86400)
+    """
+    cache: TTLBoundedDict = TTLBoundedDict(max_size=max_size, ttl=ttl)
+    cache_cleanup_scheduler.register(cache, cleanup_interval=cleanup_interval, name=name)
+    return cache
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_memory_stats() -> Dict[str, Any]:
+    """Process RSS plus entry counts of named bounded caches and core.cache caches"""
+    from core.cache import get_all_cache_stats
+    
+    caches = cache_cleanup_scheduler.cache_stats()
+    return {
+        "rss_mb": _rss_mb(),
+        "bounded_entries": sum(s.get("size", 0) for s in caches.values()),
+        "bounded_caches": caches,
+        "core_caches": get_all_cache_stats(),
+    }
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # PERFORMANCE METRICS COLLECTOR
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -527,6 +635,8 @@ __all__ = [
     # Cleanup
     'CacheCleanupScheduler',
     'cache_cleanup_scheduler',
+    'bounded_cache',
+    'get_memory_stats',
     # Metrics
     'MetricsCollector',
     'metrics',
@@ -0,0 +1,321 @@
+"""
+Spot Portfolio Engine
+=====================
+Values spot holdings and plans / executes rebalances with one price request
+per exchange instead of one ticker call per coin.
+
+- Prices: Bybit /v5/market/tickers?category=spot returns every pair in one
+  call; HyperLiquid spotMetaAndAssetCtxs carries mid and prev-day prices for
+  every spot pair
+- Planning: current values, targets and deltas for all coins are computed
+  as numpy vectors; the plan doubles as a dry run
+- Execution: sells before buys (to free quote currency), each phase runs
+  concurrently under a per-exchange concurrency cap and rate limiter
+
+Usage:
+    from core.spot_portfolio import fetch_bybit_spot_tickers, plan_rebalance, execute_rebalance
+
+    tickers = await fetch_bybit_spot_tickers(request, ["BTC", "ETH"])
+    plan = plan_rebalance(allocation, balances, tickers, quote_balance=usdt)
+    report = await execute_rebalance(plan, sell, buy, exchange="bybit", limiter_key=str(uid))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.rate_limiter import bybit_limiter, hl_limiter
+
+logger = logging.getLogger(__name__)
+
+# Concurrent spot orders per rebalance phase
+SPOT_MAX_CONCURRENT = {"bybit": 5, "hyperliquid": 3}
+# Skip coins whose drift is below this share of their target value
+REBALANCE_DRIFT_PCT = 5.0
+# Smallest trade worth sending (exchange minimums are around $5)
+REBALANCE_MIN_TRADE = 5.0
+# Smallest portfolio worth rebalancing
+REBALANCE_MIN_PORTFOLIO = 10.0
+
+# request(method, path, params=None, body=None) -> full Bybit response envelope
+BybitRequest = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# BULK PRICES
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+def _price(ticker: Optional[Dict[str, Any]]) -> float:
+    if not ticker:
+        return 0.0
+    try:
+        return float(ticker.get("lastPrice") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def fetch_bybit_spot_tickers(
+    request: BybitRequest,
+    coins: Optional[Iterable[str]] = None,
+    quote: str = "USDT",
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Spot tickers for many coins in one request.
+
+    Args:
+        request: Signed Bybit request callable for the account
+        coins: Base coins to keep (all {quote} pairs if None)
+        quote: Quote currency
+
+    Returns:
+        {coin: Bybit ticker dict}
+    """
+    data = await request("GET", "/v5/market/tickers", params={"category": "spot"})
+    if data.get("retCode") != 0:
+        raise RuntimeError(data.get("retMsg") or "Failed to fetch spot tickers")
+
+    wanted = {f"{c}{quote}": c for c in coins} if coins is not None else None
+    tickers = {}
+    for ticker in data.get("result", {}).get("list", []):
+        symbol = ticker.get("symbol", "")
+        if wanted is not None:
+            coin = wanted.get(symbol)
+        else:
+            coin = symbol[: -len(quote)] if symbol.endswith(quote) else None
+        if coin:
+            tickers[coin] = ticker
+    return tickers
+
+
+async def fetch_hl_spot_tickers(
+    adapter,
+    coins: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    HyperLiquid spot tickers for many tokens in one request.
+
+    Returned in the Bybit ticker shape (lastPrice, prevPrice24h,
+    price24hPcnt, volume24h) so callers handle both exchanges alike.
+    """
+    result = await adapter.get_spot_tickers()
+    if not result.get("success"):
+        raise RuntimeError(result.get("error") or "Failed to fetch HyperLiquid spot tickers")
+
+    by_name = {name.upper(): t for name, t in result.get("tickers", {}).items()}
+    names = list(coins) if coins is not None else list(result.get("tickers", {}))
+
+    tickers = {}
+    for coin in names:
+        t = by_name.get(coin.upper())
+        if not t:
+            continue
+        mid = t.get("mid_price") or t.get("mark_price") or 0.0
+        prev = t.get("prev_day_price") or mid
+        tickers[coin] = {
+            "symbol": coin,
+            "lastPrice": str(mid),
+            "prevPrice24h": str(prev),
+            "price24hPcnt": str((mid - prev) / prev if prev else 0),
+            "volume24h": str(t.get("day_volume") or 0),
+        }
+    return tickers
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# PLANNING
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class PlannedTrade:
+    """One rebalance order"""
+    coin: str
+    side: str  # Buy / Sell
+    usd: float  # Quote amount to buy / value to sell
+    qty: float  # Base quantity at the planning price
+    price: float
+    current_value: float
+    target_value: float
+    current_pct: float
+    target_pct: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class RebalancePlan:
+    """Rebalance plan (also the dry-run output)"""
+    total_value: float = 0.0
+    quote_balance: float = 0.0
+    trades: List[PlannedTrade] = field(default_factory=list)
+    holdings: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    unpriced: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def sells(self) -> List[PlannedTrade]:
+        return [t for t in self.trades if t.side == "Sell"]
+
+    @property
+    def buys(self) -> List[PlannedTrade]:
+        return [t for t in self.trades if t.side == "Buy"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_value": self.total_value,
+            "quote_balance": self.quote_balance,
+            "sells": [t.to_dict() for t in self.sells],
+            "buys": [t.to_dict() for t in self.buys],
+            "holdings": self.holdings,
+            "unpriced": self.unpriced,
+            "error": self.error,
+        }
+
+
+def plan_rebalance(
+    allocation: Dict[str, float],
+    balances: Dict[str, float],
+    tickers: Dict[str, Dict[str, Any]],
+    quote_balance: float = 0.0,
+    drift_pct: float = REBALANCE_DRIFT_PCT,
+    min_trade: float = REBALANCE_MIN_TRADE,
+    min_portfolio: float = REBALANCE_MIN_PORTFOLIO,
+) -> RebalancePlan:
+    """
+    Compute the trades that bring holdings to the target allocation.
+
+    Args:
+        allocation: {coin: target percent of portfolio}
+        balances: {coin: held quantity}
+        tickers: {coin: ticker with lastPrice}
+        quote_balance: Free quote currency, counted as cash
+        drift_pct: Ignore coins within this percent of their target value
+        min_trade: Minimum trade size in quote currency
+
+    Coins without a price are reported in plan.unpriced and left untouched.
+    """
+    coins = list(allocation)
+    plan = RebalancePlan(quote_balance=quote_balance)
+    if not coins:
+        plan.error = "No target allocation defined"
+        return plan
+
+    target_pct = np.array([float(allocation[c]) for c in coins])
+    qty = np.array([float(balances.get(c, 0) or 0) for c in coins])
+    price = np.array([_price(tickers.get(c)) for c in coins])
+
+    priced = price > 0
+    value = np.where(priced & (qty > 0), qty * price, 0.0)
+    total = float(value.sum()) + quote_balance
+    target = total * target_pct / 100.0
+    diff = target - value
+
+    plan.total_value = total
+    plan.unpriced = [c for c, ok in zip(coins, priced) if not ok]
+    current_pct = value / total * 100.0 if total > 0 else np.zeros_like(value)
+    plan.holdings = {
+        c: {"qty": float(q), "price": float(p), "value": float(v), "pct": float(cp), "target_pct": float(tp)}
+        for c, q, p, v, cp, tp in zip(coins, qty, price, value, current_pct, target_pct)
+    }
+
+    if total < min_portfolio:
+        plan.error = "Portfolio too small to rebalance"
+        return plan
+
+    drifted = priced & (np.abs(diff) >= target * drift_pct / 100.0)
+    sides = np.where(drifted & (diff < -min_trade), -1, np.where(drifted & (diff > min_trade), 1, 0))
+
+    for i in np.flatnonzero(sides):
+        usd = float(abs(diff[i]))
+        plan.trades.append(PlannedTrade(
+            coin=coins[i],
+            side="Buy" if sides[i] > 0 else "Sell",
+            usd=usd,
+            qty=usd / float(price[i]),
+            price=float(price[i]),
+            current_value=float(value[i]),
+            target_value=float(target[i]),
+            current_pct=float(current_pct[i]),
+            target_pct=float(target_pct[i]),
+        ))
+    # Largest moves first within each phase
+    plan.trades.sort(key=lambda t: t.usd, reverse=True)
+    return plan
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# EXECUTION
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+# execute(trade) -> result dict with "success"
+TradeExecutor = Callable[[PlannedTrade], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class RebalanceReport:
+    """Outcome of executing a plan"""
+    sells: List[Tuple[PlannedTrade, Dict[str, Any]]] = field(default_factory=list)
+    buys: List[Tuple[PlannedTrade, Dict[str, Any]]] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def total_rebalanced(self) -> float:
+        received = sum(r.get("usdt_received", 0) for _, r in self.sells if r.get("success"))
+        spent = sum(r.get("usdt_spent", 0) for _, r in self.buys if r.get("success"))
+        return received + spent
+
+
+async def _run_phase(
+    trades: List[PlannedTrade],
+    execute: TradeExecutor,
+    exchange: str,
+    limiter_key: str,
+    max_concurrent: int,
+) -> List[Tuple[PlannedTrade, Dict[str, Any]]]:
+    limiter = hl_limiter if exchange == "hyperliquid" else bybit_limiter
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run(trade: PlannedTrade) -> Dict[str, Any]:
+        async with semaphore:
+            await limiter.acquire(limiter_key, "order")
+            try:
+                return await execute(trade)
+            except Exception as e:
+                logger.warning(f"Rebalance {trade.side} {trade.coin} failed: {e}")
+                return {"success": False, "error": str(e)}
+
+    results = await asyncio.gather(*(run(t) for t in trades))
+    return list(zip(trades, results))
+
+
+async def execute_rebalance(
+    plan: RebalancePlan,
+    sell: TradeExecutor,
+    buy: TradeExecutor,
+    exchange: str = "bybit",
+    limiter_key: str = "default",
+    max_concurrent: Optional[int] = None,
+) -> RebalanceReport:
+    """
+    Execute a plan: all sells concurrently, then all buys concurrently.
+
+    Args:
+        plan: Output of plan_rebalance()
+        sell: Executor for Sell trades
+        buy: Executor for Buy trades
+        exchange: Selects the rate limiter and default concurrency
+        limiter_key: Rate limiter key (usually the user id)
+    """
+    started = time.perf_counter()
+    limit = max_concurrent or SPOT_MAX_CONCURRENT.get(exchange, 3)
+    report = RebalanceReport()
+    report.sells = await _run_phase(plan.sells, sell, exchange, limiter_key, limit)
+    report.buys = await _run_phase(plan.buys, buy, exchange, limiter_key, limit)
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
@@ -0,0 +1,490 @@
+"""
+Symbol Universe Service
+=======================
+In-memory catalogue of tradeable perpetuals on Bybit (linear) and
+HyperLiquid, kept fresh by a background refresher.
+
+- Instrument filters (tick size, lot size, leverage) and 24h tickers are
+  fetched with a handful of bulk requests instead of one per lookup
+- A prefix + trigram index answers symbol search without scanning
+- Filter lookups and symbol validation never touch the network once the
+  exchange has been loaded
+
+Usage:
+    from core.symbol_universe import symbol_universe
+
+    await symbol_universe.start()               # on app startup
+    hits = await symbol_universe.search("bybit", "pep", limit=20)
+    filters = await symbol_universe.filters("hyperliquid", "BTCUSDT")
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+
+from core.tasks import safe_create_task
+
+logger = logging.getLogger(__name__)
+
+BYBIT_API_URL = "https://api.bybit.com"
+HYPERLIQUID_API_URL = "https://api.hyperliquid.xyz"
+
+SYMBOL_UNIVERSE_CONFIG = {
+    "instruments_ttl": 3600,  # Bybit instrument filters - change on listings only
+    "tickers_ttl": 15,        # Prices / volume shown in search results
+    "tick": 5,                # Refresher wake-up interval, seconds
+    "request_timeout": 15,
+}
+
+EXCHANGES = ("bybit", "hyperliquid")
+
+
+@dataclass
+class SymbolInfo:
+    """One perpetual contract with its filters and latest ticker"""
+    symbol: str  # Bot/DB format: BTCUSDT (HyperLiquid coins get a USDT suffix too)
+    exchange: str
+    base: str
+    quote: str = "USDT"
+    status: str = "Trading"
+    tick_size: float = 0.0
+    qty_step: float = 0.0
+    min_qty: float = 0.0
+    max_qty: float = 0.0
+    max_mkt_qty: float = 0.0
+    min_price: float = 0.0
+    max_price: float = 0.0
+    min_leverage: float = 1.0
+    max_leverage: float = 0.0
+    funding_interval: Optional[int] = None
+    sz_decimals: Optional[int] = None  # HyperLiquid only
+    # Ticker
+    price: float = 0.0
+    change_24h: float = 0.0
+    high_24h: float = 0.0
+    low_24h: float = 0.0
+    volume_24h: float = 0.0
+    funding_rate: Optional[float] = None
+    open_interest: Optional[float] = None
+    # Raw Bybit instrument entry (priceFilter / lotSizeFilter / leverageFilter)
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def is_tradeable(self) -> bool:
+        return self.status == "Trading"
+
+    def filters(self) -> Dict[str, float]:
+        """Order filters in the format used by the bot's quantization helpers"""
+        return {
+            "tickSize": self.tick_size,
+            "minPrice": self.min_price,
+            "minQty": self.min_qty,
+            "qtyStep": self.qty_step,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# SEARCH INDEX
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SymbolIndex:
+    """
+    Prefix + trigram index over symbol names.
+
+    Symbols are base+quote (BTCUSDT), so one sorted list answers both base
+    and full-symbol prefixes; trigrams narrow substring matches to a few
+    candidates before the final `in` check.
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        self._sorted: List[str] = sorted({s.upper() for s in symbols})
+        self._trigrams: Dict[str, Set[str]] = {}
+        for symbol in self._sorted:
+            for gram in _trigrams(symbol):
+                self._trigrams.setdefault(gram, set()).add(symbol)
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def __contains__(self, symbol: str) -> bool:
+        i = bisect.bisect_left(self._sorted, symbol)
+        return i < len(self._sorted) and self._sorted[i] == symbol
+
+    def prefix(self, query: str) -> List[str]:
+        """Symbols starting with query"""
+        lo = bisect.bisect_left(self._sorted, query)
+        hi = bisect.bisect_left(self._sorted, query + "\uffff")
+        return self._sorted[lo:hi]
+
+    def contains(self, query: str) -> Set[str]:
+        """Symbols containing query anywhere"""
+        if len(query) < 3:
+            return {s for s in self._sorted if query in s}
+        grams = sorted(_trigrams(query), key=lambda g: len(self._trigrams.get(g, ())))
+        candidates = set(self._trigrams.get(grams[0], ()))
+        for gram in grams[1:]:
+            candidates &= self._trigrams.get(gram, set())
+            if not candidates:
+                break
+        return {s for s in candidates if query in s}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# PARSERS
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+def _f(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_bybit_instrument(inst: Dict[str, Any]) -> SymbolInfo:
+    """SymbolInfo from a /v5/market/instruments-info entry"""
+    lot = inst.get("lotSizeFilter", {})
+    price = inst.get("priceFilter", {})
+    leverage = inst.get("leverageFilter", {})
+    funding_interval = inst.get("fundingInterval")
+    return SymbolInfo(
+        symbol=inst.get("symbol", ""),
+        exchange="bybit",
+        base=inst.get("baseCoin", ""),
+        quote=inst.get("quoteCoin", ""),
+        status=inst.get("status", "Trading"),
+        tick_size=_f(price.get("tickSize")),
+        qty_step=_f(lot.get("qtyStep")),
+        min_qty=_f(lot.get("minOrderQty")),
+        max_qty=_f(lot.get("maxOrderQty")),
+        max_mkt_qty=_f(lot.get("maxMktOrderQty")),
+        min_price=_f(price.get("minPrice")),
+        max_price=_f(price.get("maxPrice")),
+        min_leverage=_f(leverage.get("minLeverage"), 1.0),
+        max_leverage=_f(leverage.get("maxLeverage"), 100.0),
+        funding_interval=int(funding_interval) if funding_interval not in (None, "") else None,
+        raw=inst,
+    )
+
+
+def apply_bybit_ticker(info: SymbolInfo, ticker: Dict[str, Any]) -> None:
+    """Update price fields from a /v5/market/tickers entry"""
+    info.price = _f(ticker.get("lastPrice"))
+    info.change_24h = round(_f(ticker.get("price24hPcnt")) * 100, 2)
+    info.high_24h = _f(ticker.get("highPrice24h"))
+    info.low_24h = _f(ticker.get("lowPrice24h"))
+    info.volume_24h = _f(ticker.get("turnover24h"))
+    info.funding_rate = _f(ticker.get("fundingRate")) * 100 if ticker.get("fundingRate") else None
+    info.open_interest = _f(ticker.get("openInterest")) if ticker.get("openInterest") else None
+
+
+def _hl_tick_size(sz_decimals: int) -> float:
+    # Perp prices allow at most 6 - szDecimals decimals (plus 5 significant figures)
+    return 10 ** -(6 - sz_decimals)
+
+
+def parse_hyperliquid(meta: Dict[str, Any], ctxs: List[Dict[str, Any]]) -> List[SymbolInfo]:
+    """SymbolInfos from a metaAndAssetCtxs response"""
+    infos = []
+    for asset, ctx in zip(meta.get("universe", []), ctxs):
+        name = asset.get("name", "")
+        if not name:
+            continue
+        sz_decimals = int(asset.get("szDecimals", 2))
+        step = 10 ** -sz_decimals
+        price = _f(ctx.get("markPx")) or _f(ctx.get("midPx"))
+        prev = _f(ctx.get("prevDayPx"))
+        infos.append(SymbolInfo(
+            symbol=f"{name}USDT",
+            exchange="hyperliquid",
+            base=name,
+            quote="USDC",
+            status="Delisted" if asset.get("isDelisted") else "Trading",
+            tick_size=_hl_tick_size(sz_decimals),
+            qty_step=step,
+            min_qty=step,
+            max_leverage=_f(asset.get("maxLeverage")),
+            funding_interval=60,
+            sz_decimals=sz_decimals,
+            price=price,
+            change_24h=round((price / prev - 1) * 100, 2) if prev > 0 else 0.0,
+            volume_24h=_f(ctx.get("dayNtlVlm")),
+            funding_rate=_f(ctx.get("funding")) * 100 if ctx.get("funding") is not None else None,
+            open_interest=_f(ctx.get("openInterest")) * price if ctx.get("openInterest") is not None else None,
+        ))
+    return infos
+
+
+def normalize_symbol(exchange: str, symbol: str) -> str:
+    """BTC / btcusdc / BTC-PERP -> BTCUSDT for HyperLiquid; upper-case for Bybit"""
+    s = (symbol or "").upper().strip()
+    if exchange == "hyperliquid":
+        for suffix in ("-PERP", "_PERP", "PERP", "USDT", "USDC"):
+            if s.endswith(suffix):
+                s = s[: -len(suffix)]
+                break
+        return f"{s}USDT" if s else s
+    return s
+
+
+# ═══════════════════════════════════════════════════════════════════════════════════
+# UNIVERSE
+# ═══════════════════════════════════════════════════════════════════════════════════
+
+class SymbolUniverse:
+    """
+    Background-refreshed symbol catalogue for Bybit and HyperLiquid.
+
+    - start() runs the refresher; without it the first lookup per exchange
+      loads the universe and later lookups refresh lazily when stale
+    - Lookups return the last good snapshot; a failed refresh keeps it
+    - Concurrent refreshes of the same kind share one upstream call
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**SYMBOL_UNIVERSE_CONFIG, **(config or {})}
+        self._symbols: Dict[str, Dict[str, SymbolInfo]] = {ex: {} for ex in EXCHANGES}
+        self._index: Dict[str, SymbolIndex] = {ex: SymbolIndex(()) for ex in EXCHANGES}
+        self._updated: Dict[str, float] = {"bybit_instruments": 0.0, "bybit_tickers": 0.0, "hyperliquid": 0.0}
+        self._failed_at: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"refreshes": 0, "errors": 0, "lookups": 0, "searches": 0}
+        self._refreshers: Dict[str, Callable[[], Any]] = {
+            "bybit_instruments": self._refresh_bybit_instruments,
+            "bybit_tickers": self._refresh_bybit_tickers,
+            "hyperliquid": self._refresh_hyperliquid,
+        }
+
+    # ── Lookup ──
+
+    async def get(self, exchange: str, symbol: str) -> Optional[SymbolInfo]:
+        """SymbolInfo for a symbol, or None if the exchange does not list it"""
+        await self.ensure_loaded(exchange)
+        self.stats["lookups"] += 1
+        return self._symbols[exchange].get(normalize_symbol(exchange, symbol))
+
+    async def filters(self, exchange: str, symbol: str) -> Optional[Dict[str, float]]:
+        """Order filters (tickSize, minPrice, minQty, qtyStep) or None"""
+        info = await self.get(exchange, symbol)
+        return info.filters() if info else None
+
+    async def is_tradeable(self, exchange: str, symbol: str) -> bool:
+        info = await self.get(exchange, symbol)
+        return bool(info and info.is_tradeable)
+
+    async def symbols(self, exchange: str, tradeable_only: bool = True) -> Set[str]:
+        """All listed symbols (bot format, e.g. BTCUSDT)"""
+        await self.ensure_loaded(exchange)
+        return {
+            info.symbol for info in self._symbols[exchange].values()
+            if info.is_tradeable or not tradeable_only
+        }
+
+    async def search(
+        self,
+        exchange: str,
+        query: Optional[str] = None,
+        limit: Optional[int] = 50,
+        quote: Optional[str] = "USDT",
+    ) -> List[SymbolInfo]:
+        """
+        Tradeable symbols matching query (exact, then prefix, then substring),
+        each group ordered by 24h volume. Without a query: top symbols by volume.
+        limit=None returns every match.
+        """
+        await self.ensure_loaded(exchange)
+        self.stats["searches"] += 1
+        entries = self._symbols[exchange]
+        q = (query or "").upper().strip()
+
+        if q:
+            index = self._index[exchange]
+            exact = {s for s in (q, normalize_symbol(exchange, q)) if s in index}
+            prefix = set(index.prefix(q)) - exact
+            contains = index.contains(q) - exact - prefix
+            groups = [exact, prefix, contains]
+        else:
+            groups = [set(entries)]
+
+        results: List[SymbolInfo] = []
+        for group in groups:
+            infos = [entries[s] for s in group if s in entries]
+            infos = [
+                i for i in infos
+                if i.is_tradeable and (quote is None or i.symbol.endswith(quote))
+            ]
+            infos.sort(key=lambda i: i.volume_24h, reverse=True)
+            results.extend(infos)
+        return results if limit is None else results[:limit]
+
+    # ── Refresh ──
+
+    def _kinds(self, exchange: str) -> List[str]:
+        return ["bybit_instruments", "bybit_tickers"] if exchange == "bybit" else ["hyperliquid"]
+
+    def _ttl(self, kind: str) -> float:
+        return self.config["instruments_ttl"] if kind == "bybit_instruments" else self.config["tickers_ttl"]
+
+    async def ensure_loaded(self, exchange: str) -> None:
+        """Load an exchange on first use; schedule a background refresh when stale"""
+        if exchange not in self._symbols:
+            raise ValueError(f"Unknown exchange: {exchange}")
+        now = time.time()
+        for kind in self._kinds(exchange):
+            if not self._updated[kind]:
+                # Cold start; after a failure, don't block every lookup on retries
+                if now - self._failed_at.get(kind, 0.0) >= self.config["tick"]:
+                    await self.refresh(kind)
+            elif now - self._updated[kind] >= self._ttl(kind) and (self._task is None or self._task.done()):
+                self._schedule(kind)
+
+    def _schedule(self, kind: str) -> asyncio.Task:
+        task = self._inflight.get(kind)
+        if task is None or task.done():
+            task = safe_create_task(self._refresh(kind), name=f"symbol_universe_{kind}")
+            self._inflight[kind] = task
+        return task
+
+    async def refresh(self, kind: str) -> None:
+        """Refresh one source (joins an in-flight refresh if there is one)"""
+        await asyncio.shield(self._schedule(kind))
+
+    async def _refresh(self, kind: str) -> None:
+        try:
+            await self._refreshers[kind]()
+        except Exception as e:
+            self._failed_at[kind] = time.time()
+            self.stats["errors"] += 1
+            logger.warning(f"Symbol universe refresh failed ({kind}): {e}")
+            return
+        self._updated[kind] = time.time()
+        self.stats["refreshes"] += 1
+
+    async def _refresh_bybit_instruments(self) -> None:
+        instruments = await self._fetch_bybit_instruments()
+        tickers = {s: i for s, i in self._symbols["bybit"].items()}
+        fresh = {}
+        for inst in instruments:
+            info = parse_bybit_instrument(inst)
+            if not info.symbol:
+                continue
+            old = tickers.get(info.symbol)
+            if old is not None:
+                # Keep the latest ticker until the next tickers refresh
+                for name in ("price", "change_24h", "high_24h", "low_24h", "volume_24h", "funding_rate", "open_interest"):
+                    setattr(info, name, getattr(old, name))
+            fresh[info.symbol] = info
+        self._publish("bybit", fresh)
+
+    async def _refresh_bybit_tickers(self) -> None:
+        if not self._updated["bybit_instruments"]:
+            await self.refresh("bybit_instruments")
+        entries = self._symbols["bybit"]
+        for ticker in await self._fetch_bybit_tickers():
+            info = entries.get(ticker.get("symbol", ""))
+            if info is not None:
+                apply_bybit_ticker(info, ticker)
+
+    async def _refresh_hyperliquid(self) -> None:
+        meta, ctxs = await self._fetch_hyperliquid()
+        # Keyed upper-case for lookups; SymbolInfo.symbol keeps HL casing (kPEPEUSDT)
+        self._publish("hyperliquid", {i.symbol.upper(): i for i in parse_hyperliquid(meta, ctxs)})
+
+    def _publish(self, exchange: str, entries: Dict[str, SymbolInfo]) -> None:
+        """Swap in a new snapshot; rebuild the index only when the symbol set changed"""
+        if set(entries) != set(self._symbols[exchange]):
+            self._index[exchange] = SymbolIndex(entries)
+        self._symbols[exchange] = entries
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            for kind, updated in self._updated.items():
+                if now - updated >= self._ttl(kind):
+                    self._schedule(kind)
+            await asyncio.sleep(self.config["tick"])
+
+    async def start(self):
+        """Start the background refresher (first pass loads every exchange)"""
+        if self._task is None or self._task.done():
+            self._task = safe_create_task(self._run(), name="symbol_universe_refresher")
+
+    async def stop(self):
+        tasks = [t for t in [self._task, *self._inflight.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._inflight.clear()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ── Upstream ──
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config["request_timeout"])
+            )
+        return self._session
+
+    async def _fetch_bybit_instruments(self) -> List[Dict[str, Any]]:
+        """All linear instruments (paginated, 1000 per page)"""
+        session = self._get_session()
+        instruments: List[Dict[str, Any]] = []
+        cursor = ""
+        while True:
+            params = {"category": "linear", "limit": "1000"}
+            if cursor:
+                params["cursor"] = cursor
+            async with session.get(f"{BYBIT_API_URL}/v5/market/instruments-info", params=params) as resp:
+                data = await resp.json(content_type=None)
+            if data.get("retCode") != 0:
+                raise RuntimeError(data.get("retMsg") or "instruments-info failed")
+            result = data.get("result", {})
+            instruments.extend(result.get("list", []))
+            cursor = result.get("nextPageCursor") or ""
+            if not cursor:
+                return instruments
+
+    async def _fetch_bybit_tickers(self) -> List[Dict[str, Any]]:
+        session = self._get_session()
+        async with session.get(f"{BYBIT_API_URL}/v5/market/tickers", params={"category": "linear"}) as resp:
+            data = await resp.json(content_type=None)
+        if data.get("retCode") != 0:
+            raise RuntimeError(data.get("retMsg") or "tickers failed")
+        return data.get("result", {}).get("list", [])
+
+    async def _fetch_hyperliquid(self) -> tuple:
+        """(meta, asset contexts) in one info call"""
+        session = self._get_session()
+        async with session.post(f"{HYPERLIQUID_API_URL}/info", json={"type": "metaAndAssetCtxs"}) as resp:
+            data = await resp.json(content_type=None)
+        if not isinstance(data, list) or len(data) < 2:
+            raise RuntimeError("Unexpected metaAndAssetCtxs response")
+        return data[0], data[1]
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        """Snapshot sizes and ages for health/metrics endpoints"""
+        now = time.time()
+        return {
+            **self.stats,
+            "symbols": {ex: len(entries) for ex, entries in self._symbols.items()},
+            "age_seconds": {k: round(now - v, 1) if v else None for k, v in self._updated.items()},
+        }
+
+
+symbol_universe = SymbolUniverse()
@@ -19,7 +19,7 @@ _logger.info("🐘 Using PostgreSQL database (FULL MIGRATION)")
 
 # Import ALL PostgreSQL functions from core module
 from core.db_postgres import (
-    get_pool, get_conn, execute, execute_one, execute_scalar, execute_write,
+    get_pool, get_conn, execute, execute_one, execute_scalar, execute_write, iter_query,
     pg_init_db,  # PostgreSQL schema initialization
     pg_get_user, pg_ensure_user, pg_set_user_field, pg_get_user_field,
     pg_get_all_users, pg_get_active_users, pg_get_allowed_users,
@@ -67,22 +67,20 @@ def _safe_json_loads(value, default=None):
 # ------------------------------------------------------------------------------------
 # In-memory caches for frequently accessed data
 # ------------------------------------------------------------------------------------
-_user_config_cache: dict[int, tuple[float, dict]] = {}  # user_id -> (timestamp, config)
+# get_user_config results live in core.config_cache (process L1 + Redis L2, pub/sub invalidation)
 _all_users_cache: tuple[float, list[int]] = (0.0, [])  # (timestamp, user_ids)
 _active_users_cache: tuple[float, list[int]] = (0.0, [])  # users with API keys
 CACHE_TTL = 30.0  # seconds
 _cache_lock = threading.RLock()  # SECURITY: Lock for thread-safe cache access
 
 def invalidate_user_cache(user_id: int = None):
-    """Invalidate cache for a user or all users."""
+    """Invalidate cache for a user or all users (in every bot/webapp process)."""
     global _all_users_cache, _active_users_cache
+    from core.config_cache import config_cache
     with _cache_lock:
-        if user_id:
-            _user_config_cache.pop(user_id, None)
-        else:
-            _user_config_cache.clear()
         _all_users_cache = (0.0, [])
         _active_users_cache = (0.0, [])
+    config_cache.invalidate(user_id or None)
 
 # --- Полезные константы/whitelist'ы -------------------------------------------------
 USER_FIELDS_WHITELIST = {
@@ -344,11 +342,13 @@ def ban_user(user_id: int):
     """Блокировка пользователя: бан + снятие одобрения."""
     ensure_user(user_id)
     execute_write("UPDATE users SET is_banned=1, is_allowed=0 WHERE user_id=%s", (user_id,))
+    invalidate_user_cache(user_id)
 
 def allow_user(user_id: int):
     """Одобрение пользователя: снимаем бан и ставим флаг допуска."""
     ensure_user(user_id)
     execute_write("UPDATE users SET is_allowed=1, is_banned=0 WHERE user_id=%s", (user_id,))
+    invalidate_user_cache(user_id)
 
 # ------------------------------------------------------------------------------------
 # Users
@@ -385,27 +385,8 @@ def set_user_credentials(user_id: int, api_key: str, api_secret: str, account_ty
     except Exception as e:
         _logger.debug(f"Could not invalidate client cache: {e}")  # Expected if core not fully loaded
 
-def get_user_credentials(user_id: int, account_type: str = None) -> tuple[str | None, str | None]:
-    """Get API credentials for specified account type.
-    
-    Args:
-        user_id: Telegram user ID
-        account_type: 'demo', 'real', or None (auto-detect from trading_mode)
-    
-    Returns:
-        Tuple of (api_key, api_secret)
-    """
-    with get_conn() as conn:
-        row = conn.execute(
-            "SELECT demo_api_key, demo_api_secret, real_api_key, real_api_secret, trading_mode FROM users WHERE user_id=?",
-            (user_id,),
-        ).fetchone()
-    
-    if not row:
-        return (None, None)
-    
-    demo_key, demo_secret, real_key, real_secret, trading_mode = row
-    
+def _select_credentials(demo_key, demo_secret, real_key, real_secret, trading_mode, account_type: str = None) -> tuple[str | None, str | None]:
+    """Pick the (key, secret) pair for account_type, or by trading_mode when None."""
     # CRITICAL FIX: Normalize 'both' mode to 'demo' since API needs specific mode
     if account_type == 'both':
         account_type = 'demo'
@@ -422,19 +403,32 @@ def get_user_credentials(user_id: int, account_type: str = None) -> tuple[str |
     else:
         return (demo_key, demo_secret)
 
-def get_all_user_credentials(user_id: int) -> dict:
-    """Get all API credentials, trading mode and exchange type for a user.
+def get_user_credentials(user_id: int, account_type: str = None) -> tuple[str | None, str | None]:
+    """Get API credentials for specified account type.
+    
+    Args:
+        user_id: Telegram user ID
+        account_type: 'demo', 'real', or None (auto-detect from trading_mode)
     
     Returns:
-        Dict with demo_api_key, demo_api_secret, real_api_key, real_api_secret, 
-        trading_mode, exchange_type, last_viewed_account, lang
+        Tuple of (api_key, api_secret)
     """
-    with get_conn() as conn:
+    from core.multitenancy_queries import track_query
+    
+    with track_query("db.get_user_credentials"), get_conn() as conn:
         row = conn.execute(
-            "SELECT demo_api_key, demo_api_secret, real_api_key, real_api_secret, trading_mode, exchange_type, last_viewed_account, lang FROM users WHERE user_id=?",
+            "SELECT demo_api_key, demo_api_secret, real_api_key, real_api_secret, trading_mode FROM users WHERE user_id=?",
             (user_id,),
         ).fetchone()
     
+    if not row:
+        return (None, None)
+    
+    return _select_credentials(*row, account_type)
+
+def _all_credentials_from_row(row) -> dict:
+    """get_all_user_credentials dict from (demo_key, demo_secret, real_key, real_secret,
+    trading_mode, exchange_type, last_viewed_account, lang) or None."""
     if not row:
         return {
             "demo_api_key": None, "demo_api_secret": None,
@@ -456,6 +450,23 @@ def get_all_user_credentials(user_id: int) -> dict:
         "lang": row[7] or "en"
     }
 
+def get_all_user_credentials(user_id: int) -> dict:
+    """Get all API credentials, trading mode and exchange type for a user.
+    
+    Returns:
+        Dict with demo_api_key, demo_api_secret, real_api_key, real_api_secret, 
+        trading_mode, exchange_type, last_viewed_account, lang
+    """
+    from core.multitenancy_queries import track_query
+    
+    with track_query("db.get_all_user_credentials"), get_conn() as conn:
+        row = conn.execute(
+            "SELECT demo_api_key, demo_api_secret, real_api_key, real_api_secret, trading_mode, exchange_type, last_viewed_account, lang FROM users WHERE user_id=?",
+            (user_id,),
+        ).fetchone()
+    
+    return _all_credentials_from_row(row)
+
 def set_trading_mode(user_id: int, mode: str):
     """Set trading mode: 'demo', 'real', or 'both'."""
     if mode not in ("demo", "real", "both"):
@@ -464,6 +475,7 @@ def set_trading_mode(user_id: int, mode: str):
     with get_conn() as conn:
         conn.execute("UPDATE users SET trading_mode=? WHERE user_id=?", (mode, user_id))
         conn.commit()
+    invalidate_user_cache(user_id)
 
 def get_trading_mode(user_id: int) -> str:
     """Get current trading mode."""
@@ -1253,163 +1265,167 @@ def get_user_lang(user_id: int) -> str:
     return get_user_field(user_id, "lang", "en")
 
 
-def get_user_config(user_id: int) -> dict:
-    # Check cache first
-    now = time.time()
-    if user_id in _user_config_cache:
-        ts, cfg = _user_config_cache[user_id]
-        if now - ts < CACHE_TTL:
-            return cfg.copy()  # Return copy to prevent mutation
-    
-    ensure_user(user_id)
-    with get_conn() as conn:
-        cols = [
-            # торговые настройки
-            "percent", "coins", "limit_enabled",
-            "trade_oi", "trade_rsi_bb", "trade_manual",
-            "tp_percent", "sl_percent",
-            "use_atr", "lang",
-            # стратегии/пороги
-            "strategies_enabled", "strategies_order",
-            "rsi_lo", "rsi_hi", "bb_touch_k",
-            "oi_min_pct", "price_min_pct", "limit_only_default",
-            # доступ/согласие
-            "is_allowed", "is_banned", "terms_accepted", "disclaimer_accepted",
-            # совместимость
-            "first_seen_ts", "last_seen_ts",
-            # exchange settings (IMPORTANT for routing!)
-            "exchange_type", "trading_mode", "live_enabled",
-        ]
-        if _col_exists(conn, "users", "trade_scryptomera"):
-            cols.append("trade_scryptomera")
-        # backward compatibility with old DB
-        elif _col_exists(conn, "users", "trade_bitkonovich"):
-            cols.append("trade_bitkonovich")
-        if _col_exists(conn, "users", "trade_scalper"):
-            cols.append("trade_scalper")
-        if _col_exists(conn, "users", "trade_elcaro"):
-            cols.append("trade_elcaro")
-        if _col_exists(conn, "users", "trade_fibonacci"):
-            cols.append("trade_fibonacci")
-        # Also check for old column name for backward compatibility
-        elif _col_exists(conn, "users", "trade_wyckoff"):
-            cols.append("trade_wyckoff")
-        # trade_manual is now in base cols list
-        if _col_exists(conn, "users", "strategy_settings"):
-            cols.append("strategy_settings")
-        if _col_exists(conn, "users", "dca_enabled"):
-            cols.append("dca_enabled")
-        if _col_exists(conn, "users", "dca_pct_1"):
-            cols.append("dca_pct_1")
-        if _col_exists(conn, "users", "dca_pct_2"):
-            cols.append("dca_pct_2")
-        # Spot trading
-        if _col_exists(conn, "users", "spot_enabled"):
-            cols.append("spot_enabled")
-        if _col_exists(conn, "users", "spot_settings"):
-            cols.append("spot_settings")
-        # Guide sent flag
-        if _col_exists(conn, "users", "guide_sent"):
-            cols.append("guide_sent")
-        # Global leverage
-        if _col_exists(conn, "users", "leverage"):
-            cols.append("leverage")
-        # Limit ladder (DCA entries)
-        if _col_exists(conn, "users", "limit_ladder_enabled"):
-            cols.append("limit_ladder_enabled")
-        if _col_exists(conn, "users", "limit_ladder_count"):
-            cols.append("limit_ladder_count")
-        if _col_exists(conn, "users", "limit_ladder_settings"):
-            cols.append("limit_ladder_settings")
-        # Global order type
-        if _col_exists(conn, "users", "global_order_type"):
-            cols.append("global_order_type")
-        # Global ATR settings
-        if _col_exists(conn, "users", "atr_periods"):
-            cols.append("atr_periods")
-        if _col_exists(conn, "users", "atr_multiplier_sl"):
-            cols.append("atr_multiplier_sl")
-        if _col_exists(conn, "users", "atr_trigger_pct"):
-            cols.append("atr_trigger_pct")
-        if _col_exists(conn, "users", "atr_step_pct"):
-            cols.append("atr_step_pct")
-        # Global direction
-        if _col_exists(conn, "users", "direction"):
-            cols.append("direction")
-        # Per-exchange settings (leverage, order_type, coins_group)
-        for _exc_col in (
-            "bybit_leverage", "hl_leverage",
-            "bybit_order_type", "hl_order_type",
-            "bybit_coins_group", "hl_coins_group",
-        ):
-            if _col_exists(conn, "users", _exc_col):
-                cols.append(_exc_col)
-        # Auto-close settings (per exchange)
-        for _ac_col in (
-            "bybit_auto_close_enabled", "bybit_auto_close_time", "bybit_auto_close_timezone",
-            "hl_auto_close_enabled", "hl_auto_close_time", "hl_auto_close_timezone",
-        ):
-            if _col_exists(conn, "users", _ac_col):
-                cols.append(_ac_col)
-
-        row = conn.execute(f"SELECT {', '.join(cols)} FROM users WHERE user_id=?",
-                           (user_id,)).fetchone()
+def _get_cached_user_config(user_id: int, shared: bool = True) -> dict | None:
+    """Copy of the cached config if still fresh (shared=False: process cache only)."""
+    from core.config_cache import config_cache
+    return config_cache.get(user_id, shared=shared)
 
-    if not row:
-        # дефолтная конфигурация
-        return {
-            "percent": 1.0,
-            "coins": "ALL",
-            "limit_enabled": False,  # Market by default
-            "trade_oi": True,
-            "trade_rsi_bb": True,
-            "tp_percent": DEFAULT_TP_PCT,
-            "sl_percent": DEFAULT_SL_PCT,
-            "use_atr": False,  # ATR trailing disabled by default
-            "lang": DEFAULT_LANG,
-            "strategies_enabled": [],
-            "strategies_order": [],
-            "rsi_lo": None,
-            "rsi_hi": None,
-            "bb_touch_k": None,
-            "oi_min_pct": None,
-            "price_min_pct": None,
-            "limit_only_default": False,
-            "is_allowed": 0,
-            "is_banned": 0,
-            "terms_accepted": 0,
-            "first_seen_ts": None,
-            "last_seen_ts": None,
-            "trade_scryptomera": 0,
-            "trade_scalper": 0,
-            "trade_elcaro": 0,
-            "trade_fibonacci": 0,
-            "trade_manual": 1,  # Manual monitoring enabled by default
-            "strategy_settings": {},
-            "dca_enabled": 0,
-            "dca_pct_1": 10.0,
-            "dca_pct_2": 25.0,
-            "spot_enabled": 0,
-            "spot_settings": {},
-            "guide_sent": 0,
-            "leverage": 10,
-            "limit_ladder_enabled": 0,
-            "limit_ladder_count": 3,
-            "limit_ladder_settings": [],
-            "global_order_type": "market",
-            "atr_periods": 7,
-            "atr_multiplier_sl": 1.0,
-            "atr_trigger_pct": 2.0,
-            "atr_step_pct": 0.5,
-            "direction": "all",
-            # Exchange settings
-            "exchange_type": "bybit",
-            "trading_mode": "demo",
-            "live_enabled": False,
-        }
 
-    data = dict(zip(cols, row))
+def _store_cached_user_config(user_id: int, cfg: dict, token=None, shared: bool = True):
+    """Cache cfg unless the user was invalidated since token (config_cache.begin_load) was taken."""
+    from core.config_cache import config_cache
+    config_cache.set(user_id, cfg, token, shared=shared)
 
+
+def _user_config_columns(has_col) -> list[str]:
+    """Columns get_user_config reads; has_col(name) tells whether the users table has an optional column."""
+    cols = [
+        # торговые настройки
+        "percent", "coins", "limit_enabled",
+        "trade_oi", "trade_rsi_bb", "trade_manual",
+        "tp_percent", "sl_percent",
+        "use_atr", "lang",
+        # стратегии/пороги
+        "strategies_enabled", "strategies_order",
+        "rsi_lo", "rsi_hi", "bb_touch_k",
+        "oi_min_pct", "price_min_pct", "limit_only_default",
+        # доступ/согласие
+        "is_allowed", "is_banned", "terms_accepted", "disclaimer_accepted",
+        # совместимость
+        "first_seen_ts", "last_seen_ts",
+        # exchange settings (IMPORTANT for routing!)
+        "exchange_type", "trading_mode", "live_enabled",
+    ]
+    if has_col("trade_scryptomera"):
+        cols.append("trade_scryptomera")
+    # backward compatibility with old DB
+    elif has_col("trade_bitkonovich"):
+        cols.append("trade_bitkonovich")
+    if has_col("trade_scalper"):
+        cols.append("trade_scalper")
+    if has_col("trade_elcaro"):
+        cols.append("trade_elcaro")
+    if has_col("trade_fibonacci"):
+        cols.append("trade_fibonacci")
+    # Also check for old column name for backward compatibility
+    elif has_col("trade_wyckoff"):
+        cols.append("trade_wyckoff")
+    # trade_manual is now in base cols list
+    if has_col("strategy_settings"):
+        cols.append("strategy_settings")
+    if has_col("dca_enabled"):
+        cols.append("dca_enabled")
+    if has_col("dca_pct_1"):
+        cols.append("dca_pct_1")
+    if has_col("dca_pct_2"):
+        cols.append("dca_pct_2")
+    # Spot trading
+    if has_col("spot_enabled"):
+        cols.append("spot_enabled")
+    if has_col("spot_settings"):
+        cols.append("spot_settings")
+    # Guide sent flag
+    if has_col("guide_sent"):
+        cols.append("guide_sent")
+    # Global leverage
+    if has_col("leverage"):
+        cols.append("leverage")
+    # Limit ladder (DCA entries)
+    if has_col("limit_ladder_enabled"):
+        cols.append("limit_ladder_enabled")
+    if has_col("limit_ladder_count"):
+        cols.append("limit_ladder_count")
+    if has_col("limit_ladder_settings"):
+        cols.append("limit_ladder_settings")
+    # Global order type
+    if has_col("global_order_type"):
+        cols.append("global_order_type")
+    # Global ATR settings
+    if has_col("atr_periods"):
+        cols.append("atr_periods")
+    if has_col("atr_multiplier_sl"):
+        cols.append("atr_multiplier_sl")
+    if has_col("atr_trigger_pct"):
+        cols.append("atr_trigger_pct")
+    if has_col("atr_step_pct"):
+        cols.append("atr_step_pct")
+    # Global direction
+    if has_col("direction"):
+        cols.append("direction")
+    # Per-exchange settings (leverage, order_type, coins_group)
+    for _exc_col in (
+        "bybit_leverage", "hl_leverage",
+        "bybit_order_type", "hl_order_type",
+        "bybit_coins_group", "hl_coins_group",
+    ):
+        if has_col(_exc_col):
+            cols.append(_exc_col)
+    # Auto-close settings (per exchange)
+    for _ac_col in (
+        "bybit_auto_close_enabled", "bybit_auto_close_time", "bybit_auto_close_timezone",
+        "hl_auto_close_enabled", "hl_auto_close_time", "hl_auto_close_timezone",
+    ):
+        if has_col(_ac_col):
+            cols.append(_ac_col)
+    return cols
+
+
+def _default_user_config() -> dict:
+    """дефолтная конфигурация (пользователь без строки в users)"""
+    return {
+        "percent": 1.0,
+        "coins": "ALL",
+        "limit_enabled": False,  # Market by default
+        "trade_oi": True,
+        "trade_rsi_bb": True,
+        "tp_percent": DEFAULT_TP_PCT,
+        "sl_percent": DEFAULT_SL_PCT,
+        "use_atr": False,  # ATR trailing disabled by default
+        "lang": DEFAULT_LANG,
+        "strategies_enabled": [],
+        "strategies_order": [],
+        "rsi_lo": None,
+        "rsi_hi": None,
+        "bb_touch_k": None,
+        "oi_min_pct": None,
+        "price_min_pct": None,
+        "limit_only_default": False,
+        "is_allowed": 0,
+        "is_banned": 0,
+        "terms_accepted": 0,
+        "first_seen_ts": None,
+        "last_seen_ts": None,
+        "trade_scryptomera": 0,
+        "trade_scalper": 0,
+        "trade_elcaro": 0,
+        "trade_fibonacci": 0,
+        "trade_manual": 1,  # Manual monitoring enabled by default
+        "strategy_settings": {},
+        "dca_enabled": 0,
+        "dca_pct_1": 10.0,
+        "dca_pct_2": 25.0,
+        "spot_enabled": 0,
+        "spot_settings": {},
+        "guide_sent": 0,
+        "leverage": 10,
+        "limit_ladder_enabled": 0,
+        "limit_ladder_count": 3,
+        "limit_ladder_settings": [],
+        "global_order_type": "market",
+        "atr_periods": 7,
+        "atr_multiplier_sl": 1.0,
+        "atr_trigger_pct": 2.0,
+        "atr_step_pct": 0.5,
+        "direction": "all",
+        # Exchange settings
+        "exchange_type": "bybit",
+        "trading_mode": "demo",
+        "live_enabled": False,
+    }
+
+
+def _build_user_config(data: dict) -> dict:
+    """User config dict from a users row mapping {column: value}."""
     def parse_csv(s: str | None) -> list[str]:
         return [x for x in (s or "").split(",") if x]
 
@@ -1515,8 +1531,32 @@ def get_user_config(user_id: int) -> dict:
         "bybit_coins_group": data.get("bybit_coins_group") or None,
         "hl_coins_group": data.get("hl_coins_group") or None,
     }
+    return cfg
+
+
+def get_user_config(user_id: int) -> dict:
+    # Check cache first
+    cached = _get_cached_user_config(user_id)
+    if cached is not None:
+        return cached
+    
+    from core.multitenancy_queries import track_query
+    from core.config_cache import config_cache
+    
+    token = config_cache.begin_load(user_id)
+    with track_query("db.get_user_config"):
+        ensure_user(user_id)
+        with get_conn() as conn:
+            cols = _user_config_columns(lambda col: _col_exists(conn, "users", col))
+            row = conn.execute(f"SELECT {', '.join(cols)} FROM users WHERE user_id=?",
+                               (user_id,)).fetchone()
+
+    if not row:
+        return _default_user_config()
+
+    cfg = _build_user_config(dict(zip(cols, row)))
     # Store in cache
-    _user_config_cache[user_id] = (time.time(), cfg)
+    _store_cached_user_config(user_id, cfg, token)
     return cfg
 
 
@@ -1785,7 +1825,9 @@ def set_strategy_setting_db(user_id: int, strategy: str, field: str, value,
     For smart fallback logic use set_strategy_setting() wrapper.
     """
     # Call the PostgreSQL function directly (NOT the wrapper to avoid recursion!)
-    return pg_set_strategy_setting(user_id, strategy, field, value, exchange, account_type)
+    result = pg_set_strategy_setting(user_id, strategy, field, value, exchange, account_type)
+    invalidate_user_cache(user_id)
+    return result
 
 
 def set_strategy_settings_db(user_id: int, strategy: str, settings: dict,
@@ -1944,7 +1986,10 @@ def set_strategy_setting(user_id: int, strategy: str, field: str, value,
     if exchange is None:
         exchange = get_exchange_type(user_id) or "bybit"
     
-    return pg_set_strategy_setting(user_id, strategy, field, value, exchange)
+    result = pg_set_strategy_setting(user_id, strategy, field, value, exchange)
+    # Push the change to other processes' per-user caches
+    invalidate_user_cache(user_id)
+    return result
 
 
 def get_effective_settings(user_id: int, strategy: str, exchange: str = None, 
@@ -2538,6 +2583,47 @@ def add_active_position(
         conn.commit()
 
 
+def _position_from_row(r) -> dict:
+    """Строка active_positions (порядок колонок get_active_positions) -> dict."""
+    return {
+        "symbol": r[0],
+        "side": r[1],
+        "entry_price": r[2],
+        "size": r[3],
+        "open_ts": r[4],
+        "timeframe": r[5],
+        "signal_id": r[6],
+        "dca_10_done": bool(r[7]),
+        "dca_25_done": bool(r[8]),
+        "strategy": r[9],
+        "account_type": r[10] or "demo",
+        # New fields
+        "source": r[11] or "bot",
+        "opened_by": r[12] or "bot",
+        "exchange": r[13] or "bybit",
+        "sl_price": r[14],
+        "tp_price": r[15],
+        "manual_sltp_override": bool(r[16]) if r[16] else False,
+        "manual_sltp_ts": r[17],
+        # ATR state (P0.4)
+        "atr_activated": bool(r[18]) if r[18] else False,
+        "atr_activation_price": r[19],
+        "atr_last_stop_price": r[20],
+        "atr_last_update_ts": r[21],
+        # Other
+        "leverage": r[22],
+        "client_order_id": r[23],
+        "exchange_order_id": r[24],
+        # Unified env
+        "env": r[25] or _normalize_env(r[10] or "demo"),
+        # P0.5: ATR enabled flag
+        "use_atr": bool(r[26]) if len(r) > 26 else False,
+        # Applied SL/TP percentages at open time (Fix #2)
+        "applied_sl_pct": r[27] if len(r) > 27 else None,
+        "applied_tp_pct": r[28] if len(r) > 28 else None,
+    }
+
+
 def get_active_positions(user_id: int, account_type: str | None = None, exchange: str | None = None, env: str | None = None) -> list[dict]:
     """
     Получает активные позиции пользователя.
@@ -2549,7 +2635,9 @@ def get_active_positions(user_id: int, account_type: str | None = None, exchange
     # Normalize 'both' -> 'demo' or 'testnet' based on exchange
     account_type = _normalize_both_account_type(account_type, exchange=exchange or 'bybit')
     
-    with get_conn() as conn:
+    from core.multitenancy_queries import track_query
+    
+    with track_query("db.get_active_positions"), get_conn() as conn:
         # Build query based on filters
         base_query = """
             SELECT symbol, side, entry_price, size, open_ts, timeframe, signal_id, 
@@ -2577,47 +2665,8 @@ def get_active_positions(user_id: int, account_type: str | None = None, exchange
             params.append(env)
         
         rows = conn.execute(base_query, params).fetchall()
-        
-        return [
-            {
-                "symbol": r[0],
-                "side": r[1],
-                "entry_price": r[2],
-                "size": r[3],
-                "open_ts": r[4],
-                "timeframe": r[5],
-                "signal_id": r[6],
-                "dca_10_done": bool(r[7]),
-                "dca_25_done": bool(r[8]),
-                "strategy": r[9],
-                "account_type": r[10] or "demo",
-                # New fields
-                "source": r[11] or "bot",
-                "opened_by": r[12] or "bot",
-                "exchange": r[13] or "bybit",
-                "sl_price": r[14],
-                "tp_price": r[15],
-                "manual_sltp_override": bool(r[16]) if r[16] else False,
-                "manual_sltp_ts": r[17],
-                # ATR state (P0.4)
-                "atr_activated": bool(r[18]) if r[18] else False,
-                "atr_activation_price": r[19],
-                "atr_last_stop_price": r[20],
-                "atr_last_update_ts": r[21],
-                # Other
-                "leverage": r[22],
-                "client_order_id": r[23],
-                "exchange_order_id": r[24],
-                # Unified env
-                "env": r[25] or _normalize_env(r[10] or "demo"),
-                # P0.5: ATR enabled flag
-                "use_atr": bool(r[26]) if len(r) > 26 else False,
-                # Applied SL/TP percentages at open time (Fix #2)
-                "applied_sl_pct": r[27] if len(r) > 27 else None,
-                "applied_tp_pct": r[28] if len(r) > 28 else None,
-            }
-            for r in rows
-        ]
+    
+    return [_position_from_row(r) for r in rows]
 
 
 def remove_active_position(user_id: int, symbol: str, account_type: str | None = None, entry_price: float | None = None, entry_price_tolerance: float = 0.001, exchange: str = "bybit"):
@@ -3308,6 +3357,24 @@ def add_pending_limit_order(
         )
         conn.commit()
 
+def _pending_order_from_dict(d: dict) -> dict:
+    """Нормализует строку pending_limit_orders (отсутствующие колонки — дефолты)."""
+    tif = d.get("time_in_force", "GTC")
+    qty, price = d.get("qty"), d.get("price")
+    signal_id, created_ts = d.get("signal_id"), d.get("created_ts")
+    return {
+        "order_id": str(d["order_id"]),
+        "symbol": str(d["symbol"]),
+        "side": str(d["side"]),
+        "qty": float(qty) if qty is not None else 0.0,
+        "price": float(price) if price is not None else 0.0,
+        "signal_id": int(signal_id) if signal_id is not None else 0,
+        "created_ts": int(created_ts) if created_ts is not None else 0,
+        "time_in_force": str(tif) if tif is not None else "GTC",
+        "strategy": d.get("strategy"),
+        "account_type": d.get("account_type") or "demo",
+    }
+
 def get_pending_limit_orders(user_id: int, exchange: str = "bybit") -> list[dict]:
     """
     Возвращает список отложенных лимитных ордеров пользователя для указанной биржи,
@@ -3318,86 +3385,29 @@ def get_pending_limit_orders(user_id: int, exchange: str = "bybit") -> list[dict
         user_id: ID пользователя
         exchange: Биржа ('bybit' или 'hyperliquid')
     """
-    with get_conn() as conn:
+    from core.multitenancy_queries import track_query
+    
+    with track_query("db.get_pending_limit_orders"), get_conn() as conn:
         # На всякий случай держим совместимость со старыми схемами
-        has_tif = _col_exists(conn, "pending_limit_orders", "time_in_force")
-        has_strategy = _col_exists(conn, "pending_limit_orders", "strategy")
-        has_account_type = _col_exists(conn, "pending_limit_orders", "account_type")
-
-        if has_tif and has_strategy and has_account_type:
-            rows = conn.execute(
-                """
-                SELECT order_id, symbol, side, qty, price, signal_id, created_ts, time_in_force, strategy, account_type
-                  FROM pending_limit_orders
-                 WHERE user_id=? AND exchange=?
-                 ORDER BY created_ts DESC
-                """,
-                (user_id, exchange),
-            ).fetchall()
-        elif has_tif and has_strategy:
-            rows = conn.execute(
-                """
-                SELECT order_id, symbol, side, qty, price, signal_id, created_ts, time_in_force, strategy
-                  FROM pending_limit_orders
-                 WHERE user_id=? AND exchange=?
-                 ORDER BY created_ts DESC
-                """,
-                (user_id, exchange),
-            ).fetchall()
-        elif has_tif:
-            rows = conn.execute(
-                """
-                SELECT order_id, symbol, side, qty, price, signal_id, created_ts, time_in_force
-                  FROM pending_limit_orders
-                 WHERE user_id=? AND exchange=?
-                 ORDER BY created_ts DESC
-                """,
-                (user_id, exchange),
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                """
-                SELECT order_id, symbol, side, qty, price, signal_id, created_ts
-                  FROM pending_limit_orders
-                 WHERE user_id=? AND exchange=?
-                 ORDER BY created_ts DESC
-                """,
-                (user_id, exchange),
-            ).fetchall()
-
-    result: list[dict] = []
-    for r in rows:
-        # распаковка с учётом наличия колонок
-        if has_tif and has_strategy and has_account_type:
-            order_id, symbol, side, qty, price, signal_id, created_ts, tif, strategy, account_type = r
-        elif has_tif and has_strategy:
-            order_id, symbol, side, qty, price, signal_id, created_ts, tif, strategy = r
-            account_type = "demo"
-        elif has_tif:
-            order_id, symbol, side, qty, price, signal_id, created_ts, tif = r
-            strategy = None
-            account_type = "demo"
-        else:
-            order_id, symbol, side, qty, price, signal_id, created_ts = r
-            tif = "GTC"
-            strategy = None
-            account_type = "demo"
+        cols = ["order_id", "symbol", "side", "qty", "price", "signal_id", "created_ts"]
+        if _col_exists(conn, "pending_limit_orders", "time_in_force"):
+            cols.append("time_in_force")
+            if _col_exists(conn, "pending_limit_orders", "strategy"):
+                cols.append("strategy")
+                if _col_exists(conn, "pending_limit_orders", "account_type"):
+                    cols.append("account_type")
 
-        result.append(
-            {
-                "order_id": str(order_id),
-                "symbol": str(symbol),
-                "side": str(side),
-                "qty": float(qty) if qty is not None else 0.0,
-                "price": float(price) if price is not None else 0.0,
-                "signal_id": int(signal_id) if signal_id is not None else 0,
-                "created_ts": int(created_ts) if created_ts is not None else 0,
-                "time_in_force": str(tif) if tif is not None else "GTC",
-                "strategy": strategy,
-                "account_type": account_type or "demo",
-            }
-        )
-    return result
+        rows = conn.execute(
+            f"""
+            SELECT {', '.join(cols)}
+              FROM pending_limit_orders
+             WHERE user_id=? AND exchange=?
+             ORDER BY created_ts DESC
+            """,
+            (user_id, exchange),
+        ).fetchall()
+
+    return [_pending_order_from_dict(dict(zip(cols, r))) for r in rows]
 
 def remove_pending_limit_order(user_id: int, order_id: str, exchange: str = "bybit"):
     with get_conn() as conn:
@@ -3746,6 +3756,88 @@ def get_trade_stats(user_id: int, strategy: str | None = None, period: str = "al
         return result
 
 
+def _trade_logs_where(user_id: int, strategy: Optional[str] = None,
+                      account_type: Optional[str] = None, exchange: Optional[str] = None,
+                      period: str = "all", since=None, until=None) -> tuple[str, list]:
+    """
+    Build WHERE clause + params for trade_logs list queries.
+    
+    Shared by get_trade_logs_list / get_trade_logs_page / iter_trade_logs so
+    offset, keyset and streaming reads always see the same rows.
+    """
+    import datetime
+    from zoneinfo import ZoneInfo
+    
+    # Normalize 'both' -> 'demo'/'testnet' based on exchange
+    account_type = _normalize_both_account_type(account_type, exchange=exchange or 'bybit')
+    
+    where_clauses = ["user_id = ?"]
+    params = [user_id]
+    
+    if strategy:
+        if strategy == "manual_all":
+            # Special case: include both manual and unknown strategies
+            where_clauses.append("(strategy IS NULL OR strategy IN ('unknown', 'manual'))")
+        else:
+            where_clauses.append("strategy = ?")
+            params.append(strategy)
+    
+    # Plain equality so idx_logs_keyset(user_id, exchange, account_type, ts, id)
+    # serves the query - trade_logs has no NULLs here (migration 031 + trigger)
+    if account_type:
+        where_clauses.append("account_type = ?")
+        params.append(account_type)
+        
+    # Exchange filter
+    if exchange and _col_exists_pg("trade_logs", "exchange"):
+        where_clauses.append("exchange = ?")
+        params.append(exchange)
+    
+    # Period filter (rolling windows, same as get_trade_stats)
+    current_time = datetime.datetime.now(ZoneInfo("UTC"))
+    period_days = {"today": 1, "week": 7, "month": 30}.get(period)
+    if period_days:
+        start = current_time - datetime.timedelta(days=period_days)
+        where_clauses.append("ts >= ?")
+        params.append(start.strftime("%Y-%m-%d %H:%M:%S"))
+    
+    # Explicit range
+    if since is not None:
+        where_clauses.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        where_clauses.append("ts <= ?")
+        params.append(until)
+    
+    return " AND ".join(where_clauses), params
+
+
+_TRADE_LOG_LIST_COLUMNS = """id, signal_id, symbol, side, entry_price, exit_price, 
+                   exit_reason, pnl, pnl_pct, strategy, account_type, ts, exchange"""
+
+
+def _trade_log_list_row(row) -> dict:
+    """Row (tuple or dict) with _TRADE_LOG_LIST_COLUMNS -> API trade dict"""
+    if isinstance(row, dict):
+        row = [row[k] for k in ("id", "signal_id", "symbol", "side", "entry_price", "exit_price",
+                                "exit_reason", "pnl", "pnl_pct", "strategy", "account_type", "ts", "exchange")]
+    return {
+        "id": row[0],
+        "signal_id": row[1],
+        "symbol": row[2],
+        "side": row[3],
+        "entry_price": row[4],
+        "exit_price": row[5],
+        "exit_reason": row[6],
+        "pnl": row[7],
+        "pnl_percent": row[8],
+        "strategy": row[9] or "unknown",
+        "account_type": row[10] or "demo",
+        "time": row[11],
+        "exchange": row[12] or "bybit",
+    }
+
+
 def get_trade_logs_list(user_id: int, limit: int = 500, strategy: Optional[str] = None, 
                         account_type: Optional[str] = None, exchange: Optional[str] = None,
                         period: str = "all", offset: int = 0,
@@ -3753,6 +3845,9 @@ def get_trade_logs_list(user_id: int, limit: int = 500, strategy: Optional[str]
     """
     Get list of trade logs for a user with period filtering and pagination.
     
+    For deep pagination use get_trade_logs_page (keyset), for full history
+    use iter_trade_logs (streaming) - OFFSET scans every skipped row.
+    
     Args:
         user_id: Telegram user ID
         limit: Max records to return
@@ -3766,50 +3861,9 @@ def get_trade_logs_list(user_id: int, limit: int = 500, strategy: Optional[str]
     Returns:
         List of trade dicts, or (list, total_count) tuple if return_count=True
     """
-    import datetime
-    from zoneinfo import ZoneInfo
-    
-    # Normalize 'both' -> 'demo'/'testnet' based on exchange
-    account_type = _normalize_both_account_type(account_type, exchange=exchange or 'bybit')
+    where_sql, params = _trade_logs_where(user_id, strategy, account_type, exchange, period)
     
     with get_conn() as conn:
-        where_clauses = ["user_id = ?"]
-        params = [user_id]
-        
-        if strategy:
-            if strategy == "manual_all":
-                # Special case: include both manual and unknown strategies
-                where_clauses.append("(strategy IS NULL OR strategy IN ('unknown', 'manual'))")
-            else:
-                where_clauses.append("strategy = ?")
-                params.append(strategy)
-        
-        if account_type:
-            where_clauses.append("(account_type = ? OR account_type IS NULL)")
-            params.append(account_type)
-            
-        # Exchange filter
-        if exchange and _col_exists(conn, "trade_logs", "exchange"):
-            where_clauses.append("(exchange = ? OR exchange IS NULL)")
-            params.append(exchange)
-        
-        # Period filter (rolling windows, same as get_trade_stats)
-        current_time = datetime.datetime.now(ZoneInfo("UTC"))
-        if period == "today":
-            start = current_time - datetime.timedelta(hours=24)
-            where_clauses.append("ts >= ?")
-            params.append(start.strftime("%Y-%m-%d %H:%M:%S"))
-        elif period == "week":
-            start = current_time - datetime.timedelta(days=7)
-            where_clauses.append("ts >= ?")
-            params.append(start.strftime("%Y-%m-%d %H:%M:%S"))
-        elif period == "month":
-            start = current_time - datetime.timedelta(days=30)
-            where_clauses.append("ts >= ?")
-            params.append(start.strftime("%Y-%m-%d %H:%M:%S"))
-        
-        where_sql = " AND ".join(where_clauses)
-        
         # Get total count if requested
         total_count = 0
         if return_count:
@@ -3821,38 +3875,97 @@ def get_trade_logs_list(user_id: int, limit: int = 500, strategy: Optional[str]
         # Get paginated results
         query_params = list(params) + [limit, offset]
         cur = conn.execute(f"""
-            SELECT id, signal_id, symbol, side, entry_price, exit_price, 
-                   exit_reason, pnl, pnl_pct, strategy, account_type, ts, exchange
+            SELECT {_TRADE_LOG_LIST_COLUMNS}
             FROM trade_logs
             WHERE {where_sql}
-            ORDER BY ts DESC
+            ORDER BY ts DESC, id DESC
             LIMIT ? OFFSET ?
         """, query_params)
         
-        rows = cur.fetchall()
-        result = []
-        for row in rows:
-            result.append({
-                "id": row[0],
-                "signal_id": row[1],
-                "symbol": row[2],
-                "side": row[3],
-                "entry_price": row[4],
-                "exit_price": row[5],
-                "exit_reason": row[6],
-                "pnl": row[7],
-                "pnl_percent": row[8],
-                "strategy": row[9] or "unknown",
-                "account_type": row[10] or "demo",
-                "time": row[11],
-                "exchange": row[12] or "bybit",
-            })
+        result = [_trade_log_list_row(row) for row in cur.fetchall()]
         
         if return_count:
             return result, total_count
         return result
 
 
+def encode_trade_cursor(ts, trade_id: int) -> str:
+    """Opaque keyset cursor for (ts, id)"""
+    import base64
+    ts_str = ts.isoformat() if hasattr(ts, "isoformat") else str(ts)
+    return base64.urlsafe_b64encode(f"{ts_str}|{trade_id}".encode()).decode().rstrip("=")
+
+
+def decode_trade_cursor(cursor: str) -> tuple:
+    """Inverse of encode_trade_cursor. Raises ValueError on a malformed cursor."""
+    import base64
+    import datetime
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts_str, trade_id = raw.rsplit("|", 1)
+        return datetime.datetime.fromisoformat(ts_str), int(trade_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_trade_logs_page(user_id: int, limit: int = 100, cursor: Optional[str] = None,
+                        strategy: Optional[str] = None, account_type: Optional[str] = None,
+                        exchange: Optional[str] = None, period: str = "all") -> tuple[list, Optional[str]]:
+    """
+    Keyset-paginated trade logs, newest first.
+    
+    Pages are positioned by (ts, id) of the last row instead of OFFSET, so
+    page N costs the same as page 1 (served by idx_logs_keyset).
+    
+    Returns:
+        (trades, next_cursor) - next_cursor is None on the last page
+    """
+    where_sql, params = _trade_logs_where(user_id, strategy, account_type, exchange, period)
+    if cursor:
+        after_ts, after_id = decode_trade_cursor(cursor)
+        where_sql += " AND (ts, id) < (?, ?)"
+        params += [after_ts, after_id]
+    
+    with get_conn() as conn:
+        rows = conn.execute(f"""
+            SELECT {_TRADE_LOG_LIST_COLUMNS}
+            FROM trade_logs
+            WHERE {where_sql}
+            ORDER BY ts DESC, id DESC
+            LIMIT ?
+        """, params + [limit + 1]).fetchall()
+    
+    trades = [_trade_log_list_row(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and trades:
+        next_cursor = encode_trade_cursor(trades[-1]["time"], trades[-1]["id"])
+    return trades, next_cursor
+
+
+def iter_trade_logs(user_id: int, strategy: Optional[str] = None,
+                    account_type: Optional[str] = None, exchange: Optional[str] = None,
+                    period: str = "all", since=None, until=None,
+                    ascending: bool = False, batch_size: int = 1000):
+    """
+    Stream all matching trade logs through a server-side cursor.
+    
+    Constant memory for any history size - use for exports and
+    aggregations instead of get_trade_logs_list(limit=...).
+    """
+    where_sql, params = _trade_logs_where(
+        user_id, strategy, account_type, exchange, period, since=since, until=until
+    )
+    order = "ASC" if ascending else "DESC"
+    rows = iter_query(f"""
+        SELECT {_TRADE_LOG_LIST_COLUMNS}
+        FROM trade_logs
+        WHERE {where_sql}
+        ORDER BY ts {order}, id {order}
+    """, tuple(params), batch_size=batch_size)
+    for row in rows:
+        yield _trade_log_list_row(row)
+
+
 def get_rolling_24h_pnl(user_id: int, account_type: str | None = None, exchange: str | None = None) -> float:
     """
     Get realized PnL for the last 24 hours (rolling window) from trade_logs.
@@ -5409,6 +5522,16 @@ def set_hl_credentials(user_id: int, creds: dict = None, private_key: str = None
             """, (private_key, wallet_address, vault_address, private_key, wallet_address, user_id))
         conn.commit()
     invalidate_user_cache(user_id)
+    _invalidate_hl_adapters(user_id)
+
+
+def _invalidate_hl_adapters(user_id: int):
+    """Drop pooled HL adapters for a user after their keys change"""
+    try:
+        from core.hl_adapter_pool import hl_adapter_pool
+        hl_adapter_pool.invalidate_user(user_id)
+    except Exception as e:
+        _logger.debug(f"Could not invalidate HL adapter pool: {e}")
 
 
 def get_hl_credentials(user_id: int, account_type: str = None) -> dict:
@@ -5500,6 +5623,7 @@ def set_exchange_type(user_id: int, exchange_type: str):
             (exchange_type, user_id)
         )
         conn.commit()
+    invalidate_user_cache(user_id)
 
 
 def is_hl_enabled(user_id: int) -> bool:
@@ -5606,6 +5730,7 @@ def clear_hl_credentials(user_id: int, account_type: str = None):
             """, (user_id,))
         conn.commit()
     invalidate_user_cache(user_id)
+    _invalidate_hl_adapters(user_id)
 
 
 # =====================================
@@ -5636,6 +5761,7 @@ def set_exchange_mode(user_id: int, mode: str):
             (mode, user_id)
         )
         conn.commit()
+    invalidate_user_cache(user_id)
 
 
 def get_exchange_status(user_id: int) -> dict:
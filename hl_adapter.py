@@ -5,6 +5,8 @@ import logging
 import time
 from typing import Dict, Any, Optional, List, Tuple
 
+import aiohttp
+
 from hyperliquid import HyperLiquidClient, HyperLiquidError, coin_to_asset_id
 from models import Position, Order, Balance, OrderResult, OrderSide, PositionSide
 
@@ -67,7 +69,7 @@ def _safe_float(val, default=0.0):
 
 
 class HLAdapter:
-    def __init__(self, private_key: str, testnet: bool = False, vault_address: Optional[str] = None, main_wallet_address: Optional[str] = None):
+    def __init__(self, private_key: str, testnet: bool = False, vault_address: Optional[str] = None, main_wallet_address: Optional[str] = None, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize HLAdapter.
         
@@ -77,11 +79,14 @@ class HLAdapter:
             vault_address: Vault address for trading on behalf of another wallet (auto-discovered if agent)
             main_wallet_address: Main wallet address for balance queries (auto-discovered if agent)
                                  If not set and wallet is an agent, will be auto-discovered
+            session: Shared aiohttp session (not closed by the adapter)
         """
-        self._client = HyperLiquidClient(private_key=private_key, testnet=testnet, vault_address=vault_address)
+        self._client = HyperLiquidClient(private_key=private_key, testnet=testnet, vault_address=vault_address, session=session)
         self._main_wallet_address = main_wallet_address
         self._initialized = False
         self._agent_checked = False
+        # Set by core.hl_adapter_pool - close() is then a no-op and the pool owns the lifetime
+        self._pool_owned = False
 
     @property
     def address(self) -> str:
@@ -97,9 +102,9 @@ class HLAdapter:
         return self._client.is_testnet
 
     async def initialize(self):
-        if not self._initialized:
-            await self._client.initialize()
-            self._initialized = True
+        # Cheap when warm; refreshes the session and the shared asset meta table when stale
+        await self._client.initialize()
+        self._initialized = True
         
         # Auto-discover main wallet if not set and not checked yet
         if not self._agent_checked and self._main_wallet_address is None:
@@ -110,6 +115,8 @@ class HLAdapter:
                 logger.info(f"[HLAdapter] Auto-discovered main wallet: {discovered}")
 
     async def close(self):
+        if self._pool_owned:
+            return
         if self._client:
             try:
                 await self._client.close()
@@ -910,6 +917,56 @@ class HLAdapter:
             logger.error(f"close_position error: {e}")
             return {"retCode": 1, "retMsg": str(e), "result": {}}
 
+    async def close_positions(self, positions: List[Dict[str, Any]], slippage: float = 0.01) -> Dict[str, Any]:
+        """
+        Close several positions with one multi-order action.
+
+        Args:
+            positions: Entries shaped like fetch_positions() items - symbol,
+                       side (position side), size and optional markPrice used
+                       as the reference price for the IOC limit
+            slippage: Slippage tolerance (default 1%)
+
+        Returns:
+            Bybit-like response; result.list has one entry per position with
+            symbol, orderId, avgPrice, cumExecQty and error ("" on success)
+        """
+        await self.initialize()
+        if not positions:
+            return {"retCode": 0, "retMsg": "OK", "result": {"list": []}}
+
+        closes = []
+        for p in positions:
+            size = _safe_float(p.get("size"))
+            closes.append({
+                "coin": self._normalize_symbol(p.get("symbol", "")),
+                "szi": size if p.get("side", "Buy") == "Buy" else -size,
+                "px": _safe_float(p.get("markPrice")) or None,
+            })
+
+        try:
+            result = await self._client.bulk_market_close(closes, slippage=slippage)
+        except HyperLiquidError as e:
+            logger.error(f"close_positions error: {e}")
+            return {"retCode": 1, "retMsg": str(e), "result": {"list": []}}
+
+        if result.get("status") != "ok":
+            return {"retCode": 1, "retMsg": str(result), "result": {"list": []}}
+
+        statuses = result.get("response", {}).get("data", {}).get("statuses", [])
+        result_list = []
+        for p, status in zip(positions, statuses + [{}] * (len(positions) - len(statuses))):
+            item = {"symbol": p.get("symbol", ""), "orderId": "", "avgPrice": "0", "cumExecQty": "0", "error": ""}
+            if "filled" in status:
+                filled = status["filled"]
+                item.update(orderId=str(filled.get("oid", "")), avgPrice=str(filled.get("avgPx", 0)), cumExecQty=str(filled.get("totalSz", 0)))
+            elif "resting" in status:
+                item["orderId"] = str(status["resting"].get("oid", ""))
+            else:
+                item["error"] = str(status.get("error") or "No order status returned")
+            result_list.append(item)
+        return {"retCode": 0, "retMsg": "OK", "result": {"list": result_list}}
+
     async def get_price(self, symbol: str) -> Optional[float]:
         await self.initialize()
         coin = self._normalize_symbol(symbol)
@@ -1450,6 +1507,43 @@ class HLAdapter:
             logger.error(f"get_spot_ticker error: {e}")
             return {"success": False, "error": str(e)}
 
+    async def get_spot_tickers(self) -> Dict[str, Any]:
+        """
+        Get spot tickers for every token in one request.
+
+        Returns:
+            Dict with success and tickers {token: {mid_price, mark_price,
+            prev_day_price, day_volume}} (same fields as get_spot_ticker)
+        """
+        await self.initialize()
+        try:
+            spot_data = await self._client.spot_meta_and_asset_contexts()
+            if len(spot_data) < 2:
+                return {"success": False, "error": "Empty spot meta"}
+
+            spot_meta, spot_ctxs = spot_data[0], spot_data[1]
+            tokens = spot_meta.get("tokens", [])
+            tickers = {}
+            for idx, pair in enumerate(spot_meta.get("universe", [])):
+                token_indices = pair.get("tokens", [])
+                base_idx = token_indices[0] if token_indices else None
+                if base_idx is None or base_idx >= len(tokens) or idx >= len(spot_ctxs):
+                    continue
+                name = tokens[base_idx].get("name")
+                if not name or name in tickers:
+                    continue
+                ctx = spot_ctxs[idx]
+                tickers[name] = {
+                    "mid_price": _safe_float(ctx.get("midPx")),
+                    "mark_price": _safe_float(ctx.get("markPx")),
+                    "day_volume": _safe_float(ctx.get("dayNtlVlm")),
+                    "prev_day_price": _safe_float(ctx.get("prevDayPx")),
+                }
+            return {"success": True, "tickers": tickers}
+        except Exception as e:
+            logger.error(f"get_spot_tickers error: {e}")
+            return {"success": False, "error": str(e)}
+
     async def get_spot_markets(self) -> List[Dict[str, Any]]:
         """
         Get list of available spot markets.
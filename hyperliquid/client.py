@@ -21,6 +21,11 @@ from .signer import (
     get_address_from_private_key, sign_usd_class_transfer_action,
 )
 
+try:
+    from core.metrics import metrics as _metrics
+except ImportError:  # package used outside the bot tree
+    _metrics = None
+
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,16 @@ async def _hl_rate_limit():
         _hl_last_request_time = time.time()
 
 
+def _endpoint_label(endpoint: str, data: Optional[Dict]) -> str:
+    """Metrics label: '/info:clearinghouseState', '/exchange:order'"""
+    if not isinstance(data, dict):
+        return endpoint
+    kind = data.get("type")
+    if kind is None and isinstance(data.get("action"), dict):
+        kind = data["action"].get("type")
+    return f"{endpoint}:{kind}" if kind else endpoint
+
+
 # ═══════════════════════════════════════════════════════════════
 # GLOBAL MAIN WALLET CACHE - Prevent rate limiting on discover_main_wallet
 # Key: api_wallet_address (lowercase), Value: (main_wallet_address, timestamp)
@@ -75,6 +90,40 @@ def _set_cached_main_wallet(api_address: str, main_wallet: str):
         _main_wallet_cache[key] = (main_wallet.lower(), time.time())
 
 
+def invalidate_main_wallet_cache(api_address: Optional[str] = None):
+    """Forget discovered main wallets (one API wallet, or all)"""
+    if api_address:
+        _main_wallet_cache.pop(api_address.lower(), None)
+    else:
+        _main_wallet_cache.clear()
+
+
+# ═══════════════════════════════════════════════════════════════
+# GLOBAL ASSET META TABLE - One meta request per network per TTL
+# Shared by every client; testnet and mainnet have different indices
+# Key: testnet flag, Value: (coin_to_asset, sz_decimals, timestamp)
+# ═══════════════════════════════════════════════════════════════
+_asset_meta_cache: Dict[bool, tuple] = {}
+_asset_meta_locks: Dict[bool, asyncio.Lock] = {}
+ASSET_META_TTL = 600  # 10 minutes - new listings show up after at most this long
+
+
+def _get_cached_asset_meta(testnet: bool) -> Optional[tuple]:
+    """Fresh (coin_to_asset, sz_decimals, timestamp) for a network, or None"""
+    entry = _asset_meta_cache.get(testnet)
+    if entry and time.time() - entry[2] < ASSET_META_TTL:
+        return entry
+    return None
+
+
+def invalidate_asset_meta(testnet: Optional[bool] = None):
+    """Force the next client initialize() to refetch asset meta"""
+    if testnet is None:
+        _asset_meta_cache.clear()
+    else:
+        _asset_meta_cache.pop(testnet, None)
+
+
 def round_price(px: float, coin: str, sz_decimals: Optional[int] = None) -> float:
     """
     Round price according to HyperLiquid rules:
@@ -143,6 +192,10 @@ class HyperLiquidClient:
         # Cached main wallet address (discovered from agent role)
         self._main_wallet_address: Optional[str] = None
         self._role_checked: bool = False
+        # Timestamp of the global asset meta table the mapping came from
+        self._asset_meta_time: float = 0
+        # Last signed nonce - kept strictly increasing for concurrent callers
+        self._last_nonce: int = 0
     
     @property
     def address(self) -> str:
@@ -164,8 +217,8 @@ class HyperLiquidClient:
             )
             self._own_session = True
         
-        # Build dynamic coin-to-asset mapping from meta API
-        if self._dynamic_coin_to_asset is None:
+        # Build dynamic coin-to-asset mapping from meta API (refreshed with the global table)
+        if self._dynamic_coin_to_asset is None or time.time() - self._asset_meta_time >= ASSET_META_TTL:
             await self._build_dynamic_mapping()
         
         # Auto-discover main wallet for agent wallets
@@ -178,22 +231,43 @@ class HyperLiquidClient:
         This is critical because testnet and mainnet have DIFFERENT asset indices!
         Mainnet: BTC=0, ETH=1, SOL=2, ...
         Testnet: SOL=0, APT=1, ATOM=2, BTC=3, ETH=4, ...
+        
+        The table is shared process-wide per network, so only the first client
+        after each ASSET_META_TTL pays for the meta request.
         """
+        entry = _get_cached_asset_meta(self._testnet)
+        if entry is None:
+            lock = _asset_meta_locks.setdefault(self._testnet, asyncio.Lock())
+            async with lock:
+                entry = _get_cached_asset_meta(self._testnet)
+                if entry is None:
+                    entry = await self._fetch_asset_meta()
+        
+        if entry is None:
+            self._dynamic_coin_to_asset = None
+            self._dynamic_sz_decimals = None
+            return
+        self._dynamic_coin_to_asset, self._dynamic_sz_decimals, self._asset_meta_time = entry
+    
+    async def _fetch_asset_meta(self) -> Optional[tuple]:
+        """Fetch meta and publish it as the network's global asset table"""
         try:
             meta_data = await self._info_request("meta")
             universe = meta_data.get("universe", [])
-            self._dynamic_coin_to_asset = {}
-            self._dynamic_sz_decimals = {}
+            coin_to_asset = {}
+            sz_decimals = {}
             for idx, asset in enumerate(universe):
                 name = asset.get("name", "")
                 if name:
-                    self._dynamic_coin_to_asset[name.upper()] = idx
-                    self._dynamic_sz_decimals[name.upper()] = asset.get("szDecimals", 2)
-            logger.info(f"[HL] Built dynamic mapping: {len(self._dynamic_coin_to_asset)} assets ({'testnet' if self._testnet else 'mainnet'})")
+                    coin_to_asset[name.upper()] = idx
+                    sz_decimals[name.upper()] = asset.get("szDecimals", 2)
+            entry = (coin_to_asset, sz_decimals, time.time())
+            _asset_meta_cache[self._testnet] = entry
+            logger.info(f"[HL] Built dynamic mapping: {len(coin_to_asset)} assets ({'testnet' if self._testnet else 'mainnet'})")
+            return entry
         except Exception as e:
             logger.warning(f"[HL] Failed to build dynamic mapping, falling back to hardcoded: {e}")
-            self._dynamic_coin_to_asset = None
-            self._dynamic_sz_decimals = None
+            return None
     
     def get_asset_id(self, coin: str) -> Optional[int]:
         """Get asset ID for a coin, using dynamic mapping if available."""
@@ -273,6 +347,9 @@ class HyperLiquidClient:
         return None
     
     async def close(self):
+        if not self._own_session:
+            # Shared (pooled) session - its owner closes it
+            return
         if self._session and not self._session.closed:
             try:
                 await self._session.close()
@@ -299,11 +376,17 @@ class HyperLiquidClient:
         
         url = f"{self._base_url}{endpoint}"
         last_error = None
+        label = _endpoint_label(endpoint, data)
         
         for attempt in range(retries):
+            started = time.perf_counter()
             try:
                 async with self._session.request(method, url, json=data, params=params, headers={"Content-Type": "application/json"}) as response:
                     text = await response.text()
+                    if _metrics is not None:
+                        _metrics.exchange_latency.observe(
+                            (time.perf_counter() - started) * 1000, exchange="hyperliquid", endpoint=label
+                        )
                     
                     # Handle rate limiting with exponential backoff
                     if response.status == 429:
@@ -325,6 +408,8 @@ class HyperLiquidClient:
             except aiohttp.ClientError as e:
                 logger.error(f"HyperLiquid request failed: {e}")
                 last_error = e
+                if _metrics is not None:
+                    _metrics.exchange_errors.inc(exchange="hyperliquid", endpoint=label)
                 if attempt < retries - 1:
                     await asyncio.sleep(2)  # Increased from 1s
                     continue
@@ -337,8 +422,13 @@ class HyperLiquidClient:
         data = {"type": request_type, **kwargs}
         return await self._request("POST", "/info", data=data)
     
+    def _next_nonce(self) -> int:
+        """Millisecond nonce, strictly increasing even for same-ms concurrent actions"""
+        self._last_nonce = max(get_timestamp_ms(), self._last_nonce + 1)
+        return self._last_nonce
+    
     async def _exchange_request(self, action: Dict[str, Any]) -> Dict[str, Any]:
-        nonce = get_timestamp_ms()
+        nonce = self._next_nonce()
         signed_payload = sign_l1_action(self._private_key, action, vault_address=self._vault_address, nonce=nonce, is_mainnet=not self._testnet)
         return await self._request("POST", "/exchange", data=signed_payload)
     
@@ -485,7 +575,74 @@ class HyperLiquidClient:
         order_wire = order_request_to_order_wire(order_req, asset)
         action = order_wire_to_action([order_wire], grouping=grouping)
         return await self._exchange_request(action)
-    
+
+    async def bulk_orders(self, orders: List[Dict[str, Any]], grouping: str = "na") -> Dict[str, Any]:
+        """
+        Submit several orders in one signed exchange action.
+
+        Args:
+            orders: Dicts with coin, is_buy, sz, limit_px and optional
+                    reduce_only, order_type, cloid (same meaning as order())
+            grouping: Order grouping ("na" = independent orders)
+
+        Returns:
+            Exchange response; response.data.statuses holds one entry per
+            order, in submission order
+        """
+        wires = []
+        for o in orders:
+            coin = o["coin"]
+            asset = self.get_asset_id(coin)
+            if asset is None:
+                raise HyperLiquidError(f"Unknown coin: {coin}")
+            order_req = {
+                "coin": coin,
+                "is_buy": o["is_buy"],
+                "sz": o["sz"],
+                "limit_px": o["limit_px"],
+                "reduce_only": o.get("reduce_only", False),
+                "order_type": o.get("order_type") or {"limit": {"tif": "Gtc"}},
+                "_sz_decimals": self.get_sz_decimals(coin),
+            }
+            if o.get("cloid"):
+                order_req["cloid"] = o["cloid"]
+            wires.append(order_request_to_order_wire(order_req, asset))
+
+        action = order_wire_to_action(wires, grouping=grouping)
+        return await self._exchange_request(action)
+
+    async def bulk_market_close(self, closes: List[Dict[str, Any]], slippage: float = 0.01) -> Dict[str, Any]:
+        """
+        Close several positions with reduce-only IOC orders in one action.
+
+        Args:
+            closes: Dicts with coin, szi (signed position size) and optional
+                    px (reference price; missing prices come from one allMids call)
+            slippage: Slippage tolerance (default 1%)
+        """
+        mids: Dict[str, float] = {}
+        if any(not c.get("px") for c in closes):
+            mids = await self.get_all_mids()
+
+        orders = []
+        for c in closes:
+            coin = c["coin"]
+            ref_px = c.get("px") or mids.get(coin)
+            if not ref_px:
+                raise HyperLiquidError(f"Cannot get price for {coin}")
+            is_buy = c["szi"] < 0
+            limit_px = ref_px * (1 + slippage) if is_buy else ref_px * (1 - slippage)
+            orders.append({
+                "coin": coin,
+                "is_buy": is_buy,
+                "sz": abs(c["szi"]),
+                "limit_px": round_price(limit_px, coin, sz_decimals=self.get_sz_decimals(coin)),
+                "reduce_only": True,
+                "order_type": {"limit": {"tif": "Ioc"}},
+                "cloid": c.get("cloid"),
+            })
+        return await self.bulk_orders(orders)
+
     async def market_open(self, coin: str, is_buy: bool, sz: float, slippage: float = 0.01, cloid: Optional[str] = None) -> Dict[str, Any]:
         mid_price = await self.get_mid_price(coin)
         if mid_price is None:
@@ -574,7 +731,7 @@ class HyperLiquidClient:
         asset = self.get_asset_id(coin)
         if asset is None:
             raise HyperLiquidError(f"Unknown coin: {coin}")
-        nonce = get_timestamp_ms()
+        nonce = self._next_nonce()
         signed_payload = sign_update_leverage_action(self._private_key, asset, is_cross, leverage, nonce=nonce, is_mainnet=not self._testnet)
         return await self._request("POST", "/exchange", data=signed_payload)
     
@@ -848,7 +1005,7 @@ class HyperLiquidClient:
         amount: float
     ) -> Dict[str, Any]:
         """Transfer USDC to another address on L1"""
-        nonce = get_timestamp_ms()
+        nonce = self._next_nonce()
         
         # This requires a special signature format
         action = {
@@ -0,0 +1,53 @@
+"""
+Migration: Backtest Jobs Table
+Version: 028
+Created: 2026-10-19
+
+Persistent queue + result store for async backtests (/api/backtest/run-async).
+request_hash is a content hash of the job parameters, so identical requests
+reuse a stored result instead of recomputing it.
+"""
+
+
+def upgrade(cur):
+    """Apply migration"""
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS backtest_jobs (
+            id            TEXT PRIMARY KEY,
+            user_id       BIGINT NOT NULL,
+            kind          TEXT NOT NULL,
+            request_hash  TEXT NOT NULL,
+            params        JSONB NOT NULL,
+
+            status        TEXT NOT NULL DEFAULT 'queued',   -- queued, running, completed, failed, cancelled
+            priority      INTEGER NOT NULL DEFAULT 0,
+            progress      REAL DEFAULT 0,
+
+            result        JSONB,
+            error         TEXT,
+
+            created_at    TIMESTAMP DEFAULT NOW(),
+            started_at    TIMESTAMP,
+            finished_at   TIMESTAMP
+        )
+    """)
+
+    # Result cache lookup: latest completed job for a hash
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_backtest_jobs_hash
+        ON backtest_jobs(request_hash, finished_at DESC)
+        WHERE status = 'completed'
+    """)
+    # Restart recovery
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_backtest_jobs_pending
+        ON backtest_jobs(priority, created_at)
+        WHERE status IN ('queued', 'running')
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_backtest_jobs_user ON backtest_jobs(user_id, created_at DESC)")
+
+
+def downgrade(cur):
+    """Rollback migration"""
+    cur.execute("DROP TABLE IF EXISTS backtest_jobs CASCADE")
@@ -0,0 +1,25 @@
+"""
+Migration: Trade Logs Keyset Index
+Version: 029
+Created: 2026-10-19
+
+Composite index for keyset pagination / streaming export of trade history
+(db.get_trade_logs_page, db.iter_trade_logs, portfolio period aggregation):
+rows are read in (ts, id) order within (user_id, exchange, account_type).
+"""
+
+
+def upgrade(cur):
+    """Apply migration"""
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_logs_keyset
+        ON trade_logs(user_id, exchange, account_type, ts DESC, id DESC)
+    """)
+    # Unfiltered history (exchange/account "all")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_user_ts_id ON trade_logs(user_id, ts DESC, id DESC)")
+
+
+def downgrade(cur):
+    """Rollback migration"""
+    cur.execute("DROP INDEX IF EXISTS idx_logs_keyset")
+    cur.execute("DROP INDEX IF EXISTS idx_logs_user_ts_id")
@@ -0,0 +1,29 @@
+"""
+Migration: Backtest Jobs Ownership
+Version: 030
+Created: 2026-10-19
+
+Every uvicorn worker runs its own BacktestJobQueue. Active jobs are owned by
+one process (owner = "host:pid") which refreshes heartbeat_at; jobs whose
+owner released them or stopped heartbeating are claimed atomically
+(FOR UPDATE SKIP LOCKED) by exactly one surviving worker.
+"""
+
+
+def upgrade(cur):
+    """Apply migration"""
+    cur.execute("ALTER TABLE backtest_jobs ADD COLUMN IF NOT EXISTS owner TEXT")
+    cur.execute("ALTER TABLE backtest_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP")
+    # Per-user quota and in-flight dedup across workers
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_backtest_jobs_active_hash
+        ON backtest_jobs(request_hash)
+        WHERE status IN ('queued', 'running')
+    """)
+
+
+def downgrade(cur):
+    """Rollback migration"""
+    cur.execute("DROP INDEX IF EXISTS idx_backtest_jobs_active_hash")
+    cur.execute("ALTER TABLE backtest_jobs DROP COLUMN IF EXISTS heartbeat_at")
+    cur.execute("ALTER TABLE backtest_jobs DROP COLUMN IF EXISTS owner")
@@ -0,0 +1,40 @@
+"""
+Migration: Trade Logs Exchange / Account Type Backfill
+Version: 031
+Created: 2026-10-19
+
+List, keyset and export queries filter trade_logs with plain equality on
+exchange / account_type so idx_logs_keyset can serve them. Legacy rows with
+NULLs get the column defaults (the values the API already displays for
+them), and a trigger keeps writers that pass None from adding new NULLs.
+"""
+
+
+def upgrade(cur):
+    """Apply migration"""
+    cur.execute("UPDATE trade_logs SET exchange = 'bybit' WHERE exchange IS NULL")
+    cur.execute("UPDATE trade_logs SET account_type = 'demo' WHERE account_type IS NULL")
+
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION trade_logs_default_scope()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.exchange := COALESCE(NEW.exchange, 'bybit');
+            NEW.account_type := COALESCE(NEW.account_type, 'demo');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS trg_trade_logs_default_scope ON trade_logs")
+    cur.execute("""
+        CREATE TRIGGER trg_trade_logs_default_scope
+        BEFORE INSERT OR UPDATE OF exchange, account_type ON trade_logs
+        FOR EACH ROW
+        EXECUTE FUNCTION trade_logs_default_scope()
+    """)
+
+
+def downgrade(cur):
+    """Rollback migration"""
+    cur.execute("DROP TRIGGER IF EXISTS trg_trade_logs_default_scope ON trade_logs")
+    cur.execute("DROP FUNCTION IF EXISTS trade_logs_default_scope()")
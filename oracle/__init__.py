@@ -91,6 +91,7 @@ from oracle.market_analyzer import MarketAnalyzer
 from oracle.smart_contract_auditor import SmartContractAuditor, AuditResult, Vulnerability, Severity
 from oracle.portfolio_optimizer import PortfolioOptimizer, Asset, AllocationResult, PortfolioMetrics
 from oracle.report_generator import ReportGenerator, ReportConfig
+from oracle.report_store import ReportStore
 
 __version__ = "1.0.0"
 __author__ = "Enliko Oracle Team"
@@ -127,4 +128,5 @@ __all__ = [
     # Reports
     "ReportGenerator",
     "ReportConfig",
+    "ReportStore",
 ]
@@ -18,12 +18,14 @@ Reference: BlackRock Aladdin manages $21.6T+ in assets
 import math
 import random
 import statistics
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 from datetime import datetime
 
+import numpy as np
+
 logger = logging.getLogger("oracle.aladdin")
 
 
@@ -163,6 +165,52 @@ class AladdinRiskReport:
     simulations_run: int = 0
 
 
+@dataclass
+class FactorBatch:
+    """Vectorized factor, stress and correlation results for a batch of assets"""
+    factors: List[RiskFactor]        # Factor definitions (columns of `values`)
+    categories: List[str]            # Columns of category_scores / contributions
+    scenarios: List[str]             # Rows of `stress`
+    values: np.ndarray               # (assets, factors) 0-100, higher = safer
+    category_scores: np.ndarray      # (assets, categories) weighted averages
+    contributions: np.ndarray        # (assets, categories) % of total
+    factor_scores: np.ndarray        # (assets,) category-weighted factor score
+    stress: np.ndarray               # (scenarios, assets) return under scenario
+    correlations: np.ndarray         # (assets, 4) BTC, ETH, S&P500, Gold
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def risk_factors(self, i: int) -> List[RiskFactor]:
+        return [
+            RiskFactor(
+                id=f.id,
+                name=f.name,
+                category=f.category,
+                weight=f.weight,
+                value=value,
+                sensitivity=f.sensitivity
+            )
+            for f, value in zip(self.factors, self.values[i].tolist())
+        ]
+
+    def factor_contributions(self, i: int) -> Dict[str, float]:
+        return dict(zip(self.categories, self.contributions[i].tolist()))
+
+    def stress_results(self, i: int) -> Dict[str, float]:
+        return dict(zip(self.scenarios, self.stress[:, i].tolist()))
+
+    def correlation_matrix(self, i: int) -> CorrelationMatrix:
+        btc, eth, sp500, gold = self.correlations[i].tolist()
+        return CorrelationMatrix(
+            assets=["BTC", "ETH", "S&P500", "Gold"],
+            btc_correlation=btc,
+            eth_correlation=eth,
+            sp500_correlation=sp500,
+            gold_correlation=gold
+        )
+
+
 # =============================================================================
 # HISTORICAL STRESS SCENARIOS (from Aladdin's database)
 # =============================================================================
@@ -440,6 +488,71 @@ def create_crypto_risk_factors() -> List[RiskFactor]:
     return factors
 
 
+# =============================================================================
+# VECTORIZED FACTOR INPUTS
+# =============================================================================
+
+# Factors with their own scoring rule; other factors use their category's rule
+_FACTOR_RULES = {
+    RiskFactorCategory.MARKET: {"MKT004", "MKT005", "MKT006", "MKT007"},
+    RiskFactorCategory.LIQUIDITY: {"LIQ001", "LIQ002", "LIQ005"},
+    RiskFactorCategory.TECHNOLOGY: {"TECH001", "TECH003", "TECH004", "TECH005", "TECH006", "TECH010"},
+    RiskFactorCategory.CONCENTRATION: {"CONC002", "CONC006"},
+    RiskFactorCategory.OPERATIONAL: {"GOV001", "GOV008", "GOV010"},
+}
+
+_CATEGORY_RULES = {
+    RiskFactorCategory.TECHNOLOGY: "security_score",
+    RiskFactorCategory.OPERATIONAL: "team_score",
+    RiskFactorCategory.REGULATORY: "regulatory",
+    RiskFactorCategory.MACRO: "macro",
+    RiskFactorCategory.SENTIMENT: "sentiment",
+}
+
+# Asset inputs of the factor/stress/correlation rules with their defaults:
+# name -> getter(tokenomics, market, security, team)
+_ASSET_FEATURES: Dict[str, Callable[[Dict, Dict, Dict, Dict], float]] = {
+    "volatility_30d": lambda t, m, s, g: m.get("volatility_30d", 80),
+    "volatility_90d": lambda t, m, s, g: m.get("volatility_90d", m.get("volatility_30d", 80)),
+    "volume_to_mcap": lambda t, m, s, g: m.get("volume_to_mcap_ratio", 0.05),
+    "fear_greed": lambda t, m, s, g: m.get("fear_greed_index", 50),
+    "volume_24h": lambda t, m, s, g: m.get("volume_24h_usd", 0),
+    "liquidity_score": lambda t, m, s, g: m.get("liquidity_score", 50),
+    "btc_correlation": lambda t, m, s, g: m.get("btc_correlation_30d", 0.7),
+    "eth_correlation": lambda t, m, s, g: m.get("eth_correlation_30d", 0.65),
+    "sp500_correlation": lambda t, m, s, g: m.get("sp500_correlation", 0.3),
+    "gold_correlation": lambda t, m, s, g: m.get("gold_correlation", 0.1),
+    "audit_count": lambda t, m, s, g: s.get("audit_count", 0),
+    "critical_issues": lambda t, m, s, g: s.get("critical_issues", 0),
+    "high_issues": lambda t, m, s, g: s.get("high_issues", 0),
+    "test_coverage": lambda t, m, s, g: s.get("test_coverage_pct", 0),
+    "contract_verified": lambda t, m, s, g: bool(s.get("contract_verified", False)),
+    "security_score": lambda t, m, s, g: s.get("security_score", 50),
+    "has_kyc": lambda t, m, s, g: bool(s.get("has_kyc", False)),
+    "is_dao": lambda t, m, s, g: g.get("governance_type", "") == "dao",
+    "is_multisig": lambda t, m, s, g: g.get("governance_type", "") == "multisig",
+    "team_public": lambda t, m, s, g: bool(g.get("team_public", False)),
+    "social_followers": lambda t, m, s, g: g.get("social_followers", 0),
+    "github_commits": lambda t, m, s, g: g.get("github_commits_30d", 0),
+    "team_score": lambda t, m, s, g: g.get("team_score", 50),
+    "has_legal_entity": lambda t, m, s, g: bool(g.get("has_legal_entity", False)),
+    "team_allocation": lambda t, m, s, g: t.get("team_allocation_pct", 15),
+    "vesting_months": lambda t, m, s, g: t.get("vesting_period_months", 0),
+    "cliff_months": lambda t, m, s, g: t.get("cliff_months", 0),
+}
+
+
+def _factor_rule(factor: RiskFactor) -> str:
+    """Name of the AladdinEngine._factor_values rule scoring this factor"""
+    if factor.id in _FACTOR_RULES.get(factor.category, ()):
+        return factor.id
+    return _CATEGORY_RULES.get(factor.category, "neutral")
+
+
+def _asset_sections(asset: Dict[str, Any]) -> Tuple[Dict, Dict, Dict, Dict]:
+    return tuple(asset.get(key) or {} for key in ("tokenomics", "market", "security", "team"))
+
+
 # =============================================================================
 # ALADDIN RISK ENGINE
 # =============================================================================
@@ -485,7 +598,16 @@ class AladdinEngine:
         RiskFactorCategory.SENTIMENT: 0.03,
         RiskFactorCategory.ESG: 0.02,
     }
-    
+
+    # Project type sensitivity in stress tests
+    PROJECT_TYPE_SENSITIVITY = {
+        "defi": 1.2,      # DeFi more sensitive
+        "nft": 1.3,       # NFTs very volatile
+        "memecoin": 1.5,  # Memecoins extreme
+        "infrastructure": 0.9,  # More stable
+        "staking": 0.8,   # Staking platforms stable
+    }
+
     def __init__(
         self,
         monte_carlo_simulations: int = 10000,
@@ -498,7 +620,23 @@ class AladdinEngine:
         self.time_horizon = time_horizon_days
         self.risk_factors = create_crypto_risk_factors()
         self.stress_scenarios = HISTORICAL_STRESS_SCENARIOS
-        
+
+        # Factor exposures as arrays: rule per factor column, and a
+        # (factors x categories) matrix turning factor values into weighted
+        # category averages with a single matrix product
+        self._factor_rules = [_factor_rule(f) for f in self.risk_factors]
+        self._categories = list(dict.fromkeys(f.category for f in self.risk_factors))
+        weights = np.array([f.weight for f in self.risk_factors], dtype=float)
+        membership = np.array(
+            [[f.category == c for c in self._categories] for f in self.risk_factors],
+            dtype=float
+        ).reshape(len(self.risk_factors), len(self._categories))
+        weighted = membership * weights[:, None]
+        self._category_matrix = weighted / weighted.sum(axis=0)
+        self._category_weights = np.array(
+            [self.CATEGORY_WEIGHTS.get(c, 0.1) for c in self._categories], dtype=float
+        )
+
         logger.info(
             f"Aladdin Engine initialized: "
             f"{len(self.risk_factors)} factors, "
@@ -515,336 +653,266 @@ class AladdinEngine:
     ) -> AladdinRiskReport:
         """
         Run comprehensive Aladdin-style risk analysis.
-        
+
         Args:
             tokenomics: Token distribution, vesting, supply data
             market: Price, volume, volatility data
             security: Audit, vulnerabilities data
             team: Team transparency, governance data
             project_type: Type of project (defi, nft, gaming, etc.)
-        
+
         Returns:
             AladdinRiskReport with full analysis
         """
-        report = AladdinRiskReport(
-            asset_name=tokenomics.get("name", "Unknown"),
-            analysis_timestamp=datetime.utcnow().isoformat()
-        )
-        
-        # 1. Calculate individual factor values
-        report.risk_factors = self._evaluate_factors(
-            tokenomics, market, security, team
-        )
-        report.factors_analyzed = len(report.risk_factors)
-        
-        # 2. Factor contribution analysis
-        report.factor_contributions = self._calculate_factor_contributions(
-            report.risk_factors
-        )
-        
-        # 3. Monte Carlo simulation
-        report.monte_carlo = self._run_monte_carlo(
-            market.get("volatility_30d", 80),
-            market.get("expected_return", 0),
-            market.get("btc_correlation", 0.7)
-        )
-        report.simulations_run = self.simulations
-        
-        # 4. Historical stress testing
-        report.stress_test_results = self._run_stress_tests(
-            market, tokenomics, project_type
-        )
-        
-        # Find worst case
-        worst = min(report.stress_test_results.items(), key=lambda x: x[1])
-        report.worst_case_scenario = worst[0]
-        report.worst_case_loss = worst[1]
-        
-        # 5. Correlation analysis
-        report.correlations = self._calculate_correlations(market)
-        
-        # 6. Drawdown analysis
-        report.drawdown = self._analyze_drawdown(market)
-        
-        # 7. ESG scoring
-        report.esg = self._calculate_esg(tokenomics, team, security)
-        
-        # 8. Composite risk score
-        report.composite_risk_score = self._calculate_composite_score(
-            report.risk_factors,
-            report.monte_carlo,
-            report.esg
-        )
-        
-        # 9. Risk-adjusted score (Sharpe-like)
-        report.risk_adjusted_score = self._calculate_risk_adjusted_score(
-            report.composite_risk_score,
-            report.monte_carlo
-        )
-        
-        # 10. Final ratings
-        report.risk_rating = self._get_risk_rating(report.composite_risk_score)
-        report.investment_recommendation = self._generate_recommendation(report)
-        report.position_sizing_suggestion = self._calculate_position_size(report)
-        
+        report = self.analyze_batch([{
+            "tokenomics": tokenomics,
+            "market": market,
+            "security": security,
+            "team": team,
+            "project_type": project_type,
+        }])[0]
+
         logger.info(
             f"Aladdin analysis complete: "
             f"Score={report.composite_risk_score:.1f}, "
             f"Rating={report.risk_rating}"
         )
-        
+
         return report
-    
-    def _evaluate_factors(
-        self,
-        tokenomics: Dict,
-        market: Dict,
-        security: Dict,
-        team: Dict
-    ) -> List[RiskFactor]:
-        """Evaluate all risk factors based on input data"""
-        evaluated = []
-        
-        for factor in self.risk_factors:
-            # Clone factor and set value based on data
-            f = RiskFactor(
-                id=factor.id,
-                name=factor.name,
-                category=factor.category,
-                weight=factor.weight,
-                sensitivity=factor.sensitivity
+
+    def analyze_batch(self, assets: List[Dict[str, Any]]) -> List[AladdinRiskReport]:
+        """
+        Run the full analysis for many assets at once.
+
+        Factors, contributions, stress tests and correlations are evaluated
+        for the whole batch in one vectorized pass (see evaluate_batch);
+        Monte Carlo, drawdown and ESG still run per asset.
+
+        Args:
+            assets: analyze() keyword arguments per asset, e.g.
+                {"tokenomics": {...}, "market": {...}, "security": {...},
+                 "team": {...}, "project_type": "defi"}
+
+        Returns:
+            One AladdinRiskReport per asset, in input order
+        """
+        batch = self.evaluate_batch(assets)
+        timestamp = datetime.utcnow().isoformat()
+        reports = []
+
+        for i, asset in enumerate(assets):
+            tokenomics, market, security, team = _asset_sections(asset)
+            report = AladdinRiskReport(
+                asset_name=tokenomics.get("name", "Unknown"),
+                analysis_timestamp=timestamp
             )
-            
-            # Calculate factor value based on category and ID
-            f.value = self._calculate_factor_value(
-                factor, tokenomics, market, security, team
+
+            # 1-2. Factor values and contributions (vectorized)
+            report.risk_factors = batch.risk_factors(i)
+            report.factors_analyzed = len(report.risk_factors)
+            report.factor_contributions = batch.factor_contributions(i)
+
+            # 3. Monte Carlo simulation
+            report.monte_carlo = self._run_monte_carlo(
+                market.get("volatility_30d", 80),
+                market.get("expected_return", 0),
+                market.get("btc_correlation", 0.7)
             )
-            
-            evaluated.append(f)
-        
-        return evaluated
-    
-    def _calculate_factor_value(
-        self,
-        factor: RiskFactor,
-        tokenomics: Dict,
-        market: Dict,
-        security: Dict,
-        team: Dict
-    ) -> float:
+            report.simulations_run = self.simulations
+
+            # 4. Historical stress testing (vectorized)
+            report.stress_test_results = batch.stress_results(i)
+
+            # Find worst case
+            worst = min(report.stress_test_results.items(), key=lambda x: x[1])
+            report.worst_case_scenario = worst[0]
+            report.worst_case_loss = worst[1]
+
+            # 5. Correlation analysis (vectorized)
+            report.correlations = batch.correlation_matrix(i)
+
+            # 6. Drawdown analysis
+            report.drawdown = self._analyze_drawdown(market)
+
+            # 7. ESG scoring
+            report.esg = self._calculate_esg(tokenomics, team, security)
+
+            # 8. Composite risk score
+            report.composite_risk_score = self._calculate_composite_score(
+                float(batch.factor_scores[i]),
+                report.monte_carlo,
+                report.esg
+            )
+
+            # 9. Risk-adjusted score (Sharpe-like)
+            report.risk_adjusted_score = self._calculate_risk_adjusted_score(
+                report.composite_risk_score,
+                report.monte_carlo
+            )
+
+            # 10. Final ratings
+            report.risk_rating = self._get_risk_rating(report.composite_risk_score)
+            report.investment_recommendation = self._generate_recommendation(report)
+            report.position_sizing_suggestion = self._calculate_position_size(report)
+
+            reports.append(report)
+
+        return reports
+
+    def evaluate_batch(self, assets: List[Dict[str, Any]]) -> FactorBatch:
         """
-        Calculate individual factor value (0-100 scale, higher = better/safer).
-        
+        Score many assets at once.
+
+        Factor values form an (assets x factors) matrix; category scores and
+        contributions are its product with the factor weight matrix, and stress
+        tests are one (scenarios x assets) matrix.
+        """
+        x = self._asset_features(assets)
+        values = self._factor_values(x)
+
+        # 1. Weighted category averages and their share of the total
+        category_scores = values @ self._category_matrix
+        weighted = category_scores * self._category_weights
+        total = weighted.sum(axis=1, keepdims=True)
+        contributions = np.divide(
+            weighted * 100, total, out=weighted.copy(), where=total > 0
+        )
+        factor_scores = weighted.sum(axis=1) / self._category_weights.sum()
+
+        # 2. Stress scenarios x assets
+        stress = self._stress_matrix(x)
+
+        # 3. Correlations with reference assets
+        correlations = np.column_stack([
+            x["btc_correlation"],
+            x["eth_correlation"],
+            x["sp500_correlation"],
+            x["gold_correlation"],
+        ])
+
+        return FactorBatch(
+            factors=self.risk_factors,
+            categories=[c.value for c in self._categories],
+            scenarios=[s.name for s in self.stress_scenarios],
+            values=values,
+            category_scores=category_scores,
+            contributions=contributions,
+            factor_scores=factor_scores,
+            stress=stress,
+            correlations=correlations,
+        )
+
+    def _asset_features(self, assets: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Extract factor inputs into one array per feature"""
+        rows = []
+        project_types = []
+        for asset in assets:
+            sections = _asset_sections(asset)
+            rows.append([get(*sections) for get in _ASSET_FEATURES.values()])
+            project_types.append(asset.get("project_type", "defi"))
+
+        columns = np.array(rows, dtype=float).reshape(len(assets), len(_ASSET_FEATURES))
+        x = dict(zip(_ASSET_FEATURES, columns.T))
+        x["is_defi"] = np.array(["defi" in p.lower() for p in project_types], dtype=bool)
+        x["type_multiplier"] = np.array(
+            [self.PROJECT_TYPE_SENSITIVITY.get(p, 1.0) for p in project_types], dtype=float
+        )
+        return x
+
+    def _factor_values(self, x: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Calculate factor values (0-100 scale, higher = better/safer) for all
+        assets: one column per factor, evaluated with the rule from _factor_rule.
+
         This maps raw data to normalized factor scores.
         """
-        cat = factor.category
-        fid = factor.id
-        
-        # MARKET FACTORS
-        if cat == RiskFactorCategory.MARKET:
-            if fid == "MKT005":  # 30-Day Volatility
-                vol = market.get("volatility_30d", 80)
-                # Lower volatility = higher score
-                return max(0, min(100, 100 - vol))
-            elif fid == "MKT006":  # 90-Day Volatility
-                vol = market.get("volatility_90d", market.get("volatility_30d", 80))
-                return max(0, min(100, 100 - vol * 0.8))
-            elif fid == "MKT007":  # Volume Trend
-                vol_ratio = market.get("volume_to_mcap_ratio", 0.05)
-                # Good ratio is 0.05-0.3
-                if 0.05 <= vol_ratio <= 0.3:
-                    return 80
-                elif vol_ratio < 0.01:
-                    return 20
-                else:
-                    return 50
-            elif fid == "MKT004":  # Fear & Greed
-                fg = market.get("fear_greed_index", 50)
-                # Neutral (40-60) is best
-                return 100 - abs(50 - fg) * 2
-            else:
-                return 50  # Default neutral
-        
-        # LIQUIDITY FACTORS
-        elif cat == RiskFactorCategory.LIQUIDITY:
-            if fid == "LIQ001":  # 24h Volume
-                vol = market.get("volume_24h_usd", 0)
-                if vol >= 100_000_000:  # $100M+
-                    return 95
-                elif vol >= 10_000_000:  # $10M+
-                    return 80
-                elif vol >= 1_000_000:  # $1M+
-                    return 60
-                elif vol >= 100_000:  # $100K+
-                    return 40
-                else:
-                    return 20
-            elif fid == "LIQ002":  # Volume/MCap
-                ratio = market.get("volume_to_mcap_ratio", 0.05)
-                if 0.05 <= ratio <= 0.3:
-                    return 85
-                elif ratio < 0.01:
-                    return 20
-                elif ratio > 1:
-                    return 40  # Possible wash trading
-                else:
-                    return 60
-            elif fid == "LIQ005":  # DEX TVL
-                score = market.get("liquidity_score", 50)
-                return score
-            else:
-                return 50
-        
-        # TECHNOLOGY/SECURITY FACTORS
-        elif cat == RiskFactorCategory.TECHNOLOGY:
-            if fid == "TECH001":  # Audit Count
-                audits = security.get("audit_count", 0)
-                return min(100, audits * 25)
-            elif fid == "TECH003":  # Critical Vulns
-                critical = security.get("critical_issues", 0)
-                return max(0, 100 - critical * 50)
-            elif fid == "TECH004":  # High Vulns
-                high = security.get("high_issues", 0)
-                return max(0, 100 - high * 20)
-            elif fid == "TECH005":  # Test Coverage
-                coverage = security.get("test_coverage_pct", 0)
-                return coverage
-            elif fid == "TECH006":  # Contract Verified
-                verified = security.get("contract_verified", False)
-                return 90 if verified else 30
-            elif fid == "TECH010":  # Multi-sig
-                has_multisig = team.get("governance_type", "") == "multisig"
-                return 80 if has_multisig else 40
-            else:
-                sec_score = security.get("security_score", 50)
-                return sec_score
-        
-        # CONCENTRATION FACTORS
-        elif cat == RiskFactorCategory.CONCENTRATION:
-            if fid == "CONC002":  # Team Concentration
-                team_pct = tokenomics.get("team_allocation_pct", 15)
-                # Lower team allocation = higher score
-                if team_pct <= 5:
-                    return 95
-                elif team_pct <= 10:
-                    return 80
-                elif team_pct <= 15:
-                    return 65
-                elif team_pct <= 25:
-                    return 45
-                else:
-                    return 20
-            elif fid == "CONC006":  # Vesting Risk
-                vesting = tokenomics.get("vesting_period_months", 0)
-                cliff = tokenomics.get("cliff_months", 0)
-                score = min(100, (vesting + cliff) * 2)
-                return score
-            else:
-                return 50
-        
-        # GOVERNANCE/OPERATIONAL FACTORS
-        elif cat == RiskFactorCategory.OPERATIONAL:
-            if fid == "GOV001":  # DAO Score
-                gov = team.get("governance_type", "")
-                if gov == "dao":
-                    return 90
-                elif gov == "multisig":
-                    return 70
-                else:
-                    return 40
-            elif fid == "GOV008":  # Public Team
-                public = team.get("team_public", False)
-                return 85 if public else 30
-            elif fid == "GOV010":  # Community
-                followers = team.get("social_followers", 0)
-                if followers >= 100000:
-                    return 90
-                elif followers >= 10000:
-                    return 70
-                elif followers >= 1000:
-                    return 50
-                else:
-                    return 30
-            else:
-                team_score = team.get("team_score", 50)
-                return team_score
-        
-        # REGULATORY FACTORS
-        elif cat == RiskFactorCategory.REGULATORY:
-            # Simplified regulatory assessment
-            has_legal = team.get("has_legal_entity", False)
-            has_kyc = security.get("has_kyc", False)
-            score = 50
-            if has_legal:
-                score += 25
-            if has_kyc:
-                score += 15
-            return min(100, score)
-        
-        # MACRO FACTORS
-        elif cat == RiskFactorCategory.MACRO:
-            btc_corr = market.get("btc_correlation_30d", 0.7)
-            # Moderate correlation (0.3-0.6) is ideal for diversification
-            if 0.3 <= btc_corr <= 0.6:
-                return 80
-            elif btc_corr > 0.9:
-                return 40  # Too correlated
-            else:
-                return 60
-        
-        # SENTIMENT FACTORS
-        elif cat == RiskFactorCategory.SENTIMENT:
-            # Use social metrics
-            commits = team.get("github_commits_30d", 0)
-            followers = team.get("social_followers", 0)
-            score = 50
-            if commits >= 50:
-                score += 25
-            elif commits >= 20:
-                score += 15
-            if followers >= 50000:
-                score += 20
-            return min(100, score)
-        
-        # Default
-        return 50
-    
-    def _calculate_factor_contributions(
-        self,
-        factors: List[RiskFactor]
-    ) -> Dict[str, float]:
-        """Calculate contribution of each factor category to total risk"""
-        contributions = {}
-        category_scores = {}
-        category_weights = {}
-        
-        for factor in factors:
-            cat = factor.category.value
-            if cat not in category_scores:
-                category_scores[cat] = []
-                category_weights[cat] = []
-            
-            category_scores[cat].append(factor.value)
-            category_weights[cat].append(factor.weight)
-        
-        total_weighted = 0
-        for cat, scores in category_scores.items():
-            weights = category_weights[cat]
-            if scores:
-                weighted_avg = sum(s * w for s, w in zip(scores, weights)) / sum(weights)
-                cat_weight = self.CATEGORY_WEIGHTS.get(
-                    RiskFactorCategory(cat), 0.1
-                )
-                contributions[cat] = weighted_avg * cat_weight
-                total_weighted += contributions[cat]
-        
-        # Normalize to percentage
-        if total_weighted > 0:
-            for cat in contributions:
-                contributions[cat] = (contributions[cat] / total_weighted) * 100
-        
-        return contributions
-    
+        n = len(x["volatility_30d"])
+
+        # Good volume/mcap ratio is 0.05-0.3
+        ratio = x["volume_to_mcap"]
+        healthy_ratio = (ratio >= 0.05) & (ratio <= 0.3)
+        volume = x["volume_24h"]
+        team_pct = x["team_allocation"]
+        followers = x["social_followers"]
+        commits = x["github_commits"]
+        btc_corr = x["btc_correlation"]
+
+        rules = {
+            "neutral": np.full(n, 50.0),
+
+            # MARKET FACTORS
+            "MKT004": 100 - np.abs(50 - x["fear_greed"]) * 2,          # Neutral (40-60) is best
+            "MKT005": np.clip(100 - x["volatility_30d"], 0, 100),      # Lower volatility = higher score
+            "MKT006": np.clip(100 - x["volatility_90d"] * 0.8, 0, 100),
+            "MKT007": np.select([healthy_ratio, ratio < 0.01], [80, 20], 50),
+
+            # LIQUIDITY FACTORS
+            "LIQ001": np.select(
+                [volume >= 100_000_000, volume >= 10_000_000, volume >= 1_000_000, volume >= 100_000],
+                [95, 80, 60, 40], 20
+            ),
+            # Ratio above 1 suggests wash trading
+            "LIQ002": np.select([healthy_ratio, ratio < 0.01, ratio > 1], [85, 20, 40], 60),
+            "LIQ005": x["liquidity_score"],
+
+            # TECHNOLOGY/SECURITY FACTORS
+            "TECH001": np.minimum(100, x["audit_count"] * 25),
+            "TECH003": np.maximum(0, 100 - x["critical_issues"] * 50),
+            "TECH004": np.maximum(0, 100 - x["high_issues"] * 20),
+            "TECH005": x["test_coverage"],
+            "TECH006": np.where(x["contract_verified"] > 0, 90, 30),
+            "TECH010": np.where(x["is_multisig"] > 0, 80, 40),
+            "security_score": x["security_score"],
+
+            # CONCENTRATION FACTORS
+            "CONC002": np.select(                                       # Lower team allocation = higher score
+                [team_pct <= 5, team_pct <= 10, team_pct <= 15, team_pct <= 25],
+                [95, 80, 65, 45], 20
+            ),
+            "CONC006": np.minimum(100, (x["vesting_months"] + x["cliff_months"]) * 2),
+
+            # GOVERNANCE/OPERATIONAL FACTORS
+            "GOV001": np.select([x["is_dao"] > 0, x["is_multisig"] > 0], [90, 70], 40),
+            "GOV008": np.where(x["team_public"] > 0, 85, 30),
+            "GOV010": np.select([followers >= 100000, followers >= 10000, followers >= 1000], [90, 70, 50], 30),
+            "team_score": x["team_score"],
+
+            # REGULATORY FACTORS (simplified assessment)
+            "regulatory": np.minimum(100, 50 + x["has_legal_entity"] * 25 + x["has_kyc"] * 15),
+
+            # MACRO FACTORS - moderate correlation (0.3-0.6) is ideal for diversification
+            "macro": np.select([(btc_corr >= 0.3) & (btc_corr <= 0.6), btc_corr > 0.9], [80, 40], 60),
+
+            # SENTIMENT FACTORS (social metrics)
+            "sentiment": np.minimum(
+                100,
+                50 + np.select([commits >= 50, commits >= 20], [25, 15], 0) + np.where(followers >= 50000, 20, 0)
+            ),
+        }
+
+        return np.column_stack([rules[rule] for rule in self._factor_rules]).astype(float)
+
+    def _stress_matrix(self, x: Dict[str, np.ndarray]) -> np.ndarray:
+        """Historical stress test impacts, scenarios x assets"""
+        market_impact = np.array([s.market_impact for s in self.stress_scenarios], dtype=float)[:, None]
+        btc_drawdown = np.abs([s.btc_drawdown for s in self.stress_scenarios])[:, None]
+        defi_drawdown = np.abs([s.defi_drawdown for s in self.stress_scenarios])[:, None]
+
+        # DeFi projects take the DeFi-specific drawdown on top
+        base_impact = market_impact * np.where(x["is_defi"], 1 + defi_drawdown * 0.3, 1.0)
+
+        # BTC correlation amplifies market crashes
+        btc_factor = 1 + (x["btc_correlation"] * btc_drawdown * 0.5)
+
+        # Low liquidity and high volatility amplify all impacts
+        liquidity_factor = 1 + (1 - x["liquidity_score"] / 100) * 0.5
+        vol_factor = 1 + x["volatility_30d"] / 100 * 0.3
+
+        impact = base_impact * btc_factor * liquidity_factor * vol_factor * x["type_multiplier"]
+
+        # Cap at -99%
+        return np.maximum(-0.99, impact)
+
     def _run_monte_carlo(
         self,
         volatility_pct: float,
@@ -941,65 +1009,6 @@ class AladdinEngine:
         
         return result
     
-    def _run_stress_tests(
-        self,
-        market: Dict,
-        tokenomics: Dict,
-        project_type: str
-    ) -> Dict[str, float]:
-        """Run historical stress test scenarios"""
-        results = {}
-        
-        vol = market.get("volatility_30d", 80) / 100
-        btc_corr = market.get("btc_correlation_30d", 0.7)
-        liquidity = market.get("liquidity_score", 50) / 100
-        
-        # Project type sensitivity
-        type_multiplier = {
-            "defi": 1.2,      # DeFi more sensitive
-            "nft": 1.3,       # NFTs very volatile
-            "memecoin": 1.5,  # Memecoins extreme
-            "infrastructure": 0.9,  # More stable
-            "staking": 0.8,   # Staking platforms stable
-        }.get(project_type, 1.0)
-        
-        for scenario in self.stress_scenarios:
-            # Calculate impact based on scenario and asset characteristics
-            base_impact = scenario.market_impact
-            
-            # Adjust for DeFi-specific scenarios
-            if "defi" in project_type.lower():
-                base_impact *= (1 + abs(scenario.defi_drawdown) * 0.3)
-            
-            # BTC correlation amplifies market crashes
-            btc_factor = 1 + (btc_corr * abs(scenario.btc_drawdown) * 0.5)
-            
-            # Low liquidity amplifies all impacts
-            liquidity_factor = 1 + (1 - liquidity) * 0.5
-            
-            # High volatility amplifies impacts
-            vol_factor = 1 + vol * 0.3
-            
-            # Calculate final impact
-            impact = base_impact * btc_factor * liquidity_factor * vol_factor * type_multiplier
-            
-            # Cap at -99%
-            impact = max(-0.99, impact)
-            
-            results[scenario.name] = impact
-        
-        return results
-    
-    def _calculate_correlations(self, market: Dict) -> CorrelationMatrix:
-        """Calculate asset correlations"""
-        return CorrelationMatrix(
-            assets=["BTC", "ETH", "S&P500", "Gold"],
-            btc_correlation=market.get("btc_correlation_30d", 0.7),
-            eth_correlation=market.get("eth_correlation_30d", 0.65),
-            sp500_correlation=market.get("sp500_correlation", 0.3),
-            gold_correlation=market.get("gold_correlation", 0.1)
-        )
-    
     def _analyze_drawdown(self, market: Dict) -> DrawdownAnalysis:
         """Analyze drawdown characteristics"""
         vol = market.get("volatility_30d", 80) / 100
@@ -1123,39 +1132,15 @@ class AladdinEngine:
     
     def _calculate_composite_score(
         self,
-        factors: List[RiskFactor],
+        factor_score: float,
         monte_carlo: MonteCarloResult,
         esg: ESGScore
     ) -> float:
-        """Calculate composite risk score (0-100)"""
-        
-        # 1. Factor-based score (weighted average)
-        category_scores = {}
-        category_weights_sum = {}
-        
-        for factor in factors:
-            cat = factor.category
-            if cat not in category_scores:
-                category_scores[cat] = 0
-                category_weights_sum[cat] = 0
-            
-            category_scores[cat] += factor.value * factor.weight
-            category_weights_sum[cat] += factor.weight
-        
-        factor_score = 0
-        total_weight = 0
-        
-        for cat, weighted_sum in category_scores.items():
-            if category_weights_sum[cat] > 0:
-                cat_avg = weighted_sum / category_weights_sum[cat]
-                cat_weight = self.CATEGORY_WEIGHTS.get(cat, 0.1)
-                factor_score += cat_avg * cat_weight
-                total_weight += cat_weight
-        
-        if total_weight > 0:
-            factor_score = factor_score / total_weight
-        
-        # 2. Monte Carlo adjustment
+        """
+        Calculate composite risk score (0-100) from the category-weighted
+        factor score (FactorBatch.factor_scores).
+        """
+        # 1. Monte Carlo adjustment
         # Penalize high VaR and high probability of loss
         mc_penalty = 0
         if monte_carlo.var_95 < -0.20:
@@ -1163,7 +1148,7 @@ class AladdinEngine:
         if monte_carlo.probability_of_loss > 0.5:
             mc_penalty += (monte_carlo.probability_of_loss - 0.5) * 20
         
-        # 3. ESG bonus
+        # 2. ESG bonus
         esg_bonus = (esg.overall_esg - 50) * 0.1  # Up to +5 or -5
         
         # Combine
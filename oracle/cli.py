@@ -12,7 +12,8 @@ CLI Commands:
 
 API Endpoints:
   POST /api/analyze         - Analyze a project
-  GET  /api/report/{id}     - Get report
+  GET  /api/jobs/{id}       - Background analysis status
+  GET  /api/report/{id}     - Get report (?format=html|markdown|text|json)
   GET  /api/reports         - List all reports
   GET  /api/status          - System status
 """
@@ -125,22 +126,16 @@ async def cmd_watch(args):
     await oracle.watch_directory(watch_path)
 
 
-async def cmd_serve(args):
-    """Start API server"""
+def create_serve_app(args):
+    """Build the Oracle API app (raises ImportError without FastAPI)"""
     import os
-    try:
-        import uvicorn
-        from fastapi import FastAPI, HTTPException, BackgroundTasks
-        from fastapi.middleware.cors import CORSMiddleware
-        from pydantic import BaseModel
-    except ImportError:
-        print("❌ FastAPI and uvicorn required. Install with: pip install fastapi uvicorn")
-        sys.exit(1)
+    from fastapi import FastAPI, HTTPException
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import Response
+    from pydantic import BaseModel
     
     from oracle.core import Oracle
-    from oracle.report_generator import ReportGenerator, ReportConfig
-    
-    print_banner()
+    from oracle.report_store import ReportStore
     
     # Create FastAPI app
     app = FastAPI(
@@ -157,16 +152,16 @@ async def cmd_serve(args):
         allow_headers=["*"],
     )
     
-    # Storage
-    reports_cache = {}
+    # Storage: on-disk, shared between processes and restarts
     oracle = Oracle()
-    generator = ReportGenerator()
+    store = ReportStore(args.store or oracle.cache_dir / "reports")
     
     # Models
     class AnalyzeRequest(BaseModel):
         path: str
         generate_report: bool = True
         report_format: str = "json"
+        wait: bool = True  # False: return job id immediately, poll /api/jobs/{id}
     
     class AnalyzeResponse(BaseModel):
         success: bool
@@ -181,7 +176,7 @@ async def cmd_serve(args):
     async def status():
         return {
             "status": "running",
-            "reports_count": len(reports_cache),
+            "reports_count": len(store.list()),
             "version": "1.0.0"
         }
     
@@ -209,7 +204,7 @@ async def cmd_serve(args):
             return False
     
     @app.post("/api/analyze")
-    async def analyze(request: AnalyzeRequest, background_tasks: BackgroundTasks):
+    async def analyze(request: AnalyzeRequest):
         """Analyze a project"""
         # Security: Validate path to prevent traversal attacks
         if not is_safe_path(request.path):
@@ -219,18 +214,21 @@ async def cmd_serve(args):
             raise HTTPException(status_code=404, detail="Path not found")
         
         try:
-            report = await oracle.analyze_project(request.path)
-            reports_cache[report.report_id] = report
+            if not request.wait:
+                job_id = await store.submit(oracle, request.path)
+                return {"success": True, **store.job_status(job_id)}
+            
+            report = await store.analyze(oracle, request.path)
             
             if request.generate_report:
-                report_path = generator.generate(report, format=request.report_format)
+                await asyncio.to_thread(store.render, report.report_id, request.report_format)
             
             return {
                 "success": True,
                 "report_id": report.report_id,
                 "project_name": report.project_name,
                 "overall_score": report.risk.overall_score,
-                "risk_level": report.risk.risk_level,
+                "risk_level": report.risk.risk_level.value,
                 "recommendation": report.risk.investment_recommendation,
                 "red_flags_count": len(report.risk.red_flags)
             }
@@ -239,64 +237,73 @@ async def cmd_serve(args):
             logger.error(f"Analysis error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
     
+    @app.get("/api/jobs/{job_id}")
+    async def get_job(job_id: str):
+        """Background analysis status"""
+        return {"success": True, **store.job_status(job_id)}
+    
+    # Rendered formats are cached by the store after the first request
+    MEDIA_TYPES = {
+        "html": "text/html",
+        "markdown": "text/markdown",
+        "text": "text/plain",
+    }
+    
     @app.get("/api/report/{report_id}")
-    async def get_report(report_id: str):
+    async def get_report(report_id: str, format: Optional[str] = None):
         """Get report by ID"""
-        if report_id not in reports_cache:
-            raise HTTPException(status_code=404, detail="Report not found")
-        
-        report = reports_cache[report_id]
+        if format is None:
+            report = await asyncio.to_thread(store.load, report_id)
+            if report is None:
+                raise HTTPException(status_code=404, detail="Report not found")
+            return {"success": True, "report": json.loads(report.to_json())}
         
-        # Convert to dict
-        from dataclasses import asdict
-        return {
-            "success": True,
-            "report": {
-                "report_id": report.report_id,
-                "project_name": report.project_name,
-                "project_type": report.project_type,
-                "generated_at": report.generated_at,
-                "executive_summary": report.executive_summary,
-                "tokenomics": asdict(report.tokenomics),
-                "market": asdict(report.market),
-                "security": asdict(report.security),
-                "team": asdict(report.team),
-                "risk": asdict(report.risk),
-            }
-        }
+        if format not in MEDIA_TYPES and format != "json":
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+        content = await asyncio.to_thread(store.render, report_id, format)
+        if content is None:
+            raise HTTPException(status_code=404, detail="Report not found")
+        return Response(content=content, media_type=MEDIA_TYPES.get(format, "application/json"))
     
     @app.get("/api/reports")
     async def list_reports():
         """List all reports"""
+        reports = await asyncio.to_thread(store.list)
         return {
             "success": True,
-            "count": len(reports_cache),
-            "reports": [
-                {
-                    "report_id": r.report_id,
-                    "project_name": r.project_name,
-                    "generated_at": r.generated_at,
-                    "overall_score": r.risk.overall_score,
-                    "risk_level": r.risk.risk_level
-                }
-                for r in reports_cache.values()
-            ]
+            "count": len(reports),
+            "reports": reports
         }
     
     @app.delete("/api/report/{report_id}")
     async def delete_report(report_id: str):
         """Delete a report"""
-        if report_id not in reports_cache:
+        if not await asyncio.to_thread(store.delete, report_id):
             raise HTTPException(status_code=404, detail="Report not found")
         
-        del reports_cache[report_id]
         return {"success": True, "message": "Report deleted"}
     
+    return app
+
+
+async def cmd_serve(args):
+    """Start API server"""
+    try:
+        import uvicorn
+        app = create_serve_app(args)
+    except ImportError:
+        print("❌ FastAPI and uvicorn required. Install with: pip install fastapi uvicorn")
+        sys.exit(1)
+    
+    print_banner()
+    
     print(f"\n🚀 Starting Oracle API server on port {args.port}")
     print(f"   Docs: http://localhost:{args.port}/docs")
     print("=" * 60)
     
-    uvicorn.run(app, host=args.host, port=args.port)
+    # Already inside asyncio.run(): serve on the running loop
+    server = uvicorn.Server(uvicorn.Config(app, host=args.host, port=args.port))
+    await server.serve()
 
 
 async def cmd_report(args):
@@ -362,6 +369,7 @@ def main():
     serve_parser = subparsers.add_parser("serve", help="Start API server")
     serve_parser.add_argument("--host", default="0.0.0.0", help="Host to bind")
     serve_parser.add_argument("--port", type=int, default=8888, help="Port to listen on")
+    serve_parser.add_argument("--store", help="Report store directory (default: .oracle_cache/reports)")
     
     # report command
     report_parser = subparsers.add_parser("report", help="Get report by ID")
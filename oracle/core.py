@@ -21,6 +21,7 @@ from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 
 logger = logging.getLogger("oracle")
@@ -128,6 +129,7 @@ class SecurityData:
     has_upgradeable: bool = False
     has_mint_function: bool = False
     has_blacklist: bool = False
+    has_reentrancy_guard: bool = False
     
     # Overall
     security_score: float = 0  # 0-100
@@ -145,6 +147,7 @@ class TeamData:
     discord_members: int = 0
     telegram_members: int = 0
     github_contributors: int = 0
+    social_followers: int = 0  # Total across platforms (twitter + discord if not set)
     
     # Activity
     github_commits_30d: int = 0
@@ -244,10 +247,30 @@ class OracleReport:
     raw_files_analyzed: int = 0
     analysis_duration_seconds: float = 0
     
+    @property
+    def generated_at(self) -> str:
+        return self.analysis_timestamp
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return asdict(self)
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OracleReport":
+        """Rebuild a report from to_json() output"""
+        data = dict(data)
+        risk = dict(data.pop("risk", {}))
+        risk["risk_level"] = RiskLevel(risk.get("risk_level", RiskLevel.HIGH.value))
+        return cls(
+            project_type=ProjectType(data.pop("project_type", ProjectType.UNKNOWN.value)),
+            tokenomics=TokenomicsData(**data.pop("tokenomics", {})),
+            market=MarketData(**data.pop("market", {})),
+            security=SecurityData(**data.pop("security", {})),
+            team=TeamData(**data.pop("team", {})),
+            risk=RiskMetrics(**risk),
+            **data
+        )
+    
     def to_json(self) -> str:
         """Convert to JSON string"""
         data = self.to_dict()
@@ -270,6 +293,9 @@ class Oracle:
         print(report.risk.overall_score)
     """
     
+    # Directories never scanned (dependencies, VCS, build output)
+    SKIP_DIRS = {"node_modules", "venv", ".git", "__pycache__", "dist", "build"}
+    
     # Risk weights (must sum to 1.0)
     RISK_WEIGHTS = {
         "tokenomics": 0.25,
@@ -380,7 +406,7 @@ class Oracle:
         """Lazy load smart contract auditor"""
         if self._contract_auditor is None:
             from oracle.smart_contract_auditor import SmartContractAuditor
-            self._contract_auditor = SmartContractAuditor(self.config)
+            self._contract_auditor = SmartContractAuditor(self.config, cache_dir=self.cache_dir / "audit")
         return self._contract_auditor
     
     @property
@@ -437,42 +463,38 @@ class Oracle:
             report.raw_files_analyzed = project_data.get("files_count", 0)
             report.project_type = self._detect_project_type(project_data)
             
-            # Step 2: Analyze tokenomics (from whitepaper, docs, code)
-            report.tokenomics = await self.tokenomics_analyzer.analyze(
-                project_data, project_name
-            )
-            
-            # Step 3: Get market data (if symbol provided)
+            # Steps 2-5 are independent: tokenomics (whitepaper, docs, code),
+            # smart contract audit (local sources), team analysis and
+            # market data (if symbol provided) run concurrently
+            analyses = [
+                self.tokenomics_analyzer.analyze(project_data, project_name),
+                self.contract_auditor.audit(project_data),
+                self._analyze_team(project_data),
+            ]
             if symbol:
-                report.market = await self.market_analyzer.analyze(symbol)
-            
-            # Step 4: Smart contract audit (if address provided)
-            if contract_address:
-                security, audit_result = await self.contract_auditor.audit(project_data)
-                report.security = security
-            else:
-                # Analyze local smart contracts
-                security, audit_result = await self.contract_auditor.audit(project_data)
-                report.security = security
-            
-            # Step 5: Team analysis
-            report.team = await self._analyze_team(project_data)
-            
-            # Step 6: Calculate comprehensive risk score (basic engine)
-            report.risk = self.risk_engine.calculate(
-                tokenomics=report.tokenomics,
-                market=report.market,
-                security=report.security,
-                team=report.team
-            )
+                analyses.append(self.market_analyzer.analyze(symbol))
+            results = await asyncio.gather(*analyses)
+            report.tokenomics, (report.security, audit_result), report.team = results[:3]
+            if symbol:
+                report.market = results[3]
             
-            # Step 6b: Run Aladdin advanced analysis (enhanced metrics)
-            aladdin_report = await self._run_aladdin_analysis(
-                report.tokenomics,
-                report.market,
-                report.security,
-                report.team,
-                report.project_type.value
+            # Step 6: Basic risk score and Aladdin advanced analysis (Monte Carlo
+            # runs in a worker thread while the basic engine scores)
+            report.risk, aladdin_report = await asyncio.gather(
+                asyncio.to_thread(
+                    self.risk_engine.calculate,
+                    tokenomics=report.tokenomics,
+                    market=report.market,
+                    security=report.security,
+                    team=report.team
+                ),
+                self._run_aladdin_analysis(
+                    report.tokenomics,
+                    report.market,
+                    report.security,
+                    report.team,
+                    report.project_type.value
+                )
             )
             
             # Merge Aladdin results into risk metrics
@@ -540,39 +562,67 @@ class Oracle:
             elif path.suffix in [".md", ".txt"]:
                 data["documentation"].append({"path": str(path), "content": content})
         else:
-            # Directory analysis
-            for file_path in path.rglob("*"):
-                if file_path.is_file():
-                    data["files_count"] += 1
-                    
-                    # Skip node_modules, venv, etc.
-                    if any(x in str(file_path) for x in [
-                        "node_modules", "venv", ".git", "__pycache__", "dist", "build"
-                    ]):
-                        continue
-                    
-                    # Categorize files
-                    content = self._read_file_safe(file_path)
-                    file_info = {"path": str(file_path), "content": content}
-                    
-                    if file_path.suffix == ".sol":
-                        data["smart_contracts"].append(file_info)
-                    elif file_path.name.lower() in ["readme.md", "readme.txt"]:
-                        data["readme_content"] = content
-                    elif file_path.name.lower() in ["tokenomics.md", "whitepaper.md", "economics.md"]:
-                        data["tokenomics_files"].append(file_info)
-                    elif file_path.suffix in [".md", ".rst"]:
-                        data["documentation"].append(file_info)
-                    elif file_path.name in ["package.json", "hardhat.config.js", "truffle-config.js"]:
-                        data["config_files"].append(file_info)
-                        if file_path.name == "package.json" and content:
-                            try:
-                                data["package_info"] = json.loads(content)
-                            except json.JSONDecodeError:
-                                pass
+            # Directory analysis: walk once, then read only the files we use
+            files_count, candidates = await asyncio.to_thread(self._collect_files, path)
+            data["files_count"] = files_count
+            contents = await self._read_files([file_path for _, file_path in candidates])
+            
+            for (category, file_path), content in zip(candidates, contents):
+                file_info = {"path": str(file_path), "content": content}
+                
+                if category == "readme":
+                    data["readme_content"] = content
+                else:
+                    data[category].append(file_info)
+                
+                if file_path.name == "package.json" and content:
+                    try:
+                        data["package_info"] = json.loads(content)
+                    except json.JSONDecodeError:
+                        pass
         
         return data
     
+    def _categorize_file(self, file_path: Path) -> Optional[str]:
+        """Category of a project file in scan data, None if its content is not used"""
+        name = file_path.name.lower()
+        if file_path.suffix == ".sol":
+            return "smart_contracts"
+        if name in ["readme.md", "readme.txt"]:
+            return "readme"
+        if name in ["tokenomics.md", "whitepaper.md", "economics.md"]:
+            return "tokenomics_files"
+        if file_path.suffix in [".md", ".rst"]:
+            return "documentation"
+        if file_path.name in ["package.json", "hardhat.config.js", "truffle-config.js"]:
+            return "config_files"
+        return None
+    
+    def _collect_files(self, root: Path):
+        """Walk the project (skipping SKIP_DIRS); returns (files_count, [(category, path)])"""
+        files_count = 0
+        candidates = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in self.SKIP_DIRS)
+            for filename in sorted(filenames):
+                files_count += 1
+                file_path = Path(dirpath) / filename
+                category = self._categorize_file(file_path)
+                if category:
+                    candidates.append((category, file_path))
+        return files_count, candidates
+    
+    async def _read_files(self, paths: List[Path]) -> List[str]:
+        """Read files concurrently in a thread pool (order preserved)"""
+        if not paths:
+            return []
+        workers = self.config.get("analysis", {}).get("parallel_workers", 4)
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="oracle-read") as pool:
+            return await asyncio.gather(*(
+                loop.run_in_executor(pool, self._read_file_safe, file_path) for file_path in paths
+            ))
+    
     def _read_file_safe(self, path: Path, max_size: int = 1_000_000) -> str:
         """Safely read file content"""
         try:
@@ -783,14 +833,15 @@ Investment Recommendation: {risk.investment_recommendation.upper().replace('_',
         team_dict = asdict(team) if team else {}
         
         # Add missing fields for Aladdin
-        if "social_followers" not in team_dict:
+        if not team_dict.get("social_followers"):
             team_dict["social_followers"] = (
                 team_dict.get("twitter_followers", 0) +
                 team_dict.get("discord_members", 0)
             )
         
-        # Run Aladdin analysis
-        return self.aladdin_engine.analyze(
+        # Run Aladdin analysis (CPU-heavy Monte Carlo, off the event loop)
+        return await asyncio.to_thread(
+            self.aladdin_engine.analyze,
             tokenomics=tokenomics_dict,
             market=market_dict,
             security=security_dict,
@@ -12,8 +12,10 @@ Modern Portfolio Theory implementation for crypto:
 Based on Markowitz portfolio theory with crypto-specific adjustments.
 """
 
+import hashlib
 import numpy as np
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -54,6 +56,15 @@ class AllocationResult:
     risk_contribution: Dict[str, float] = field(default_factory=dict)
 
 
+@dataclass
+class CovarianceModel:
+    """Covariance estimate for one asset universe, factorized once"""
+    volatilities: np.ndarray
+    correlations: np.ndarray
+    cov: np.ndarray
+    inv: Optional[np.ndarray] = None  # None when the covariance is singular
+
+
 class PortfolioOptimizer:
     """
     Portfolio Optimization Engine
@@ -67,8 +78,17 @@ class PortfolioOptimizer:
     
     RISK_FREE_RATE = 0.05  # 5% annual (stablecoin yield)
     
+    TARGETS = ("max_sharpe", "min_volatility", "risk_parity")
+    
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
+        # Covariance models per asset universe and volatility/correlation estimate
+        self._models: "OrderedDict[tuple, CovarianceModel]" = OrderedDict()
+        self._models_size = self.config.get("covariance_cache_size", 32)
+        # Constant-correlation shrinkage intensity (0 = sample correlations)
+        self.shrinkage = self.config.get("covariance_shrinkage", 0.0)
+        # Frontier solver optimality tolerance
+        self.frontier_tol = self.config.get("frontier_tol", 1e-10)
     
     def optimize(
         self,
@@ -89,35 +109,59 @@ class PortfolioOptimizer:
         Returns:
             AllocationResult with optimal weights
         """
-        result = AllocationResult()
-        n = len(assets)
-        
-        if n == 0:
+        if len(assets) == 0:
             logger.warning("No assets provided for optimization")
-            return result
-        
-        # Build expected returns vector
-        expected_returns = np.array([a.expected_return for a in assets])
+            return AllocationResult()
         
-        # Build volatility vector
-        volatilities = np.array([a.volatility for a in assets])
+        model = self._covariance_model(assets, correlation_matrix)
+        return self._allocate(assets, model, target, risk_budget)
+    
+    def optimize_all(
+        self,
+        assets: List[Asset],
+        correlation_matrix: Optional[np.ndarray] = None,
+        risk_budget: Optional[float] = None,
+        targets: Tuple[str, ...] = TARGETS
+    ) -> Dict[str, AllocationResult]:
+        """
+        Optimize for several objectives from one covariance factorization.
         
-        # Build correlation matrix
-        if correlation_matrix is None:
-            correlation_matrix = self._default_correlation_matrix(n)
+        Returns:
+            {target: AllocationResult} for max_sharpe, min_volatility and
+            risk_parity by default
+        """
+        if len(assets) == 0:
+            logger.warning("No assets provided for optimization")
+            return {target: AllocationResult() for target in targets}
         
-        # Build covariance matrix
-        cov_matrix = self._build_covariance_matrix(volatilities, correlation_matrix)
+        model = self._covariance_model(assets, correlation_matrix)
+        return {
+            target: self._allocate(assets, model, target, risk_budget)
+            for target in targets
+        }
+    
+    def _allocate(
+        self,
+        assets: List[Asset],
+        model: CovarianceModel,
+        target: str,
+        risk_budget: Optional[float]
+    ) -> AllocationResult:
+        """Weights for one objective plus portfolio metrics"""
+        result = AllocationResult()
+        n = len(assets)
+        expected_returns = np.array([a.expected_return for a in assets])
+        cov_matrix = model.cov
         
         # Optimize based on target
         if target == "max_sharpe":
             weights = self._maximize_sharpe(
-                expected_returns, cov_matrix, assets, risk_budget
+                expected_returns, model, assets, risk_budget
             )
         elif target == "min_volatility":
-            weights = self._minimize_volatility(cov_matrix, assets)
+            weights = self._minimize_volatility(model, assets)
         elif target == "risk_parity":
-            weights = self._risk_parity(volatilities, correlation_matrix, assets)
+            weights = self._risk_parity(model.volatilities, model.correlations, assets)
         else:
             weights = self._equal_weight(n)
         
@@ -158,7 +202,7 @@ class PortfolioOptimizer:
         )
         
         logger.info(
-            f"Portfolio optimized: E(R)={port_return:.1%}, "
+            f"Portfolio optimized ({target}): E(R)={port_return:.1%}, "
             f"Vol={port_volatility:.1%}, Sharpe={sharpe:.2f}"
         )
         
@@ -168,11 +212,16 @@ class PortfolioOptimizer:
         self,
         assets: List[Asset],
         correlation_matrix: Optional[np.ndarray] = None,
-        n_points: int = 20
+        n_points: int = 20,
+        warm_start: bool = True
     ) -> List[Tuple[float, float, Dict[str, float]]]:
         """
         Calculate efficient frontier points.
         
+        Target returns are solved in increasing order; with warm_start each
+        solve starts from the previous point's weights, which are already
+        close to the next optimum.
+        
         Returns:
             List of (return, volatility, weights) tuples
         """
@@ -181,22 +230,19 @@ class PortfolioOptimizer:
             return []
         
         expected_returns = np.array([a.expected_return for a in assets])
-        volatilities = np.array([a.volatility for a in assets])
-        
-        if correlation_matrix is None:
-            correlation_matrix = self._default_correlation_matrix(n)
-        
-        cov_matrix = self._build_covariance_matrix(volatilities, correlation_matrix)
+        cov_matrix = self._covariance_model(assets, correlation_matrix).cov
         
         # Get return range
         min_ret = np.min(expected_returns)
         max_ret = np.max(expected_returns)
         
         frontier = []
+        weights = None
         
         for target_return in np.linspace(min_ret, max_ret, n_points):
             weights = self._minimize_volatility_for_return(
-                expected_returns, cov_matrix, target_return, assets
+                expected_returns, cov_matrix, target_return, assets,
+                initial=weights if warm_start else None
             )
             
             if weights is not None:
@@ -205,7 +251,7 @@ class PortfolioOptimizer:
                 frontier.append((float(target_return), float(port_vol), weight_dict))
         
         return frontier
-    
+
     def position_size(
         self,
         capital: float,
@@ -269,56 +315,114 @@ class PortfolioOptimizer:
         np.fill_diagonal(corr, 1.0)
         return corr
     
+    def _covariance_model(
+        self,
+        assets: List[Asset],
+        correlation_matrix: Optional[np.ndarray]
+    ) -> CovarianceModel:
+        """
+        Covariance matrix and its inverse for an asset universe.
+        
+        Cached per (symbols, volatilities, correlations, shrinkage), so repeated
+        optimize()/efficient_frontier() calls on the same estimate reuse one
+        factorization.
+        """
+        n = len(assets)
+        volatilities = np.array([a.volatility for a in assets], dtype=float)
+        if correlation_matrix is None:
+            correlations = self._default_correlation_matrix(n)
+        else:
+            correlations = np.asarray(correlation_matrix, dtype=float)
+        
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(volatilities.tobytes())
+        digest.update(np.ascontiguousarray(correlations).tobytes())
+        key = (tuple(a.symbol for a in assets), digest.hexdigest(), self.shrinkage)
+        
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            return model
+        
+        if self.shrinkage > 0:
+            correlations = self._shrink_correlations(correlations, self.shrinkage)
+        cov = self._build_covariance_matrix(volatilities, correlations)
+        model = CovarianceModel(
+            volatilities=volatilities,
+            correlations=correlations,
+            cov=cov,
+            inv=self._invert_covariance(cov)
+        )
+        
+        self._models[key] = model
+        if len(self._models) > self._models_size:
+            self._models.popitem(last=False)
+        return model
+    
+    def _shrink_correlations(self, correlations: np.ndarray, intensity: float) -> np.ndarray:
+        """Shrink towards the constant-correlation target (Ledoit-Wolf style)"""
+        n = len(correlations)
+        if n < 2:
+            return correlations
+        mean_corr = (correlations.sum() - np.trace(correlations)) / (n * (n - 1))
+        target = np.full((n, n), mean_corr)
+        np.fill_diagonal(target, 1.0)
+        return (1 - intensity) * correlations + intensity * target
+    
     def _build_covariance_matrix(
         self,
         volatilities: np.ndarray,
         correlations: np.ndarray
     ) -> np.ndarray:
         """Build covariance matrix from volatilities and correlations"""
-        n = len(volatilities)
-        cov = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(n):
-                cov[i, j] = correlations[i, j] * volatilities[i] * volatilities[j]
-        
-        return cov
+        return correlations * np.outer(volatilities, volatilities)
+    
+    def _invert_covariance(self, cov: np.ndarray) -> Optional[np.ndarray]:
+        """Inverse via Cholesky (falls back to LU for non-PD matrices)"""
+        try:
+            chol_inv = np.linalg.inv(np.linalg.cholesky(cov))
+            return chol_inv.T @ chol_inv
+        except np.linalg.LinAlgError:
+            pass
+        try:
+            return np.linalg.inv(cov)
+        except np.linalg.LinAlgError:
+            return None
     
     def _maximize_sharpe(
         self,
         returns: np.ndarray,
-        cov: np.ndarray,
+        model: CovarianceModel,
         assets: List[Asset],
         risk_budget: Optional[float]
     ) -> np.ndarray:
         """Find maximum Sharpe ratio portfolio (analytical solution)"""
         n = len(returns)
+        cov = model.cov
+        
+        if model.inv is None:
+            return self._equal_weight(n)
         
         # Excess returns
         excess = returns - self.RISK_FREE_RATE
         
-        try:
-            # Analytical solution: w* = Sigma^-1 * excess / (1' * Sigma^-1 * excess)
-            cov_inv = np.linalg.inv(cov)
-            weights = np.dot(cov_inv, excess)
-            
-            # Handle negative weights (go to constrained optimization)
-            if np.any(weights < 0):
-                weights = self._constrained_max_sharpe(returns, cov, assets)
-            else:
-                weights = weights / np.sum(weights)
-            
-            # Apply risk budget constraint
-            if risk_budget is not None:
-                port_vol = np.sqrt(np.dot(weights.T, np.dot(cov, weights)))
-                if port_vol > risk_budget:
-                    # Scale down weights
-                    scale = risk_budget / port_vol
-                    weights = weights * scale
-                    weights = weights / np.sum(weights)
+        # Analytical solution: w* = Sigma^-1 * excess / (1' * Sigma^-1 * excess)
+        weights = np.dot(model.inv, excess)
         
-        except np.linalg.LinAlgError:
-            weights = self._equal_weight(n)
+        # Handle negative weights (go to constrained optimization)
+        if np.any(weights < 0):
+            weights = self._constrained_max_sharpe(returns, cov, assets)
+        else:
+            weights = weights / np.sum(weights)
+        
+        # Apply risk budget constraint
+        if risk_budget is not None:
+            port_vol = np.sqrt(np.dot(weights.T, np.dot(cov, weights)))
+            if port_vol > risk_budget:
+                # Scale down weights
+                scale = risk_budget / port_vol
+                weights = weights * scale
+                weights = weights / np.sum(weights)
         
         return weights
     
@@ -341,15 +445,16 @@ class PortfolioOptimizer:
         
         for _ in range(iterations):
             # Calculate gradient of Sharpe ratio
+            cov_w = np.dot(cov, weights)
             port_ret = np.dot(weights, returns)
-            port_var = np.dot(weights.T, np.dot(cov, weights))
+            port_var = np.dot(weights, cov_w)
             port_vol = np.sqrt(port_var)
             
             excess = port_ret - self.RISK_FREE_RATE
             
             # Gradient of Sharpe ratio
             grad_ret = returns
-            grad_var = 2 * np.dot(cov, weights)
+            grad_var = 2 * cov_w
             
             gradient = (grad_ret * port_vol - excess * grad_var / (2 * port_vol)) / port_var
             
@@ -364,24 +469,23 @@ class PortfolioOptimizer:
     
     def _minimize_volatility(
         self,
-        cov: np.ndarray,
+        model: CovarianceModel,
         assets: List[Asset]
     ) -> np.ndarray:
         """Find minimum volatility portfolio"""
         n = len(assets)
         
-        try:
-            cov_inv = np.linalg.inv(cov)
-            ones = np.ones(n)
-            weights = np.dot(cov_inv, ones) / np.dot(ones, np.dot(cov_inv, ones))
-            
-            # Handle negative weights
-            if np.any(weights < 0):
-                weights = np.maximum(weights, 0)
-                weights = weights / np.sum(weights)
+        if model.inv is None:
+            return self._equal_weight(n)
         
-        except np.linalg.LinAlgError:
-            weights = self._equal_weight(n)
+        ones = np.ones(n)
+        inv_ones = np.dot(model.inv, ones)
+        weights = inv_ones / np.dot(ones, inv_ones)
+        
+        # Handle negative weights
+        if np.any(weights < 0):
+            weights = np.maximum(weights, 0)
+            weights = weights / np.sum(weights)
         
         return weights
     
@@ -390,35 +494,76 @@ class PortfolioOptimizer:
         returns: np.ndarray,
         cov: np.ndarray,
         target_return: float,
-        assets: List[Asset]
+        assets: List[Asset],
+        initial: Optional[np.ndarray] = None
     ) -> Optional[np.ndarray]:
-        """Find minimum volatility portfolio for target return"""
-        n = len(assets)
+        """
+        Find minimum volatility portfolio for target return.
         
-        # Simple iterative approach
-        weights = np.ones(n) / n
-        learning_rate = 0.01
-        iterations = 500
+        Long-only active-set solve of min w'Cw s.t. sum(w) = 1, E(R) = target.
+        A warm start (the previous frontier point) is shifted towards the
+        highest/lowest return asset until it meets the new target, so the
+        solve starts from that point's active set instead of from scratch.
+        """
+        n = len(assets)
+        lowest, highest = int(np.argmin(returns)), int(np.argmax(returns))
+        target_return = float(np.clip(target_return, returns[lowest], returns[highest]))
         
-        for _ in range(iterations):
-            # Current portfolio
-            port_ret = np.dot(weights, returns)
+        # Feasible start: blend the start portfolio with the extreme asset
+        if initial is None:
+            weights = np.zeros(n)
+            weights[lowest] = 1.0
+        else:
+            weights = initial.copy()
+        start_return = np.dot(weights, returns)
+        anchor = highest if target_return >= start_return else lowest
+        gap = returns[anchor] - start_return
+        blend = (target_return - start_return) / gap if gap != 0 else 0.0
+        weights *= 1 - blend
+        weights[anchor] += blend
+        
+        constraints = np.vstack([np.ones(n), returns])
+        bounds = np.array([1.0, target_return])
+        free = weights > 0
+        
+        for _ in range(10 * n + 10):
+            idx = np.flatnonzero(free)
+            k = len(idx)
             
-            # Gradient of volatility
-            grad_vol = np.dot(cov, weights) / np.sqrt(np.dot(weights.T, np.dot(cov, weights)))
+            # Equality-constrained optimum over the free assets (KKT system)
+            kkt = np.zeros((k + 2, k + 2))
+            kkt[:k, :k] = cov[np.ix_(idx, idx)]
+            kkt[:k, k:] = constraints[:, idx].T
+            kkt[k:, :k] = constraints[:, idx]
+            rhs = np.concatenate([np.zeros(k), bounds])
+            try:
+                solution = np.linalg.solve(kkt, rhs)
+            except np.linalg.LinAlgError:
+                # Free assets with equal returns make the system singular
+                solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+            optimum, multipliers = solution[:k], solution[k:]
             
-            # Penalty for return constraint
-            ret_penalty = 10.0 * (port_ret - target_return) * returns
+            current = weights[idx]
+            if np.any(optimum < -1e-12):
+                # Step to the first weight that hits zero and hold it there
+                shrinking = optimum < current
+                ratios = np.full(k, np.inf)
+                ratios[shrinking] = current[shrinking] / (current[shrinking] - optimum[shrinking])
+                blocking = int(np.argmin(ratios))
+                weights[idx] = current + min(1.0, ratios[blocking]) * (optimum - current)
+                weights[idx[blocking]] = 0.0
+                free[idx[blocking]] = False
+                continue
             
-            # Update
-            weights = weights - learning_rate * (grad_vol + ret_penalty)
+            weights[idx] = np.maximum(optimum, 0)
             
-            # Project to simplex
-            weights = np.maximum(weights, 0)
-            if np.sum(weights) > 0:
-                weights = weights / np.sum(weights)
-            else:
-                return None
+            # Release the held asset that would lower the variance the most
+            reduced = np.dot(cov[:, idx], weights[idx]) + np.dot(constraints.T, multipliers)
+            reduced[free] = np.inf
+            entering = int(np.argmin(reduced))
+            if reduced[entering] >= -self.frontier_tol:
+                break
+            free[entering] = True
         
         return weights
     
@@ -73,21 +73,43 @@ class ReportGenerator:
         self.config = config or ReportConfig()
         Path(self.config.output_dir).mkdir(parents=True, exist_ok=True)
     
+    # Format -> file extension
+    FORMATS = {
+        "html": "html",
+        "json": "json",
+        "text": "txt",
+        "markdown": "md",
+    }
+    
     def generate(
         self,
         report: OracleReport,
-        format: str = "html"  # html, json, text, pdf
+        format: str = "html"  # html, json, text, markdown
     ) -> str:
         """
-        Generate report in specified format.
+        Generate report in specified format and save it to output_dir.
         
         Args:
             report: OracleReport from Oracle analysis
-            format: Output format (html, json, text, pdf)
+            format: Output format (html, json, text, markdown)
         
         Returns:
-            Path to generated report or report content
+            Path to generated report
         """
+        content = self.render(report, format)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"oracle_report_{report.project_name}_{timestamp}.{self.FORMATS[format]}"
+        filepath = Path(self.config.output_dir) / filename
+        
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(content)
+        
+        logger.info(f"{format.upper()} report generated: {filepath}")
+        return str(filepath)
+    
+    def render(self, report: OracleReport, format: str = "html") -> str:
+        """Render report content in specified format (no file written)"""
         if format == "html":
             return self._generate_html(report)
         elif format == "json":
@@ -99,14 +121,15 @@ class ReportGenerator:
         else:
             raise ValueError(f"Unsupported format: {format}")
     
+    @staticmethod
+    def _level(value) -> str:
+        """Risk level / project type as plain string (reports carry enums)"""
+        return getattr(value, "value", value) or ""
+    
     def _generate_html(self, report: OracleReport) -> str:
         """Generate HTML report"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"oracle_report_{report.project_name}_{timestamp}.html"
-        filepath = Path(self.config.output_dir) / filename
-        
         # Get colors
-        risk_color = self.RISK_COLORS.get(report.risk.risk_level, "#6b7280")
+        risk_color = self.RISK_COLORS.get(self._level(report.risk.risk_level), "#6b7280")
         score_color = self._get_score_color(report.risk.overall_score)
         
         # Build HTML
@@ -372,7 +395,7 @@ class ReportGenerator:
                 <div class="score-label">Overall Score</div>
             </div>
             <div>
-                <div class="risk-badge">{report.risk.risk_level.upper()} RISK</div>
+                <div class="risk-badge">{self._level(report.risk.risk_level).upper()} RISK</div>
                 {self._recommendation_html(report.risk.investment_recommendation)}
             </div>
         </div>
@@ -404,12 +427,7 @@ class ReportGenerator:
 </body>
 </html>"""
         
-        # Save file
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        
-        logger.info(f"HTML report generated: {filepath}")
-        return str(filepath)
+        return html_content
     
     def _recommendation_html(self, rec: str) -> str:
         """Generate recommendation badge HTML"""
@@ -625,16 +643,12 @@ class ReportGenerator:
     
     def _generate_json(self, report: OracleReport) -> str:
         """Generate JSON report"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"oracle_report_{report.project_name}_{timestamp}.json"
-        filepath = Path(self.config.output_dir) / filename
-        
         # Convert to dict
         data = {
             "report_id": report.report_id,
             "project_name": report.project_name,
             "project_path": report.project_path,
-            "project_type": report.project_type,
+            "project_type": self._level(report.project_type),
             "generated_at": report.generated_at,
             "analysis_duration_seconds": report.analysis_duration_seconds,
             "executive_summary": report.executive_summary,
@@ -644,12 +658,9 @@ class ReportGenerator:
             "team": asdict(report.team),
             "risk": asdict(report.risk),
         }
+        data["risk"]["risk_level"] = self._level(report.risk.risk_level)
         
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, default=str)
-        
-        logger.info(f"JSON report generated: {filepath}")
-        return str(filepath)
+        return json.dumps(data, indent=2, default=str)
     
     def _generate_text(self, report: OracleReport) -> str:
         """Generate plain text report"""
@@ -665,7 +676,7 @@ class ReportGenerator:
             "OVERALL ASSESSMENT",
             "=" * 60,
             f"Overall Score: {report.risk.overall_score:.0f}/100",
-            f"Risk Level: {report.risk.risk_level.upper()}",
+            f"Risk Level: {self._level(report.risk.risk_level).upper()}",
             f"Recommendation: {report.risk.investment_recommendation.upper()}",
             "",
             "EXECUTIVE SUMMARY:",
@@ -725,17 +736,7 @@ class ReportGenerator:
             "=" * 60,
         ])
         
-        content = "\n".join(lines)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"oracle_report_{report.project_name}_{timestamp}.txt"
-        filepath = Path(self.config.output_dir) / filename
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
-        
-        logger.info(f"Text report generated: {filepath}")
-        return str(filepath)
+        return "\n".join(lines)
     
     def _generate_markdown(self, report: OracleReport) -> str:
         """Generate Markdown report"""
@@ -753,7 +754,7 @@ class ReportGenerator:
 | Metric | Value |
 |--------|-------|
 | **Overall Score** | **{report.risk.overall_score:.0f}/100** |
-| **Risk Level** | {report.risk.risk_level.upper()} |
+| **Risk Level** | {self._level(report.risk.risk_level).upper()} |
 | **Recommendation** | {report.risk.investment_recommendation.upper()} |
 
 ### Executive Summary
@@ -829,15 +830,7 @@ class ReportGenerator:
 *🔮 Oracle Financial Intelligence System*
 """
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"oracle_report_{report.project_name}_{timestamp}.md"
-        filepath = Path(self.config.output_dir) / filename
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(md)
-        
-        logger.info(f"Markdown report generated: {filepath}")
-        return str(filepath)
+        return md
     
     def _get_score_color(self, score: float) -> str:
         """Get color for score value"""
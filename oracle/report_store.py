@@ -0,0 +1,209 @@
+"""
+Oracle Report Store
+===================
+
+Persistent, content-addressed storage for analysis reports:
+- Reports are keyed by project content hash + analyzer versions, so an
+  unchanged project is never analyzed twice (across restarts and processes)
+- Rendered formats (html, markdown, json, text) are produced on first
+  request and stored next to the report
+- In-flight analyses are deduplicated: submitting the same project while
+  it is being analyzed attaches to the running job
+
+Layout:
+    <root>/<report_id>/report.json      OracleReport.to_json()
+    <root>/<report_id>/summary.json     listing data
+    <root>/<report_id>/rendered.<ext>   rendered formats
+    <root>/keys/<content_key>           report_id for a content key
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from oracle.core import Oracle, OracleReport
+
+logger = logging.getLogger("oracle.store")
+
+
+def analyzer_versions() -> Dict[str, str]:
+    """Versions that invalidate stored reports when analysis logic changes"""
+    from oracle.smart_contract_auditor import SmartContractAuditor
+    return {
+        "oracle": OracleReport.oracle_version,
+        "auditor": SmartContractAuditor.rules_version(),
+    }
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class ReportStore:
+    """
+    On-disk report store shared by every Oracle process using the same root.
+
+    Usage:
+        store = ReportStore(".oracle_cache/reports")
+        report = await store.analyze(oracle, "/path/to/project")
+        html = store.render(report.report_id, "html")
+    """
+
+    def __init__(self, root: Union[str, Path], generator=None):
+        self.root = Path(root)
+        (self.root / "keys").mkdir(parents=True, exist_ok=True)
+        self._generator = generator
+        self._reports: Dict[str, OracleReport] = {}
+        self._jobs: Dict[str, asyncio.Task] = {}
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from oracle.report_generator import ReportGenerator
+            self._generator = ReportGenerator()
+        return self._generator
+
+    # ── Content keys ──
+
+    async def content_key(self, oracle: Oracle, project_path: str) -> str:
+        """Hash of everything the analysis reads, plus analyzer versions"""
+        path = Path(project_path)
+        if path.is_file():
+            paths = [path]
+        else:
+            _, candidates = await asyncio.to_thread(oracle._collect_files, path)
+            paths = [file_path for _, file_path in candidates]
+        contents = await oracle._read_files(paths)
+
+        digest = hashlib.sha256(json.dumps(analyzer_versions(), sort_keys=True).encode())
+        for file_path, content in zip(paths, contents):
+            digest.update(str(file_path.relative_to(path) if path.is_dir() else file_path.name).encode())
+            digest.update(b"\0")
+            digest.update(hashlib.sha256(content.encode()).digest())
+        return digest.hexdigest()[:32]
+
+    def find(self, key: str) -> Optional[str]:
+        """report_id stored for a content key"""
+        try:
+            report_id = (self.root / "keys" / key).read_text().strip()
+        except OSError:
+            return None
+        return report_id if (self.root / report_id / "report.json").exists() else None
+
+    # ── Reports ──
+
+    def save(self, report: OracleReport, key: Optional[str] = None) -> None:
+        report_dir = self.root / report.report_id
+        report_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(report_dir / "report.json", report.to_json())
+        _write_atomic(report_dir / "summary.json", json.dumps({
+            "report_id": report.report_id,
+            "project_name": report.project_name,
+            "generated_at": report.generated_at,
+            "overall_score": report.risk.overall_score,
+            "risk_level": report.risk.risk_level.value,
+        }))
+        if key:
+            _write_atomic(self.root / "keys" / key, report.report_id)
+        self._reports[report.report_id] = report
+
+    def load(self, report_id: str) -> Optional[OracleReport]:
+        report = self._reports.get(report_id)
+        if report is None:
+            try:
+                data = json.loads((self.root / report_id / "report.json").read_text())
+            except (OSError, ValueError):
+                return None
+            report = self._reports[report_id] = OracleReport.from_dict(data)
+        return report
+
+    def list(self) -> List[Dict[str, Any]]:
+        summaries = []
+        for summary in self.root.glob("*/summary.json"):
+            try:
+                summaries.append(json.loads(summary.read_text()))
+            except (OSError, ValueError):
+                continue
+        return sorted(summaries, key=lambda s: s.get("generated_at", ""), reverse=True)
+
+    def delete(self, report_id: str) -> bool:
+        report_dir = self.root / report_id
+        if not (report_dir / "report.json").exists():
+            return False
+        self._reports.pop(report_id, None)
+        for key_file in (self.root / "keys").iterdir():
+            try:
+                if key_file.read_text().strip() == report_id:
+                    key_file.unlink()
+            except OSError:
+                continue
+        shutil.rmtree(report_dir, ignore_errors=True)
+        return True
+
+    def render(self, report_id: str, format: str = "html") -> Optional[str]:
+        """Rendered report, generated once and then served from disk"""
+        ext = self.generator.FORMATS.get(format)
+        if ext is None:
+            raise ValueError(f"Unsupported format: {format}")
+        path = self.root / report_id / f"rendered.{ext}"
+        try:
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            pass
+        report = self.load(report_id)
+        if report is None:
+            return None
+        content = self.generator.render(report, format)
+        _write_atomic(path, content)
+        return content
+
+    # ── Analysis jobs ──
+
+    async def submit(self, oracle: Oracle, project_path: str) -> str:
+        """
+        Start (or join) analysis of a project in the background.
+
+        Returns the job id (content key); the report is available through
+        find(job_id) once job_status() reports "completed".
+        """
+        key = await self.content_key(oracle, project_path)
+        job = self._jobs.get(key)
+        if (job is None or job.done()) and self.find(key) is None:
+            self._jobs[key] = asyncio.create_task(self._run(oracle, project_path, key))
+        return key
+
+    async def analyze(self, oracle: Oracle, project_path: str) -> OracleReport:
+        """Stored report for the project's current content, analyzing it if needed"""
+        key = await self.submit(oracle, project_path)
+        job = self._jobs.get(key)
+        if job is not None:
+            return await asyncio.shield(job)
+        return self.load(self.find(key))
+
+    def job_status(self, key: str) -> Dict[str, Any]:
+        job = self._jobs.get(key)
+        if job is not None and not job.done():
+            return {"job_id": key, "status": "running"}
+        report_id = self.find(key)
+        if report_id:
+            return {"job_id": key, "status": "completed", "report_id": report_id}
+        return {"job_id": key, "status": "failed" if job is not None else "unknown"}
+
+    async def _run(self, oracle: Oracle, project_path: str, key: str) -> OracleReport:
+        try:
+            report = await oracle.analyze_project(project_path)
+            failed = any(flag.startswith("Analysis error") for flag in report.risk.red_flags)
+            # Failed analyses are kept for inspection but never served for the content key
+            await asyncio.to_thread(self.save, report, None if failed else key)
+            return report
+        finally:
+            # Stored reports are found by key; only failed jobs stay for job_status()
+            if self.find(key):
+                self._jobs.pop(key, None)
@@ -16,9 +16,13 @@ Supports:
 """
 
 import re
+import json
+import asyncio
+import hashlib
 import logging
+from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 
 from oracle.core import SecurityData
@@ -74,6 +78,13 @@ class AuditResult:
     code_quality_score: float = 0.0
 
 
+@dataclass
+class FileAudit:
+    """Audit of a single file's content (cached by content hash)"""
+    findings: List[Tuple[str, int]] = field(default_factory=list)  # (vulnerability type, line)
+    flags: List[str] = field(default_factory=list)  # AuditResult/SecurityData flags found in the file
+
+
 class SmartContractAuditor:
     """
     Automated Smart Contract Security Auditor
@@ -279,8 +290,84 @@ class SmartContractAuditor:
         ],
     }
     
-    def __init__(self, config: Optional[Dict] = None):
+    # Per-file flags not tracked on AuditResult
+    CONTRACT_FLAGS = {
+        "has_mint_function": r"function\s+mint\s*\(",
+        "has_blacklist": r"blacklist|blocklist|banned|_isBlacklisted",
+        "has_upgradeable": r"Upgradeable|Proxy|UUPS|TransparentProxy|implementation",
+    }
+    
+    def __init__(self, config: Optional[Dict] = None, cache_dir: Optional[Path] = None):
         self.config = config or {}
+        # Per-file results keyed by content hash + rules version; optionally persisted
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._file_cache: Dict[str, FileAudit] = {}
+        self._rules_version = self.rules_version()
+        self.cache_hits = 0
+    
+    @classmethod
+    def rules_version(cls) -> str:
+        """Hash of the detection rules - cached file audits are invalid once rules change"""
+        rules = json.dumps(
+            [cls.VULNERABILITY_PATTERNS, cls.SECURITY_FEATURES, cls.CONTRACT_FLAGS],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(rules.encode()).hexdigest()[:12]
+    
+    def audit_file(self, code: str) -> FileAudit:
+        """Audit one file's content, reusing a previous result for identical content"""
+        key = f"{self._rules_version}-{hashlib.sha256(code.encode()).hexdigest()}"
+        cached = self._file_cache.get(key) or self._load_file_audit(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self._file_cache[key] = cached
+            return cached
+        
+        findings = []
+        for vuln_type, vuln_config in self.VULNERABILITY_PATTERNS.items():
+            for pattern in vuln_config["patterns"]:
+                for match in re.finditer(pattern, code, re.IGNORECASE | re.MULTILINE):
+                    findings.append((vuln_type, code.count('\n', 0, match.start()) + 1))
+        
+        scratch = AuditResult()
+        self._detect_security_features(code, scratch)
+        self._detect_risky_patterns(code, scratch)
+        flags = [name for name, value in asdict(scratch).items() if value is True]
+        flags += [name for name, pattern in self.CONTRACT_FLAGS.items() if re.search(pattern, code, re.IGNORECASE)]
+        
+        file_audit = FileAudit(findings=findings, flags=flags)
+        self._file_cache[key] = file_audit
+        self._store_file_audit(key, file_audit)
+        return file_audit
+    
+    def _load_file_audit(self, key: str) -> Optional[FileAudit]:
+        if self.cache_dir is None:
+            return None
+        try:
+            data = json.loads((self.cache_dir / f"{key}.json").read_text())
+            return FileAudit(findings=[tuple(f) for f in data["findings"]], flags=data["flags"])
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _store_file_audit(self, key: str, file_audit: FileAudit) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / f"{key}.json").write_text(json.dumps(asdict(file_audit)))
+        except OSError as e:
+            logger.debug(f"Could not persist file audit: {e}")
+    
+    def _vulnerability(self, vuln_type: str, location: str) -> Vulnerability:
+        vuln_config = self.VULNERABILITY_PATTERNS[vuln_type]
+        return Vulnerability(
+            title=vuln_config["title"],
+            severity=vuln_config["severity"],
+            description=vuln_config["description"],
+            location=location,
+            recommendation=vuln_config["recommendation"],
+            cwe_id=vuln_config.get("cwe")
+        )
     
     async def audit(self, project_data: Dict[str, Any]) -> Tuple[SecurityData, AuditResult]:
         """
@@ -304,23 +391,20 @@ class SmartContractAuditor:
         
         logger.info(f"Auditing {len(contracts)} smart contracts")
         
-        # Analyze each contract
-        for contract in contracts:
-            file_path = contract.get("path", "unknown")
-            code = contract.get("content", "")
-            
-            if not code:
-                continue
-            
-            # Detect vulnerabilities
-            vulns = self._detect_vulnerabilities(code, file_path)
-            result.vulnerabilities.extend(vulns)
-            
-            # Detect security features
-            self._detect_security_features(code, result)
-            
-            # Check for risky patterns
-            self._detect_risky_patterns(code, result)
+        # Regex scanning is CPU-bound: run it off the event loop
+        file_audits = await asyncio.to_thread(
+            lambda: [(c.get("path", "unknown"), self.audit_file(c["content"])) for c in contracts if c.get("content")]
+        )
+        
+        contract_flags = set()
+        for file_path, file_audit in file_audits:
+            for vuln_type, line_num in file_audit.findings:
+                result.vulnerabilities.append(self._vulnerability(vuln_type, f"{file_path}:{line_num}"))
+            for flag in file_audit.flags:
+                if flag in self.CONTRACT_FLAGS:
+                    contract_flags.add(flag)
+                else:
+                    setattr(result, flag, True)
         
         # Count by severity
         for vuln in result.vulnerabilities:
@@ -346,10 +430,10 @@ class SmartContractAuditor:
         security.high_issues = result.high_count
         security.medium_issues = result.medium_count
         security.has_reentrancy_guard = result.has_reentrancy_guard
-        security.has_mint_function = self._check_mint_function(contracts)
-        security.has_blacklist = self._check_blacklist(contracts)
-        security.has_pause = result.has_pausable
-        security.upgradeable = self._check_upgradeable(contracts)
+        security.has_mint_function = "has_mint_function" in contract_flags
+        security.has_blacklist = "has_blacklist" in contract_flags
+        security.has_pausable = result.has_pausable
+        security.has_upgradeable = "has_upgradeable" in contract_flags
         security.security_score = result.security_score
         
         logger.info(
@@ -365,27 +449,10 @@ class SmartContractAuditor:
         file_path: str
     ) -> List[Vulnerability]:
         """Detect vulnerabilities using pattern matching"""
-        vulnerabilities = []
-        
-        for vuln_type, vuln_config in self.VULNERABILITY_PATTERNS.items():
-            for pattern in vuln_config["patterns"]:
-                matches = re.finditer(pattern, code, re.IGNORECASE | re.MULTILINE)
-                
-                for match in matches:
-                    # Calculate line number
-                    line_num = code[:match.start()].count('\n') + 1
-                    
-                    vuln = Vulnerability(
-                        title=vuln_config["title"],
-                        severity=vuln_config["severity"],
-                        description=vuln_config["description"],
-                        location=f"{file_path}:{line_num}",
-                        recommendation=vuln_config["recommendation"],
-                        cwe_id=vuln_config.get("cwe")
-                    )
-                    vulnerabilities.append(vuln)
-        
-        return vulnerabilities
+        return [
+            self._vulnerability(vuln_type, f"{file_path}:{line_num}")
+            for vuln_type, line_num in self.audit_file(code).findings
+        ]
     
     def _detect_security_features(self, code: str, result: AuditResult):
         """Detect security features in code"""
@@ -474,34 +541,6 @@ class SmartContractAuditor:
             score -= 5
         
         return max(0, min(100, score))
-    
-    def _check_mint_function(self, contracts: List[Dict]) -> bool:
-        """Check if any contract has mint function"""
-        for contract in contracts:
-            code = contract.get("content", "")
-            if re.search(r"function\s+mint\s*\(", code, re.IGNORECASE):
-                return True
-        return False
-    
-    def _check_blacklist(self, contracts: List[Dict]) -> bool:
-        """Check if any contract has blacklist functionality"""
-        for contract in contracts:
-            code = contract.get("content", "")
-            if re.search(r"blacklist|blocklist|banned|_isBlacklisted", code, re.IGNORECASE):
-                return True
-        return False
-    
-    def _check_upgradeable(self, contracts: List[Dict]) -> bool:
-        """Check if contract is upgradeable"""
-        for contract in contracts:
-            code = contract.get("content", "")
-            if re.search(
-                r"Upgradeable|Proxy|UUPS|TransparentProxy|implementation",
-                code,
-                re.IGNORECASE
-            ):
-                return True
-        return False
 
 
 async def test():
@@ -569,5 +608,4 @@ contract Token is Ownable, ReentrancyGuard {
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(test())
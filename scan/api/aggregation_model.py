@@ -49,6 +49,10 @@ _futures_1m_bars = {}
 _spot_tf_cache = {}
 _futures_tf_cache = {}
 
+# Гранулярность кеша TF результатов (мс): aggregate_1m_bars_to_tf отдаёт одно и то же
+# значение в пределах окна (используется SnapshotRows для пересчёта строк)
+TF_CACHE_MS = 5000
+
 # Redis keys для персистентности
 REDIS_KEY_PREFIX_SPOT = "bars:spot:"
 REDIS_KEY_PREFIX_FUTURES = "bars:futures:"
@@ -319,7 +323,7 @@ def aggregate_1m_bars_to_tf(symbol: str, current_ts_ms: int, timeframe: str, mar
     
     # ОПТИМИЗАЦІЯ: Кеш на 5 секунд (замість 60с) для більш реального оновлення vDelta
     # Кешуємо по 5-секундних інтервалах для балансу CPU vs актуальність
-    current_5sec = (current_ts_ms // 5000) * 5000
+    current_5sec = (current_ts_ms // TF_CACHE_MS) * TF_CACHE_MS
     
     # Проверяем кеш
     if symbol in cache_dict and timeframe in cache_dict[symbol]:
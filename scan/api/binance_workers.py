@@ -11,6 +11,7 @@ import logging
 import websockets
 import aiohttp
 import random
+import time
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from channels.layers import get_channel_layer
@@ -28,6 +29,7 @@ from .aggregation_model import (
     add_kline_to_bars,
     fill_missing_bars_from_klines,
 )
+from .symbol_state import SnapshotRows, SymbolStore
 
 # Server-side formatters for performance optimization  
 try:
@@ -48,9 +50,9 @@ except Exception:
     ScreenerSnapshot = None
 
 
-# Глобальное хранилище данных для spot и futures
-_spot_data: Dict[str, Dict] = {}
-_futures_data: Dict[str, Dict] = {}
+# Глобальное хранилище данных для spot и futures (SymbolState на символ + dirty-множество)
+_spot_data = SymbolStore()
+_futures_data = SymbolStore()
 
 # Интервалы для kline
 KLINE_INTERVALS = ['1m', '3m', '5m', '15m', '30m', '1h', '4h', '8h', '1d']
@@ -425,6 +427,7 @@ class BinanceSpotWorker:
         self.channel_layer = get_channel_layer()
         self.group_name = 'screener_spot'
         self.symbols: List[str] = []  # Будет загружено асинхронно в run()
+        self._rows = SnapshotRows(_spot_data)
         self.open_interest_cache: Dict[str, float] = {}
         self._warmup_done = False
     
@@ -633,9 +636,6 @@ class BinanceSpotWorker:
         """
         global _spot_data
         
-        if symbol not in _spot_data:
-            _spot_data[symbol] = {}
-        
         price = float(data.get('p', 0))
         quantity = float(data.get('q', 0))
         is_buyer_maker = data.get('m', False)  # True = продажа (maker), False = покупка (taker)
@@ -674,27 +674,17 @@ class BinanceSpotWorker:
             logger.info(f"[TIME DIAG] {symbol} event_time_ms={event_time_ms}, event_dt={event_dt.isoformat()}, now_dt={now_dt.isoformat()}, diff_sec={(now_dt - event_dt).total_seconds()}")
         
         # Храним только базовую информацию для совместимости (ticks, last_price)
-        if 'aggTrade' not in _spot_data[symbol]:
-            _spot_data[symbol]['aggTrade'] = {
-                'ticks': 0,
-                'last_price': price,
-            }
-        
-        _spot_data[symbol]['aggTrade']['ticks'] += 1
-        _spot_data[symbol]['aggTrade']['last_price'] = price
-        _spot_data[symbol]['aggTrade']['last_update'] = datetime.fromtimestamp(event_time_ms / 1000, tz=timezone.utc).isoformat()
+        state = _spot_data.state(symbol)
+        state.ticks += 1
+        state.last_price = price
+        state.trade_ts_ms = event_time_ms
+        _spot_data.mark(symbol)
 
     
     async def process_kline(self, symbol: str, interval: str, data: dict):
         """Обрабатывает kline для volatility, volume, ticks, change."""
         global _spot_data
         
-        if symbol not in _spot_data:
-            _spot_data[symbol] = {}
-        
-        if 'kline' not in _spot_data[symbol]:
-            _spot_data[symbol]['kline'] = {}
-        
         k = data.get('k', {})
         if not k:
             return
@@ -713,7 +703,8 @@ class BinanceSpotWorker:
             'last_update': datetime.now(timezone.utc).isoformat(),
         }
         
-        _spot_data[symbol]['kline'][interval] = kline_entry
+        _spot_data.state(symbol).klines[interval] = kline_entry
+        _spot_data.mark(symbol)
 
     async def _fetch_recent_klines_spot(self, symbol: str, interval: str, limit: int = 3):
         """Fetch recent klines for spot market via REST as a fallback when windows are empty."""
@@ -755,62 +746,146 @@ class BinanceSpotWorker:
         """
         global _spot_data
         
-        if symbol not in _spot_data:
-            _spot_data[symbol] = {}
-        
         price = float(data.get('c', 0))
         if price > 0:  # Только если цена валидная
-            ticker_key = 'ticker' if not interval else f'ticker_{interval}'
-            # Для основного ticker сохраняем change_24h, для остальных - change
-            change_key = 'change_24h' if not interval else 'change'
-            _spot_data[symbol][ticker_key] = {
-                'price': price,  # Last price (c)
-                'open': float(data.get('o', 0)),  # Open price (o)
-                'high': float(data.get('h', 0)),  # High price (h)
-                'low': float(data.get('l', 0)),  # Low price (l)
-                change_key: float(data.get('P', 0)),  # Price change percent (P)
-                'change': float(data.get('P', 0)),  # Также сохраняем как change для совместимости
-                'volume': float(data.get('v', 0)),  # Base asset volume (v)
-                'quote_volume': float(data.get('q', 0)),  # Quote asset volume (q)
-                'interval': interval,  # Сохраняем интервал для идентификации
-                'last_update': datetime.now(timezone.utc).isoformat(),
-            }
+            state = _spot_data.state(symbol)
+            if interval:
+                # ticker_1h/4h/1d в snapshot не используются - храним как есть
+                state.interval_tickers[interval] = {
+                    'price': price,
+                    'open': float(data.get('o', 0)),
+                    'high': float(data.get('h', 0)),
+                    'low': float(data.get('l', 0)),
+                    'change': float(data.get('P', 0)),
+                    'volume': float(data.get('v', 0)),
+                    'quote_volume': float(data.get('q', 0)),
+                    'interval': interval,
+                    'last_update': datetime.now(timezone.utc).isoformat(),
+                }
+                return
+            state.price = price  # Last price (c)
+            state.open = float(data.get('o', 0))  # Open price (o)
+            state.high = float(data.get('h', 0))  # High price (h)
+            state.low = float(data.get('l', 0))  # Low price (l)
+            state.change_24h = float(data.get('P', 0))  # Price change percent (P)
+            state.volume = float(data.get('v', 0))  # Base asset volume (v)
+            state.quote_volume = float(data.get('q', 0))  # Quote asset volume (q)
+            state.ticker_ts = time.time()
+            _spot_data.mark(symbol)
     
     async def process_book_ticker(self, symbol: str, data: dict):
         """Обрабатывает bookTicker для bid/ask, spread."""
         global _spot_data
         
-        if symbol not in _spot_data:
-            _spot_data[symbol] = {}
-        
-        bid_price = float(data.get('b', 0))
-        ask_price = float(data.get('a', 0))
-        spread = ask_price - bid_price if bid_price > 0 and ask_price > 0 else 0
-        
-        _spot_data[symbol]['bookTicker'] = {
-            'bid_price': bid_price,
-            'bid_qty': float(data.get('B', 0)),
-            'ask_price': ask_price,
-            'ask_qty': float(data.get('A', 0)),
-            'spread': spread,
-            'last_update': datetime.now(timezone.utc).isoformat(),
-        }
+        # bookTicker не входит в строки snapshot - символ не помечается dirty
+        state = _spot_data.state(symbol)
+        state.bid_price = float(data.get('b', 0))
+        state.bid_qty = float(data.get('B', 0))
+        state.ask_price = float(data.get('a', 0))
+        state.ask_qty = float(data.get('A', 0))
+        state.book_ts = time.time()
     
     async def process_depth(self, symbol: str, data: dict):
         """Обрабатывает depth10 для стакана."""
         global _spot_data
         
-        if symbol not in _spot_data:
-            _spot_data[symbol] = {}
+        state = _spot_data.state(symbol)
+        state.bids = [[float(b[0]), float(b[1])] for b in data.get('bids', [])]
+        state.asks = [[float(a[0]), float(a[1])] for a in data.get('asks', [])]
+        state.depth_ts = time.time()
+    
+    def _symbol_set(self) -> set:
+        """self.symbols как set (пересоздаётся при смене списка)."""
+        if getattr(self, '_symbols_key', None) is not self.symbols:
+            self._symbols_key = self.symbols
+            self._symbols_lookup = set(self.symbols)
+        return self._symbols_lookup
+    
+    def _build_row(self, symbol: str, state, now_ms: int) -> Optional[dict]:
+        """Строка snapshot для символа (None - нет цены)."""
+        # Пропускаем символы без ticker данных (нет цены)
+        if not state.has_ticker:
+            return None
+        
+        klines = state.klines
+        current_price = state.price
+        
+        # Формируем snapshot для символа
+        row_data = {
+            'symbol': symbol,
+            'price': current_price,
+            'change_24h': state.change_24h,
+            'volume_24h': state.quote_volume,
+            'ticks_1m': state.ticks,
+        }
+        
+        # НОВАЯ АРХИТЕКТУРА: все TF данные из агрегированных 1m баров
+        # Для каждого TF вызываем aggregate_1m_bars_to_tf()
+        for interval in KLINE_INTERVALS:
+            # Получаем агрегированные данные из 1m баров
+            tf_data = aggregate_1m_bars_to_tf(symbol, now_ms, interval, market_type='spot')
+            
+            if tf_data and tf_data.get('bars_count', 0) > 0:
+                # Данные есть - используем их
+                row_data[f'vdelta_{interval}'] = tf_data['vdelta']
+                row_data[f'volume_{interval}'] = tf_data['volume']
+                row_data[f'change_{interval}'] = tf_data['change_pct']
+                row_data[f'ticks_{interval}'] = tf_data['trades']
+                
+                # Volatility из high/low 1m баров
+                # Для этого нужно дополнительно получить high/low
+                # Пока используем 0 (можно доработать в aggregation_model)
+                row_data[f'volatility_{interval}'] = 0.0
+            else:
+                # Fallback на kline данные от Binance (если есть)
+                if interval in klines:
+                    kline = klines[interval]
+                    open_price = kline.get('open', 0)
+                    close_price = kline.get('close', 0)
+                    high = kline.get('high', 0)
+                    low = kline.get('low', 0)
+                    
+                    if open_price > 0:
+                        row_data[f'volatility_{interval}'] = ((high - low) / open_price) * 100
+                        row_data[f'change_{interval}'] = ((close_price - open_price) / open_price) * 100
+                    else:
+                        row_data[f'volatility_{interval}'] = 0.0
+                        row_data[f'change_{interval}'] = 0.0
+                    
+                    row_data[f'volume_{interval}'] = kline.get('quote_volume', 0)
+                    row_data[f'ticks_{interval}'] = kline.get('trades', 0)
+                    row_data[f'vdelta_{interval}'] = 0  # kline не имеет vdelta
+                else:
+                    # Нет данных - нули
+                    row_data[f'volatility_{interval}'] = 0.0
+                    row_data[f'change_{interval}'] = 0.0
+                    row_data[f'volume_{interval}'] = 0.0
+                    row_data[f'ticks_{interval}'] = 0
+                    row_data[f'vdelta_{interval}'] = 0
+        
+        # Spot рынки: используем 24h volume как метрику ликвидности
+        spot_volume = state.quote_volume
+        row_data['open_interest'] = spot_volume
+        row_data['funding_rate'] = 0.0  # Spot не имеет funding rate
+        
+        # Volume change для всех таймфреймов
+        prev_volume = state.volume_previous if state.volume_previous is not None else spot_volume
+        if prev_volume > 0:
+            volume_change = ((spot_volume - prev_volume) / prev_volume) * 100
+        else:
+            volume_change = 0.0
         
-        bids = [[float(b[0]), float(b[1])] for b in data.get('bids', [])]
-        asks = [[float(a[0]), float(a[1])] for a in data.get('asks', [])]
+        state.volume_previous = spot_volume
         
-        _spot_data[symbol]['depth'] = {
-            'bids': bids,
-            'asks': asks,
-            'last_update': datetime.now(timezone.utc).isoformat(),
-        }
+        for interval in KLINE_INTERVALS:
+            row_data[f'oi_change_{interval}'] = volume_change
+        
+        # Timestamp
+        row_data['timestamp'] = state.trade_last_update or datetime.now(timezone.utc).isoformat()
+        row_data['ts'] = row_data['timestamp']
+        
+        # Send only raw fields; formatting happens client-side to keep payload small
+        return _project_row_for_client(row_data)
     
     async def send_snapshot(self):
         """Собирает snapshot и отправляет через Channels group."""
@@ -818,117 +893,21 @@ class BinanceSpotWorker:
         
         # Ждем первого сообщения от Binance перед отправкой снапшотов
         if not self._warmup_done:
-            has_ticker = any(data.get('ticker') for data in _spot_data.values())
-            has_agg = any(data.get('aggTrade') for data in _spot_data.values())
+            has_ticker = any(state.has_ticker for state in _spot_data.values())
+            has_agg = any(state.has_trades for state in _spot_data.values())
             if not (has_ticker or has_agg):
                 return
             self._warmup_done = True
             logger.info("Spot worker: Warmup done! Starting to send snapshots")
         
-        # КРИТИЧНО: Створюємо КОПІЮ _spot_data перед ітерацією
-        snapshot_data = dict(_spot_data)
-        
-        snapshot = []
+        # Пересобираем строки только для изменившихся символов (dirty) - без копии _spot_data
         now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        symbol_set = self._symbol_set()
+        for symbol in self._rows.to_rebuild(now_ms, self.symbols):
+            if symbol in symbol_set and symbol in _spot_data:
+                self._rows.set(symbol, self._build_row(symbol, _spot_data[symbol], now_ms))
         
-        for symbol in self.symbols:
-            if symbol not in snapshot_data:
-                continue
-            
-            symbol_data = snapshot_data[symbol]
-            
-            # Собираем данные для snapshot
-            ticker = symbol_data.get('ticker', {})
-            agg_trade = symbol_data.get('aggTrade', {})
-            klines = symbol_data.get('kline', {})
-            
-            # Пропускаем символы без ticker данных (нет цены)
-            if not ticker or ticker.get('price', 0) == 0:
-                continue
-            
-            current_price = ticker.get('price', 0)
-            
-            # Формируем snapshot для символа
-            row_data = {
-                'symbol': symbol,
-                'price': current_price,
-                'change_24h': ticker.get('change_24h', ticker.get('change', 0)),
-                'volume_24h': ticker.get('quote_volume', 0),
-                'ticks_1m': agg_trade.get('ticks', 0) if agg_trade else 0,
-            }
-            
-            # НОВАЯ АРХИТЕКТУРА: все TF данные из агрегированных 1m баров
-            # Для каждого TF вызываем aggregate_1m_bars_to_tf()
-            for interval in KLINE_INTERVALS:
-                # Получаем агрегированные данные из 1m баров
-                tf_data = aggregate_1m_bars_to_tf(symbol, now_ms, interval, market_type='spot')
-                
-                if tf_data and tf_data.get('bars_count', 0) > 0:
-                    # Данные есть - используем их
-                    row_data[f'vdelta_{interval}'] = tf_data['vdelta']
-                    row_data[f'volume_{interval}'] = tf_data['volume']
-                    row_data[f'change_{interval}'] = tf_data['change_pct']
-                    row_data[f'ticks_{interval}'] = tf_data['trades']
-                    
-                    # Volatility из high/low 1m баров
-                    # Для этого нужно дополнительно получить high/low
-                    # Пока используем 0 (можно доработать в aggregation_model)
-                    row_data[f'volatility_{interval}'] = 0.0
-                else:
-                    # Fallback на kline данные от Binance (если есть)
-                    if interval in klines:
-                        kline = klines[interval]
-                        open_price = kline.get('open', 0)
-                        close_price = kline.get('close', 0)
-                        high = kline.get('high', 0)
-                        low = kline.get('low', 0)
-                        
-                        if open_price > 0:
-                            row_data[f'volatility_{interval}'] = ((high - low) / open_price) * 100
-                            row_data[f'change_{interval}'] = ((close_price - open_price) / open_price) * 100
-                        else:
-                            row_data[f'volatility_{interval}'] = 0.0
-                            row_data[f'change_{interval}'] = 0.0
-                        
-                        row_data[f'volume_{interval}'] = kline.get('quote_volume', 0)
-                        row_data[f'ticks_{interval}'] = kline.get('trades', 0)
-                        row_data[f'vdelta_{interval}'] = 0  # kline не имеет vdelta
-                    else:
-                        # Нет данных - нули
-                        row_data[f'volatility_{interval}'] = 0.0
-                        row_data[f'change_{interval}'] = 0.0
-                        row_data[f'volume_{interval}'] = 0.0
-                        row_data[f'ticks_{interval}'] = 0
-                        row_data[f'vdelta_{interval}'] = 0
-            
-            # Spot рынки: используем 24h volume как метрику ликвидности
-            spot_volume = ticker.get('quote_volume', 0)
-            row_data['open_interest'] = spot_volume
-            row_data['funding_rate'] = 0.0  # Spot не имеет funding rate
-            
-            # Volume change для всех таймфреймов
-            prev_volume = symbol_data.get('volume_previous', spot_volume)
-            if prev_volume > 0:
-                volume_change = ((spot_volume - prev_volume) / prev_volume) * 100
-            else:
-                volume_change = 0.0
-            
-            symbol_data['volume_previous'] = spot_volume
-            
-            for interval in KLINE_INTERVALS:
-                row_data[f'oi_change_{interval}'] = volume_change
-            
-            # Timestamp
-            if agg_trade and 'last_update' in agg_trade:
-                row_data['timestamp'] = agg_trade['last_update']
-            else:
-                row_data['timestamp'] = datetime.now(timezone.utc).isoformat()
-            row_data['ts'] = row_data['timestamp']
-            
-            # Send only raw fields; formatting happens client-side to keep payload small
-            projected = _project_row_for_client(row_data)
-            
-            snapshot.append(projected)
+        snapshot = self._rows.collect(self.symbols)
 
         # Persist aggregated snapshot to DB at a throttled interval
         # NOTE: Temporarily disabled for performance - DB writes are too slow
@@ -946,14 +925,13 @@ class BinanceSpotWorker:
 
         # Отправляем через Channels group (только если есть данные)
         if not snapshot:
-            symbols_with_data = [s for s in self.symbols if s in snapshot_data]
-            symbols_with_ticker = [s for s in symbols_with_data if snapshot_data[s].get('ticker')]
-            logger.warning(f"Spot worker: Empty snapshot, skipping send. Total symbols: {len(self.symbols)}, in snapshot_data: {len(symbols_with_data)}, with ticker: {len(symbols_with_ticker)}")
+            symbols_with_data = [s for s in self.symbols if s in _spot_data]
+            symbols_with_ticker = [s for s in symbols_with_data if _spot_data[s].has_ticker]
+            logger.warning(f"Spot worker: Empty snapshot, skipping send. Total symbols: {len(self.symbols)}, in _spot_data: {len(symbols_with_data)}, with ticker: {len(symbols_with_ticker)}")
             print(f"[PRINT DEBUG SPOT] send_snapshot(): ⚠️ EMPTY snapshot. _spot_data keys: {len(_spot_data)}, symbols: {len(self.symbols)}", flush=True)
             return  # Не отправляем пустые snapshot
         
         # Throttle отправки
-        import time
         global _last_snapshot_time, _min_snapshot_interval
         
         current_time = time.time()
@@ -1064,11 +1042,8 @@ class BinanceSpotWorker:
             for symbol in symbols:
                 new_oi = oi_data.get(symbol, 0.0)
                 
-                if symbol not in _spot_data:
-                    _spot_data[symbol] = {}
-                
                 old_oi = self.open_interest_cache.get(symbol, new_oi)
-                _spot_data[symbol]['oi_previous'] = old_oi
+                _spot_data.state(symbol).oi_previous = old_oi
                 self.open_interest_cache[symbol] = new_oi
             
             return oi_data
@@ -1171,6 +1146,7 @@ class BinanceFuturesWorker:
         # История OI по минутам: {symbol: [(ts_minute, oi_value), ...]}
         self.oi_history: Dict[str, List[tuple]] = {}
         self.symbols: List[str] = []  # Будет загружено асинхронно в run()
+        self._rows = SnapshotRows(_futures_data)
         self._warmup_done = False
     
     async def connect_chunk(self, chunk_idx: int, stream_chunk: List[str], total_chunks: int):
@@ -1429,9 +1405,6 @@ class BinanceFuturesWorker:
         """
         global _futures_data
         
-        if symbol not in _futures_data:
-            _futures_data[symbol] = {}
-        
         price = float(data.get('p', 0))
         quantity = float(data.get('q', 0))
         is_buyer_maker = data.get('m', False)  # True = продажа (maker), False = покупка (taker)
@@ -1465,15 +1438,11 @@ class BinanceFuturesWorker:
             logger.info(f"[TIME DIAG] {symbol} event_time_ms={event_time_ms}, event_dt={event_dt.isoformat()}, now_dt={now_dt.isoformat()}, diff_sec={(now_dt - event_dt).total_seconds()}")
         
         # Храним только базовую информацию (ticks, last_price)
-        if 'aggTrade' not in _futures_data[symbol]:
-            _futures_data[symbol]['aggTrade'] = {
-                'ticks': 0,
-                'last_price': price,
-            }
-        
-        _futures_data[symbol]['aggTrade']['ticks'] += 1
-        _futures_data[symbol]['aggTrade']['last_price'] = price
-        _futures_data[symbol]['aggTrade']['last_update'] = datetime.fromtimestamp(event_time_ms / 1000, tz=timezone.utc).isoformat()
+        state = _futures_data.state(symbol)
+        state.ticks += 1
+        state.last_price = price
+        state.trade_ts_ms = event_time_ms
+        _futures_data.mark(symbol)
     
     async def process_kline(self, symbol: str, interval: str, data: dict):
         """Обрабатывает kline для volatility, volume, ticks."""
@@ -1481,20 +1450,15 @@ class BinanceFuturesWorker:
 
         global _futures_data
         
-        if symbol not in _futures_data:
-            _futures_data[symbol] = {}
-        
-        if 'kline' not in _futures_data[symbol]:
-            _futures_data[symbol]['kline'] = {}
-        
         k = data.get('k', {})
         if not k:
             return
         
         is_closed = k.get('x', False)
+        klines = _futures_data.state(symbol).klines
         
-        if interval not in _futures_data[symbol]['kline']:
-            _futures_data[symbol]['kline'][interval] = {
+        if interval not in klines:
+            klines[interval] = {
                 'open': float(k.get('o', 0)),
                 'high': float(k.get('h', 0)),
                 'low': float(k.get('l', 0)),
@@ -1507,7 +1471,7 @@ class BinanceFuturesWorker:
         else:
             # Обновляем данные для открытой свечи
             # ВАЖНО: для открытых свечей volume и trades накапливаются, а не заменяются
-            kline_data = _futures_data[symbol]['kline'][interval]
+            kline_data = klines[interval]
             kline_data['high'] = max(kline_data['high'], float(k.get('h', 0)))
             kline_data['low'] = min(kline_data['low'], float(k.get('l', 0)))
             kline_data['close'] = float(k.get('c', 0))
@@ -1527,15 +1491,13 @@ class BinanceFuturesWorker:
             
             kline_data['is_closed'] = is_closed
         
-        _futures_data[symbol]['kline'][interval]['last_update'] = datetime.now(timezone.utc).isoformat()
+        klines[interval]['last_update'] = datetime.now(timezone.utc).isoformat()
+        _futures_data.mark(symbol)
     
     async def process_ticker(self, symbol: str, data: dict):
         """Обрабатывает ticker для price, change, volume."""
         global _futures_data
         
-        if symbol not in _futures_data:
-            _futures_data[symbol] = {}
-        
         # Получаем цену из разных возможных полей (c = close/last price)
         price_str = data.get('c') or data.get('lastPrice') or data.get('p') or '0'
         try:
@@ -1544,16 +1506,16 @@ class BinanceFuturesWorker:
             price = 0.0
         
         if price > 0:  # Только если цена валидная
-            _futures_data[symbol]['ticker'] = {
-                'price': price,  # Last price
-                'open': float(data.get('o', data.get('openPrice', 0))),  # Open price (24h)
-                'high': float(data.get('h', data.get('highPrice', 0))),
-                'low': float(data.get('l', data.get('lowPrice', 0))),
-                'change_24h': float(data.get('P', data.get('priceChangePercent', 0))),  # Price change percent
-                'volume': float(data.get('v', data.get('volume', 0))),  # Base asset volume
-                'quote_volume': float(data.get('q', data.get('quoteVolume', 0))),  # Quote asset volume
-                'last_update': datetime.now(timezone.utc).isoformat(),
-            }
+            state = _futures_data.state(symbol)
+            state.price = price  # Last price
+            state.open = float(data.get('o', data.get('openPrice', 0)))  # Open price (24h)
+            state.high = float(data.get('h', data.get('highPrice', 0)))
+            state.low = float(data.get('l', data.get('lowPrice', 0)))
+            state.change_24h = float(data.get('P', data.get('priceChangePercent', 0)))  # Price change percent
+            state.volume = float(data.get('v', data.get('volume', 0)))  # Base asset volume
+            state.quote_volume = float(data.get('q', data.get('quoteVolume', 0)))  # Quote asset volume
+            state.ticker_ts = time.time()
+            _futures_data.mark(symbol)
             
             # Логируем первые несколько обновлений для диагностики
             if not hasattr(self, '_ticker_process_count'):
@@ -1570,51 +1532,33 @@ class BinanceFuturesWorker:
         """Обрабатывает markPrice для mark price и funding rate."""
         global _futures_data
         
-        if symbol not in _futures_data:
-            _futures_data[symbol] = {}
-        
-        _futures_data[symbol]['markPrice'] = {
-            'mark_price': float(data.get('p', 0)),
-            'funding_rate': float(data.get('r', 0)),
-            'next_funding_time': int(data.get('T', 0)),
-            'last_update': datetime.now(timezone.utc).isoformat(),
-        }
+        state = _futures_data.state(symbol)
+        state.mark_price = float(data.get('p', 0))
+        state.funding_rate = float(data.get('r', 0))
+        state.next_funding_time = int(data.get('T', 0))
+        state.mark_ts = time.time()
+        _futures_data.mark(symbol)
     
     async def process_book_ticker(self, symbol: str, data: dict):
         """Обрабатывает bookTicker для bid/ask, spread."""
         global _futures_data
         
-        if symbol not in _futures_data:
-            _futures_data[symbol] = {}
-        
-        bid_price = float(data.get('b', 0))
-        ask_price = float(data.get('a', 0))
-        spread = ask_price - bid_price if bid_price > 0 and ask_price > 0 else 0
-        
-        _futures_data[symbol]['bookTicker'] = {
-            'bid_price': bid_price,
-            'bid_qty': float(data.get('B', 0)),
-            'ask_price': ask_price,
-            'ask_qty': float(data.get('A', 0)),
-            'spread': spread,
-            'last_update': datetime.now(timezone.utc).isoformat(),
-        }
+        # bookTicker не входит в строки snapshot - символ не помечается dirty
+        state = _futures_data.state(symbol)
+        state.bid_price = float(data.get('b', 0))
+        state.bid_qty = float(data.get('B', 0))
+        state.ask_price = float(data.get('a', 0))
+        state.ask_qty = float(data.get('A', 0))
+        state.book_ts = time.time()
     
     async def process_depth(self, symbol: str, data: dict):
         """Обрабатывает depth10 для стакана."""
         global _futures_data
         
-        if symbol not in _futures_data:
-            _futures_data[symbol] = {}
-        
-        bids = [[float(b[0]), float(b[1])] for b in data.get('bids', [])]
-        asks = [[float(a[0]), float(a[1])] for a in data.get('asks', [])]
-        
-        _futures_data[symbol]['depth'] = {
-            'bids': bids,
-            'asks': asks,
-            'last_update': datetime.now(timezone.utc).isoformat(),
-        }
+        state = _futures_data.state(symbol)
+        state.bids = [[float(b[0]), float(b[1])] for b in data.get('bids', [])]
+        state.asks = [[float(a[0]), float(a[1])] for a in data.get('asks', [])]
+        state.depth_ts = time.time()
     
     async def process_force_order(self, data: dict):
         """Обрабатывает forceOrder (ликвидации) согласно документации Binance.
@@ -1752,6 +1696,8 @@ class BinanceFuturesWorker:
                     if response.status == 200:
                         data = await response.json()
                         self.open_interest_cache[symbol] = float(data.get('openInterest', 0))
+                        # OI входит в строку snapshot - иначе она не пересоберётся
+                        _futures_data.mark(symbol)
         except Exception as e:
             logger.error(f"Futures worker: Error fetching OI for {symbol}: {e}")
     
@@ -1848,9 +1794,8 @@ class BinanceFuturesWorker:
                     
                     # Сохраняем предыдущее значение для вычисления изменения
                     global _futures_data
-                    if symbol not in _futures_data:
-                        _futures_data[symbol] = {}
-                    _futures_data[symbol]['oi_previous'] = old_oi
+                    _futures_data.state(symbol).oi_previous = old_oi
+                    _futures_data.mark(symbol)
         except Exception as e:
             logger.debug(f"Futures worker: Error fetching OI for {symbol}: {e}")
     
@@ -1924,116 +1869,114 @@ class BinanceFuturesWorker:
                 logger.error(f"Futures worker: Error in OI update loop: {e}", exc_info=True)
                 await asyncio.sleep(3.0)
     
+    def _symbol_set(self) -> set:
+        """self.symbols как set (пересоздаётся при смене списка)."""
+        if getattr(self, '_symbols_key', None) is not self.symbols:
+            self._symbols_key = self.symbols
+            self._symbols_lookup = set(self.symbols)
+        return self._symbols_lookup
+    
+    def _build_row(self, symbol: str, state, now_ms: int) -> Optional[dict]:
+        """Строка snapshot для символа (None - нет цены)."""
+        # Пропускаем символы без ticker данных (нет цены)
+        if not state.has_ticker:
+            return None
+        
+        klines = state.klines
+        current_price = state.price
+        
+        # Получаем OI из кеша (обновляется отдельной задачей каждую секунду)
+        oi = self.open_interest_cache.get(symbol, 0)
+        oi_prev = state.oi_previous if state.oi_previous is not None else oi
+        
+        # Вычисляем OI Change
+        if oi_prev > 0:
+            oi_change = ((oi - oi_prev) / oi_prev) * 100
+        else:
+            oi_change = 0.0
+        
+        row_data = {
+            'symbol': symbol,
+            'price': current_price,
+            'mark_price': state.mark_price,
+            'funding_rate': state.funding_rate,
+            'open_interest': oi,
+            'change_24h': state.change_24h,
+            'volume_24h': state.quote_volume,
+            'ticks_1m': state.ticks,
+        }
+        
+        # НОВАЯ АРХИТЕКТУРА: все TF данные из агрегированных 1m баров
+        for interval in KLINE_INTERVALS:
+            # Получаем агрегированные данные из 1m баров
+            tf_data = aggregate_1m_bars_to_tf(symbol, now_ms, interval, market_type='futures')
+            
+            if tf_data and tf_data.get('bars_count', 0) > 0:
+                # Данные есть - используем их
+                row_data[f'vdelta_{interval}'] = tf_data['vdelta']
+                row_data[f'volume_{interval}'] = tf_data['volume']
+                row_data[f'change_{interval}'] = tf_data['change_pct']
+                row_data[f'ticks_{interval}'] = tf_data['trades']
+                row_data[f'volatility_{interval}'] = 0.0  # TODO: добавить в aggregation_model
+            else:
+                # Fallback на kline данные от Binance
+                if interval in klines:
+                    kline = klines[interval]
+                    open_price = kline.get('open', 0)
+                    close_price = kline.get('close', 0)
+                    high = kline.get('high', 0)
+                    low = kline.get('low', 0)
+                    
+                    if open_price > 0:
+                        row_data[f'volatility_{interval}'] = ((high - low) / open_price) * 100
+                        row_data[f'change_{interval}'] = ((close_price - open_price) / open_price) * 100
+                    else:
+                        row_data[f'volatility_{interval}'] = 0.0
+                        row_data[f'change_{interval}'] = 0.0
+                    
+                    row_data[f'volume_{interval}'] = kline.get('quote_volume', 0)
+                    row_data[f'ticks_{interval}'] = kline.get('trades', 0)
+                    row_data[f'vdelta_{interval}'] = 0  # kline не имеет vdelta
+                else:
+                    # Нет данных - нули
+                    row_data[f'volatility_{interval}'] = 0.0
+                    row_data[f'change_{interval}'] = 0.0
+                    row_data[f'volume_{interval}'] = 0.0
+                    row_data[f'ticks_{interval}'] = 0
+                    row_data[f'vdelta_{interval}'] = 0
+        
+        # OI Change для каждого таймфрейма (из истории OI)
+        for interval in KLINE_INTERVALS:
+            row_data[f'oi_change_{interval}'] = self.get_oi_change_by_tf(symbol, interval)
+        
+        # Timestamp
+        row_data['timestamp'] = state.trade_last_update or datetime.now(timezone.utc).isoformat()
+        
+        # Send only raw fields; formatting happens client-side to keep payload small
+        return _project_row_for_client(row_data, market_type='futures')
+    
     async def send_snapshot(self):
         """Собирает snapshot и отправляет через Channels group."""
         global _futures_data
         
         # Ждем первого сообщения от Binance перед отправкой снапшотов
         if not self._warmup_done:
-            has_ticker = any(data.get('ticker') for data in _futures_data.values())
-            has_agg = any(data.get('aggTrade') for data in _futures_data.values())
+            has_ticker = any(state.has_ticker for state in _futures_data.values())
+            has_agg = any(state.has_trades for state in _futures_data.values())
             if not (has_ticker or has_agg):
                 logger.debug("Futures worker: Warmup - waiting for first Binance messages before sending snapshots")
                 return
             self._warmup_done = True
             logger.info("Futures worker: Warmup done! Starting to send snapshots")
         
-        # КРИТИЧНО: Створюємо КОПІЮ _futures_data перед ітерацією
-        # Це вирішує race condition коли aggTrade handler змінює dict одночасно з читанням
-        snapshot_data = dict(_futures_data)
-        
-        snapshot = []
+        # Пересобираем строки только для изменившихся символов (dirty) - без копии _futures_data
         now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        symbol_set = self._symbol_set()
+        for symbol in self._rows.to_rebuild(now_ms, self.symbols):
+            if symbol in symbol_set and symbol in _futures_data:
+                self._rows.set(symbol, self._build_row(symbol, _futures_data[symbol], now_ms))
         
-        for symbol in self.symbols:
-            if symbol not in snapshot_data:
-                continue
-            
-            symbol_data = snapshot_data[symbol]
-            
-            ticker = symbol_data.get('ticker', {})
-            mark_price = symbol_data.get('markPrice', {})
-            agg_trade = symbol_data.get('aggTrade', {})
-            klines = symbol_data.get('kline', {})
-            
-            # Пропускаем символы без ticker данных (нет цены)
-            if not ticker or ticker.get('price', 0) == 0:
-                continue
-            
-            current_price = ticker.get('price', 0)
-            
-            # Получаем OI из кеша (обновляется отдельной задачей каждую секунду)
-            oi = self.open_interest_cache.get(symbol, 0)
-            oi_prev = symbol_data.get('oi_previous', oi)
-            
-            # Вычисляем OI Change
-            if oi_prev > 0:
-                oi_change = ((oi - oi_prev) / oi_prev) * 100
-            else:
-                oi_change = 0.0
-            
-            row_data = {
-                'symbol': symbol,
-                'price': current_price,
-                'mark_price': mark_price.get('mark_price', 0),
-                'funding_rate': mark_price.get('funding_rate', 0),
-                'open_interest': oi,
-                'change_24h': ticker.get('change_24h', 0),
-                'volume_24h': ticker.get('quote_volume', 0),
-                'ticks_1m': agg_trade.get('ticks', 0) if agg_trade else 0,
-            }
-            
-            # НОВАЯ АРХИТЕКТУРА: все TF данные из агрегированных 1m баров
-            for interval in KLINE_INTERVALS:
-                # Получаем агрегированные данные из 1m баров
-                tf_data = aggregate_1m_bars_to_tf(symbol, now_ms, interval, market_type='futures')
-                
-                if tf_data and tf_data.get('bars_count', 0) > 0:
-                    # Данные есть - используем их
-                    row_data[f'vdelta_{interval}'] = tf_data['vdelta']
-                    row_data[f'volume_{interval}'] = tf_data['volume']
-                    row_data[f'change_{interval}'] = tf_data['change_pct']
-                    row_data[f'ticks_{interval}'] = tf_data['trades']
-                    row_data[f'volatility_{interval}'] = 0.0  # TODO: добавить в aggregation_model
-                else:
-                    # Fallback на kline данные от Binance
-                    if interval in klines:
-                        kline = klines[interval]
-                        open_price = kline.get('open', 0)
-                        close_price = kline.get('close', 0)
-                        high = kline.get('high', 0)
-                        low = kline.get('low', 0)
-                        
-                        if open_price > 0:
-                            row_data[f'volatility_{interval}'] = ((high - low) / open_price) * 100
-                            row_data[f'change_{interval}'] = ((close_price - open_price) / open_price) * 100
-                        else:
-                            row_data[f'volatility_{interval}'] = 0.0
-                            row_data[f'change_{interval}'] = 0.0
-                        
-                        row_data[f'volume_{interval}'] = kline.get('quote_volume', 0)
-                        row_data[f'ticks_{interval}'] = kline.get('trades', 0)
-                        row_data[f'vdelta_{interval}'] = 0  # kline не имеет vdelta
-                    else:
-                        # Нет данных - нули
-                        row_data[f'volatility_{interval}'] = 0.0
-                        row_data[f'change_{interval}'] = 0.0
-                        row_data[f'volume_{interval}'] = 0.0
-                        row_data[f'ticks_{interval}'] = 0
-                        row_data[f'vdelta_{interval}'] = 0
-            
-            # OI Change для каждого таймфрейма (из истории OI)
-            for interval in KLINE_INTERVALS:
-                row_data[f'oi_change_{interval}'] = self.get_oi_change_by_tf(symbol, interval)
-            
-            # Timestamp
-            if agg_trade and 'last_update' in agg_trade:
-                row_data['timestamp'] = agg_trade['last_update']
-            else:
-                row_data['timestamp'] = datetime.now(timezone.utc).isoformat()
-            
-            # Send only raw fields; formatting happens client-side to keep payload small
-            snapshot.append(_project_row_for_client(row_data, market_type='futures'))
+        snapshot = self._rows.collect(self.symbols)
         
         # Persist aggregated snapshot to DB at a throttled interval
         # NOTE: Temporarily disabled for performance - DB writes are too slow
@@ -2050,11 +1993,10 @@ class BinanceFuturesWorker:
         
         # Отправляем через Channels group (только если есть данные)
         if not snapshot:
-            logger.warning(f"Futures worker: Empty snapshot, skipping send. Symbols in snapshot_data: {len([s for s in self.symbols if s in snapshot_data])}")
+            logger.warning(f"Futures worker: Empty snapshot, skipping send. Symbols in _futures_data: {len([s for s in self.symbols if s in _futures_data])}")
             return  # Не отправляем пустые snapshot
         
         # Синхронизация отправки snapshot - простая throttle без lock
-        import time
         global _last_snapshot_time, _min_snapshot_interval
         
         current_time = time.time()
@@ -0,0 +1,214 @@
+"""
+Компактное состояние символов для Binance воркеров.
+
+Вместо вложенных dict ({'ticker': {...}, 'aggTrade': {...}, ...}) каждый символ
+хранится в SymbolState со __slots__: обработка aggTrade — это пара присваиваний
+атрибутов без создания новых dict/строк.
+
+Обработчики помечают символ как dirty (SymbolStore.mark), snapshot забирает
+накопленное множество через take_dirty() (двойной буфер: два set меняются
+местами, без копирования) и пересобирает строки только для изменившихся
+символов (SnapshotRows). Стоимость snapshot зависит от активности, а не от
+размера вселенной символов.
+"""
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .aggregation_model import TF_CACHE_MS
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts else None
+
+
+class SymbolState:
+    """Состояние одного символа (ticker, aggTrade, markPrice, bookTicker, depth, klines)."""
+
+    __slots__ = (
+        # ticker (24h)
+        'price', 'open', 'high', 'low', 'change_24h', 'volume', 'quote_volume', 'ticker_ts',
+        # aggTrade
+        'ticks', 'last_price', 'trade_ts_ms',
+        # markPrice (futures)
+        'mark_price', 'funding_rate', 'next_funding_time', 'mark_ts',
+        # bookTicker
+        'bid_price', 'bid_qty', 'ask_price', 'ask_qty', 'book_ts',
+        # depth
+        'bids', 'asks', 'depth_ts',
+        # kline по интервалам и ticker_1h/4h/1d (spot)
+        'klines', 'interval_tickers',
+        # предыдущие значения для расчёта изменений
+        'oi_previous', 'volume_previous',
+    )
+
+    def __init__(self):
+        self.price = 0.0
+        self.open = self.high = self.low = 0.0
+        self.change_24h = 0.0
+        self.volume = self.quote_volume = 0.0
+        self.ticker_ts = 0.0
+        self.ticks = 0
+        self.last_price = 0.0
+        self.trade_ts_ms = 0
+        self.mark_price = self.funding_rate = 0.0
+        self.next_funding_time = 0
+        self.mark_ts = 0.0
+        self.bid_price = self.bid_qty = self.ask_price = self.ask_qty = 0.0
+        self.book_ts = 0.0
+        self.bids: List[List[float]] = []
+        self.asks: List[List[float]] = []
+        self.depth_ts = 0.0
+        self.klines: Dict[str, dict] = {}
+        self.interval_tickers: Dict[str, dict] = {}
+        self.oi_previous: Optional[float] = None
+        self.volume_previous: Optional[float] = None
+
+    @property
+    def has_ticker(self) -> bool:
+        return self.price > 0
+
+    @property
+    def has_trades(self) -> bool:
+        return self.ticks > 0
+
+    @property
+    def trade_last_update(self) -> Optional[str]:
+        return _iso(self.trade_ts_ms / 1000) if self.trade_ts_ms else None
+
+    def get(self, key: str, default=None):
+        """Совместимость со старым dict-форматом (_spot_data[symbol].get('ticker'))."""
+        if key == 'ticker':
+            if not self.has_ticker:
+                return default
+            return {
+                'price': self.price, 'open': self.open, 'high': self.high, 'low': self.low,
+                'change_24h': self.change_24h, 'change': self.change_24h,
+                'volume': self.volume, 'quote_volume': self.quote_volume,
+                'last_update': _iso(self.ticker_ts),
+            }
+        if key == 'aggTrade':
+            if not self.has_trades:
+                return default
+            return {'ticks': self.ticks, 'last_price': self.last_price, 'last_update': self.trade_last_update}
+        if key == 'markPrice':
+            if not self.mark_ts:
+                return default
+            return {
+                'mark_price': self.mark_price, 'funding_rate': self.funding_rate,
+                'next_funding_time': self.next_funding_time, 'last_update': _iso(self.mark_ts),
+            }
+        if key == 'bookTicker':
+            if not self.book_ts:
+                return default
+            return {
+                'bid_price': self.bid_price, 'bid_qty': self.bid_qty,
+                'ask_price': self.ask_price, 'ask_qty': self.ask_qty,
+                'spread': self.ask_price - self.bid_price if self.bid_price > 0 and self.ask_price > 0 else 0,
+                'last_update': _iso(self.book_ts),
+            }
+        if key == 'depth':
+            if not self.depth_ts:
+                return default
+            return {'bids': self.bids, 'asks': self.asks, 'last_update': _iso(self.depth_ts)}
+        if key == 'kline':
+            return self.klines or default
+        if key.startswith('ticker_'):
+            return self.interval_tickers.get(key[len('ticker_'):], default)
+        if key in ('oi_previous', 'volume_previous'):
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+
+class SymbolStore(Mapping):
+    """Состояния символов одного рынка + dirty-множество с двойной буферизацией.
+
+    Для чтения ведёт себя как dict {symbol: SymbolState} (consumers, диагностика).
+    """
+
+    def __init__(self):
+        self._states: Dict[str, SymbolState] = {}
+        self._dirty: Set[str] = set()
+        self._spare: Set[str] = set()
+
+    def state(self, symbol: str) -> SymbolState:
+        """Состояние символа (создаётся при первом обращении)."""
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = SymbolState()
+        return state
+
+    def mark(self, symbol: str) -> None:
+        """Пометить символ как изменившийся с прошлого snapshot."""
+        self._dirty.add(symbol)
+
+    def take_dirty(self) -> Set[str]:
+        """Забрать накопленные dirty символы; новые пометки идут во второй буфер.
+
+        Возвращённое множество валидно до следующего вызова take_dirty().
+        """
+        self._spare.clear()
+        self._dirty, self._spare = self._spare, self._dirty
+        return self._spare
+
+    def clear(self) -> None:
+        self._states.clear()
+        self._dirty.clear()
+        self._spare.clear()
+
+    def __getitem__(self, symbol: str) -> SymbolState:
+        return self._states[symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._states)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class SnapshotRows:
+    """Кеш готовых строк snapshot, пересобираются только нужные символы.
+
+    Кроме dirty символов пересчёт нужен, когда сдвигаются окна TF:
+    - на смене минуты меняется набор 1m баров в окне → пересобрать все;
+    - aggregate_1m_bars_to_tf кеширует результат на TF_CACHE_MS, поэтому
+      символы, пересобранные по dirty внутри окна кеша, пересобираются ещё
+      раз в следующем окне (иначе осталось бы закешированное значение).
+      _recent хранит только dirty текущего окна кеша: в следующем окне
+      строка строится уже по свежему агрегату, повторять её дальше не нужно.
+    """
+
+    def __init__(self, store: SymbolStore):
+        self.store = store
+        self.rows: Dict[str, dict] = {}
+        self._minute: Optional[int] = None
+        self._bucket: Optional[int] = None
+        self._recent: Set[str] = set()
+
+    def to_rebuild(self, now_ms: int, symbols: Iterable[str]) -> Iterable[str]:
+        dirty = self.store.take_dirty()
+        minute = now_ms // 60000
+        bucket = now_ms // TF_CACHE_MS
+        if minute != self._minute:
+            self._minute, self._bucket = minute, bucket
+            self._recent = set()
+            return symbols
+        if bucket != self._bucket:
+            self._bucket = bucket
+            rebuild = dirty | self._recent
+            self._recent = set(dirty)
+            return rebuild
+        self._recent.update(dirty)
+        return dirty
+
+    def set(self, symbol: str, row: Optional[dict]) -> None:
+        if row is None:
+            self.rows.pop(symbol, None)
+        else:
+            self.rows[symbol] = row
+
+    def collect(self, symbols: Iterable[str]) -> List[dict]:
+        """Строки в порядке symbols (только ссылки на закешированные dict)."""
+        rows = self.rows
+        return [rows[s] for s in symbols if s in rows]
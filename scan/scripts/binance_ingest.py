@@ -4,22 +4,27 @@ Simple Binance Futures USDT-margined ingest script with continuous updates.
 Fetches symbols and basic metrics from Binance public API and writes them into
 the PostgreSQL database via Django ORM.
 
-This version runs continuously, updating data every second.
+This version runs continuously, updating data every few seconds. Open interest
+and funding rates are refreshed by a background asyncio ingester that paces
+requests against Binance's reported request weight (OIFundingIngester).
 
 Run from the project root:
 
     python scripts/binance_ingest.py
 """
 
+import asyncio
 import os
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import aiohttp
 import django
 import requests
 
@@ -115,36 +120,240 @@ def fetch_tickers(retries: int = 10) -> List[Dict[str, Any]]:
                 return []
 
 
-def fetch_open_interest(symbol: str, session: requests.Session = None) -> float:
-    """Fetch current open interest for a symbol."""
-    try:
-        client = session if session else requests
-        resp = client.get(
-            f"{BINANCE_BASE_URL}/fapi/v1/openInterest",
-            params={"symbol": symbol},
-            timeout=2,  # Reduced timeout for faster processing (2s)
+# Binance futures request-weight limit per IP per minute, and the share of it
+# this script may use (the rest is left for klines and the websocket workers)
+BINANCE_WEIGHT_LIMIT = int(os.getenv("BINANCE_WEIGHT_LIMIT", "2400"))
+WEIGHT_HEADROOM = 0.8
+
+# openInterest costs 1 weight per symbol: ~180 symbols every 30s is ~360/min,
+# the same as the old once-a-minute OI+funding pass (2 weight per symbol).
+# A larger universe stretches the sweep instead of raising the weight.
+OI_REFRESH_INTERVAL = 30.0       # one full openInterest sweep over all symbols
+OI_MAX_WEIGHT_PER_MIN = int(os.getenv("BINANCE_OI_WEIGHT_PER_MIN", "360"))
+FUNDING_REFRESH_INTERVAL = 10.0  # bulk premiumIndex (all symbols, one request, 60 weight/min)
+OI_CONCURRENCY = 10              # connections in the shared aiohttp pool
+
+LOOP_BACKOFF_MIN = 1.0           # ingester loop retry delay after an error, doubled up to MAX
+LOOP_BACKOFF_MAX = 60.0
+
+
+class WeightBudget:
+    """Token bucket over Binance request weight.
+
+    Binance counts weight per IP in calendar-minute windows and reports the
+    weight already used in the current window in the X-MBX-USED-WEIGHT-1M
+    header of every response. That figure is authoritative (it includes the
+    klines threads and any other client on this IP), so it replaces the local
+    estimate whenever it is higher. Between responses acquire() counts weight
+    locally; a 418/429 pauses all callers for Retry-After seconds.
+    """
+
+    def __init__(self, limit: int = BINANCE_WEIGHT_LIMIT, headroom: float = WEIGHT_HEADROOM, clock=time.time):
+        self.capacity = int(limit * headroom)
+        self.used = 0
+        self.paused_until = 0.0
+        self._clock = clock
+        self._window = int(clock() // 60)
+        self._lock = asyncio.Lock()
+
+    def _roll(self, now: float) -> None:
+        window = int(now // 60)
+        if window != self._window:
+            self._window = window
+            self.used = 0
+
+    async def acquire(self, weight: int = 1) -> None:
+        """Wait until `weight` fits into the current minute's budget."""
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._roll(now)
+                if self.used + weight <= self.capacity:
+                    self.used += weight
+                    return
+                await asyncio.sleep(60 - now % 60 + 0.05)
+
+    def update(self, headers) -> None:
+        """Sync with the server-side count from response headers."""
+        value = headers.get("X-MBX-USED-WEIGHT-1M")
+        if not value:
+            return
+        self._roll(self._clock())
+        try:
+            self.used = max(self.used, int(value))
+        except ValueError:
+            pass
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, self._clock() + seconds)
+
+
+class BinanceFuturesClient:
+    """aiohttp client for Binance futures REST: one shared connection pool, weight-aware."""
+
+    def __init__(self, base_url: str = BINANCE_BASE_URL, budget: Optional[WeightBudget] = None,
+                 concurrency: int = OI_CONCURRENCY):
+        self.base_url = base_url
+        self.budget = budget or WeightBudget()
+        self.concurrency = concurrency
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "BinanceFuturesClient":
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=5),
         )
-        resp.raise_for_status()
-        data = resp.json()
-        return float(data.get("openInterest", 0.0))
-    except Exception:
-        return 0.0
+        return self
 
+    async def __aexit__(self, *exc) -> None:
+        await self.session.close()
 
-def fetch_funding_rate(symbol: str, session: requests.Session = None) -> float:
-    """Fetch current funding rate for a symbol."""
-    try:
-        client = session if session else requests
-        resp = client.get(
-            f"{BINANCE_BASE_URL}/fapi/v1/premiumIndex",
-            params={"symbol": symbol},
-            timeout=2,  # Reduced timeout for faster processing (2s)
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, weight: int = 1, retries: int = 3):
+        """GET returning parsed JSON, or None after `retries` failed attempts."""
+        for attempt in range(retries):
+            await self.budget.acquire(weight)
+            try:
+                async with self.session.get(f"{self.base_url}{path}", params=params) as resp:
+                    self.budget.update(resp.headers)
+                    if resp.status in (418, 429):
+                        try:
+                            wait_time = float(resp.headers.get("Retry-After") or 60)
+                        except ValueError:
+                            wait_time = 60.0
+                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Rate limit ({resp.status}) on {path}, pausing {wait_time:.0f}s")
+                        self.budget.pause(wait_time)
+                        continue
+                    resp.raise_for_status()
+                    return await resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        return None
+
+    async def funding_rates(self) -> Dict[str, float]:
+        """Funding rates of all symbols from one bulk premiumIndex request (weight 10)."""
+        data = await self.get("/fapi/v1/premiumIndex", weight=10)
+        return {
+            item["symbol"]: float(item.get("lastFundingRate") or 0.0)
+            for item in data or []
+            if item.get("symbol")
+        }
+
+    async def open_interest(self, symbol: str) -> Optional[float]:
+        """Current open interest for a symbol (weight 1)."""
+        data = await self.get("/fapi/v1/openInterest", {"symbol": symbol})
+        if not data:
+            return None
+        try:
+            return float(data.get("openInterest", 0.0))
+        except (TypeError, ValueError):
+            return None
+
+
+async def fetch_oi_and_funding_bulk(symbols: List[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """One-shot OI + funding for `symbols` (used when no OIFundingIngester is running)."""
+    async with BinanceFuturesClient() as client:
+        funding, oi_values = await asyncio.gather(
+            client.funding_rates(),
+            asyncio.gather(*(client.open_interest(s) for s in symbols)),
         )
-        resp.raise_for_status()
-        data = resp.json()
-        return float(data.get("lastFundingRate", 0.0))
-    except Exception:
-        return 0.0
+    return {s: (oi, funding.get(s)) for s, oi in zip(symbols, oi_values)}
+
+
+class OIFundingIngester:
+    """Keeps open interest and funding rates fresh in a background thread.
+
+    Funding comes from one bulk premiumIndex request every
+    FUNDING_REFRESH_INTERVAL; openInterest requests are spread evenly over
+    OI_REFRESH_INTERVAL instead of fired in bursts, all gated by one
+    WeightBudget. ingest_snapshot() reads the latest values via snapshot()
+    on every cycle, so the screener sees OI/funding move continuously.
+    An error in either loop is logged and retried with backoff; it does not
+    stop the other loop or the thread.
+    """
+
+    def __init__(self, oi_interval: float = OI_REFRESH_INTERVAL,
+                 funding_interval: float = FUNDING_REFRESH_INTERVAL):
+        self.oi_interval = oi_interval
+        self.funding_interval = funding_interval
+        self._symbols: List[str] = []
+        self._oi: Dict[str, float] = {}
+        self._funding: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_symbols(self, symbols: List[str]) -> None:
+        with self._lock:
+            self._symbols = list(symbols)
+
+    def snapshot(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """Latest (oi, funding) per symbol; None where not fetched yet."""
+        with self._lock:
+            return {s: (self._oi.get(s), self._funding.get(s)) for s in set(self._oi) | set(self._funding)}
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="oi-funding", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    async def run(self) -> None:
+        async with BinanceFuturesClient() as client:
+            await asyncio.gather(
+                self._run_loop("Funding", lambda: self._funding_step(client)),
+                self._run_loop("OI", lambda: self._oi_sweep(client)),
+            )
+
+    async def _run_loop(self, name: str, step) -> None:
+        """Repeat step() until stopped; errors are logged and retried with backoff."""
+        backoff = LOOP_BACKOFF_MIN
+        while not self._stop.is_set():
+            try:
+                await step()
+                backoff = LOOP_BACKOFF_MIN
+            except Exception as e:
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ⚠️ {name} loop error: {e!r}, retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, LOOP_BACKOFF_MAX)
+
+    async def _funding_step(self, client: BinanceFuturesClient) -> None:
+        rates = await client.funding_rates()
+        if rates:
+            with self._lock:
+                self._funding.update(rates)
+        await asyncio.sleep(self.funding_interval)
+
+    async def _oi_sweep(self, client: BinanceFuturesClient) -> None:
+        with self._lock:
+            symbols = list(self._symbols)
+        if not symbols:
+            await asyncio.sleep(1.0)
+            return
+
+        started = time.time()
+        spacing = max(self.oi_interval / len(symbols), 60.0 / OI_MAX_WEIGHT_PER_MIN)
+        tasks = []
+        for symbol in symbols:
+            if self._stop.is_set():
+                break
+            tasks.append(asyncio.create_task(self._refresh_oi(client, symbol)))
+            await asyncio.sleep(spacing)
+        # One symbol's failure must not abort the sweep
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] OI sweep: {len(symbols)} symbols in {time.time() - started:.1f}s, {failed} failed (weight used {client.budget.used}/{client.budget.capacity})")
+
+    async def _refresh_oi(self, client: BinanceFuturesClient, symbol: str) -> None:
+        oi = await client.open_interest(symbol)
+        if oi is not None:
+            with self._lock:
+                self._oi[symbol] = oi
 
 
 # Global session for connection pooling (reuse connections)
@@ -164,20 +373,6 @@ def get_session():
         _http_session.mount('https://', adapter)
     return _http_session
 
-def fetch_oi_and_funding(symbol: str) -> Tuple[float, float]:
-    """Fetch both OI and funding rate for a symbol in parallel."""
-    session = get_session()
-    # Use ThreadPoolExecutor to fetch both in parallel
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        oi_future = executor.submit(fetch_open_interest, symbol, session)
-        funding_future = executor.submit(fetch_funding_rate, symbol, session)
-        
-        oi = oi_future.result()
-        funding = funding_future.result()
-        
-        return oi, funding
-
-
 def fetch_klines(symbol: str, interval: str = "1m", limit: int = 1440, session: requests.Session = None, retries: int = 5) -> List[List]:
     """Fetch klines (candlestick) data for a symbol with retry logic.
     
@@ -356,11 +551,16 @@ def calculate_timeframe_data_from_klines(klines_1m: List[List]) -> Dict[str, Dic
     return result
 
 
-def ingest_snapshot(should_update_oi_funding: bool = True) -> int:
+def ingest_snapshot(
+    should_update_oi_funding: bool = True,
+    ingester: Optional[OIFundingIngester] = None,
+) -> int:
     """Ingest one snapshot of all symbols. Returns count of symbols processed.
     
     Args:
         should_update_oi_funding: If True, fetch OI/Funding from API. If False, use cached values from DB.
+        ingester: Running OIFundingIngester; its latest values are used (and its symbol
+            list updated) instead of fetching. Missing values fall back to the previous snapshot.
     """
     from screener.models import ScreenerSnapshot, Symbol
 
@@ -375,56 +575,19 @@ def ingest_snapshot(should_update_oi_funding: bool = True) -> int:
     processed = 0
     snapshots_to_create = []  # Collect snapshots for bulk insert
 
-    # Pre-fetch OI and funding rates
     # Tickers are already filtered to allowed symbols only
     symbol_codes = [t["symbol"] for t in tickers if Decimal(t.get("lastPrice", "0")) > 0]
-    oi_funding_data = {}
+    live_oi_funding = {}
     
-    if should_update_oi_funding:
-        # Fetch OI and funding rates with SMART BATCHING to avoid rate limits
-        # УМНЫЙ БАТЧИНГ: OI + Funding = 2 weight per символ
-        # 178 символов × 2 = 356 weight, нужно распределить равномерно
-        import os
-        cpu_count = os.cpu_count() or 8
-        rate_limit_per_second = 20.0  # weight/sec
-        max_workers = min(50, cpu_count * 6)  # Умеренный параллелизм
-        
-        # Разбиваем на батчи по 10 символов (20 weight per батч = 1 секунда)
-        batch_size = 10
-        batches = [symbol_codes[i:i + batch_size] for i in range(0, len(symbol_codes), batch_size)]
-        
+    if ingester is not None:
+        ingester.set_symbols(symbol_codes)
+        live_oi_funding = ingester.snapshot()
+    elif should_update_oi_funding:
+        # One shared pool, weight-aware pacing; funding for all symbols in one request
         start_time = time.time()
-        for batch_idx, batch in enumerate(batches):
-            batch_start = time.time()
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_symbol = {
-                    executor.submit(fetch_oi_and_funding, symbol): symbol 
-                    for symbol in batch
-                }
-                
-                for future in as_completed(future_to_symbol):
-                    symbol = future_to_symbol[future]
-                    try:
-                        oi, funding = future.result()
-                        oi_funding_data[symbol] = (oi, funding)
-                    except Exception as e:
-                        print(f"Error fetching OI/funding for {symbol}: {e}")
-                        oi_funding_data[symbol] = (0.0, 0.0)
-            
-            # Задержка между батчами для соблюдения rate limit
-            # 10 символов × 2 weight = 20 weight per батч = 1 секунда
-            if batch_idx < len(batches) - 1:
-                required_time = (batch_size * 2) / rate_limit_per_second  # 2 weight per символ
-                elapsed = time.time() - batch_start
-                sleep_time = max(0, required_time - elapsed)
-                
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-        
+        live_oi_funding = asyncio.run(fetch_oi_and_funding_bulk(symbol_codes))
         elapsed_total = time.time() - start_time
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Fetched OI/Funding for {len(oi_funding_data)} symbols in {elapsed_total:.2f}s")
-            # No delay needed - retry logic handles rate limits
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Fetched OI/Funding for {len(live_oi_funding)} symbols in {elapsed_total:.2f}s")
 
     # Pre-fetch all symbols and previous snapshots in bulk (optimization)
     symbol_codes_list = [t["symbol"] for t in tickers if Decimal(t.get("lastPrice", "0")) > 0]
@@ -474,17 +637,16 @@ def ingest_snapshot(should_update_oi_funding: bool = True) -> int:
             if snapshot:
                 prev_snapshots[snapshot.symbol.symbol] = snapshot
     
-    # If not updating OI/Funding from API, use cached values from previous snapshots
-    if not should_update_oi_funding:
-        for symbol_code in symbol_codes:
-            if symbol_code not in oi_funding_data:
-                prev_snapshot = prev_snapshots.get(symbol_code)
-                if prev_snapshot:
-                    oi = float(prev_snapshot.open_interest) if prev_snapshot.open_interest else 0.0
-                    funding = float(prev_snapshot.funding_rate) if prev_snapshot.funding_rate else 0.0
-                    oi_funding_data[symbol_code] = (oi, funding)
-                else:
-                    oi_funding_data[symbol_code] = (0.0, 0.0)
+    # Values not fetched (yet) are carried over from the previous snapshot
+    oi_funding_data = {}
+    for symbol_code in symbol_codes:
+        oi, funding = live_oi_funding.get(symbol_code, (None, None))
+        prev_snapshot = prev_snapshots.get(symbol_code)
+        if oi is None:
+            oi = float(prev_snapshot.open_interest) if prev_snapshot and prev_snapshot.open_interest else 0.0
+        if funding is None:
+            funding = float(prev_snapshot.funding_rate) if prev_snapshot and prev_snapshot.funding_rate else 0.0
+        oi_funding_data[symbol_code] = (oi, funding)
     
     # Fetch klines for all symbols with SMART BATCHING to avoid rate limits
     # УМНЫЙ БАТЧИНГ: распределяем запросы равномерно по времени
@@ -803,7 +965,7 @@ def main() -> None:
     cpu_count = os.cpu_count() or 8
     print(f"Starting Binance ingest loop (OPTIMIZED FOR 178 SYMBOLS - {cpu_count} CPU cores)...")
     print("Using REAL klines data for vdelta calculation!")
-    print("Ticker + Klines: every 12s, OI/Funding: every 18s")
+    print(f"Ticker + Klines: every 3s, OI sweep: {OI_REFRESH_INTERVAL:.0f}s, Funding: {FUNDING_REFRESH_INTERVAL:.0f}s (background)")
     print("Press Ctrl+C to stop.")
     
     # Updated intervals with SMART BATCHING - теперь можно обновлять чаще!
@@ -813,40 +975,34 @@ def main() -> None:
     # Основной цикл занимает ~10 секунд, но запросы распределены равномерно
     # Можно обновлять каждые 3-4 секунды, так как запросы идут непрерывно
     UPDATE_INTERVAL = 3.0  # УСКОРЕНИЕ - обновление каждые 3 секунды (умный батчинг позволяет!)
-    OI_FUNDING_UPDATE_INTERVAL = 60.0  # OI/Funding каждые 60 секунд (кэшируется из БД)
     
     # Initial delay to avoid hitting rate limit immediately after restart
     # If service was restarted due to rate limit, wait a bit before starting
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Waiting 10 seconds before first request to avoid rate limits...")
     time.sleep(10)
     
-    last_oi_funding_update = 0.0
+    # OI/Funding refresh continuously in the background; every snapshot picks up the latest values
+    ingester = OIFundingIngester()
+    ingester.start()
     
     try:
         while True:
             start_time = time.time()
-            current_time = time.time()
-            
-            # Determine if we should update OI/Funding (only once per minute)
-            should_update_oi_funding = (current_time - last_oi_funding_update) >= OI_FUNDING_UPDATE_INTERVAL
-            
-            if should_update_oi_funding:
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Updating OI/Funding from API...")
-                last_oi_funding_update = current_time
             
-            count = ingest_snapshot(should_update_oi_funding=should_update_oi_funding)
+            count = ingest_snapshot(ingester=ingester)
             elapsed = time.time() - start_time
             
-            update_type = "full" if should_update_oi_funding else "ticker only"
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Ingested {count} symbols ({update_type}) in {elapsed:.2f}s")
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Ingested {count} symbols in {elapsed:.2f}s")
             
-            # Sleep to maintain 5 second interval between updates
-            # If processing takes longer than 5s, start immediately (no delay)
+            # Sleep to maintain UPDATE_INTERVAL between updates
+            # If processing takes longer, start immediately (no delay)
             sleep_time = max(0, UPDATE_INTERVAL - elapsed)
             if sleep_time > 0:
                 time.sleep(sleep_time)
     except KeyboardInterrupt:
         print("\nStopped by user.")
+    finally:
+        ingester.stop()
 
 
 if __name__ == "__main__":
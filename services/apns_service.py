@@ -8,6 +8,7 @@ Features:
 - Daily trading digest with beautiful formatting
 - Break-even and partial TP alerts
 - Signal notifications
+- Pooled HTTP/2 delivery; bursts are batched with cached preferences/devices
 
 Author: Enliko Team
 Created: 2026-02-01
@@ -19,14 +20,25 @@ import jwt
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
-import aiohttp
+from typing import Optional, Dict, List, Iterable, Tuple
+import httpx
 from dataclasses import dataclass
 
-from core.db_postgres import execute, execute_one
+from core.cache import LRUCache
+from core.db_postgres import execute
+from core.tasks import safe_create_task
 
 logger = logging.getLogger(__name__)
 
+# httpx negotiates HTTP/2 (many concurrent streams on one connection) only
+# when the optional h2 package is installed (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.warning("h2 not installed - APNs falls back to HTTP/1.1 connections")
+
 # ============================================================================
 # APNs Configuration
 # ============================================================================
@@ -54,6 +66,27 @@ APNS_SANDBOX = "https://api.sandbox.push.apple.com"
 # Use production for TestFlight/App Store builds, sandbox only for Xcode debug
 APNS_HOST = os.environ.get("APNS_HOST", APNS_PRODUCTION)
 
+# Delivery tuning
+APNS_CONFIG = {
+    "max_connections": 4,       # HTTP/2 connections kept warm to APNs
+    "max_streams": 200,         # concurrent in-flight pushes across connections
+    "keepalive_seconds": 600,   # idle time before a pooled connection is dropped
+    "timeout_seconds": 10,
+    "batch_window": 0.05,       # coalesce submit() calls arriving within 50ms
+    "cache_ttl": 120,           # preferences/device tokens; bounds staleness across processes
+    "cache_size": 50000,
+}
+
+# APNs category -> notification_preferences flags that must all be enabled
+CATEGORY_PREFERENCES = {
+    "TRADE_OPENED": ("trade_opened", "trades_enabled"),
+    "TRADE_CLOSED": ("trade_closed", "trades_enabled"),
+    "BREAK_EVEN": ("break_even",),
+    "PARTIAL_TP": ("partial_tp",),
+    "SIGNAL": ("signals_enabled",),
+    "MARGIN_WARNING": ("margin_warning",),
+}
+
 
 @dataclass
 class PushPayload:
@@ -69,28 +102,83 @@ class PushPayload:
     mutable_content: bool = True  # For Notification Service Extension
     content_available: bool = False  # For silent push
 
+    def to_body(self) -> bytes:
+        """Serialized APNs request body"""
+        aps = {
+            "alert": {
+                "title": self.title,
+                "body": self.body,
+            },
+            "sound": self.sound,
+        }
+        
+        if self.subtitle:
+            aps["alert"]["subtitle"] = self.subtitle
+        if self.badge is not None:
+            aps["badge"] = self.badge
+        if self.category:
+            aps["category"] = self.category
+        if self.thread_id:
+            aps["thread-id"] = self.thread_id
+        if self.mutable_content:
+            aps["mutable-content"] = 1
+        if self.content_available:
+            aps["content-available"] = 1
+            
+        body = {"aps": aps}
+        
+        if self.custom_data:
+            body.update(self.custom_data)
+        return json.dumps(body).encode()
+
+
+def push_allowed(prefs: Optional[dict], category: Optional[str]) -> bool:
+    """Whether notification_preferences allow a push of this category (no row = allowed)"""
+    if not prefs:
+        return True
+    return all(prefs.get(flag, True) for flag in CATEGORY_PREFERENCES.get(category or "", ()))
+
 
 class APNsService:
     """
     Apple Push Notification Service client.
     Uses JWT authentication (token-based).
+    
+    Pushes go over a small pool of long-lived HTTP/2 connections with many
+    concurrent streams. Preferences and device tokens are cached per user
+    (invalidate() on change), and send_batch() resolves a whole burst of
+    recipients with one query each instead of two queries per push.
     """
     
-    def __init__(self):
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**APNS_CONFIG, **(config or {})}
         self._token: Optional[str] = None
         self._token_expires: float = 0
         self._auth_key: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._streams: Optional[asyncio.Semaphore] = None
+        self._preferences: LRUCache[dict] = LRUCache(self.config["cache_size"], self.config["cache_ttl"])
+        self._devices: LRUCache[List[str]] = LRUCache(self.config["cache_size"], self.config["cache_ttl"])
+        self._pending: List[Tuple[int, PushPayload, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"sent": 0, "failed": 0, "filtered": 0, "batches": 0}
         
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
-        if self._session is None or self._session.closed:
-            connector = aiohttp.TCPConnector(
-                limit=100,
-                enable_cleanup_closed=True
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled APNs client"""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.config["max_connections"],
+                max_keepalive_connections=self.config["max_connections"],
+                keepalive_expiry=self.config["keepalive_seconds"],
             )
-            self._session = aiohttp.ClientSession(connector=connector)
-        return self._session
+            self._client = httpx.AsyncClient(
+                base_url=APNS_HOST,
+                http2=HTTP2_AVAILABLE,
+                limits=limits,
+                timeout=self.config["timeout_seconds"],
+            )
+            self._streams = asyncio.Semaphore(self.config["max_streams"])
+        return self._client
         
     def _load_auth_key(self) -> str:
         """Load APNs authentication key from file"""
@@ -151,72 +239,58 @@ class APNsService:
         Returns:
             True if sent successfully
         """
+        return await self._post(device_token, payload.to_body(), priority, expiration)
+        
+    async def _post(
+        self,
+        device_token: str,
+        body: bytes,
+        priority: int = 10,
+        expiration: int = 0,
+        user_id: Optional[int] = None,
+    ) -> bool:
+        """One APNs request (one HTTP/2 stream on a pooled connection)"""
         try:
-            session = await self._get_session()
-            token = self._generate_token()
-            
-            url = f"{APNS_HOST}/3/device/{device_token}"
-            
+            client = await self._get_client()
             headers = {
-                "authorization": f"bearer {token}",
+                "authorization": f"bearer {self._generate_token()}",
                 "apns-topic": APNS_BUNDLE_ID,
                 "apns-push-type": "alert",
                 "apns-priority": str(priority),
                 "apns-expiration": str(expiration),
+                "content-type": "application/json",
             }
             
-            # Build APNs payload
-            aps = {
-                "alert": {
-                    "title": payload.title,
-                    "body": payload.body,
-                },
-                "sound": payload.sound,
-            }
-            
-            if payload.subtitle:
-                aps["alert"]["subtitle"] = payload.subtitle
-            if payload.badge is not None:
-                aps["badge"] = payload.badge
-            if payload.category:
-                aps["category"] = payload.category
-            if payload.thread_id:
-                aps["thread-id"] = payload.thread_id
-            if payload.mutable_content:
-                aps["mutable-content"] = 1
-            if payload.content_available:
-                aps["content-available"] = 1
+            async with self._streams:
+                resp = await client.post(f"/3/device/{device_token}", content=body, headers=headers)
                 
-            body = {"aps": aps}
-            
-            if payload.custom_data:
-                body.update(payload.custom_data)
+            if resp.status_code == 200:
+                logger.debug(f"Push sent to {device_token[:20]}...")
+                self.stats["sent"] += 1
+                return True
                 
-            async with session.post(url, json=body, headers=headers) as resp:
-                if resp.status == 200:
-                    logger.debug(f"Push sent to {device_token[:20]}...")
-                    return True
-                else:
-                    error = await resp.text()
-                    logger.error(f"APNs error {resp.status}: {error}")
-                    
-                    # Handle specific errors
-                    if resp.status == 410:  # Unregistered
-                        await self._deactivate_device(device_token)
-                    elif resp.status == 400:  # Bad request
-                        try:
-                            error_data = json.loads(error)
-                            if error_data.get("reason") == "BadDeviceToken":
-                                await self._deactivate_device(device_token)
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    return False
+            error = resp.text
+            logger.error(f"APNs error {resp.status_code}: {error}")
+            self.stats["failed"] += 1
+            
+            # Handle specific errors
+            if resp.status_code == 410:  # Unregistered
+                await self._deactivate_device(device_token, user_id)
+            elif resp.status_code == 400:  # Bad request
+                try:
+                    error_data = json.loads(error)
+                    if error_data.get("reason") == "BadDeviceToken":
+                        await self._deactivate_device(device_token, user_id)
+                except (json.JSONDecodeError, TypeError):
+                    pass
+            return False
                     
         except Exception as e:
             logger.error(f"Failed to send push: {e}")
+            self.stats["failed"] += 1
             return False
             
-    async def _deactivate_device(self, device_token: str):
+    async def _deactivate_device(self, device_token: str, user_id: Optional[int] = None):
         """Deactivate invalid device token"""
         try:
             execute("""
@@ -226,7 +300,101 @@ class APNsService:
             logger.info(f"Deactivated device token: {device_token[:20]}...")
         except Exception as e:
             logger.error(f"Failed to deactivate device: {e}")
+        if user_id is not None:
+            self._devices.delete(user_id)
+            
+    # ------------------------------------------------------------------
+    # Preference / device cache
+    # ------------------------------------------------------------------
+    
+    def invalidate(self, user_id: int):
+        """Drop cached preferences and devices (call after they change)"""
+        self._preferences.delete(user_id)
+        self._devices.delete(user_id)
+        
+    def _load_audience(self, user_ids: List[int]) -> None:
+        """Fill the cache for users not in it: one preferences + one devices query"""
+        prefs: Dict[int, dict] = {uid: {} for uid in user_ids}
+        try:
+            rows = execute("""
+                SELECT user_id, trades_enabled, signals_enabled, price_alerts_enabled,
+                       daily_report_enabled, trade_opened, trade_closed,
+                       break_even, partial_tp, margin_warning
+                FROM notification_preferences WHERE user_id = ANY(%s)
+            """, (user_ids,))
+            for row in rows or []:
+                prefs[row["user_id"]] = dict(row)
+        except Exception as e:
+            # If preferences can't be loaded, send notifications anyway
+            logger.debug(f"Could not load notification preferences: {e}")
+            
+        devices: Dict[int, List[str]] = {uid: [] for uid in user_ids}
+        rows = execute("""
+            SELECT user_id, device_token FROM user_devices
+            WHERE user_id = ANY(%s) AND device_type = 'ios' AND is_active = TRUE
+        """, (user_ids,))
+        for row in rows or []:
+            devices[row["user_id"]].append(row["device_token"])
+            
+        for uid in user_ids:
+            self._preferences.set(uid, prefs[uid])
+            self._devices.set(uid, devices[uid])
+            
+    async def _audience(self, user_ids: Iterable[int]) -> Dict[int, Tuple[dict, List[str]]]:
+        """Preferences and iOS device tokens per user, from cache or one bulk load"""
+        user_ids = list(dict.fromkeys(user_ids))
+        missing = [uid for uid in user_ids
+                   if self._preferences.get(uid) is None or self._devices.get(uid) is None]
+        if missing:
+            await asyncio.to_thread(self._load_audience, missing)
+        return {uid: (self._preferences.get(uid) or {}, self._devices.get(uid) or []) for uid in user_ids}
+        
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+    
+    async def send_batch(self, items: Iterable[Tuple[int, PushPayload]]) -> List[int]:
+        """
+        Send pushes for many (user_id, payload) pairs concurrently.
+        Checks each user's notification preferences before sending.
+        
+        Returns:
+            Number of successful sends per item, in input order
+        """
+        items = list(items)
+        if not items:
+            return []
+        self.stats["batches"] += 1
+        
+        try:
+            audience = await self._audience(uid for uid, _ in items)
+        except Exception as e:
+            logger.error(f"Failed to load push audience: {e}")
+            return [0] * len(items)
             
+        bodies: Dict[int, bytes] = {}
+        sends = []   # (item index, coroutine)
+        for index, (user_id, payload) in enumerate(items):
+            prefs, devices = audience[user_id]
+            if not push_allowed(prefs, payload.category):
+                logger.debug(f"User {user_id} disabled {payload.category} notifications")
+                self.stats["filtered"] += 1
+                continue
+            if not devices:
+                logger.debug(f"No iOS devices for user {user_id}")
+                continue
+            body = bodies.get(id(payload))
+            if body is None:
+                body = bodies[id(payload)] = payload.to_body()
+            for token in devices:
+                sends.append((index, self._post(token, body, user_id=user_id)))
+                
+        counts = [0] * len(items)
+        results = await asyncio.gather(*(coro for _, coro in sends))
+        for (index, _), ok in zip(sends, results):
+            counts[index] += int(ok)
+        return counts
+        
     async def send_to_user(self, user_id: int, payload: PushPayload) -> int:
         """
         Send push to all active devices of user.
@@ -235,72 +403,67 @@ class APNsService:
         Returns:
             Number of successful sends
         """
-        # Check user notification preferences
-        try:
-            prefs = execute_one("""
-                SELECT trades_enabled, signals_enabled, price_alerts_enabled,
-                       daily_report_enabled, trade_opened, trade_closed,
-                       break_even, partial_tp, margin_warning
-                FROM notification_preferences WHERE user_id = %s
-            """, (user_id,))
-            
-            if prefs:
-                category = payload.category or ""
-                p = prefs if isinstance(prefs, dict) else {}
-                
-                # Map APNs categories to preference keys
-                if category == "TRADE_CLOSED" and not p.get("trade_closed", True):
-                    logger.debug(f"User {user_id} disabled trade_closed notifications")
-                    return 0
-                if category == "TRADE_OPENED" and not p.get("trade_opened", True):
-                    logger.debug(f"User {user_id} disabled trade_opened notifications")
-                    return 0
-                if category == "BREAK_EVEN" and not p.get("break_even", True):
-                    logger.debug(f"User {user_id} disabled break_even notifications")
-                    return 0
-                if category == "PARTIAL_TP" and not p.get("partial_tp", True):
-                    logger.debug(f"User {user_id} disabled partial_tp notifications")
-                    return 0
-                if category == "SIGNAL" and not p.get("signals_enabled", True):
-                    logger.debug(f"User {user_id} disabled signal notifications")
-                    return 0
-                if category == "MARGIN_WARNING" and not p.get("margin_warning", True):
-                    logger.debug(f"User {user_id} disabled margin_warning notifications")
-                    return 0
-                if category in ("TRADE_CLOSED", "TRADE_OPENED") and not p.get("trades_enabled", True):
-                    logger.debug(f"User {user_id} disabled all trade notifications")
-                    return 0
-        except Exception as e:
-            logger.debug(f"Could not check preferences for user {user_id}: {e}")
-            # If preferences can't be loaded, send notification anyway
+        return (await self.send_batch([(user_id, payload)]))[0]
         
-        devices = execute("""
-            SELECT device_token FROM user_devices
-            WHERE user_id = %s AND device_type = 'ios' AND is_active = TRUE
-        """, (user_id,))
+    async def submit(self, user_id: int, payload: PushPayload) -> int:
+        """
+        Queue a push and wait for it. Calls arriving within batch_window are
+        sent as one send_batch, so a signal filling hundreds of users costs
+        one preferences/devices lookup instead of hundreds.
         
-        if not devices:
-            logger.debug(f"No iOS devices for user {user_id}")
-            return 0
+        Returns:
+            Number of successful sends
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((user_id, payload, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = safe_create_task(self._flush_after_window(), name="apns_flush")
+        return await future
+        
+    async def _flush_after_window(self):
+        """
+        Send everything submitted during the batch window. Pushes submitted
+        while a batch is in flight go out in the next window of the same task.
+        """
+        pending = []
+        try:
+            while self._pending:
+                await asyncio.sleep(self.config["batch_window"])
+                pending, self._pending = self._pending, []
+                try:
+                    counts = await self.send_batch((uid, payload) for uid, payload, _ in pending)
+                except Exception as e:
+                    logger.error(f"APNs batch failed: {e}")
+                    counts = [0] * len(pending)
+                self._resolve(pending, counts)
+                pending = []
+        except asyncio.CancelledError:
+            # Don't leave submitters waiting on a flush that will never come
+            pending, self._pending = pending + self._pending, []
+            self._resolve(pending, [0] * len(pending))
+            raise
             
-        success_count = 0
-        for device in devices:
-            token = device["device_token"] if isinstance(device, dict) else device[0]
-            if await self.send_push(token, payload):
-                success_count += 1
-                
-        return success_count
+    @staticmethod
+    def _resolve(pending: List[Tuple[int, PushPayload, asyncio.Future]], counts: List[int]):
+        for (_, _, future), count in zip(pending, counts):
+            if not future.done():
+                future.set_result(count)
         
     async def close(self):
-        """Close the session"""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Close the connection pool"""
+        if self._client and not self._client.is_closed:
+            await self._client.aclose()
 
 
 # Global instance
 apns_service = APNsService()
 
 
+def invalidate_push_cache(user_id: int):
+    """Forget cached push preferences/devices of user (after register/unregister/settings change)"""
+    apns_service.invalidate(user_id)
+
+
 # ============================================================================
 # Trade Notification Helpers
 # ============================================================================
@@ -317,6 +480,9 @@ async def send_trade_opened_push(user_id: int, trade_data: dict):
     - leverage: int
     - take_profit: float (optional)
     - stop_loss: float (optional)
+    
+    Pushes submitted at about the same moment (e.g. one signal filling many
+    users) are delivered as a single batch.
     """
     symbol = trade_data.get("symbol", "UNKNOWN")
     side = trade_data.get("side", "LONG").upper()
@@ -342,7 +508,7 @@ async def send_trade_opened_push(user_id: int, trade_data: dict):
         }
     )
     
-    return await apns_service.send_to_user(user_id, payload)
+    return await apns_service.submit(user_id, payload)
 
 
 async def send_trade_closed_push(user_id: int, trade_data: dict):
@@ -357,6 +523,8 @@ async def send_trade_closed_push(user_id: int, trade_data: dict):
     - pnl: float
     - pnl_percent: float
     - exit_reason: str (optional)
+    
+    Batched with other pushes submitted at about the same moment.
     """
     symbol = trade_data.get("symbol", "UNKNOWN")
     side = trade_data.get("side", "LONG").upper()
@@ -394,7 +562,7 @@ async def send_trade_closed_push(user_id: int, trade_data: dict):
         }
     )
     
-    return await apns_service.send_to_user(user_id, payload)
+    return await apns_service.submit(user_id, payload)
 
 
 async def send_daily_digest_push(user_id: int, digest_data: dict):
@@ -466,7 +634,7 @@ async def send_daily_digest_push(user_id: int, digest_data: dict):
         }
     )
     
-    return await apns_service.send_to_user(user_id, payload)
+    return await apns_service.submit(user_id, payload)
 
 
 async def send_break_even_push(user_id: int, symbol: str, side: str, entry_price: float):
@@ -575,15 +743,18 @@ async def calculate_daily_digest(user_id: int) -> Optional[dict]:
     
     Returns digest data or None if no trades today.
     """
+    from services.digest_service import day_bounds
+    
     today = datetime.now().date()
+    day_start, day_end = day_bounds(today)
     
     # Get today's trades
     trades = execute("""
         SELECT symbol, side, pnl, pnl_pct, exit_reason
         FROM trade_logs
-        WHERE user_id = %s AND DATE(ts) = %s
+        WHERE user_id = %s AND ts >= %s AND ts < %s
         ORDER BY pnl DESC
-    """, (user_id, today.isoformat()))
+    """, (user_id, day_start, day_end))
     
     if not trades:
         return None
@@ -616,36 +787,13 @@ async def calculate_daily_digest(user_id: int) -> Optional[dict]:
 
 async def send_daily_digests_to_all_users():
     """
-    Send daily digest to all active users who have trades today.
-    Called at 8 PM daily.
+    Send daily digest push to all active users who have trades today.
+    Called at 8 PM daily. Stats for all users come from one grouped query
+    (services.digest_service); users with daily_report_enabled = FALSE are skipped.
     """
-    logger.info("Starting daily digest push notifications...")
+    from services.digest_service import run_daily_digest
     
-    # Get all users with daily report enabled
-    users = execute("""
-        SELECT u.user_id 
-        FROM users u
-        LEFT JOIN notification_preferences np ON u.user_id = np.user_id
-        WHERE u.is_allowed = 1 
-        AND COALESCE(np.daily_report_enabled, TRUE) = TRUE
-    """)
-    
-    if not users:
-        logger.info("No users for daily digest")
-        return
-        
-    sent_count = 0
-    for user_row in users:
-        user_id = user_row.get("user_id") or user_row[0]
-        
-        try:
-            digest = await calculate_daily_digest(user_id)
-            if digest:
-                result = await send_daily_digest_push(user_id, digest)
-                if result > 0:
-                    sent_count += 1
-                await asyncio.sleep(0.1)  # Rate limiting
-        except Exception as e:
-            logger.error(f"Failed to send digest to {user_id}: {e}")
-            
-    logger.info(f"Daily digest sent to {sent_count} users")
+    logger.info("Starting daily digest push notifications...")
+    report = await run_daily_digest(bot=None, send_websocket=False)
+    logger.info(f"Daily digest sent to {report.push_sent} users")
+    return report
@@ -0,0 +1,366 @@
+"""
+Daily Digest Pipeline for Enliko Bot
+Set-based daily PnL digest for all users:
+- One grouped query over a ts range computes every user's stats
+  (no per-user DATE(ts) queries - the ts index is used)
+- Recipient flags (lang, exchanges, push preference) come from the same query
+- Translations / keyboards resolved once per language
+- Telegram + APNs delivery through a rate-limited concurrent dispatcher
+- Delivery report for each run
+
+Used by NotificationService.send_daily_reports_to_all_users and
+apns_service.send_daily_digests_to_all_users.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.db_postgres import execute, get_conn
+from core.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+DIGEST_CONFIG = {
+    "concurrency": 20,             # Parallel sends in flight
+    "telegram_rate": 25.0,         # Messages/sec (Telegram broadcast limit is ~30/sec)
+    "telegram_burst": 30,
+    "push_rate": 100.0,            # Push sends/sec
+    "push_burst": 100,
+    "max_retries": 1,              # Retries after Telegram RetryAfter
+}
+
+
+@dataclass
+class DigestRecipient:
+    """One user's daily stats + what is needed to deliver them"""
+    user_id: int
+    stats: Dict[str, Any]
+    lang: Optional[str] = None
+    has_bybit: bool = False
+    has_hl: bool = False
+    push_enabled: bool = True
+
+
+@dataclass
+class DigestReport:
+    """Delivery report for one digest run"""
+    day: str
+    recipients: int = 0
+    telegram_sent: int = 0
+    telegram_blocked: int = 0
+    telegram_failed: int = 0
+    push_sent: int = 0
+    push_failed: int = 0
+    duration_sec: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["errors"] = data["errors"][:20]
+        return data
+
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """[start, end) of a calendar day - equivalent to DATE(ts) = day, but sargable"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def _stats_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Row of the grouped query -> NotificationService._query_digest_stats shape"""
+    return {
+        "trades_count": row["trades_count"],
+        "total_pnl": row["total_pnl"] or 0,
+        "avg_pnl": row["avg_pnl"] or 0,
+        "wins": row["wins"] or 0,
+        "losses": row["losses"] or 0,
+        "best_pnl": row["best_pnl"] or 0,
+        "worst_pnl": row["worst_pnl"] or 0,
+        "best_symbol": row["best_symbol"] or "N/A",
+        "worst_symbol": row["worst_symbol"] or "N/A",
+    }
+
+
+def collect_daily_digests(day: date, user_ids: Optional[Iterable[int]] = None) -> List[DigestRecipient]:
+    """
+    Daily stats for every allowed user with trades on `day`, in one query.
+
+    trade_logs is scanned once over the day's ts range and grouped by user;
+    users without trades are never touched.
+    """
+    start, end = day_bounds(day)
+    user_filter = ""
+    params: list = [start, end]
+    if user_ids is not None:
+        user_filter = "AND t.user_id = ANY(%s)"
+        params.append(list(user_ids))
+
+    rows = execute(f"""
+        WITH day_stats AS (
+            SELECT
+                t.user_id,
+                COUNT(*) AS trades_count,
+                COALESCE(SUM(t.pnl), 0) AS total_pnl,
+                COALESCE(AVG(t.pnl), 0) AS avg_pnl,
+                COUNT(*) FILTER (WHERE t.pnl > 0) AS wins,
+                COUNT(*) FILTER (WHERE t.pnl < 0) AS losses,
+                MAX(t.pnl) AS best_pnl,
+                MIN(t.pnl) AS worst_pnl,
+                (ARRAY_AGG(t.symbol ORDER BY t.pnl DESC NULLS LAST))[1] AS best_symbol,
+                (ARRAY_AGG(t.symbol ORDER BY t.pnl ASC NULLS LAST))[1] AS worst_symbol
+            FROM trade_logs t
+            WHERE t.ts >= %s AND t.ts < %s {user_filter}
+            GROUP BY t.user_id
+        )
+        SELECT
+            s.*,
+            u.lang,
+            u.bybit_enabled,
+            (NULLIF(u.demo_api_key, '') IS NOT NULL AND NULLIF(u.demo_api_secret, '') IS NOT NULL) AS has_bybit_demo,
+            (NULLIF(u.real_api_key, '') IS NOT NULL AND NULLIF(u.real_api_secret, '') IS NOT NULL) AS has_bybit_real,
+            u.hl_enabled,
+            COALESCE(NULLIF(u.hl_testnet_private_key, ''), NULLIF(u.hl_mainnet_private_key, ''),
+                     NULLIF(u.hl_private_key, '')) IS NOT NULL AS has_hl_key,
+            COALESCE(np.daily_report_enabled, TRUE) AS push_enabled
+        FROM day_stats s
+        JOIN users u ON u.user_id = s.user_id
+        LEFT JOIN notification_preferences np ON np.user_id = s.user_id
+        WHERE u.is_allowed = 1
+        ORDER BY s.user_id
+    """, tuple(params))
+
+    recipients = []
+    for row in rows:
+        # Same rules as db.is_bybit_enabled / db.is_hl_enabled
+        bybit_flag = row.get("bybit_enabled")
+        has_bybit = not (bybit_flag is False or bybit_flag == 0) and bool(
+            row.get("has_bybit_demo") or row.get("has_bybit_real")
+        )
+        recipients.append(DigestRecipient(
+            user_id=row["user_id"],
+            stats=_stats_from_row(row),
+            lang=row.get("lang"),
+            has_bybit=has_bybit,
+            has_hl=bool(row.get("hl_enabled") and row.get("has_hl_key")),
+            push_enabled=bool(row.get("push_enabled", True)),
+        ))
+    return recipients
+
+
+def push_digest_data(stats: Dict[str, Any], day: date) -> Dict[str, Any]:
+    """Stats -> payload for apns_service.send_daily_digest_push"""
+    trades_count = stats["trades_count"]
+    return {
+        "date": day.strftime("%b %d, %Y"),
+        "trades_count": trades_count,
+        "wins": stats["wins"],
+        "losses": stats["losses"],
+        "total_pnl": stats["total_pnl"],
+        "win_rate": (stats["wins"] / trades_count * 100) if trades_count > 0 else 0,
+        "best_trade_pnl": stats["best_pnl"],
+        "best_trade_symbol": stats["best_symbol"],
+        "worst_trade_pnl": stats["worst_pnl"],
+        "worst_trade_symbol": stats["worst_symbol"],
+    }
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+class DigestRenderer:
+    """
+    Per-language translations and keyboards, resolved once per run.
+
+    `texts` maps lang -> translation dict (bot.LANGS); keyboards only depend
+    on (lang, has_bybit, has_hl), so they are built once per combination.
+    """
+
+    def __init__(self, texts: Dict[str, dict], default_lang: str = "en"):
+        self.texts = texts
+        self.default_lang = default_lang
+        self._keyboards: Dict[tuple, Any] = {}
+
+    def translations(self, lang: Optional[str]) -> dict:
+        return self.texts.get(lang or self.default_lang) or self.texts.get(self.default_lang, {})
+
+    def render(self, recipient: DigestRecipient, day: date) -> Tuple[str, str, Any]:
+        from services.notification_service import NotificationService
+
+        t = self.translations(recipient.lang)
+        message, vibe = NotificationService.build_digest_message(recipient.stats, day, t=t)
+
+        key = (recipient.lang or self.default_lang, recipient.has_bybit, recipient.has_hl)
+        keyboard = self._keyboards.get(key)
+        if keyboard is None:
+            keyboard = NotificationService.build_digest_keyboard(
+                recipient.user_id, t=t, has_bybit=recipient.has_bybit, has_hl=recipient.has_hl
+            )
+            self._keyboards[key] = keyboard
+        return message, vibe, keyboard
+
+
+# =============================================================================
+# DISPATCH
+# =============================================================================
+
+class DigestDispatcher:
+    """Bounded-concurrency, token-bucket rate-limited delivery"""
+
+    def __init__(self, concurrency: int = None):
+        cfg = DIGEST_CONFIG
+        self.semaphore = asyncio.Semaphore(concurrency or cfg["concurrency"])
+        self.telegram_bucket = TokenBucket(capacity=cfg["telegram_burst"], refill_rate=cfg["telegram_rate"])
+        self.push_bucket = TokenBucket(capacity=cfg["push_burst"], refill_rate=cfg["push_rate"])
+
+    async def send_telegram(self, bot, user_id: int, text: str, report: DigestReport, **kwargs) -> bool:
+        from telegram.error import Forbidden, RetryAfter
+
+        for attempt in range(DIGEST_CONFIG["max_retries"] + 1):
+            await self.telegram_bucket.acquire()
+            try:
+                await bot.send_message(user_id, text, **kwargs)
+                report.telegram_sent += 1
+                return True
+            except RetryAfter as e:
+                if attempt >= DIGEST_CONFIG["max_retries"]:
+                    break
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+                await asyncio.sleep(float(retry_after))
+            except Forbidden:
+                # User blocked the bot
+                report.telegram_blocked += 1
+                return False
+            except Exception as e:
+                report.errors.append(f"telegram {user_id}: {e}")
+                break
+        report.telegram_failed += 1
+        return False
+
+    async def send_push(self, send: Callable[[], Awaitable[int]], user_id: int, report: DigestReport) -> bool:
+        await self.push_bucket.acquire()
+        try:
+            if await send() > 0:
+                report.push_sent += 1
+                return True
+        except Exception as e:
+            report.errors.append(f"push {user_id}: {e}")
+            report.push_failed += 1
+        return False
+
+    async def run(self, recipients: List[DigestRecipient], deliver: Callable[[DigestRecipient], Awaitable[None]]):
+        async def _one(recipient: DigestRecipient):
+            async with self.semaphore:
+                try:
+                    await deliver(recipient)
+                except Exception as e:
+                    logger.debug(f"Digest delivery failed for {recipient.user_id}: {e}")
+
+        await asyncio.gather(*[_one(r) for r in recipients])
+
+
+def save_digest_notifications(rows: List[Tuple[int, str, str, dict]]):
+    """Batch insert of notification history rows (one round trip)"""
+    if not rows:
+        return
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.executemany("""
+                INSERT INTO notification_queue (user_id, notification_type, title, message, data, is_sent, send_telegram)
+                VALUES (%s, 'daily_report', %s, %s, %s, TRUE, TRUE)
+            """, [(uid, title, message, json.dumps(data)) for uid, title, message, data in rows])
+    except Exception as e:
+        logger.error(f"Failed to save digest notifications: {e}")
+
+
+async def run_daily_digest(
+    bot=None,
+    day: Optional[date] = None,
+    texts: Optional[Dict[str, dict]] = None,
+    default_lang: str = "en",
+    send_push: bool = True,
+    send_websocket: bool = True,
+    user_ids: Optional[Iterable[int]] = None,
+) -> DigestReport:
+    """
+    Compute and deliver the daily digest for all users.
+
+    bot=None sends push notifications only (APNs digest job).
+    """
+    day = day or datetime.now().date()
+    started = time.monotonic()
+    report = DigestReport(day=day.isoformat())
+
+    recipients = await asyncio.to_thread(collect_daily_digests, day, user_ids)
+    report.recipients = len(recipients)
+    if not recipients:
+        logger.info(f"Daily digest {day}: no users with trades")
+        return report
+
+    renderer = DigestRenderer(texts or {}, default_lang)
+    dispatcher = DigestDispatcher()
+    history: List[Tuple[int, str, str, dict]] = []
+
+    push_fn = None
+    if send_push:
+        try:
+            from services.apns_service import send_daily_digest_push as push_fn
+        except ImportError:
+            push_fn = None
+
+    ws_fn = None
+    if send_websocket:
+        from services.notification_service import _send_to_websocket as ws_fn
+
+    async def deliver(r: DigestRecipient):
+        stats = r.stats
+        trades_count, wins, losses = stats["trades_count"], stats["wins"], stats["losses"]
+        win_rate = (wins / trades_count * 100) if trades_count > 0 else 0
+        vibe = None
+
+        if bot is not None:
+            message, vibe, keyboard = renderer.render(r, day)
+            await dispatcher.send_telegram(bot, r.user_id, message, report, parse_mode='HTML', reply_markup=keyboard)
+
+        # Telegram runs send push regardless of preference (send_to_user filters
+        # by category); the push-only job honours daily_report_enabled up front
+        if push_fn and (bot is not None or r.push_enabled):
+            digest = push_digest_data(stats, day)
+            await dispatcher.send_push(lambda: push_fn(r.user_id, digest), r.user_id, report)
+
+        if ws_fn and vibe is not None:
+            ws_notification = {
+                "id": f"digest_{datetime.now().timestamp()}",
+                "type": "daily_report",
+                "title": f"Daily Report • {vibe}",
+                "message": f"PnL: ${stats['total_pnl']:+.2f} • {wins}W/{losses}L ({win_rate:.0f}%)",
+                "data": {
+                    "date": day.isoformat(),
+                    "trades_count": trades_count,
+                    "total_pnl": stats["total_pnl"],
+                    "wins": wins,
+                    "losses": losses,
+                    "win_rate": win_rate,
+                },
+                "created_at": datetime.now().isoformat()
+            }
+            await ws_fn(r.user_id, ws_notification)
+            history.append((r.user_id, ws_notification["title"], ws_notification["message"], ws_notification["data"]))
+
+    await dispatcher.run(recipients, deliver)
+    await asyncio.to_thread(save_digest_notifications, history)
+
+    report.duration_sec = round(time.monotonic() - started, 2)
+    logger.info(f"Daily digest {day}: {report.to_dict()}")
+    return report
@@ -212,8 +212,12 @@ class NotificationService:
         Query trade_logs for daily digest stats with optional exchange/account_type filters.
         Returns dict with stats or None if no trades.
         """
-        where_clauses = ["user_id = %s", "DATE(ts) = %s"]
-        params: list = [user_id, today.isoformat()]
+        from services.digest_service import day_bounds
+        
+        # ts range instead of DATE(ts) so idx_logs_user_ts is usable
+        day_start, day_end = day_bounds(today)
+        where_clauses = ["user_id = %s", "ts >= %s", "ts < %s"]
+        params: list = [user_id, day_start, day_end]
         
         if exchange:
             where_clauses.append("(exchange = %s OR exchange IS NULL)")
@@ -657,27 +661,15 @@ class NotificationService:
                 
     async def send_daily_reports_to_all_users(self):
         """
-        Send daily PnL reports to all active users
-        Uses PostgreSQL via context manager
+        Send daily PnL reports to all active users.
+        All users' stats come from one grouped query; delivery is concurrent
+        and rate-limited (see services.digest_service).
         """
         try:
-            # Import get_texts to load user-specific translations
-            from bot import get_texts
+            from bot import LANGS, DEFAULT_LANG
+            from services.digest_service import run_daily_digest
             
-            # Get all users using PostgreSQL
-            with get_conn() as conn:
-                cur = conn.cursor()
-                cur.execute("SELECT user_id FROM users WHERE is_allowed = 1")
-                users = cur.fetchall()
-            
-            for row in users:
-                uid = row[0] if isinstance(row, (list, tuple)) else row.get('user_id')
-                try:
-                    t = get_texts(uid)  # Load per-user translations
-                    await self.send_daily_pnl_report(uid, t)
-                    await asyncio.sleep(0.1)  # Rate limiting
-                except Exception as e:
-                    logger.debug(f"Failed to send daily report to {uid}: {e}")
+            return await run_daily_digest(bot=self.bot, texts=LANGS, default_lang=DEFAULT_LANG)
                     
         except Exception as e:
             logger.error(f"Error sending daily reports: {e}")
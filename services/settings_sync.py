@@ -59,6 +59,14 @@ class SettingsSyncManager:
     
     async def notify_change(self, change: SettingChange):
         """Notify all subscribers of a setting change"""
+        # Drop the user's cached config in every bot/webapp process first,
+        # so subscribers (and the other process) read the new settings
+        try:
+            from core.db_executor import adb
+            await adb.invalidate_user_cache(change.user_id)
+        except Exception as e:
+            logger.warning(f"Config cache invalidation failed for user {change.user_id}: {e}")
+        
         async with self._lock:
             # Store in history
             if change.user_id not in self._change_history:
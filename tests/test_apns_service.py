@@ -0,0 +1,145 @@
+"""
+APNs Delivery Tests
+Batched sends, preference/device cache, submit() coalescing, token cleanup
+
+Run: python -m pytest tests/test_apns_service.py -v
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services import apns_service as apns_module
+from services.apns_service import APNsService, PushPayload, push_allowed
+
+PREFERENCES = {2: {"user_id": 2, "trade_opened": False, "trades_enabled": True}}
+DEVICES = {1: ["tok-1a", "tok-1b"], 2: ["tok-2"], 4: ["tok-dead"]}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    queries = []
+
+    def fake_execute(query, params):
+        queries.append(" ".join(query.split()))
+        if "FROM notification_preferences" in query:
+            return [PREFERENCES[uid] for uid in params[0] if uid in PREFERENCES]
+        if "FROM user_devices" in query:
+            return [{"user_id": uid, "device_token": t} for uid in params[0] for t in DEVICES.get(uid, [])]
+        return None
+
+    monkeypatch.setattr(apns_module, "execute", fake_execute)
+    return queries
+
+
+@pytest.fixture
+async def service():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        token = request.url.path.rsplit("/", 1)[-1]
+        if token == "tok-dead":
+            return httpx.Response(410, json={"reason": "Unregistered"})
+        return httpx.Response(200)
+
+    svc = APNsService(config={"batch_window": 0.01})
+    svc._generate_token = lambda: "jwt"
+    svc._client = httpx.AsyncClient(base_url=apns_module.APNS_HOST, transport=httpx.MockTransport(handler))
+    svc._streams = asyncio.Semaphore(svc.config["max_streams"])
+    svc.requests = requests
+    yield svc
+    await svc.close()
+
+
+def _opened():
+    return PushPayload(title="BTCUSDT LONG", body="Entry", category="TRADE_OPENED", custom_data={"type": "trade_opened"})
+
+
+class TestSendBatch:
+
+    async def test_one_lookup_per_batch(self, service, db):
+        payload = _opened()
+        counts = await service.send_batch([(1, payload), (2, payload), (3, payload)])
+
+        assert counts == [2, 0, 0]          # 2 opted out of trade_opened, 3 has no device
+        assert len(db) == 2
+        assert sorted(r.url.path for r in service.requests) == ["/3/device/tok-1a", "/3/device/tok-1b"]
+        body = json.loads(service.requests[0].content)
+        assert body["aps"]["category"] == "TRADE_OPENED" and body["type"] == "trade_opened"
+        assert service.requests[0].headers["apns-topic"] == apns_module.APNS_BUNDLE_ID
+
+        # Cached: the next burst does not touch the database
+        await service.send_batch([(1, payload), (3, payload)])
+        assert len(db) == 2
+
+    async def test_invalidate_reloads_user(self, service, db):
+        await service.send_to_user(1, _opened())
+        service.invalidate(1)
+        await service.send_to_user(1, _opened())
+        assert len(db) == 4
+
+    async def test_unregistered_token_deactivated(self, service, db):
+        assert await service.send_to_user(4, _opened()) == 0
+        assert any(q.startswith("UPDATE user_devices SET is_active = FALSE") for q in db)
+        assert service._devices.get(4) is None
+
+
+class TestSubmit:
+
+    async def test_concurrent_submits_coalesce(self, service, db):
+        payload = _opened()
+        counts = await asyncio.gather(*(service.submit(uid, payload) for uid in (1, 2, 3, 1)))
+
+        assert counts == [2, 0, 0, 2]
+        assert service.stats["batches"] == 1
+        assert len(db) == 2
+
+    async def test_submit_during_inflight_batch(self, service, db):
+        in_flight, release = asyncio.Event(), asyncio.Event()
+        send_batch = service.send_batch
+
+        async def slow_send_batch(items):
+            items = list(items)
+            if service.stats["batches"] == 0:
+                in_flight.set()
+                await release.wait()
+            return await send_batch(items)
+
+        service.send_batch = slow_send_batch
+        first = asyncio.create_task(service.submit(1, _opened()))
+        await in_flight.wait()
+        second = asyncio.create_task(service.submit(1, _opened()))
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert await asyncio.wait_for(asyncio.gather(first, second), 1) == [2, 2]
+        assert service._pending == []
+
+    async def test_cancelled_flush_resolves_waiters(self, service, db):
+        service.config["batch_window"] = 10
+        waiter = asyncio.create_task(service.submit(1, _opened()))
+        await asyncio.sleep(0.01)   # flush task is now inside the batch window
+        service._flush_task.cancel()
+
+        assert await asyncio.wait_for(waiter, 1) == 0
+
+    async def test_trade_helper_uses_batching(self, monkeypatch, service, db):
+        monkeypatch.setattr(apns_module, "apns_service", service)
+        results = await asyncio.gather(
+            apns_module.send_trade_opened_push(1, {"symbol": "BTCUSDT", "side": "long", "entry_price": 100}),
+            apns_module.send_trade_closed_push(2, {"symbol": "BTCUSDT", "side": "long", "pnl": 5}),
+        )
+        assert results == [2, 1]
+        assert service.stats["batches"] == 1
+
+
+class TestPreferences:
+
+    def test_category_flags(self):
+        assert push_allowed(None, "TRADE_CLOSED")
+        assert push_allowed({"trade_closed": True}, "TRADE_CLOSED")
+        assert not push_allowed({"trades_enabled": False}, "TRADE_CLOSED")
+        assert not push_allowed({"signals_enabled": False}, "SIGNAL")
+        assert push_allowed({"signals_enabled": False}, "DAILY_DIGEST")
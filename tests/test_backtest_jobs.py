@@ -0,0 +1,339 @@
+"""
+Backtest Job Queue Tests
+Result cache, in-flight dedup, tier priority/quotas, restart recovery,
+several worker processes sharing one table
+
+Run: python -m pytest tests/test_backtest_jobs.py -v
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from webapp.services import backtest_jobs as jobs_module
+from webapp.services.backtest_jobs import (
+    BacktestJob, BacktestJobQueue, QuotaExceeded, request_hash,
+)
+
+
+class MemoryStore:
+    """In-memory stand-in for the backtest_jobs table"""
+
+    def __init__(self):
+        self.rows = {}
+        self.heartbeats = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _copy(job):
+        return BacktestJob(**{**job.__dict__, "subscribers": set(job.subscribers)})
+
+    def save(self, job):
+        row = self.rows.get(job.id)
+        if row is not None and row.owner != job.owner:
+            return
+        self.rows[job.id] = self._copy(job)
+        self.heartbeats.setdefault(job.id, time.time())
+
+    def create(self, job, max_active):
+        with self.lock:
+            for row in self.rows.values():
+                if row.request_hash == job.request_hash and row.is_active:
+                    return "existing", self._copy(row)
+            if sum(1 for r in self.rows.values() if r.user_id == job.user_id and r.is_active) >= max_active:
+                return "quota", None
+            self.save(job)
+            return "created", job
+
+    def find_result(self, digest, max_age_hours):
+        done = [j for j in self.rows.values() if j.request_hash == digest and j.status == "completed"]
+        return done[-1].result if done else None
+
+    def load(self, job_id):
+        return self.rows.get(job_id)
+
+    def claim_pending(self, owner, lease_seconds):
+        with self.lock:
+            claimed = []
+            for row in self.rows.values():
+                stale = time.time() - self.heartbeats.get(row.id, 0) > lease_seconds
+                if row.is_active and (row.owner is None or stale):
+                    row.owner, row.status = owner, "queued"
+                    self.heartbeats[row.id] = time.time()
+                    claimed.append(self._copy(row))
+            return claimed
+
+    def heartbeat(self, owner):
+        for row in self.rows.values():
+            if row.owner == owner and row.is_active:
+                self.heartbeats[row.id] = time.time()
+
+    def release(self, owner):
+        for row in self.rows.values():
+            if row.owner == owner and row.is_active:
+                row.owner, row.status = None, "queued"
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Fake runner: records calls, blocks until released"""
+    calls = []
+    release = threading.Event()
+
+    def fake_backtest(params):
+        calls.append(params["strategy"])
+        release.wait(5)
+        return {"strategy": params["strategy"], "total_trades": 3}
+
+    monkeypatch.setitem(jobs_module.JOB_CONFIG, "use_process_pool", False)
+    monkeypatch.setitem(jobs_module.JOB_RUNNERS, "backtest", fake_backtest)
+    sent = []
+
+    async def capture(backtest_id, *args, **kwargs):
+        sent.append((backtest_id, args))
+
+    from webapp.api import backtest_ws
+    for name in ("send_progress", "send_result", "send_error"):
+        monkeypatch.setattr(backtest_ws, name, capture)
+
+    yield calls, release, sent
+    release.set()
+
+
+@pytest.fixture
+async def queue():
+    q = BacktestJobQueue(store=MemoryStore(), workers=1)
+    await q.start()
+    yield q
+    await q.stop()
+
+
+PARAMS = {"strategies": ["elcaro", "oi"], "symbol": "BTCUSDT", "timeframe": "1h", "days": 30}
+
+
+async def _wait(job, status="completed"):
+    for _ in range(200):
+        if job.status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stuck in {job.status}")
+
+
+class TestJobQueue:
+
+    async def test_runs_and_streams_progress(self, queue, runs):
+        calls, release, sent = runs
+        release.set()
+        job = await queue.submit(1, "backtest", PARAMS, tier="premium")
+        await _wait(job)
+
+        assert calls == ["elcaro", "oi"]
+        assert set(job.result) == {"elcaro", "oi"}
+        assert queue.store.rows[job.id].status == "completed"
+        assert all(bid == job.id for bid, _ in sent)
+        assert len(sent) == 4  # 2 units + final progress + result
+
+    async def test_identical_request_uses_stored_result(self, queue, runs):
+        calls, release, _ = runs
+        release.set()
+        first = await queue.submit(1, "backtest", PARAMS)
+        await _wait(first)
+
+        second = await queue.submit(2, "backtest", dict(PARAMS))
+        assert second.cached and second.status == "completed"
+        assert second.result == first.result
+        assert len(calls) == 2
+        # Persisted, so it survives _prune and is visible to other workers
+        assert queue.store.rows[second.id].status == "completed"
+
+    async def test_inflight_requests_attach(self, queue, runs):
+        calls, release, _ = runs
+        first = await queue.submit(1, "backtest", PARAMS)
+        second = await queue.submit(2, "backtest", PARAMS)
+
+        assert second is first
+        assert first.subscribers == {1, 2}
+
+        # One subscriber cancelling does not stop the shared job
+        assert queue.cancel(first.id, user_id=1)
+        # A user who is not subscribed cannot cancel it
+        assert not queue.cancel(first.id, user_id=3)
+        release.set()
+        await _wait(first)
+        assert calls == ["elcaro", "oi"]
+
+    async def test_quota_per_tier(self, queue, runs):
+        await queue.submit(1, "backtest", {**PARAMS, "days": 1}, tier="basic")
+        await queue.submit(1, "backtest", {**PARAMS, "days": 2}, tier="basic")
+        with pytest.raises(QuotaExceeded):
+            await queue.submit(1, "backtest", {**PARAMS, "days": 3}, tier="basic")
+        # Other users are unaffected
+        await queue.submit(2, "backtest", {**PARAMS, "days": 3}, tier="basic")
+
+    async def test_priority_by_tier(self, queue, runs):
+        calls, release, _ = runs
+        blocker = await queue.submit(9, "backtest", {**PARAMS, "strategies": ["blocker"]}, tier="enterprise")
+        while calls != ["blocker"]:
+            await asyncio.sleep(0.01)
+
+        low = await queue.submit(1, "backtest", {**PARAMS, "strategies": ["trial"]}, tier="trial")
+        high = await queue.submit(2, "backtest", {**PARAMS, "strategies": ["premium"]}, tier="premium")
+        release.set()
+        await _wait(low)
+
+        assert calls == ["blocker", "premium", "trial"]
+        assert blocker.status == high.status == "completed"
+
+    async def test_cancel_queued_job(self, queue, runs):
+        calls, release, _ = runs
+        await queue.submit(1, "backtest", {**PARAMS, "strategies": ["a"]})
+        job = await queue.submit(2, "backtest", {**PARAMS, "strategies": ["b"]})
+
+        assert queue.cancel(job.id)
+        release.set()
+        await _wait(job, "cancelled")
+        assert "b" not in calls
+
+    async def test_pending_jobs_recovered_on_start(self, runs):
+        calls, release, _ = runs
+        release.set()
+        store = MemoryStore()
+        orphan = BacktestJob(
+            id="orphan", user_id=1, kind="backtest", params=PARAMS,
+            request_hash=request_hash("backtest", PARAMS), status="running",
+        )
+        store.save(orphan)
+
+        q = BacktestJobQueue(store=store, workers=1)
+        await q.start()
+        try:
+            await _wait(q.jobs["orphan"])
+        finally:
+            await q.stop()
+        assert store.rows["orphan"].status == "completed"
+
+
+class TestRequestHash:
+
+    def test_key_order_irrelevant(self):
+        a = request_hash("backtest", {"symbol": "BTCUSDT", "days": 30}, now=1_000_000)
+        b = request_hash("backtest", {"days": 30, "symbol": "BTCUSDT"}, now=1_000_000)
+        assert a == b
+
+    def test_changes_with_bar(self):
+        params = {"symbol": "BTCUSDT", "timeframe": "1h"}
+        assert request_hash("backtest", params, now=3600 * 10) == request_hash("backtest", params, now=3600 * 10 + 1800)
+        assert request_hash("backtest", params, now=3600 * 10) != request_hash("backtest", params, now=3600 * 11)
+        assert request_hash("backtest", params, now=0) != request_hash("walk_forward", params, now=0)
+
+
+class TestSeveralWorkers:
+    """Two queues sharing one table, like two uvicorn worker processes"""
+
+    @pytest.fixture
+    async def pair(self):
+        store = MemoryStore()
+        a, b = BacktestJobQueue(store=store, workers=1), BacktestJobQueue(store=store, workers=1)
+        a.owner, b.owner = "host:1", "host:2"
+        yield store, a, b
+        await a.stop()
+        await b.stop()
+
+    async def test_orphan_claimed_once(self, pair, runs):
+        calls, release, _ = runs
+        store, a, b = pair
+        orphan = BacktestJob(
+            id="orphan", user_id=1, kind="backtest", params={**PARAMS, "strategies": ["x"]},
+            request_hash="h", status="running",
+        )
+        store.save(orphan)
+
+        await a.start()
+        await b.start()
+        release.set()
+        await _wait(a.jobs["orphan"])
+
+        assert "orphan" not in b.jobs
+        assert a._inflight == {}
+        assert calls == ["x"]
+
+    async def test_quota_and_dedup_across_workers(self, pair, runs):
+        store, a, b = pair
+        first = await a.submit(1, "backtest", {**PARAMS, "days": 1}, tier="trial")
+        with pytest.raises(QuotaExceeded):
+            await b.submit(1, "backtest", {**PARAMS, "days": 2}, tier="trial")
+
+        same = await b.submit(2, "backtest", {**PARAMS, "days": 1}, tier="trial")
+        assert same.id == first.id
+        assert same.id not in b.jobs
+
+    async def test_stop_releases_jobs(self, pair, runs):
+        store, a, b = pair
+        job = await a.submit(1, "backtest", {**PARAMS, "strategies": ["y"]})
+        await a.stop()
+        assert store.rows[job.id].owner is None
+
+        await b.start()
+        assert b.jobs[job.id].owner == "host:2"
+        assert b._inflight[job.request_hash] == job.id
+
+
+class FakePgCursor:
+    """psycopg2-like cursor: RETURNING rows are buffered and consumed by fetch*"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.rowcount = len(rows)
+        self.description = [("id",)] if rows else None
+
+    def execute(self, query, params=None):
+        self.query = query
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+
+class FakePgConnection:
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self, cursor_factory=None):
+        return FakePgCursor(self.rows)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestStoreClaim:
+    """BacktestJobStore.claim_pending through the real db_helper cursor wrapper"""
+
+    def test_all_returned_rows_claimed(self, monkeypatch):
+        db_helper = pytest.importorskip("webapp.api.db_helper")
+        rows = [
+            {
+                "id": f"job{i}", "user_id": 1, "kind": "backtest", "params": "{}",
+                "request_hash": f"h{i}", "priority": 0, "status": "queued",
+                "created_at": None, "owner": "host:1",
+            }
+            for i in range(3)
+        ]
+        monkeypatch.setattr(
+            db_helper, "get_db", lambda: db_helper._DictCompatConnection(FakePgConnection(rows)),
+        )
+
+        claimed = jobs_module.BacktestJobStore().claim_pending("host:1", 90)
+
+        assert sorted(job.id for job in claimed) == ["job0", "job1", "job2"]
+
@@ -0,0 +1,133 @@
+"""
+Tests for core.bulk_close - batched, concurrent close-all engine
+"""
+
+import sys
+import time
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.bulk_close import (
+    CloseResult,
+    close_accounts,
+    close_bybit_account,
+    close_hl_account,
+)
+
+
+class FakeBybit:
+    """Records Bybit calls and answers like the v5 API"""
+    
+    def __init__(self, positions, rejected=()):
+        self.positions = positions
+        self.rejected = set(rejected)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def __call__(self, method, path, params=None, body=None):
+        self.calls.append(path)
+        if path == "/v5/position/list":
+            return {"retCode": 0, "result": {"list": self.positions}}
+        if path == "/v5/order/create-batch":
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            placed, ext = [], []
+            for order in body["request"]:
+                assert order["reduceOnly"] is True
+                if order["symbol"] in self.rejected:
+                    placed.append({"orderId": "", "symbol": order["symbol"]})
+                    ext.append({"code": 110017, "msg": "current position is zero"})
+                else:
+                    placed.append({"orderId": f"oid-{order['symbol']}", "symbol": order["symbol"]})
+                    ext.append({"code": 0, "msg": "OK"})
+            return {"retCode": 0, "result": {"list": placed}, "retExtInfo": {"list": ext}}
+        if path == "/v5/order/history":
+            return {"retCode": 0, "result": {"list": [
+                {"orderId": f"oid-{p['symbol']}", "avgPrice": "110", "cumExecQty": p["size"]}
+                for p in self.positions
+            ]}}
+        raise AssertionError(f"Unexpected call {path}")
+
+
+def _bybit_positions(n):
+    return [
+        {"symbol": f"COIN{i}USDT", "side": "Buy", "size": "2", "avgPrice": "100", "markPrice": "105", "positionIdx": 0}
+        for i in range(n)
+    ]
+
+
+class TestBulkCloseEngine:
+    """core.bulk_close: batched, concurrent close-all"""
+    
+    @pytest.fixture(autouse=True)
+    def no_fill_delay(self, monkeypatch):
+        import core.bulk_close as bulk_close
+        monkeypatch.setattr(bulk_close, "FILL_LOOKUP_DELAY", 0)
+    
+    async def test_bybit_positions_go_out_in_batches(self):
+        fake = FakeBybit(_bybit_positions(45))
+        results = await close_bybit_account(fake, "demo", limiter_key="bulk-test-1")
+        
+        assert fake.calls.count("/v5/order/create-batch") == 3  # 20 + 20 + 5
+        assert fake.calls.count("/v5/order/history") == 1
+        assert fake.max_in_flight > 1
+        assert len(results) == 45 and all(r.success for r in results)
+        assert results[0].exit_price == 110
+        assert results[0].pnl == pytest.approx(20.0)
+        assert all(r.account_type == "demo" and r.latency_ms >= 0 for r in results)
+    
+    async def test_bybit_rejected_order_reported_per_symbol(self):
+        fake = FakeBybit(_bybit_positions(3), rejected={"COIN1USDT"})
+        results = {r.symbol: r for r in await close_bybit_account(fake, "real", limiter_key="bulk-test-2")}
+        
+        assert not results["COIN1USDT"].success
+        assert "position is zero" in results["COIN1USDT"].error
+        assert results["COIN0USDT"].success and results["COIN2USDT"].success
+    
+    async def test_hl_positions_closed_in_one_action(self):
+        class FakeAdapter:
+            close_calls = []
+            
+            async def fetch_positions(self):
+                return {"retCode": 0, "result": {"list": [
+                    {"symbol": "BTCUSDT", "side": "Buy", "size": "0.1", "entryPrice": "50000", "markPrice": "51000"},
+                    {"symbol": "ETHUSDT", "side": "Sell", "size": "1", "entryPrice": "3000", "markPrice": "2900"},
+                ]}}
+            
+            async def close_positions(self, positions):
+                self.close_calls.append(positions)
+                return {"retCode": 0, "result": {"list": [
+                    {"symbol": "BTCUSDT", "orderId": "1", "avgPrice": "51000", "cumExecQty": "0.1", "error": ""},
+                    {"symbol": "ETHUSDT", "orderId": "", "avgPrice": "0", "cumExecQty": "0", "error": "Order could not immediately match"},
+                ]}}
+        
+        adapter = FakeAdapter()
+        results = await close_hl_account(adapter, "mainnet", limiter_key="bulk-test-3")
+        
+        assert len(adapter.close_calls) == 1
+        assert results[0].success and results[0].pnl == pytest.approx(100.0)
+        assert not results[1].success and "immediately match" in results[1].error
+    
+    async def test_accounts_closed_concurrently(self):
+        async def slow_account():
+            await asyncio.sleep(0.1)
+            return [CloseResult(symbol="BTCUSDT", account_type="demo", side="Buy", size=1, success=True, pnl=5)]
+        
+        async def broken_account():
+            await asyncio.sleep(0.1)
+            raise RuntimeError("API key expired")
+        
+        started = time.perf_counter()
+        report = await close_accounts({"demo": slow_account, "real": broken_account})
+        
+        assert time.perf_counter() - started < 0.18
+        assert report.closed == 1 and report.total_pnl == 5
+        assert report.errors == {"real": "API key expired"}
+        assert report.to_dict()["results"][0]["symbol"] == "BTCUSDT"
@@ -0,0 +1,245 @@
+"""
+Tests for core.config_cache - tiered user config cache with pub/sub invalidation
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_cache import TieredUserConfigCache, ALL_USERS
+
+
+class FakeRedis:
+    """Just enough of redis.Redis for the cache"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self._check()
+        self.data[key] = value
+
+    def mget(self, keys):
+        self._check()
+        return [self.data.get(k) for k in keys]
+
+    def eval(self, script, numkeys, key, user_ver_key, all_ver_key, user_ver, all_ver, ttl, value):
+        """The guarded SETEX script"""
+        self._check()
+        if self.data.get(user_ver_key, "0") == user_ver and self.data.get(all_ver_key, "0") == all_ver:
+            self.data[key] = value
+            return 1
+        return 0
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+
+    def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        return [k for k in list(self.data) if k.startswith(prefix)]
+
+    def pipeline(self, transaction=True):
+        redis = self
+        ops = []
+
+        class Pipeline:
+            def incr(self, key):
+                ops.append(lambda: redis.incr(key))
+
+            def expire(self, key, ttl):
+                pass
+
+            def delete(self, key):
+                ops.append(lambda: redis.data.pop(key, None))
+
+            def publish(self, channel, message):
+                ops.append(lambda: redis.published.append((channel, message)))
+
+            def execute(self):
+                redis._check()
+                for op in ops:
+                    op()
+
+        return Pipeline()
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def make_cache(redis, **config):
+    return TieredUserConfigCache({"use_redis": True, **config}, redis_client=redis)
+
+
+def load(cache, user_id, cfg):
+    """A database load as db.get_user_config does it"""
+    token = cache.begin_load(user_id)
+    cache.set(user_id, cfg, token)
+
+
+class TestTiers:
+
+    def test_l1_hit_returns_copy(self, redis):
+        cache = make_cache(redis)
+        cache.set(1, {"percent": 1.0})
+
+        cfg = cache.get(1)
+        cfg["percent"] = 99
+        assert cache.get(1) == {"percent": 1.0}
+        assert cache.stats["l1_hits"] == 2
+
+    def test_l1_ttl_short_without_listener(self, redis):
+        cache = make_cache(redis, l1_ttl=900.0, fallback_ttl=30.0)
+        assert cache.l1_ttl == 30.0
+
+        cache.listening = True
+        assert cache.l1_ttl == 900.0
+
+    def test_l2_shared_between_processes(self, redis):
+        webapp = make_cache(redis)
+        bot = make_cache(redis)
+
+        load(webapp, 7, {"lang": "ru"})
+
+        assert bot.get(7) == {"lang": "ru"}
+        assert bot.stats["l2_hits"] == 1
+        # Unshared reads (event loop thread) never touch Redis
+        assert make_cache(redis).get(7, shared=False) is None
+
+    def test_redis_errors_fall_back_to_l1(self, redis):
+        cache = make_cache(redis)
+        redis.fail = True
+
+        load(cache, 1, {"a": 1})
+
+        assert cache.get(1) == {"a": 1}
+        assert cache.stats["redis_errors"] == 1
+        assert cache.stats["redis"] is False
+
+
+class TestInvalidation:
+
+    def test_invalidate_drops_l2_and_publishes(self, redis):
+        webapp = make_cache(redis)
+        bot = make_cache(redis)
+        load(webapp, 7, {"lang": "ru"})
+        assert bot.get(7) == {"lang": "ru"}
+
+        webapp.invalidate(7)
+        for _, message in redis.published:
+            bot.handle_message(message)
+
+        assert redis.published == [(webapp.config["channel"], "7")]
+        assert "user_config:7" not in redis.data
+        assert bot.get(7) is None
+
+    def test_invalidate_all(self, redis):
+        cache = make_cache(redis)
+        load(cache, 1, {"a": 1})
+        load(cache, 2, {"b": 2})
+
+        cache.invalidate()
+
+        assert not [k for k in redis.data if k.startswith("user_config:")]
+        assert redis.published[-1][1] == ALL_USERS
+        assert cache.get(1) is None and cache.get(2) is None
+
+    def test_load_overlapping_invalidation_not_cached(self, redis):
+        cache = make_cache(redis)
+
+        token = cache.begin_load(5)
+        cache.handle_message("5")           # another process changed user 5 meanwhile
+        cache.set(5, {"old": True}, token)
+
+        assert cache.get(5) is None
+        assert cache.stats["stale_loads"] == 1
+
+        token = cache.begin_load(5)
+        cache.set(5, {"new": True}, token)
+        assert cache.get(5) == {"new": True}
+
+    def test_unknown_message_ignored(self, redis):
+        cache = make_cache(redis)
+        cache.set(1, {"a": 1})
+
+        cache.handle_message("not-a-user")
+
+        assert cache.get(1) == {"a": 1}
+
+    def test_slow_load_in_other_process_does_not_restore_stale_l2(self, redis):
+        webapp = make_cache(redis)
+        bot = make_cache(redis)
+
+        token = bot.begin_load(3)              # bot starts reading the old row
+        webapp.invalidate(3)                   # webapp commits a change (bot's listener lags)
+        bot.set(3, {"old": True}, token)       # bot's read finishes
+
+        assert "user_config:3" not in redis.data
+        assert bot.get(3) is None
+        assert make_cache(redis).get(3) is None
+
+    def test_failed_publish_is_retried(self, redis):
+        cache = make_cache(redis, redis_retry=0.0)
+        redis.fail = True
+
+        cache.invalidate(4)
+        assert cache.stats["pending_invalidations"] == 1
+        assert redis.published == []
+
+        redis.fail = False
+        assert cache.flush_invalidations()
+        assert redis.published == [(cache.config["channel"], "4")]
+        assert cache.stats["pending_invalidations"] == 0
+
+
+class FakeConn:
+    def execute(self, query, params=None):
+        return self
+
+    def commit(self):
+        pass
+
+
+class TestWriters:
+    """db.py writers of columns get_user_config returns must invalidate it"""
+
+    @pytest.mark.parametrize("write", [
+        lambda db: db.ban_user(5),
+        lambda db: db.allow_user(5),
+        lambda db: db.set_trading_mode(5, "real"),
+        lambda db: db.set_exchange_type(5, "hyperliquid"),
+        lambda db: db.set_exchange_mode(5, "both"),
+    ])
+    def test_writer_drops_cached_config(self, redis, monkeypatch, write):
+        from contextlib import contextmanager
+        import db
+        from core import config_cache as config_cache_module
+
+        @contextmanager
+        def fake_get_conn():
+            yield FakeConn()
+
+        monkeypatch.setattr(db, "get_conn", fake_get_conn)
+        monkeypatch.setattr(db, "execute_write", lambda query, params=None: None)
+        cache = make_cache(redis)
+        monkeypatch.setattr(config_cache_module, "config_cache", cache)
+        load(cache, 5, {"is_banned": 0})
+
+        write(db)
+
+        assert cache.get(5) is None
+        assert (cache.config["channel"], "5") in redis.published
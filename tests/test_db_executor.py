@@ -0,0 +1,129 @@
+"""
+Tests for core.db_executor - bounded DB thread pool, db.py facade and loop-thread detection
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db
+from core import db_executor as dbx
+from core.db_executor import AsyncDB, DBExecutor, QUEUE_WAIT
+
+
+@pytest.fixture
+def loop_calls(monkeypatch):
+    """Fresh loop-thread call bookkeeping"""
+    monkeypatch.setattr(dbx, "LOOP_THREAD_WARN", True)
+    monkeypatch.setattr(dbx, "_loop_calls", {})
+    monkeypatch.setattr(dbx, "_loop_warned_at", {})
+    return dbx._loop_calls
+
+
+class TestDBExecutor:
+
+    async def test_runs_off_loop_thread_and_records_timing(self):
+        executor = DBExecutor(max_workers=2)
+        loop_thread = threading.get_ident()
+
+        thread = await executor.run(threading.get_ident, name="ident")
+
+        assert thread != loop_thread
+        stats = executor.query_stats.get_stats()
+        assert stats["ident"].execution_count == 1
+        assert stats[QUEUE_WAIT].execution_count == 1
+        await executor.stop()
+
+    async def test_concurrency_bounded_by_workers(self):
+        executor = DBExecutor(max_workers=2)
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+        assert peak == 2
+        assert executor.peak_in_flight == 6
+        assert executor.in_flight == 0
+        await executor.stop()
+
+    async def test_timeout(self):
+        executor = DBExecutor(max_workers=1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 0.2, timeout=0.01)
+
+        assert executor.timeouts == 1
+        await executor.stop()
+
+    async def test_errors_propagate_and_are_counted(self):
+        executor = DBExecutor(max_workers=1)
+
+        def fail():
+            raise ValueError("bad row")
+
+        with pytest.raises(ValueError):
+            await executor.run(fail, name="fail")
+
+        assert executor.query_stats.get_stats()["fail"].error_count == 1
+        await executor.stop()
+
+    def test_default_workers_leave_reserve(self, monkeypatch):
+        from core.db_postgres import PG_POOL_MAX
+
+        monkeypatch.delenv("DB_EXECUTOR_WORKERS", raising=False)
+        assert dbx.default_workers() == PG_POOL_MAX - dbx.DB_EXECUTOR_CONFIG["reserved_connections"]
+
+        monkeypatch.setenv("DB_EXECUTOR_WORKERS", "7")
+        assert dbx.default_workers() == 7
+
+
+class TestAsyncDB:
+
+    async def test_facade_calls_current_db_function(self, monkeypatch):
+        executor = DBExecutor(max_workers=1)
+        adb = AsyncDB(executor)
+        monkeypatch.setattr(db, "get_exchange_type", lambda uid: f"ex-{uid}")
+
+        assert await adb.get_exchange_type(5) == "ex-5"
+        assert "db.get_exchange_type" in executor.query_stats.get_stats()
+        await executor.stop()
+
+    def test_unknown_and_private_names(self):
+        adb = AsyncDB(DBExecutor(max_workers=1))
+
+        with pytest.raises(AttributeError):
+            adb.no_such_function
+        with pytest.raises(AttributeError):
+            adb._get_cached_user_config
+
+
+class TestLoopThreadDetection:
+
+    async def test_loop_thread_calls_counted_per_site(self, loop_calls):
+        for _ in range(3):
+            dbx.report_loop_thread_call()
+
+        (site, count), = loop_calls.items()
+        assert site.startswith("test_db_executor.py:")
+        assert count == 3
+
+    async def test_worker_thread_calls_ignored(self, loop_calls):
+        await asyncio.to_thread(dbx.report_loop_thread_call)
+
+        assert loop_calls == {}
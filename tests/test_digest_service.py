@@ -0,0 +1,150 @@
+"""
+Daily Digest Pipeline Tests
+Grouped stats query, per-language rendering and rate-limited delivery
+
+Run: python -m pytest tests/test_digest_service.py -v
+"""
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from telegram.error import Forbidden, RetryAfter
+
+from services import digest_service
+from services.digest_service import DigestRenderer, collect_daily_digests, run_daily_digest
+
+DAY = date(2026, 3, 1)
+
+
+def _row(user_id, lang="en", pnl=10.0, **overrides):
+    row = {
+        "user_id": user_id, "trades_count": 4, "total_pnl": pnl, "avg_pnl": pnl / 4,
+        "wins": 3, "losses": 1, "best_pnl": 8.0, "worst_pnl": -2.0,
+        "best_symbol": "BTCUSDT", "worst_symbol": None, "lang": lang,
+        "bybit_enabled": True, "has_bybit_demo": True, "has_bybit_real": False,
+        "hl_enabled": 0, "has_hl_key": True, "push_enabled": True,
+    }
+    row.update(overrides)
+    return row
+
+
+class FakeBot:
+    def __init__(self, fail=None):
+        self.sent = []
+        self.fail = fail or {}
+        self.active = 0
+        self.peak = 0
+
+    async def send_message(self, user_id, text, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.005)
+            error = self.fail.get(user_id)
+            if error is not None:
+                self.fail[user_id] = None   # fail once
+                raise error
+            self.sent.append((user_id, text, kwargs["reply_markup"]))
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    data = [_row(1), _row(2, lang="ru"), _row(3, bybit_enabled=0), _row(4, push_enabled=False)]
+    queries = []
+
+    def fake_execute(query, params):
+        queries.append((query, params))
+        return data
+
+    monkeypatch.setattr(digest_service, "execute", fake_execute)
+    monkeypatch.setattr(digest_service, "save_digest_notifications", lambda rows: None)
+    monkeypatch.setitem(digest_service.DIGEST_CONFIG, "concurrency", 3)
+    return data, queries
+
+
+@pytest.fixture
+def pushes(monkeypatch):
+    sent = []
+
+    async def fake_push(user_id, digest):
+        sent.append((user_id, digest))
+        return 1
+
+    async def fake_ws(user_id, notification):
+        pass
+
+    from services import apns_service, notification_service
+    monkeypatch.setattr(apns_service, "send_daily_digest_push", fake_push)
+    monkeypatch.setattr(notification_service, "_send_to_websocket", fake_ws)
+    return sent
+
+
+class TestCollect:
+
+    def test_single_range_query(self, rows):
+        _, queries = rows
+        recipients = collect_daily_digests(DAY)
+
+        assert len(queries) == 1
+        query, params = queries[0]
+        assert "DATE(ts)" not in query and "GROUP BY t.user_id" in query
+        assert params == (datetime(2026, 3, 1), datetime(2026, 3, 2))
+
+        first, _, no_bybit, _ = recipients
+        assert first.stats["worst_symbol"] == "N/A"
+        assert first.has_bybit and not first.has_hl
+        assert not no_bybit.has_bybit
+
+    def test_user_filter(self, rows):
+        _, queries = rows
+        collect_daily_digests(DAY, user_ids=[1, 2])
+        assert queries[0][1][-1] == [1, 2]
+
+
+class TestDelivery:
+
+    async def test_telegram_run_report(self, rows, pushes):
+        bot = FakeBot(fail={2: RetryAfter(0), 3: Forbidden("blocked")})
+        texts = {"en": {"digest_title": "Daily"}, "ru": {"digest_title": "Отчёт"}}
+
+        report = await run_daily_digest(bot=bot, day=DAY, texts=texts)
+
+        assert report.recipients == 4
+        assert report.telegram_sent == 3          # user 2 retried after RetryAfter
+        assert report.telegram_blocked == 1
+        assert report.push_sent == 4              # Telegram run pushes to everyone
+        assert bot.peak <= 3
+        by_user = {uid: text for uid, text, _ in bot.sent}
+        assert "Отчёт" in by_user[2] and "Daily" in by_user[1]
+
+    async def test_push_only_respects_preference(self, rows, pushes):
+        report = await run_daily_digest(bot=None, day=DAY, send_websocket=False)
+
+        assert sorted(uid for uid, _ in pushes) == [1, 2, 3]
+        assert report.push_sent == 3 and report.telegram_sent == 0
+        assert pushes[0][1]["win_rate"] == 75
+        assert pushes[0][1]["date"] == "Mar 01, 2026"
+
+    async def test_no_trades(self, monkeypatch):
+        monkeypatch.setattr(digest_service, "execute", lambda q, p: [])
+        report = await run_daily_digest(bot=FakeBot(), day=DAY)
+        assert report.recipients == 0
+
+
+class TestRenderer:
+
+    def test_keyboard_cached_per_language(self):
+        renderer = DigestRenderer({"en": {}, "ru": {"digest_btn_close": "X"}})
+        a = digest_service.DigestRecipient(1, _row(1) | {"best_symbol": "A", "worst_symbol": "B"}, lang="en", has_bybit=True)
+        b = digest_service.DigestRecipient(2, dict(a.stats), lang="en", has_bybit=True)
+        c = digest_service.DigestRecipient(3, dict(a.stats), lang="ru", has_bybit=True)
+
+        assert renderer.render(a, DAY)[2] is renderer.render(b, DAY)[2]
+        assert renderer.render(c, DAY)[2] is not renderer.render(a, DAY)[2]
+
+    def test_unknown_language_falls_back(self):
+        renderer = DigestRenderer({"en": {"digest_title": "Daily"}})
+        assert renderer.translations("xx") == {"digest_title": "Daily"}
+        assert renderer.translations(None) == {"digest_title": "Daily"}
@@ -0,0 +1,150 @@
+"""
+Tests for core.hl_adapter_pool and the shared HyperLiquid asset meta table
+"""
+
+import sys
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import hyperliquid.client as hl_client
+from core.hl_adapter_pool import HLAdapterPool, key_fingerprint
+from hyperliquid import HyperLiquidClient
+
+TEST_KEY = "0x" + "11" * 32
+OTHER_KEY = "0x" + "22" * 32
+
+
+class FakeAdapter:
+    def __init__(self, private_key, testnet):
+        self.private_key = private_key
+        self.testnet = testnet
+        self.address = "0xabc"
+        self._main_wallet_address = None
+        self._pool_owned = True
+        self.closed = False
+
+    async def close(self):
+        if not self._pool_owned:
+            self.closed = True
+
+
+class CountingPool(HLAdapterPool):
+    """Pool that builds fake adapters and counts initializations"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.created = 0
+
+    async def _create_adapter(self, private_key, testnet, vault_address, main_wallet_address):
+        self.created += 1
+        await asyncio.sleep(0.01)  # initialize() round trips
+        return FakeAdapter(private_key, testnet)
+
+
+class TestHLAdapterPool:
+
+    async def test_same_key_reuses_adapter(self):
+        pool = CountingPool()
+
+        first = await pool.get(TEST_KEY, testnet=True, user_id=1)
+        second = await pool.get(TEST_KEY.removeprefix("0x"), testnet=True, user_id=1)
+
+        assert first is second
+        assert pool.created == 1
+        assert pool.stats["hits"] == 1
+
+    async def test_concurrent_first_use_initializes_once(self):
+        pool = CountingPool()
+
+        adapters = await asyncio.gather(*(pool.get(TEST_KEY, testnet=False, user_id=i) for i in range(10)))
+
+        assert pool.created == 1
+        assert all(a is adapters[0] for a in adapters)
+
+    async def test_networks_and_keys_are_separate(self):
+        pool = CountingPool()
+
+        testnet = await pool.get(TEST_KEY, testnet=True)
+        mainnet = await pool.get(TEST_KEY, testnet=False)
+        other = await pool.get(OTHER_KEY, testnet=True)
+
+        assert len({id(testnet), id(mainnet), id(other)}) == 3
+        assert key_fingerprint(TEST_KEY) != key_fingerprint(OTHER_KEY)
+        assert TEST_KEY[2:] not in str(pool._pool.keys())
+
+    async def test_invalidation_after_credential_change(self):
+        pool = CountingPool()
+
+        first = await pool.get(TEST_KEY, testnet=True, user_id=7)
+        await pool.get(OTHER_KEY, testnet=True, user_id=8)
+
+        assert pool.invalidate_user(7) == 1
+        assert await pool.get(TEST_KEY, testnet=True, user_id=7) is not first
+        assert pool.invalidate_key(OTHER_KEY) == 1
+        assert pool.stats["adapters"] == 1
+
+    async def test_cleanup_evicts_idle_adapters(self):
+        pool = CountingPool(max_idle_seconds=0.0)
+
+        adapter = await pool.get(TEST_KEY, testnet=True)
+        await asyncio.sleep(0.01)
+
+        assert await pool.cleanup() == 1
+        assert adapter.closed
+        assert pool.stats["adapters"] == 0
+
+    async def test_lru_eviction_at_capacity(self):
+        pool = CountingPool(max_size=1)
+
+        first = await pool.get(TEST_KEY, testnet=True)
+        await pool.get(OTHER_KEY, testnet=True)
+
+        assert first.closed
+        assert pool.stats["evictions"] == 1
+
+
+class TestSharedAssetMeta:
+
+    @pytest.fixture(autouse=True)
+    def fresh_meta(self, monkeypatch):
+        monkeypatch.setattr(hl_client, "_asset_meta_cache", {})
+        monkeypatch.setattr(hl_client, "_asset_meta_locks", {})
+
+    def _client(self, calls):
+        client = HyperLiquidClient(private_key=TEST_KEY, testnet=True)
+
+        async def info_request(request_type, **kwargs):
+            calls.append(request_type)
+            await asyncio.sleep(0.01)
+            return {"universe": [{"name": "SOL", "szDecimals": 1}, {"name": "BTC", "szDecimals": 5}]}
+
+        client._info_request = info_request
+        return client
+
+    async def test_meta_fetched_once_per_network(self):
+        calls = []
+        clients = [self._client(calls) for _ in range(5)]
+
+        await asyncio.gather(*(c._build_dynamic_mapping() for c in clients))
+
+        assert calls == ["meta"]
+        assert all(c.get_asset_id("BTC") == 1 and c.get_sz_decimals("SOL") == 1 for c in clients)
+
+    async def test_stale_meta_is_refetched(self, monkeypatch):
+        calls = []
+        client = self._client(calls)
+        await client._build_dynamic_mapping()
+
+        monkeypatch.setattr(hl_client, "ASSET_META_TTL", 0)
+        await client._build_dynamic_mapping()
+
+        assert calls == ["meta", "meta"]
+
+    def test_nonces_strictly_increase(self):
+        client = HyperLiquidClient(private_key=TEST_KEY, testnet=True)
+        nonces = [client._next_nonce() for _ in range(100)]
+        assert nonces == sorted(set(nonces))
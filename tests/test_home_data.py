@@ -0,0 +1,93 @@
+"""
+Home Data Cache Tests
+Background refresh, stale-while-revalidate and pre-serialized /all payload
+
+Run: python -m pytest tests/test_home_data.py -v
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from webapp.api.home_data import HomeDataCache
+
+
+class Source:
+    def __init__(self, value, delay=0.0, fail=False):
+        self.value = value
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"value": self.value, "call": self.calls}
+
+
+@pytest.fixture
+def sources():
+    return {"btc": Source(1), "market": Source(2, delay=0.02)}
+
+
+@pytest.fixture
+async def cache(sources):
+    cache = HomeDataCache(
+        {name: (source, 60) for name, source in sources.items()},
+        config={"use_redis": False, "tick": 0.01},
+    )
+    yield cache
+    await cache.stop()
+
+
+class TestLookup:
+
+    async def test_cold_requests_share_one_fetch(self, cache, sources):
+        entries = await asyncio.gather(*(cache.get("market") for _ in range(5)))
+
+        assert sources["market"].calls == 1
+        assert all(e is entries[0] for e in entries)
+        assert json.loads(entries[0].body) == {"value": 2, "call": 1}
+
+    async def test_stale_served_while_refreshing(self, cache, sources):
+        await cache.get("market")
+        cache._entries["market"].updated -= 120
+
+        stale = await cache.get("market")
+        assert json.loads(stale.body)["call"] == 1       # no waiting on upstream
+        await cache._inflight["market"]
+        fresh = await cache.get("market")
+        assert json.loads(fresh.body)["call"] == 2
+        assert cache.stats["stale"] == 1
+
+    async def test_failed_refresh_keeps_last_payload(self, cache, sources):
+        first = await cache.get("btc")
+        sources["btc"].fail = True
+        assert await cache.refresh("btc") is first
+        assert cache.stats["errors"] == 1
+
+    async def test_cold_failure_is_503(self, cache, sources):
+        sources["btc"].fail = True
+        with pytest.raises(HTTPException) as exc:
+            await cache.get("btc")
+        assert exc.value.status_code == 503
+
+
+class TestBackground:
+
+    async def test_refresher_warms_all_sources(self, cache, sources):
+        await cache.start()
+        await asyncio.sleep(0.05)
+
+        assert sources["btc"].calls == 1 and sources["market"].calls == 1
+        await cache.get("btc")
+        assert cache.stats["misses"] == 0
+
+    async def test_all_body_is_valid_json(self, cache):
+        payload = json.loads(await cache.all_body())
+        assert payload["btc"]["value"] == 1
+        assert payload["market"]["value"] == 2
+        assert "timestamp" in payload
@@ -0,0 +1,127 @@
+"""
+Tests for core.loop_profiler - loop lag, callback attribution and stall stacks
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import functools
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.loop_profiler import LoopProfiler, callback_name, OTHER
+
+
+@pytest.fixture
+async def profiler():
+    profiler = LoopProfiler({"track_ms": 5.0, "slow_ms": 20.0, "lag_interval": 0.01})
+    await profiler.start()
+    yield profiler
+    await profiler.stop()
+
+
+def _block(seconds):
+    time.sleep(seconds)
+
+
+class TestCallbackName:
+
+    async def test_task_names(self):
+        async def work():
+            await asyncio.sleep(0)
+
+        named = asyncio.create_task(work(), name="monitor_positions_loop")
+        unnamed = asyncio.create_task(work())
+        await asyncio.gather(named, unnamed)
+
+        assert callback_name(named.cancel) == "task:monitor_positions_loop"
+        assert callback_name(unnamed.cancel) == "task:TestCallbackName.test_task_names.<locals>.work"
+
+    def test_plain_and_partial_callbacks(self):
+        assert callback_name(_block) == "cb:_block"
+        assert callback_name(functools.partial(_block, 1)) == "cb:_block"
+
+
+class TestLoopProfiler:
+
+    async def test_blocking_task_attributed_by_name(self, profiler):
+        async def blocker():
+            _block(0.03)
+
+        await asyncio.create_task(blocker(), name="blocking_job")
+
+        snapshot = profiler.snapshot()
+        job = next(t for t in snapshot["tasks"] if t["name"] == "task:blocking_job")
+        assert job["slow"] == 1
+        assert job["max_ms"] >= 30
+        assert snapshot["slowest"][0]["name"] == "task:blocking_job"
+
+    async def test_other_threads_loops_ignored(self, profiler):
+        async def side_blocker():
+            _block(0.03)
+
+        # e.g. asyncio.run() inside a worker thread
+        thread = threading.Thread(target=asyncio.run, args=(side_blocker(),))
+        thread.start()
+        thread.join()
+
+        names = [c["name"] for c in profiler.snapshot()["slowest"]]
+        assert not any("side_blocker" in name for name in names)
+
+    async def test_fast_callbacks_not_tracked(self, profiler):
+        await asyncio.create_task(asyncio.sleep(0), name="quick")
+
+        assert all(c["name"] != "task:quick" for c in profiler.snapshot()["busiest"])
+
+    async def test_lag_sampled(self, profiler):
+        await asyncio.sleep(0.02)
+        _block(0.05)
+        await asyncio.sleep(0.03)
+
+        lag = profiler.snapshot()["lag"]
+        assert lag["max_ms"] >= 30
+
+    async def test_name_limit(self):
+        profiler = LoopProfiler({"max_names": 1})
+
+        class Handle:
+            def __init__(self, cb):
+                self._callback = cb
+
+        profiler._record_callback(Handle(_block), 10.0)
+        profiler._record_callback(Handle(len), 10.0)
+
+        names = {c["name"] for c in profiler.snapshot()["busiest"]}
+        assert names == {"cb:_block", OTHER}
+
+    async def test_uninstall_restores_handle_run(self):
+        original = asyncio.events.Handle._run
+        profiler = LoopProfiler()
+
+        await profiler.start()
+        assert asyncio.events.Handle._run is not original
+        await profiler.stop()
+
+        assert asyncio.events.Handle._run is original
+
+
+class TestStackSampling:
+
+    async def test_stalled_callback_stack_sampled(self):
+        profiler = LoopProfiler({"stall_ms": 10.0, "stack_interval": 0.005}, stacks=True)
+        await profiler.start()
+        try:
+            async def stuck():
+                _block(0.1)
+
+            await asyncio.create_task(stuck(), name="stuck_job")
+        finally:
+            await profiler.stop()
+
+        stacks = profiler.snapshot()["stacks"]
+        assert stacks and stacks[0]["callback"] == "task:stuck_job"
+        assert "_block" in stacks[0]["stack"]
@@ -0,0 +1,143 @@
+"""
+Tests for core.metrics - sharded counters, bucketed histograms and Prometheus exposition
+"""
+
+import sys
+import asyncio
+import threading
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    track_signal_latency,
+    observe_signal_to_order,
+)
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestCounter:
+
+    def test_labels(self):
+        counter = Counter("orders_total")
+        counter.inc(exchange="bybit")
+        counter.inc(2, exchange="bybit")
+        counter.inc(exchange="hyperliquid")
+
+        assert counter.value == 4
+        assert counter.get_by_labels() == {"exchange=bybit": 3, "exchange=hyperliquid": 1}
+
+    def test_concurrent_increments_not_lost(self):
+        counter = Counter("hits_total")
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert counter.value == 80000
+
+
+class TestHistogram:
+
+    def test_buckets_and_stats(self):
+        hist = Histogram("latency_ms", buckets=(10, 100, 1000))
+        for value in (5, 10, 50, 500, 5000):
+            hist.observe(value)
+
+        series = hist.series()[()]
+        # Bucket bounds are inclusive (le); the last slot is +Inf
+        assert series.counts == [2, 1, 1, 1]
+        assert hist.count == 5
+        assert hist.sum == 5565
+        stats = hist.get_stats()
+        assert stats["min"] == 5
+        assert stats["max"] == 5000
+
+    def test_percentile_interpolates_within_bucket(self):
+        hist = Histogram("latency_ms", buckets=(100, 200))
+        for _ in range(100):
+            hist.observe(150)
+
+        assert 100 <= hist.percentile(50) <= 200
+        assert hist.percentile(99) <= 150  # clamped to observed max
+
+    def test_labelled_series_are_separate(self):
+        hist = Histogram("latency_ms")
+        hist.observe(1, endpoint="/a")
+        hist.observe(2, endpoint="/b")
+
+        assert set(hist.series()) == {(("endpoint", "/a"),), (("endpoint", "/b"),)}
+        assert hist.count == 2
+
+
+class TestPrometheusExposition:
+
+    def test_histogram_format(self, registry):
+        hist = registry.histogram("req_ms", "Request latency", buckets=(1, 10))
+        hist.observe(0.5, route="/x")
+        hist.observe(5, route="/x")
+        hist.observe(50, route="/x")
+
+        text = registry.render_prometheus()
+
+        assert "# HELP req_ms Request latency" in text
+        assert "# TYPE req_ms histogram" in text
+        assert 'req_ms_bucket{route="/x",le="1"} 1' in text
+        assert 'req_ms_bucket{route="/x",le="10"} 2' in text
+        assert 'req_ms_bucket{route="/x",le="+Inf"} 3' in text
+        assert 'req_ms_sum{route="/x"} 55.5' in text
+        assert 'req_ms_count{route="/x"} 3' in text
+        assert text.endswith("\n")
+
+    def test_counter_label_escaping_and_name_sanitizing(self, registry):
+        registry.counter("bad-name.total", "x").inc(path='a"b\\c')
+
+        text = registry.render_prometheus()
+
+        assert '# TYPE bad_name_total counter' in text
+        assert 'bad_name_total{path="a\\"b\\\\c"} 1' in text
+
+    def test_collectors_run_before_export(self, registry):
+        gauge = registry.gauge("queue_depth")
+        registry.register_collector(lambda: gauge.set(7))
+
+        assert "queue_depth 7" in registry.render_prometheus()
+
+
+class TestSignalToOrder:
+
+    async def test_orders_inside_handler_recorded(self):
+        from core.metrics import metrics
+
+        before = metrics.signal_to_order.count
+
+        async def place_order():
+            observe_signal_to_order("hyperliquid")
+
+        @track_signal_latency
+        async def handler():
+            observe_signal_to_order("bybit")
+            # Orders placed from tasks spawned by the handler count too
+            await asyncio.create_task(place_order())
+
+        await handler()
+        # Outside a signal handler nothing is recorded
+        observe_signal_to_order("bybit")
+
+        assert metrics.signal_to_order.count == before + 2
+        assert set(metrics.signal_to_order.series()) >= {(("exchange", "bybit"),), (("exchange", "hyperliquid"),)}
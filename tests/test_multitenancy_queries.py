@@ -0,0 +1,215 @@
+"""
+Tests for core.multitenancy_queries - statement execution, query stats and the hot-read fast path
+"""
+
+import sys
+import pytest
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db
+from core import multitenancy_queries as mq
+from core.multitenancy_queries import (
+    PreparedStatementManager,
+    QueryStatsCollector,
+    fetch_active_positions,
+    fetch_pending_limit_orders,
+)
+
+
+class FakeRawConnection:
+    """Physical connection recording queries and prepare() calls"""
+
+    def __init__(self):
+        self.queries = []
+        self.prepares = 0
+
+    async def prepare(self, query, name=None):
+        self.prepares += 1
+        return query
+
+    async def fetchrow(self, query, *args):
+        self.queries.append((query, args))
+        return {"user_id": args[0]}
+
+
+class FakeProxy:
+    """Pool proxy; like asyncpg's, it refuses work once released back to the pool"""
+
+    def __init__(self, con):
+        self._con = con
+        self.released = False
+
+    def _check(self):
+        if self.released:
+            raise RuntimeError("cannot call Connection.fetchrow(): connection has been released back to the pool")
+
+    async def prepare(self, query, name=None):
+        self._check()
+        return FakePrepared(self, await self._con.prepare(query, name=name))
+
+    async def fetchrow(self, query, *args):
+        self._check()
+        return await self._con.fetchrow(query, *args)
+
+
+class FakePrepared:
+    """PreparedStatement bound to the acquire (proxy) that created it"""
+
+    def __init__(self, proxy, query):
+        self.proxy = proxy
+        self.query = query
+
+    async def fetchrow(self, *args):
+        self.proxy._check()
+        return await self.proxy._con.fetchrow(self.query, *args)
+
+
+class FakePoolManager:
+    """UnifiedPoolManager stand-in handing out one physical connection through fresh proxies"""
+
+    def __init__(self):
+        self.raw = FakeRawConnection()
+
+    @asynccontextmanager
+    async def async_connection(self):
+        proxy = FakeProxy(self.raw)
+        try:
+            yield proxy
+        finally:
+            proxy.released = True
+
+
+@pytest.fixture
+def fast_path(monkeypatch):
+    """Reset fast path state and let tests swap run_prepared"""
+    monkeypatch.setattr(mq, "FAST_PATH_ENABLED", True)
+    monkeypatch.setattr(mq, "_fast_path_down_until", 0.0)
+    monkeypatch.setattr(mq, "_broken_statements", set())
+    return monkeypatch
+
+
+class TestPreparedStatementManager:
+
+    async def test_run_survives_pool_release(self, monkeypatch):
+        from core import pool_manager
+
+        manager = FakePoolManager()
+        monkeypatch.setattr(pool_manager, "get_pool_manager", lambda: manager)
+
+        # The same physical connection acquired twice: nothing from the first acquire is reused
+        assert await mq.run_prepared("get_user_row", 7, method="fetchrow") == {"user_id": 7}
+        assert await mq.run_prepared("get_user_row", 8, method="fetchrow") == {"user_id": 8}
+
+        query = mq.PREPARED_STATEMENTS["get_user_row"].query
+        assert manager.raw.queries == [(query, (7,)), (query, (8,))]
+        assert manager.raw.prepares == 0
+
+    async def test_get_prepared_per_acquire(self):
+        manager = PreparedStatementManager()
+        raw = FakeRawConnection()
+
+        for user_id in (1, 2):
+            proxy = FakeProxy(raw)
+            prepared = await manager.get_prepared(proxy, "get_user_row")
+            assert await prepared.fetchrow(user_id) == {"user_id": user_id}
+            proxy.released = True
+
+        assert raw.prepares == 2
+        assert manager.stats == {"prepares": 2, "executions": 0}
+
+    async def test_unknown_statement(self):
+        with pytest.raises(ValueError):
+            await PreparedStatementManager().get_prepared(FakeRawConnection(), "nope")
+        with pytest.raises(ValueError):
+            await PreparedStatementManager().run(FakeRawConnection(), "nope")
+
+
+class TestQueryStatsCollector:
+
+    def test_track_records_latency_and_errors(self):
+        collector = QueryStatsCollector()
+
+        with collector.track("q"):
+            pass
+        with pytest.raises(RuntimeError):
+            with collector.track("q"):
+                raise RuntimeError("boom")
+
+        stats = collector.get_stats()["q"]
+        assert stats.execution_count == 2
+        assert stats.error_count == 1
+        assert stats.to_dict()["count"] == 2
+
+    def test_slow_queries(self):
+        collector = QueryStatsCollector()
+        collector.record_sync("fast", 1.0)
+        collector.record_sync("slow", 250.0)
+
+        assert [s.query_name for s in collector.get_slow_queries(100.0)] == ["slow"]
+
+
+POSITION_ROW = (
+    "BTCUSDT", "Buy", 60000.0, 0.01, None, "24h", 7,
+    1, 0, "oi", "demo",
+    None, None, "bybit", 59000.0, 62000.0,
+    0, None,
+    None, None, None, None,
+    10, "cid", "eid", None, 1,
+    2.0, 4.0,
+)
+
+
+class TestFastPath:
+
+    async def test_rows_use_shared_builders(self, fast_path):
+        calls = []
+
+        async def run_prepared(stmt_name, *args, method="fetch"):
+            calls.append((stmt_name, args))
+            if stmt_name == "get_active_positions":
+                return [POSITION_ROW]
+            return [{"order_id": 1, "symbol": "ETHUSDT", "side": "Sell", "qty": "0.5",
+                     "price": None, "signal_id": None, "created_ts": 5,
+                     "time_in_force": None, "strategy": "scalper", "account_type": None}]
+
+        fast_path.setattr(mq, "run_prepared", run_prepared)
+
+        positions = await fetch_active_positions(1, account_type="demo", exchange="bybit")
+        orders = await fetch_pending_limit_orders(1, exchange="bybit")
+
+        assert positions == [db._position_from_row(POSITION_ROW)]
+        assert positions[0]["env"] == "paper" and positions[0]["use_atr"] is True
+        assert orders[0]["qty"] == 0.5 and orders[0]["time_in_force"] == "GTC"
+        assert orders[0]["account_type"] == "demo"
+        assert calls[0] == ("get_active_positions", (1, "demo", "bybit", None))
+
+    async def test_connection_failure_falls_back_and_backs_off(self, fast_path):
+        attempts = []
+
+        async def run_prepared(stmt_name, *args, method="fetch"):
+            attempts.append(stmt_name)
+            raise ConnectionError("pool down")
+
+        fast_path.setattr(mq, "run_prepared", run_prepared)
+        fast_path.setattr(db, "get_active_positions", lambda *a: [{"symbol": "SYNC"}])
+
+        assert await fetch_active_positions(1) == [{"symbol": "SYNC"}]
+        assert await fetch_active_positions(1) == [{"symbol": "SYNC"}]
+
+        # Second call skipped the fast path during the backoff window
+        assert attempts == ["get_active_positions"]
+        assert not mq.get_fast_path_status()["available"]
+
+    async def test_disabled_fast_path_uses_sync(self, fast_path):
+        async def run_prepared(*args, **kwargs):
+            raise AssertionError("fast path must not be used")
+
+        fast_path.setattr(mq, "FAST_PATH_ENABLED", False)
+        fast_path.setattr(mq, "run_prepared", run_prepared)
+        fast_path.setattr(db, "get_pending_limit_orders", lambda *a: [])
+
+        assert await fetch_pending_limit_orders(1) == []
@@ -0,0 +1,89 @@
+"""
+Tests for core.optimizations - TTLBoundedDict dict protocol, named cleanup registration, memory stats
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.optimizations import CacheCleanupScheduler, TTLBoundedDict, get_memory_stats
+from core import optimizations
+
+
+class TestTTLBoundedDict:
+
+    def test_dict_protocol(self):
+        cache = TTLBoundedDict(max_size=10, ttl=60)
+        cache[(1, "BTCUSDT")] = 100.0
+
+        assert (1, "BTCUSDT") in cache
+        assert cache[(1, "BTCUSDT")] == 100.0
+        assert cache.get((2, "ETHUSDT"), 0) == 0
+        assert list(cache) == [(1, "BTCUSDT")]
+        assert cache.pop((1, "BTCUSDT"), None) == 100.0
+        assert cache.pop((1, "BTCUSDT"), None) is None
+        with pytest.raises(KeyError):
+            cache[(1, "BTCUSDT")]
+
+    def test_none_values_are_present(self):
+        cache = TTLBoundedDict(max_size=10, ttl=60)
+        cache[-5] = None
+
+        assert -5 in cache
+        assert cache[-5] is None
+
+    def test_expired_entries_behave_as_missing(self):
+        cache = TTLBoundedDict(max_size=10, ttl=60)
+        cache.set("a", 1, ttl=-1)
+
+        assert "a" not in cache
+        assert cache.get("a", 0) == 0
+        assert cache.items() == []
+        with pytest.raises(KeyError):
+            cache["a"]
+
+    def test_len_and_stats_skip_expired(self):
+        cache = TTLBoundedDict(max_size=10, ttl=60)
+        cache["live"] = 1
+        cache.set("stale", 2, ttl=-1)
+
+        assert len(cache) == 1
+        assert cache.stats["size"] == 1
+
+    def test_size_bound_evicts_oldest(self):
+        cache = TTLBoundedDict(max_size=2, ttl=60)
+        for key in ("a", "b", "c"):
+            cache[key] = key
+
+        assert "a" not in cache
+        assert len(cache) == 2
+        assert cache.stats["evictions"] == 1
+
+
+class TestCacheCleanupScheduler:
+
+    def test_named_registration_replaces_previous(self):
+        scheduler = CacheCleanupScheduler()
+        first = TTLBoundedDict(max_size=5, ttl=60)
+        second = TTLBoundedDict(max_size=7, ttl=60)
+
+        scheduler.register(first, name="monitor.sl_notified")
+        scheduler.register(second, name="monitor.sl_notified")
+
+        assert len(scheduler._caches) == 1
+        assert scheduler.cache_stats()["monitor.sl_notified"]["max_size"] == 7
+
+    def test_memory_stats_lists_bounded_caches(self, monkeypatch):
+        scheduler = CacheCleanupScheduler()
+        monkeypatch.setattr(optimizations, "cache_cleanup_scheduler", scheduler)
+        cache = optimizations.bounded_cache("test.cache", max_size=10, ttl=60)
+        cache["x"] = 1
+
+        stats = get_memory_stats()
+
+        assert stats["bounded_caches"]["test.cache"]["size"] == 1
+        assert stats["bounded_entries"] == 1
+        assert "core_caches" in stats
@@ -144,6 +144,58 @@ class TestAladdinEngine:
         assert report.factors_analyzed >= 100
         assert report.simulations_run >= 1000
 
+    def test_batch_matches_single_analysis(self):
+        """Batch reports equal one-by-one analysis of the same assets"""
+        import random
+        from oracle.aladdin_engine import AladdinEngine
+
+        assets = [
+            {"tokenomics": {"name": "Safe", "team_allocation_pct": 5, "vesting_period_months": 36},
+             "market": {"volatility_30d": 40, "volume_24h_usd": 200_000_000, "btc_correlation_30d": 0.5},
+             "security": {"audit_count": 4, "contract_verified": True, "has_kyc": True},
+             "team": {"governance_type": "dao", "team_public": True, "social_followers": 150_000},
+             "project_type": "staking"},
+            {"tokenomics": {"name": "Risky", "team_allocation_pct": 40},
+             "market": {"volatility_30d": 140, "volume_24h_usd": 50_000, "volume_to_mcap_ratio": 2},
+             "security": {"critical_issues": 2, "high_issues": 3},
+             "team": {},
+             "project_type": "memecoin"},
+            {"tokenomics": {}, "market": {}, "security": {}, "team": {}},
+        ]
+        engine = AladdinEngine(monte_carlo_simulations=200)
+
+        random.seed(1)
+        batch = engine.analyze_batch(assets)
+        random.seed(1)
+        single = [engine.analyze(**asset) for asset in assets]
+
+        for b, s in zip(batch, single):
+            assert [f.value for f in b.risk_factors] == [f.value for f in s.risk_factors]
+            assert b.factor_contributions == pytest.approx(s.factor_contributions)
+            assert b.stress_test_results == s.stress_test_results
+            assert b.composite_risk_score == pytest.approx(s.composite_risk_score)
+        assert batch[0].composite_risk_score > batch[1].composite_risk_score
+
+    def test_evaluate_batch_shapes(self):
+        """Factor, contribution, stress and correlation matrices"""
+        from oracle.aladdin_engine import AladdinEngine, HISTORICAL_STRESS_SCENARIOS
+
+        engine = AladdinEngine()
+        batch = engine.evaluate_batch([
+            {"market": {"volatility_30d": v, "btc_correlation_30d": 0.8}, "project_type": "defi"}
+            for v in (20, 60, 100, 140)
+        ])
+
+        assert len(batch) == 4
+        assert batch.values.shape == (4, len(engine.risk_factors))
+        assert batch.stress.shape == (len(HISTORICAL_STRESS_SCENARIOS), 4)
+        assert batch.correlations.shape == (4, 4)
+        assert batch.contributions.sum(axis=1) == pytest.approx([100] * 4)
+        # Higher volatility deepens every stress loss
+        assert (batch.stress[:, 0] >= batch.stress[:, -1]).all()
+        assert (batch.stress >= -0.99).all()
+        assert batch.correlation_matrix(2).btc_correlation == 0.8
+
 
 class TestOracleCore:
     """Test Oracle core functionality"""
@@ -240,6 +292,255 @@ class TestRiskEngine:
         assert hasattr(metrics, "stress_test_results")
 
 
+VULNERABLE_CONTRACT = """
+pragma solidity ^0.8.0;
+import "@openzeppelin/contracts/access/Ownable.sol";
+contract Token is Ownable {
+    function mint(address to, uint256 amount) external onlyOwner {}
+    function auth() external { require(tx.origin == owner()); }
+}
+"""
+
+
+def _write_project(root):
+    (root / "contracts").mkdir()
+    (root / "contracts" / "Token.sol").write_text(VULNERABLE_CONTRACT)
+    (root / "README.md").write_text("DeFi swap protocol. Team: founder and CTO.")
+    (root / "docs").mkdir()
+    (root / "docs" / "whitepaper.md").write_text("Total supply: 1,000,000")
+    (root / "package.json").write_text('{"name": "token"}')
+    (root / "logo.png").write_bytes(b"\x89PNG")
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "Evil.sol").write_text("contract Evil { function f() { selfdestruct(msg.sender); } }")
+
+
+class TestProjectAnalysis:
+    """Test project scanning, per-file audit cache and the analysis pipeline"""
+    
+    @pytest.mark.asyncio
+    async def test_scan_skips_vendored_dirs(self, tmp_path):
+        from oracle.core import Oracle
+        
+        project = tmp_path / "project"
+        project.mkdir()
+        _write_project(project)
+        data = await Oracle(cache_dir=str(tmp_path / "cache"))._scan_project(str(project))
+        
+        assert data["files_count"] == 5
+        assert [os.path.basename(c["path"]) for c in data["smart_contracts"]] == ["Token.sol"]
+        assert data["readme_content"].startswith("DeFi")
+        assert len(data["tokenomics_files"]) == 1
+        assert data["package_info"] == {"name": "token"}
+    
+    @pytest.mark.asyncio
+    async def test_file_audit_cached_by_content(self, tmp_path):
+        from oracle.smart_contract_auditor import SmartContractAuditor
+        
+        project_data = {"smart_contracts": [
+            {"path": "a/Token.sol", "content": VULNERABLE_CONTRACT},
+            {"path": "b/Copy.sol", "content": VULNERABLE_CONTRACT},
+        ]}
+        auditor = SmartContractAuditor(cache_dir=tmp_path)
+        security, result = await auditor.audit(project_data)
+        
+        assert auditor.cache_hits == 1
+        assert security.has_mint_function and result.has_ownable and result.has_tx_origin
+        assert {v.location.split(":")[0] for v in result.vulnerabilities} == {"a/Token.sol", "b/Copy.sol"}
+        
+        # A new process reuses the persisted result
+        fresh = SmartContractAuditor(cache_dir=tmp_path)
+        again, again_result = await fresh.audit(project_data)
+        assert fresh.cache_hits == 2
+        assert again == security
+        assert [v.location for v in again_result.vulnerabilities] == [v.location for v in result.vulnerabilities]
+    
+    @pytest.mark.asyncio
+    async def test_analyze_project(self, tmp_path):
+        from oracle.core import Oracle
+        
+        project = tmp_path / "project"
+        project.mkdir()
+        _write_project(project)
+        oracle = Oracle(cache_dir=str(tmp_path / "cache"))
+        
+        report = await oracle.analyze_project(str(project))
+        
+        assert report.raw_files_analyzed == 5
+        assert report.security.has_mint_function
+        assert not report.risk.red_flags or not report.risk.red_flags[-1].startswith("Analysis error")
+        assert report.risk.simulations_run > 0
+        
+        await oracle.analyze_project(str(project))
+        assert oracle.contract_auditor.cache_hits == 1
+
+
+
+class TestReportStore:
+    """Test the persistent report store used by `oracle serve`"""
+    
+    @pytest.fixture
+    def project(self, tmp_path):
+        project = tmp_path / "project"
+        project.mkdir()
+        _write_project(project)
+        return project
+    
+    @pytest.fixture
+    def oracle(self, tmp_path):
+        from oracle.core import Oracle
+        
+        oracle = Oracle(cache_dir=str(tmp_path / "cache"))
+        original = oracle.analyze_project
+        oracle.runs = 0
+        
+        async def counting(path, *args, **kwargs):
+            oracle.runs += 1
+            return await original(path, *args, **kwargs)
+        
+        oracle.analyze_project = counting
+        return oracle
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_submissions_share_one_job(self, tmp_path, project, oracle):
+        from oracle.report_store import ReportStore
+        
+        store = ReportStore(tmp_path / "reports")
+        first, second = await asyncio.gather(
+            store.analyze(oracle, str(project)),
+            store.analyze(oracle, str(project)),
+        )
+        
+        assert oracle.runs == 1
+        assert first.report_id == second.report_id
+        
+        # Unchanged content is served from disk, even by a new store instance
+        reopened = ReportStore(tmp_path / "reports")
+        again = await reopened.analyze(oracle, str(project))
+        assert oracle.runs == 1
+        assert again.report_id == first.report_id
+        assert again.risk.risk_level == first.risk.risk_level
+        assert reopened.list()[0]["report_id"] == first.report_id
+        
+        # A content change is a new key
+        (project / "README.md").write_text("NFT marketplace")
+        changed = await reopened.analyze(oracle, str(project))
+        assert oracle.runs == 2 and changed.report_id != first.report_id
+    
+    @pytest.mark.asyncio
+    async def test_rendered_formats_cached(self, tmp_path, project, oracle):
+        from oracle.report_store import ReportStore
+        
+        store = ReportStore(tmp_path / "reports")
+        report = await store.analyze(oracle, str(project))
+        calls = []
+        render = store.generator.render
+        store.generator.render = lambda r, fmt: calls.append(fmt) or render(r, fmt)
+        
+        html = store.render(report.report_id, "html")
+        assert report.report_id in html
+        assert store.render(report.report_id, "html") == html
+        assert '"risk_level"' in store.render(report.report_id, "json")
+        assert calls == ["html", "json"]
+        
+        assert store.delete(report.report_id)
+        assert store.render(report.report_id, "html") is None
+        assert store.find(await store.content_key(oracle, str(project))) is None
+    
+    def test_serve_app_analyzes_project(self, tmp_path, project, monkeypatch):
+        pytest.importorskip("fastapi")
+        from argparse import Namespace
+        from fastapi.testclient import TestClient
+        from oracle.cli import create_serve_app
+        
+        monkeypatch.chdir(tmp_path)   # cwd is an allowed analysis root
+        app = create_serve_app(Namespace(host="127.0.0.1", port=0, store=str(tmp_path / "reports")))
+        client = TestClient(app)
+        
+        assert client.get("/api/status").json()["reports_count"] == 0
+        assert client.post("/api/analyze", json={"path": str(tmp_path / "missing")}).status_code == 404
+        
+        body = client.post("/api/analyze", json={"path": str(project), "report_format": "html"}).json()
+        assert body["success"] and body["report_id"]
+        assert client.get(f"/api/report/{body['report_id']}?format=html").status_code == 200
+        assert client.get("/api/reports").json()["count"] == 1
+
+
+def _universe(n, seed=0):
+    import numpy as np
+    from oracle.portfolio_optimizer import Asset
+
+    rng = np.random.default_rng(seed)
+    assets = [
+        Asset(
+            symbol=f"A{i}",
+            expected_return=rng.uniform(0.1, 1.5),
+            volatility=rng.uniform(0.4, 1.5),
+            risk_score=rng.uniform(20, 80),
+        )
+        for i in range(n)
+    ]
+    loadings = rng.normal(size=(n, 3))
+    cov = loadings @ loadings.T + np.eye(n) * 3
+    scale = np.sqrt(np.diag(cov))
+    return assets, cov / np.outer(scale, scale)
+
+
+class TestPortfolioOptimizer:
+    """Test frontier solver, covariance cache and batch optimization"""
+
+    def test_frontier_warm_start_matches_cold(self):
+        import numpy as np
+        from oracle.portfolio_optimizer import PortfolioOptimizer
+
+        assets, corr = _universe(30)
+        returns = np.array([a.expected_return for a in assets])
+        optimizer = PortfolioOptimizer()
+
+        warm = optimizer.efficient_frontier(assets, corr, n_points=15)
+        cold = optimizer.efficient_frontier(assets, corr, n_points=15, warm_start=False)
+
+        assert len(warm) == len(cold) == 15
+        for (ret, vol, weights), (_, cold_vol, _) in zip(warm, cold):
+            w = np.array([weights[a.symbol] for a in assets])
+            assert vol == pytest.approx(cold_vol, rel=1e-6)
+            assert w.min() >= 0 and w.sum() == pytest.approx(1)
+            assert w @ returns == pytest.approx(ret)
+
+        # Volatility is convex along the frontier
+        vols = np.array([vol for _, vol, _ in warm])
+        assert (np.diff(vols, 2) >= -1e-9).all()
+
+    def test_covariance_model_cached_per_universe(self):
+        import numpy as np
+        from oracle.portfolio_optimizer import PortfolioOptimizer
+
+        assets, corr = _universe(10)
+        optimizer = PortfolioOptimizer({"covariance_cache_size": 2})
+
+        model = optimizer._covariance_model(assets, corr)
+        assert optimizer._covariance_model(assets, corr.copy()) is model
+        assert optimizer._covariance_model(assets[:5], corr[:5, :5]) is not model
+        assert optimizer._covariance_model(assets, None) is not model
+        assert len(optimizer._models) == 2
+
+        shrunk = PortfolioOptimizer({"covariance_shrinkage": 1.0})._covariance_model(assets, corr)
+        off_diagonal = shrunk.correlations[~np.eye(10, dtype=bool)]
+        assert off_diagonal == pytest.approx(off_diagonal.mean())
+
+    def test_optimize_all_matches_single_targets(self):
+        from oracle.portfolio_optimizer import PortfolioOptimizer
+
+        assets, corr = _universe(20)
+        optimizer = PortfolioOptimizer()
+        results = optimizer.optimize_all(assets, corr)
+
+        assert set(results) == set(PortfolioOptimizer.TARGETS)
+        for target, result in results.items():
+            single = PortfolioOptimizer().optimize(assets, corr, target=target)
+            assert result.weights == pytest.approx(single.weights)
+            assert sum(result.weights.values()) == pytest.approx(1)
+
+
 if __name__ == "__main__":
     # Run tests
     pytest.main([__file__, "-v", "--tb=short"])
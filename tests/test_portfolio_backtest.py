@@ -0,0 +1,101 @@
+"""
+Portfolio Backtest Runner Tests
+Process-pool fan-out, equity curve alignment and vectorized correlations
+
+Run: python -m pytest tests/test_portfolio_backtest.py -v
+"""
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from webapp.services import portfolio_backtest
+from webapp.services.backtest_engine_pro import ProBacktestEngine, DataFetcher
+
+
+def _candles(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2026, 1, 1)
+    price = 100.0
+    out = []
+    for i in range(n):
+        price *= 1 + rng.normal(0, 0.01) + 0.002 * math.sin(i / 10)
+        ts = start + timedelta(hours=i)
+        out.append({
+            "timestamp": int(ts.timestamp() * 1000), "time": ts.isoformat(),
+            "open": price * 0.998, "high": price * 1.01, "low": price * 0.99,
+            "close": price, "volume": 1000.0,
+        })
+    return out
+
+
+@pytest.fixture
+def fake_candles(monkeypatch):
+    data = {f"S{i}USDT": _candles(seed=i) for i in range(6)}
+
+    async def fetch(symbol, timeframe, days):
+        return data.get(symbol, [])
+
+    monkeypatch.setattr(DataFetcher, "fetch_candles", staticmethod(fetch))
+    yield data
+    portfolio_backtest.shutdown_process_pool()
+
+
+class TestAggregation:
+
+    def test_align_forward_fills(self):
+        curves = {
+            "a": [{"time": "2026-01-01T00:00:00", "equity": 100}, {"time": "2026-01-01T02:00:00", "equity": 110}],
+            "b": [{"time": "2026-01-01T01:00:00", "equity": 50}],
+        }
+        times, matrix = portfolio_backtest.align_equity_curves(curves, {"a": 100, "b": 40})
+
+        assert len(times) == 3
+        np.testing.assert_array_equal(matrix[0], [100, 100, 110])
+        np.testing.assert_array_equal(matrix[1], [40, 50, 50])
+
+    def test_correlation_matrix(self):
+        base = np.cumprod(1 + np.random.default_rng(1).normal(0, 0.01, 200)) * 100
+        matrix = np.vstack([base, base * 2, 200 - base, np.full(200, 100.0)])
+        corr = portfolio_backtest.correlation_matrix(matrix)
+
+        assert corr.shape == (4, 4)
+        assert corr[0, 1] == pytest.approx(1.0)
+        assert corr[0, 2] < -0.9
+        assert corr[0, 3] == 0.0
+        np.testing.assert_array_equal(np.diag(corr), 1.0)
+
+    def test_sharpe_weights_floor(self):
+        weights = portfolio_backtest.sharpe_weights(np.array([2.0, -1.0, 0.0]))
+        assert weights.sum() == pytest.approx(1.0)
+        assert weights[1] == weights[2] > 0
+
+
+class TestParallelRuns:
+
+    async def test_pool_matches_inline(self, fake_candles, monkeypatch):
+        engine = ProBacktestEngine()
+        symbols = list(fake_candles)
+
+        pooled = await engine.run(strategy="elcaro", symbols=symbols, days=10)
+
+        monkeypatch.setitem(portfolio_backtest.PORTFOLIO_CONFIG, "min_jobs_for_pool", 10_000)
+        inline = await engine.run(strategy="elcaro", symbols=symbols, days=10)
+
+        assert pooled["metrics"] == inline["metrics"]
+        assert pooled["equity_curve"] == inline["equity_curve"]
+        assert set(pooled["correlation_matrix"]) == set(symbols)
+
+    async def test_run_portfolio(self, fake_candles):
+        engine = ProBacktestEngine()
+        result = await engine.run_portfolio(
+            strategies=[{"strategy": "elcaro"}, {"strategy": "momentum"}],
+            symbols=list(fake_candles)[:3],
+            timeframe="1h", days=10, initial_balance=10000,
+        )
+
+        assert result["success"]
+        assert set(result["correlation_matrix"]) == {"elcaro", "momentum"}
+        assert sum(result["optimal_weights"].values()) == pytest.approx(1.0)
+        assert result["equity_curve"][0]["equity"] == pytest.approx(10000)
@@ -0,0 +1,125 @@
+"""
+Response Cache Middleware Tests
+@cache_response routes, miss coalescing, ETag/304, auth-varied keys
+
+Run: python -m pytest tests/test_response_cache.py -v
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Header, HTTPException
+
+from webapp.api.response_cache import ResponseCache, cache_response, etag_matches
+from webapp.app import ResponseCacheMiddleware
+
+
+@pytest.fixture
+def store():
+    return ResponseCache(config={"use_redis": False, "max_entries": 2})
+
+
+@pytest.fixture
+def app(store):
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=store)
+    app.state.calls = 0
+
+    @app.get("/board")
+    @cache_response(ttl=60)
+    async def board(period: str = "30d"):
+        app.state.calls += 1
+        await asyncio.sleep(0.02)
+        return {"period": period, "calls": app.state.calls}
+
+    @app.get("/items/{item_id}")
+    @cache_response(ttl=60)
+    async def item(item_id: int):
+        app.state.calls += 1
+        return {"id": item_id}
+
+    @app.get("/mine")
+    @cache_response(ttl=60, vary=("authorization",))
+    async def mine(authorization: str = Header(None)):
+        app.state.calls += 1
+        if not authorization:
+            raise HTTPException(status_code=401)
+        return {"owner": authorization}
+
+    @app.get("/live")
+    async def live():
+        app.state.calls += 1
+        return {"calls": app.state.calls}
+
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+class TestCaching:
+
+    async def test_hit_after_miss(self, app, client):
+        first = await client.get("/board")
+        second = await client.get("/board")
+
+        assert first.headers["x-cache"] == "MISS" and second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json() == {"period": "30d", "calls": 1}
+        assert second.headers["cache-control"] == "public, max-age=60"
+        assert (await client.get("/board?period=7d")).json()["calls"] == 2
+
+    async def test_concurrent_misses_coalesce(self, app, client, store):
+        responses = await asyncio.gather(*(client.get("/board") for _ in range(5)))
+
+        assert app.state.calls == 1
+        assert {r.json()["calls"] for r in responses} == {1}
+        assert store.stats["coalesced"] == 4
+
+    async def test_path_params_and_unmarked_routes(self, app, client):
+        await client.get("/items/1")
+        await client.get("/items/1")
+        await client.get("/live")
+        await client.get("/live")
+        assert app.state.calls == 3
+
+    async def test_lru_eviction(self, app, client, store):
+        for item_id in (1, 2, 3):
+            await client.get(f"/items/{item_id}")
+        await client.get("/items/1")            # evicted by 3
+        assert app.state.calls == 4
+
+
+class TestETag:
+
+    async def test_not_modified(self, client):
+        first = await client.get("/board")
+        etag = first.headers["etag"]
+
+        cached = await client.get("/board", headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["etag"] == etag
+
+        other = await client.get("/board", headers={"If-None-Match": '"stale"'})
+        assert other.status_code == 200
+
+    def test_etag_matching(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"x"')
+        assert not etag_matches(None, '"x"')
+
+
+class TestVary:
+
+    async def test_keys_per_token_and_errors_not_cached(self, app, client):
+        assert (await client.get("/mine")).status_code == 401
+        assert (await client.get("/mine")).status_code == 401
+        a = await client.get("/mine", headers={"Authorization": "a"})
+        b = await client.get("/mine", headers={"Authorization": "b"})
+        again = await client.get("/mine", headers={"Authorization": "a"})
+
+        assert a.json() == again.json() == {"owner": "a"} and b.json() == {"owner": "b"}
+        assert again.headers["cache-control"].startswith("private")
+        assert app.state.calls == 4
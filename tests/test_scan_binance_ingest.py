@@ -0,0 +1,68 @@
+"""
+Binance Ingest Tests
+OI/funding background ingester of the screener (scan/scripts/binance_ingest.py)
+
+Run: python -m pytest tests/test_scan_binance_ingest.py -v
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("django")
+
+from scan.scripts import binance_ingest
+from scan.scripts.binance_ingest import OIFundingIngester
+
+
+class FlakyClient:
+    """funding_rates / open_interest fail on the first calls, then succeed"""
+
+    def __init__(self, failures=1):
+        self.failures = failures
+        self.funding_calls = 0
+
+    async def funding_rates(self):
+        self.funding_calls += 1
+        if self.funding_calls <= self.failures:
+            raise RuntimeError("premiumIndex exploded")
+        return {"BTCUSDT": 0.0001}
+
+    async def open_interest(self, symbol):
+        if symbol == "BADUSDT":
+            raise ValueError("bad payload")
+        return 42.0
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(binance_ingest, "LOOP_BACKOFF_MIN", 0.01)
+    monkeypatch.setattr(binance_ingest, "LOOP_BACKOFF_MAX", 0.02)
+
+
+class TestOIFundingIngester:
+
+    async def test_loop_survives_errors(self):
+        ingester = OIFundingIngester(funding_interval=0.01)
+        client = FlakyClient(failures=2)
+
+        task = asyncio.create_task(ingester._run_loop("Funding", lambda: ingester._funding_step(client)))
+        for _ in range(100):
+            if ingester.snapshot():
+                break
+            await asyncio.sleep(0.01)
+        ingester._stop.set()
+        await asyncio.wait_for(task, 1)
+
+        assert client.funding_calls >= 3
+        assert ingester.snapshot()["BTCUSDT"] == (None, 0.0001)
+
+    async def test_failed_symbol_does_not_abort_sweep(self, monkeypatch):
+        monkeypatch.setattr(binance_ingest, "OI_MAX_WEIGHT_PER_MIN", 60000)
+        ingester = OIFundingIngester(oi_interval=0.01)
+        ingester.set_symbols(["BADUSDT", "BTCUSDT"])
+        client = FlakyClient()
+        client.budget = binance_ingest.WeightBudget()
+
+        await ingester._oi_sweep(client)
+
+        assert ingester.snapshot() == {"BTCUSDT": (42.0, None)}
@@ -0,0 +1,126 @@
+"""
+Scan Symbol State Tests
+Dirty-set snapshots for the Binance screener workers (scan/api/symbol_state.py)
+
+Run: python -m pytest tests/test_scan_symbol_state.py -v
+"""
+import pytest
+
+from scan.api.aggregation_model import TF_CACHE_MS
+from scan.api.symbol_state import SnapshotRows, SymbolStore
+
+MINUTE_MS = 60_000
+
+
+@pytest.fixture
+def rows():
+    return SnapshotRows(SymbolStore())
+
+
+def _rebuild(rows, now_ms, symbols=("AAA", "BBB", "CCC")):
+    return set(rows.to_rebuild(now_ms, list(symbols)))
+
+
+class TestSnapshotRows:
+
+    def test_new_minute_rebuilds_everything(self, rows):
+        assert _rebuild(rows, 10 * MINUTE_MS) == {"AAA", "BBB", "CCC"}
+
+    def test_mark_then_rebuild_only_dirty(self, rows):
+        start = 10 * MINUTE_MS
+        _rebuild(rows, start)
+
+        rows.store.mark("BBB")
+        assert _rebuild(rows, start + 100) == {"BBB"}
+        # Taken - not rebuilt again within the same cache window
+        assert _rebuild(rows, start + 200) == set()
+
+    def test_dirty_symbols_repeat_once_in_next_cache_window(self, rows):
+        start = 10 * MINUTE_MS
+        _rebuild(rows, start)
+
+        rows.store.mark("AAA")
+        _rebuild(rows, start + 100)
+        # Rebuilt inside the TF cache window -> once more after it rolls over
+        assert _rebuild(rows, start + TF_CACHE_MS) == {"AAA"}
+
+        rows.store.mark("BBB")
+        assert _rebuild(rows, start + TF_CACHE_MS + 100) == {"BBB"}
+        # AAA's row was rebuilt on a fresh aggregate; only BBB carries over
+        assert _rebuild(rows, start + 2 * TF_CACHE_MS) == {"BBB"}
+        assert _rebuild(rows, start + 3 * TF_CACHE_MS) == set()
+
+    def test_recent_does_not_grow_within_minute(self, rows):
+        start = 10 * MINUTE_MS
+        _rebuild(rows, start)
+
+        for i in range(1, MINUTE_MS // TF_CACHE_MS):
+            rows.store.mark(f"S{i}")
+            _rebuild(rows, start + i * TF_CACHE_MS)
+            assert len(rows._recent) <= 1
+
+    def test_collect_keeps_symbol_order(self, rows):
+        rows.set("BBB", {"symbol": "BBB"})
+        rows.set("AAA", {"symbol": "AAA"})
+        rows.set("CCC", None)
+
+        assert rows.collect(["AAA", "BBB", "CCC"]) == [{"symbol": "AAA"}, {"symbol": "BBB"}]
+
+
+class TestFuturesRows:
+    """Snapshot row contents of the futures worker (needs the Django/channels runtime)"""
+
+    @pytest.fixture
+    def worker(self):
+        pytest.importorskip("channels")
+        from scan.api import binance_workers
+
+        binance_workers._futures_data.clear()
+        worker = binance_workers.BinanceFuturesWorker.__new__(binance_workers.BinanceFuturesWorker)
+        worker.open_interest_cache = {}
+        worker.oi_history = {}
+        worker.symbols = ["BTCUSDT"]
+        worker._rows = SnapshotRows(binance_workers._futures_data)
+        yield worker
+        binance_workers._futures_data.clear()
+
+    async def test_open_interest_fetch_marks_row(self, worker, monkeypatch):
+        from scan.api import binance_workers
+        import aiohttp
+
+        class FakeResponse:
+            status = 200
+
+            async def json(self):
+                return {"openInterest": "1234.5"}
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        class FakeSession:
+            def get(self, url):
+                return FakeResponse()
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        monkeypatch.setattr(aiohttp, "ClientSession", FakeSession)
+        state = binance_workers._futures_data.state("BTCUSDT")
+        state.price, state.mark_price, state.funding_rate = 100.0, 100.5, 0.0001
+        now_ms = 10 * MINUTE_MS
+        worker._rows.to_rebuild(now_ms, worker.symbols)
+
+        await worker.fetch_open_interest("BTCUSDT")
+
+        assert set(worker._rows.to_rebuild(now_ms + 100, worker.symbols)) == {"BTCUSDT"}
+        row = worker._build_row("BTCUSDT", state, now_ms + 100)
+        assert row["open_interest"] == 1234.5
+        assert row["price"] == 100.0
+        assert row["mark_price"] == 100.5
+        assert {"change_1h", "volume_1h", "vdelta_1h", "oi_change_1h"} <= set(row)
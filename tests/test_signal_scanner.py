@@ -0,0 +1,143 @@
+"""
+Signal Scanner Pipeline Tests
+Shared indicator bundles, request coalescing and bounded concurrency
+
+Run: python -m pytest tests/test_signal_scanner.py -v
+"""
+import asyncio
+import time
+
+import pytest
+
+from webapp.services.signal_scanner import SignalScanner, IndicatorBundle
+
+
+def _candles(n=200, start_price=100.0):
+    now_ms = int(time.time() * 1000)
+    bar_ms = 3_600_000
+    first = now_ms - now_ms % bar_ms - (n - 1) * bar_ms
+    candles = []
+    price = start_price
+    for i in range(n):
+        price *= 1.001 if i % 7 else 0.99
+        candles.append({
+            "timestamp": first + i * bar_ms,
+            "open": price * 0.999, "high": price * 1.005,
+            "low": price * 0.995, "close": price, "volume": 1000 + i,
+        })
+    return candles
+
+
+class FakeKlinesSession:
+    """Stands in for the aiohttp session under the real _fetch_data; tracks in-flight requests"""
+
+    closed = False
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    def get(self, url, params=None):
+        self.calls.append((params["symbol"], params["interval"]))
+        return FakeKlinesResponse(self)
+
+
+class FakeKlinesResponse:
+    status = 200
+
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        self.session.active += 1
+        self.session.peak = max(self.session.peak, self.session.active)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.session.active -= 1
+        return False
+
+    async def json(self):
+        await asyncio.sleep(0.01)
+        return [
+            [c["timestamp"], c["open"], c["high"], c["low"], c["close"], c["volume"]]
+            for c in _candles()
+        ]
+
+
+@pytest.fixture
+def scanner():
+    s = SignalScanner(max_concurrency=3)
+    s.fetch_calls = []
+
+    async def fake_fetch(symbol, timeframe, limit=200):
+        s.fetch_calls.append((symbol, timeframe))
+        await asyncio.sleep(0.01)
+        return _candles()
+
+    s._fetch_data = fake_fetch
+    return s
+
+
+@pytest.fixture
+def http_scanner():
+    """Scanner running the real _fetch_data against a fake HTTP session"""
+    s = SignalScanner(max_concurrency=3)
+    session = FakeKlinesSession()
+
+    async def get_session():
+        return session
+
+    s._get_session = get_session
+    s.http = session
+    return s
+
+
+class TestScanPipeline:
+
+    async def test_bundle_reused_within_scan_interval(self, scanner):
+        strategies = list(SignalScanner.STRATEGY_ANALYZERS)
+        await scanner.scan(["BTCUSDT", "ETHUSDT"], strategies, timeframe="1h", min_score=0)
+        await scanner.scan(["BTCUSDT", "ETHUSDT"], strategies, timeframe="1h", min_score=0)
+
+        assert sorted(scanner.fetch_calls) == [("BTCUSDT", "1h"), ("ETHUSDT", "1h")]
+        bundle = scanner._data_cache[("BTCUSDT", "1h")]
+        assert isinstance(bundle, IndicatorBundle)
+        assert set(bundle.signals) == set(strategies)
+
+    async def test_expired_bundle_is_rebuilt(self, scanner):
+        await scanner.scan(["BTCUSDT"], ["rsi_oversold"], timeframe="1h")
+        scanner._data_cache[("BTCUSDT", "1h")].expires_at = time.time() - 1
+        await scanner.scan(["BTCUSDT"], ["rsi_oversold"], timeframe="1h")
+
+        assert len(scanner.fetch_calls) == 2
+
+    async def test_concurrent_requests_coalesce(self, scanner):
+        await asyncio.gather(*[
+            scanner._get_bundle("BTCUSDT", "15m") for _ in range(5)
+        ])
+        assert scanner.fetch_calls == [("BTCUSDT", "15m")]
+
+    async def test_concurrency_is_bounded(self, http_scanner):
+        symbols = [f"SYM{i}USDT" for i in range(12)]
+        await http_scanner.scan(symbols, ["ema_crossover"], timeframes=["1h", "4h"])
+
+        assert len(http_scanner.http.calls) == 24
+        assert 1 < http_scanner.http.peak <= 3
+
+    async def test_bundle_contains_columns(self, scanner):
+        bundle = await scanner._get_bundle("BTCUSDT", "1h")
+        assert bundle.indicators["close"] == [c["close"] for c in bundle.candles]
+        assert {"rsi_14", "macd", "bb", "supertrend"} <= set(bundle.indicators)
+        assert bundle.expires_at <= bundle.bar_open_ms / 1000 + 3600
+
+    async def test_forming_bar_refreshed_every_scan_interval(self, scanner):
+        from webapp.services.signal_scanner import ScannerConfig
+
+        scanner.config = ScannerConfig(symbols=["BTCUSDT"], strategies=["rsi_oversold"], scan_interval=30)
+        before = time.time()
+        bundle = await scanner._get_bundle("BTCUSDT", "1h")
+
+        # Current price / memoized signals must not be frozen for the rest of the hour
+        assert bundle.expires_at <= before + 30 + 1
@@ -0,0 +1,149 @@
+"""
+Tests for core.spot_portfolio - bulk spot prices, rebalance planning and execution
+"""
+
+import sys
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.spot_portfolio import (
+    fetch_bybit_spot_tickers,
+    fetch_hl_spot_tickers,
+    plan_rebalance,
+    execute_rebalance,
+)
+
+
+def _tickers(**prices):
+    return {coin: {"lastPrice": str(price)} for coin, price in prices.items()}
+
+
+class TestBulkPrices:
+
+    async def test_bybit_single_request_filters_coins(self):
+        calls = []
+
+        async def request(method, path, params=None, body=None):
+            calls.append((method, path, params))
+            return {"retCode": 0, "result": {"list": [
+                {"symbol": "BTCUSDT", "lastPrice": "60000"},
+                {"symbol": "ETHUSDT", "lastPrice": "3000"},
+                {"symbol": "ETHBTC", "lastPrice": "0.05"},
+                {"symbol": "SOLUSDT", "lastPrice": "150"},
+            ]}}
+
+        tickers = await fetch_bybit_spot_tickers(request, ["BTC", "ETH", "DOGE"])
+
+        assert calls == [("GET", "/v5/market/tickers", {"category": "spot"})]
+        assert set(tickers) == {"BTC", "ETH"}
+        assert tickers["ETH"]["lastPrice"] == "3000"
+
+    async def test_bybit_error_raises(self):
+        async def request(method, path, params=None, body=None):
+            return {"retCode": 10001, "retMsg": "bad"}
+
+        with pytest.raises(RuntimeError):
+            await fetch_bybit_spot_tickers(request, ["BTC"])
+
+    async def test_hyperliquid_bybit_shape(self):
+        class Adapter:
+            async def get_spot_tickers(self):
+                return {"success": True, "tickers": {
+                    "HYPE": {"mid_price": 22.0, "mark_price": 21.9, "prev_day_price": 20.0, "day_volume": 1e6},
+                    "PURR": {"mid_price": 0.0, "mark_price": 0.2, "prev_day_price": 0.0, "day_volume": 0},
+                }}
+
+        tickers = await fetch_hl_spot_tickers(Adapter(), ["hype", "PURR", "NONE"])
+
+        assert set(tickers) == {"hype", "PURR"}
+        assert float(tickers["hype"]["lastPrice"]) == 22.0
+        assert float(tickers["hype"]["price24hPcnt"]) == pytest.approx(0.1)
+        assert float(tickers["PURR"]["lastPrice"]) == 0.2
+
+
+class TestPlanRebalance:
+
+    def test_deltas_and_sides(self):
+        # 1 BTC @ 600 + 100 USDT cash = 700 total; 50/50 -> 350 each
+        plan = plan_rebalance(
+            {"BTC": 50, "ETH": 50},
+            {"BTC": 1.0, "ETH": 0.0},
+            _tickers(BTC=600, ETH=100),
+            quote_balance=100,
+        )
+
+        assert plan.total_value == pytest.approx(700)
+        sell, = plan.sells
+        buy, = plan.buys
+        assert (sell.coin, sell.usd, sell.qty) == ("BTC", pytest.approx(250), pytest.approx(250 / 600))
+        assert (buy.coin, buy.usd) == ("ETH", pytest.approx(350))
+        assert plan.holdings["BTC"]["pct"] == pytest.approx(600 / 700 * 100)
+
+    def test_small_drift_and_unpriced_are_skipped(self):
+        plan = plan_rebalance(
+            {"BTC": 50, "ETH": 48, "XYZ": 2},
+            {"BTC": 0.01, "ETH": 1.0},
+            _tickers(BTC=5000, ETH=49),
+            quote_balance=0,
+        )
+
+        # BTC 50 vs target 49.5, ETH 49 vs 47.5 -> within 5% drift
+        assert plan.trades == []
+        assert plan.unpriced == ["XYZ"]
+
+    def test_portfolio_too_small(self):
+        plan = plan_rebalance({"BTC": 100}, {}, _tickers(BTC=60000), quote_balance=3)
+
+        assert plan.error == "Portfolio too small to rebalance"
+        assert plan.to_dict()["sells"] == []
+
+
+class TestExecuteRebalance:
+
+    async def test_sells_complete_before_buys_and_run_concurrently(self):
+        plan = plan_rebalance(
+            {"A": 10, "B": 10, "C": 40, "D": 40},
+            {"A": 10, "B": 10},
+            _tickers(A=10, B=10, C=1, D=1),
+            quote_balance=0,
+        )
+        events = []
+        running = 0
+        peak = 0
+
+        async def execute(trade):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            events.append(("start", trade.side, trade.coin))
+            await asyncio.sleep(0.02)
+            running -= 1
+            events.append(("end", trade.side, trade.coin))
+            key = "usdt_received" if trade.side == "Sell" else "usdt_spent"
+            return {"success": True, key: trade.usd}
+
+        report = await execute_rebalance(plan, execute, execute, exchange="bybit", limiter_key="test-spot")
+
+        last_sell_end = max(i for i, e in enumerate(events) if e[0] == "end" and e[1] == "Sell")
+        first_buy_start = min(i for i, e in enumerate(events) if e[0] == "start" and e[1] == "Buy")
+        assert last_sell_end < first_buy_start
+        assert peak == 2
+        assert report.total_rebalanced == pytest.approx(sum(t.usd for t in plan.trades))
+
+    async def test_failed_trade_does_not_abort_phase(self):
+        plan = plan_rebalance({"A": 50, "B": 50}, {}, _tickers(A=1, B=1), quote_balance=100)
+
+        async def buy(trade):
+            if trade.coin == "A":
+                raise RuntimeError("rejected")
+            return {"success": True, "usdt_spent": trade.usd}
+
+        report = await execute_rebalance(plan, buy, buy, exchange="hyperliquid", limiter_key="test-spot")
+
+        outcomes = {t.coin: r["success"] for t, r in report.buys}
+        assert outcomes == {"A": False, "B": True}
+        assert report.total_rebalanced == pytest.approx(50)
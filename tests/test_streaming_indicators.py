@@ -0,0 +1,134 @@
+"""
+Streaming Indicator Tests
+Incremental indicators must reproduce the batch library exactly
+
+Run: python -m pytest tests/test_streaming_indicators.py -v
+"""
+import json
+import random
+
+import pytest
+
+from webapp.services.indicators import Indicators
+from webapp.services import advanced_indicators
+from webapp.services.streaming_indicators import (
+    StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD, StreamingStochastic,
+    StreamingATR, StreamingBollingerBands, StreamingSupertrend, StreamingADX,
+    StreamingVWAP, StreamingOBV, StreamingIndicator, StreamingIndicatorSet,
+    create_streaming_indicator,
+)
+
+
+@pytest.fixture
+def candles():
+    """Random walk with a flat stretch to hit the zero-range branches"""
+    rng = random.Random(42)
+    result = []
+    price = 100.0
+    for t in range(150):
+        open_ = price
+        price = price * (1 + rng.gauss(0, 0.01))
+        high = max(open_, price) * (1 + abs(rng.gauss(0, 0.003)))
+        low = min(open_, price) * (1 - abs(rng.gauss(0, 0.003)))
+        if 40 <= t < 44:
+            open_ = high = low = price
+        result.append({
+            "timestamp": 1_700_000_000_000 + t * 60_000,
+            "open": open_, "high": high, "low": low, "close": price,
+            "volume": rng.random() * 1000,
+        })
+    return result
+
+
+def _feed(indicator, candles):
+    return [indicator.update(c) for c in candles]
+
+
+class TestStreamingMatchesBatch:
+    """Value after n updates == batch(candles[:n])[-1]"""
+
+    def test_sma_ema_rsi(self, candles):
+        sma, ema, rsi = StreamingSMA(20), StreamingEMA(20), StreamingRSI(14)
+        for n, c in enumerate(candles, 1):
+            closes = [x["close"] for x in candles[:n]]
+            assert sma.update(c) == Indicators.sma(closes, 20)[-1]
+            assert ema.update(c) == Indicators.ema(closes, 20)[-1]
+            assert rsi.update(c) == Indicators.rsi(closes, 14)[-1]
+
+    def test_advanced_flavours(self, candles):
+        ema = StreamingEMA(20, seed="sma")
+        rsi = StreamingRSI(14, smoothing="simple")
+        for n, c in enumerate(candles, 1):
+            closes = [x["close"] for x in candles[:n]]
+            expected_ema = advanced_indicators.ema(closes, 20)[-1] if n >= 20 else None
+            assert ema.update(c) == expected_ema
+            assert rsi.update(c) == advanced_indicators.MomentumIndicators.rsi(closes, 14)[-1]
+
+    def test_macd_bollinger(self, candles):
+        macd, bb = StreamingMACD(), StreamingBollingerBands(20, 2.0)
+        for n, c in enumerate(candles, 1):
+            closes = [x["close"] for x in candles[:n]]
+            line, signal, hist = Indicators.macd(closes)
+            assert macd.update(c) == {"macd": line[-1], "signal": signal[-1], "histogram": hist[-1]}
+            upper, middle, lower = Indicators.bollinger_bands(closes, 20, 2.0)
+            assert bb.update(c) == {"upper": upper[-1], "middle": middle[-1], "lower": lower[-1]}
+
+    def test_candle_based(self, candles):
+        atr, stoch = StreamingATR(14), StreamingStochastic(14, 3)
+        supertrend, adx = StreamingSupertrend(10, 3.0), StreamingADX(14)
+        vwap, obv = StreamingVWAP(), StreamingOBV()
+        for n, c in enumerate(candles, 1):
+            window = candles[:n]
+            assert atr.update(c) == Indicators.atr(window, 14)[-1]
+            k, d = Indicators.stochastic(window, 14, 3)
+            assert stoch.update(c) == {"k": k[-1], "d": d[-1]}
+            st, direction = Indicators.supertrend(window, 10, 3.0)
+            assert supertrend.update(c) == {"value": st[-1], "direction": direction[-1]}
+            adx_v, plus_di, minus_di = Indicators.adx(window, 14)
+            assert adx.update(c) == {"adx": adx_v[-1], "plus_di": plus_di[-1], "minus_di": minus_di[-1]}
+            assert vwap.update(c) == Indicators.vwap(window)[-1]
+            assert obv.update(c) == Indicators.obv(window)[-1]
+
+
+class TestStreamingState:
+    """Serialization, preview and the indicator set"""
+
+    @pytest.mark.parametrize("indicator_type,params", [
+        ("sma", {"period": 20}), ("ema", {"period": 9, "seed": "sma"}), ("rsi", {"period": 14}),
+        ("macd", {}), ("stochastic", {}), ("atr", {}), ("bollinger_bands", {}),
+        ("supertrend", {}), ("adx", {}), ("vwap", {}), ("obv", {}),
+    ])
+    def test_restore_then_continue(self, candles, indicator_type, params):
+        reference = create_streaming_indicator(indicator_type, **params)
+        expected = _feed(reference, candles)[-1]
+
+        first = create_streaming_indicator(indicator_type, **params)
+        _feed(first, candles[:70])
+        payload = json.loads(json.dumps(first.to_dict()))
+        restored = StreamingIndicator.from_dict(payload)
+
+        assert _feed(restored, candles[70:])[-1] == expected
+
+    def test_preview_does_not_commit(self, candles):
+        rsi = StreamingRSI(14)
+        rsi.seed(candles[:-1])
+        before = rsi.get_state()
+        previewed = rsi.preview(candles[-1])
+
+        assert rsi.get_state() == before
+        assert rsi.update(candles[-1]) == previewed
+
+    def test_set_skips_already_seen_candles(self, candles):
+        stream = StreamingIndicatorSet({"ema": StreamingEMA(20), "atr": StreamingATR(14)})
+        stream.seed(candles[:100])
+        # Pollers re-fetch overlapping windows
+        stream.catch_up(candles[95:120])
+        stream.catch_up(candles[110:])
+
+        fresh = StreamingIndicatorSet({"ema": StreamingEMA(20), "atr": StreamingATR(14)})
+        assert stream.values == fresh.seed(candles)
+        assert stream.indicators["ema"].count == len(candles)
+
+    def test_unknown_indicator(self):
+        with pytest.raises(ValueError):
+            create_streaming_indicator("ichimoku")
@@ -0,0 +1,160 @@
+"""
+Tests for core.symbol_universe - indexed search, filters and refresh behaviour
+"""
+
+import sys
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.symbol_universe import SymbolIndex, SymbolUniverse, normalize_symbol
+
+
+def _instrument(symbol, base, quote="USDT", status="Trading", tick="0.01", step="0.001"):
+    return {
+        "symbol": symbol, "baseCoin": base, "quoteCoin": quote, "status": status,
+        "priceFilter": {"tickSize": tick, "minPrice": "0.01", "maxPrice": "1000000"},
+        "lotSizeFilter": {"qtyStep": step, "minOrderQty": step, "maxOrderQty": "100", "maxMktOrderQty": "50"},
+        "leverageFilter": {"minLeverage": "1", "maxLeverage": "50"},
+        "fundingInterval": 480,
+    }
+
+
+INSTRUMENTS = [
+    _instrument("BTCUSDT", "BTC", tick="0.10"),
+    _instrument("ETHUSDT", "ETH"),
+    _instrument("ETHBTCUSDT", "ETHBTC"),
+    _instrument("1000PEPEUSDT", "1000PEPE", tick="0.0000001", step="100"),
+    _instrument("PEPEPERP", "PEPE", quote="USDC"),
+    _instrument("OLDUSDT", "OLD", status="Closed"),
+]
+
+TICKERS = [
+    {"symbol": "BTCUSDT", "lastPrice": "60000", "price24hPcnt": "0.015", "turnover24h": "9000000000", "fundingRate": "0.0001"},
+    {"symbol": "ETHUSDT", "lastPrice": "3000", "price24hPcnt": "-0.02", "turnover24h": "4000000000", "fundingRate": "-0.0002"},
+    {"symbol": "ETHBTCUSDT", "lastPrice": "0.05", "turnover24h": "1000"},
+    {"symbol": "1000PEPEUSDT", "lastPrice": "0.012", "turnover24h": "500000000"},
+]
+
+HL_META = {"universe": [
+    {"name": "BTC", "szDecimals": 5, "maxLeverage": 50},
+    {"name": "kPEPE", "szDecimals": 0, "maxLeverage": 10},
+    {"name": "DEAD", "szDecimals": 2, "maxLeverage": 3, "isDelisted": True},
+]}
+HL_CTXS = [
+    {"markPx": "60010", "prevDayPx": "60000", "dayNtlVlm": "1000000000", "funding": "0.00001", "openInterest": "100"},
+    {"markPx": "0.012", "prevDayPx": "0.01", "dayNtlVlm": "5000000", "funding": "0.0", "openInterest": "1"},
+    {"markPx": "1", "prevDayPx": "1", "dayNtlVlm": "0"},
+]
+
+
+class FakeUniverse(SymbolUniverse):
+    """Universe with canned upstream responses and call counters"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {"instruments": 0, "tickers": 0, "hyperliquid": 0}
+        self.fail = False
+
+    async def _fetch_bybit_instruments(self):
+        self.calls["instruments"] += 1
+        if self.fail:
+            raise RuntimeError("upstream down")
+        await asyncio.sleep(0.01)
+        return INSTRUMENTS
+
+    async def _fetch_bybit_tickers(self):
+        self.calls["tickers"] += 1
+        return TICKERS
+
+    async def _fetch_hyperliquid(self):
+        self.calls["hyperliquid"] += 1
+        return HL_META, HL_CTXS
+
+
+class TestSymbolIndex:
+
+    def test_prefix_and_substring(self):
+        index = SymbolIndex(["BTCUSDT", "ETHUSDT", "ETHBTCUSDT", "1000PEPEUSDT"])
+
+        assert index.prefix("ETH") == ["ETHBTCUSDT", "ETHUSDT"]
+        assert index.contains("BTC") == {"BTCUSDT", "ETHBTCUSDT"}
+        assert index.contains("PEP") == {"1000PEPEUSDT"}
+        assert index.contains("XYZ") == set()
+        assert "BTCUSDT" in index and "BTC" not in index
+
+    def test_normalize_symbol(self):
+        assert normalize_symbol("hyperliquid", "btc") == "BTCUSDT"
+        assert normalize_symbol("hyperliquid", "BTC-PERP") == "BTCUSDT"
+        assert normalize_symbol("hyperliquid", "ethusdc") == "ETHUSDT"
+        assert normalize_symbol("bybit", "btcusdt") == "BTCUSDT"
+
+
+class TestSymbolUniverse:
+
+    async def test_search_ranks_exact_prefix_then_contains(self):
+        universe = FakeUniverse()
+
+        results = await universe.search("bybit", "btc")
+
+        # Exact base match first, then substring match
+        assert [r.symbol for r in results] == ["BTCUSDT", "ETHBTCUSDT"]
+        assert results[0].price == 60000.0
+        assert results[0].change_24h == 1.5
+
+    async def test_search_without_query_orders_by_volume(self):
+        universe = FakeUniverse()
+
+        results = await universe.search("bybit", limit=None)
+
+        # USDT only, closed instruments excluded
+        assert [r.symbol for r in results] == ["BTCUSDT", "ETHUSDT", "1000PEPEUSDT", "ETHBTCUSDT"]
+
+    async def test_filters_served_from_memory(self):
+        universe = FakeUniverse()
+
+        for _ in range(5):
+            filters = await universe.filters("bybit", "1000PEPEUSDT")
+
+        assert filters == {"tickSize": 0.0000001, "minPrice": 0.01, "minQty": 100.0, "qtyStep": 100.0}
+        assert universe.calls == {"instruments": 1, "tickers": 1, "hyperliquid": 0}
+        assert await universe.filters("bybit", "NOPEUSDT") is None
+
+    async def test_validation(self):
+        universe = FakeUniverse()
+
+        assert await universe.is_tradeable("bybit", "ETHUSDT")
+        assert not await universe.is_tradeable("bybit", "OLDUSDT")
+        assert not await universe.is_tradeable("hyperliquid", "DEAD")
+
+    async def test_hyperliquid_universe(self):
+        universe = FakeUniverse()
+
+        btc = await universe.get("hyperliquid", "BTC")
+        kpepe = await universe.get("hyperliquid", "KPEPEUSDT")
+
+        assert btc.qty_step == pytest.approx(0.00001)
+        assert btc.tick_size == pytest.approx(0.1)
+        assert kpepe.symbol == "kPEPEUSDT"
+        assert kpepe.change_24h == 20.0
+        assert await universe.symbols("hyperliquid") == {"BTCUSDT", "kPEPEUSDT"}
+
+    async def test_concurrent_cold_lookups_share_one_refresh(self):
+        universe = FakeUniverse()
+
+        await asyncio.gather(*(universe.get("bybit", "BTCUSDT") for _ in range(10)))
+
+        assert universe.calls["instruments"] == 1
+
+    async def test_failed_refresh_keeps_last_snapshot(self):
+        universe = FakeUniverse()
+        await universe.get("bybit", "BTCUSDT")
+
+        universe.fail = True
+        await universe.refresh("bybit_instruments")
+
+        assert await universe.get("bybit", "BTCUSDT") is not None
+        assert universe.stats["errors"] == 1
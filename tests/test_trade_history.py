@@ -0,0 +1,187 @@
+"""
+Trade History Tests
+Keyset pagination, streaming export and single-pass portfolio aggregation
+
+Run: python -m pytest tests/test_trade_history.py -v
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+import db
+from webapp.api import portfolio, stats
+
+
+def _rows(n, start=datetime(2026, 3, 1, 12, 0)):
+    """trade_logs rows newest first, two trades per timestamp"""
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": 1000 - i, "signal_id": None, "symbol": "BTCUSDT" if i % 3 else "ETHUSDT",
+            "side": "Buy" if i % 2 else "Sell", "entry_price": 100.0, "exit_price": 101.0,
+            "exit_reason": "TP", "pnl": (i % 5) - 2.0, "pnl_pct": 0.5,
+            "strategy": "elcaro" if i % 4 else None, "account_type": "demo",
+            "ts": start - timedelta(minutes=i // 2), "exchange": "bybit",
+        })
+    return rows
+
+
+class FakeConn:
+    """Applies the keyset predicate of get_trade_logs_page to an in-memory table"""
+
+    def __init__(self, table):
+        self.table = table
+        self.queries = []
+
+    def execute(self, query, params):
+        self.queries.append((query, list(params)))
+        rows = self.table
+        if "(ts, id) < (?, ?)" in query:
+            ts, trade_id = params[-3], params[-2]
+            rows = [r for r in rows if (r["ts"], r["id"]) < (ts, trade_id)]
+        self._result = rows[:params[-1]]
+        return self
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def table(monkeypatch):
+    rows = _rows(25)
+    conn = FakeConn(rows)
+
+    @contextmanager
+    def fake_conn():
+        yield conn
+
+    monkeypatch.setattr(db, "get_conn", fake_conn)
+    monkeypatch.setattr(db, "_col_exists_pg", lambda table, col: True)
+    return rows, conn
+
+
+class TestKeysetPagination:
+
+    def test_cursor_roundtrip(self):
+        ts = datetime(2026, 3, 1, 12, 30, 15, 250000)
+        assert db.decode_trade_cursor(db.encode_trade_cursor(ts, 42)) == (ts, 42)
+        with pytest.raises(ValueError):
+            db.decode_trade_cursor("not-a-cursor")
+
+    def test_pages_cover_history_once(self, table):
+        rows, conn = table
+        seen, cursor = [], None
+        while True:
+            page, cursor = db.get_trade_logs_page(1, limit=10, cursor=cursor, exchange="bybit")
+            seen += [t["id"] for t in page]
+            if cursor is None:
+                break
+
+        assert seen == [r["id"] for r in rows]
+        assert all("OFFSET" not in q for q, _ in conn.queries)
+        assert all("ORDER BY ts DESC, id DESC" in q for q, _ in conn.queries)
+
+    def test_iter_trade_logs_streams(self, monkeypatch):
+        captured = {}
+
+        def fake_iter_query(query, params, batch_size):
+            captured.update(query=query, params=params, batch_size=batch_size)
+            yield from _rows(3)
+
+        monkeypatch.setattr(db, "iter_query", fake_iter_query)
+        monkeypatch.setattr(db, "_col_exists_pg", lambda table, col: True)
+        since = datetime(2026, 1, 1)
+        trades = list(db.iter_trade_logs(7, exchange="hyperliquid", since=since, ascending=True, batch_size=50))
+
+        assert [t["pnl_percent"] for t in trades] == [0.5] * 3
+        assert trades[0]["strategy"] == "unknown"
+        assert "ORDER BY ts ASC, id ASC" in captured["query"]
+        assert captured["params"] == (7, "hyperliquid", since)
+        assert captured["batch_size"] == 50
+
+    def test_filters_are_index_friendly(self, monkeypatch):
+        monkeypatch.setattr(db, "_col_exists_pg", lambda table, col: True)
+        where_sql, params = db._trade_logs_where(1, None, "real", "bybit", "all")
+
+        # OR ... IS NULL would keep idx_logs_keyset from seeking on these columns
+        assert "IS NULL" not in where_sql
+        assert where_sql == "user_id = ? AND account_type = ? AND exchange = ?"
+        assert params == [1, "real", "bybit"]
+
+    def test_portfolio_period_filter_is_index_friendly(self, monkeypatch):
+        import core.db_postgres
+        captured = {}
+
+        def fake_iter_query(query, params, batch_size):
+            captured.update(query=query, params=params)
+            yield from ()
+
+        monkeypatch.setattr(core.db_postgres, "iter_query", fake_iter_query)
+        start, end = datetime(2026, 1, 1), datetime(2026, 2, 1)
+        list(portfolio.iter_trades_for_period(1, start, end, "real", "bybit"))
+
+        assert "IS NULL" not in captured["query"]
+        assert captured["params"] == (1, "bybit", "real", start, end)
+
+
+class TestExport:
+
+    def test_ndjson_and_csv(self):
+        trades = [db._trade_log_list_row(r) for r in _rows(3)]
+
+        lines = list(stats._ndjson_lines(trades))
+        assert len(lines) == 3
+        assert json.loads(lines[0])["time"] == "2026-03-01T12:00:00"
+
+        csv_text = "".join(stats._csv_lines(trades)).splitlines()
+        assert csv_text[0].split(",") == stats.TRADE_EXPORT_FIELDS
+        assert len(csv_text) == 4
+
+    def test_csv_header_only_when_empty(self):
+        assert "".join(stats._csv_lines([])).strip() == ",".join(stats.TRADE_EXPORT_FIELDS)
+
+    async def test_stream_closes_cursor_on_disconnect(self):
+        released = []
+
+        def rows():
+            try:
+                for r in _rows(1000):
+                    yield db._trade_log_list_row(r)
+            finally:
+                released.append(True)
+
+        trades = rows()
+        stream = stats._stream_in_thread(stats._csv_lines(trades), trades, batch_size=10)
+        first = await stream.__anext__()
+        assert first.startswith("id,")
+
+        await stream.aclose()   # client went away after the first chunk
+        assert released == [True]
+
+
+class TestPortfolioAggregation:
+
+    def test_single_pass_matches_builders(self):
+        trades = list(reversed(_rows(40)))
+        aggregated = portfolio.aggregate_trades(iter(trades), "1d")
+
+        assert aggregated["trade_count"] == 40
+        assert aggregated["total_pnl"] == pytest.approx(sum(t["pnl"] for t in trades))
+        assert aggregated["chart_data"] == portfolio.build_chart_data(trades, "1d")
+        assert aggregated["candles"] == portfolio.build_candle_clusters(trades, "1d")
+
+    def test_candle_ohlc(self):
+        base = datetime(2026, 3, 1, 10, 0)
+        trades = [
+            {"id": 1, "ts": base, "pnl": 5.0, "side": "Buy", "symbol": "BTCUSDT"},
+            {"id": 2, "ts": base + timedelta(minutes=5), "pnl": -8.0, "side": "Sell", "symbol": "BTCUSDT"},
+            {"id": 3, "ts": base + timedelta(hours=2), "pnl": 2.0, "side": None, "symbol": "ETHUSDT"},
+        ]
+        first, second = portfolio.build_candle_clusters(trades, "1d")
+
+        assert (first.open_pnl, first.high_pnl, first.low_pnl, first.close_pnl) == (0, 5, -3, -3)
+        assert (first.long_count, first.short_count, first.win_count, first.loss_count) == (1, 1, 1, 1)
+        assert (second.open_pnl, second.close_pnl) == (-3, -1)
+        assert second.strategies["unknown"]["win_rate"] == 100
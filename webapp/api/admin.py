@@ -1365,6 +1365,55 @@ async def get_system_health(
     return db.get_system_health()
 
 
+@router.get("/system")
+async def get_system_queries(
+    threshold_ms: float = Query(100.0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    admin: dict = Depends(require_admin)
+):
+    """Query latency stats (slowest first), slow queries, DB pool, executor and config cache state for this process."""
+    from core.multitenancy_queries import _query_stats, get_fast_path_status
+    from core.pool_manager import get_pool_manager
+    from core.db_executor import db_executor
+    from core.config_cache import config_cache
+
+    stats = sorted(_query_stats.get_stats().values(), key=lambda s: s.total_time_ms, reverse=True)
+    slow = sorted(_query_stats.get_slow_queries(threshold_ms), key=lambda s: s.avg_time_ms, reverse=True)
+    manager = get_pool_manager()
+    return {
+        "queries": [s.to_dict() for s in stats[:limit]],
+        "slow_queries": [s.to_dict() for s in slow],
+        "threshold_ms": threshold_ms,
+        "fast_path": get_fast_path_status(),
+        "pool": {**manager.get_pool_status(), "metrics": manager.get_metrics()},
+        "db_executor": db_executor.stats,
+        "config_cache": config_cache.stats,
+    }
+
+
+@router.get("/system/loop")
+async def get_event_loop_profile(
+    limit: int = Query(20, ge=1, le=200),
+    reset: bool = Query(False),
+    admin: dict = Depends(require_admin)
+):
+    """Event loop lag, slowest callbacks/tasks and stall stacks for this process."""
+    from core.loop_profiler import loop_profiler
+
+    snapshot = loop_profiler.snapshot(limit=limit)
+    if reset:
+        loop_profiler.reset()
+    return snapshot
+
+
+@router.get("/system/memory")
+async def get_memory_profile(admin: dict = Depends(require_admin)):
+    """RSS and entry counts per in-process cache (the bot serves the same on /debug/memory)."""
+    from core.optimizations import get_memory_stats
+
+    return get_memory_stats()
+
+
 # ============ USER TRADING CONTROL ============
 
 @router.post("/users/{user_id}/pause-trading")
@@ -10,16 +10,18 @@ import os
 import json
 import asyncio
 from pathlib import Path
+from collections import deque
 from datetime import datetime
 
-from core.tasks import safe_create_task
-
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 # Import auth and PostgreSQL helper
 from webapp.api.auth import get_current_user
 from webapp.api.db_helper import get_db
+from webapp.services.streaming_indicators import (
+    StreamingIndicatorSet, StreamingRSI, StreamingEMA,
+)
 
 router = APIRouter()
 
@@ -64,6 +66,13 @@ class WalkForwardRequest(BaseModel):
     data_source: str = "binance"
 
 
+DEFAULT_WALK_FORWARD_RANGES = {
+    "stop_loss_percent": [1.0, 1.5, 2.0, 2.5, 3.0],
+    "take_profit_percent": [2.0, 3.0, 4.0, 5.0, 6.0],
+    "risk_per_trade": [0.5, 1.0, 1.5, 2.0]
+}
+
+
 class CustomBacktestRequest(BaseModel):
     strategy_id: int
     symbol: str = "BTCUSDT"
@@ -108,76 +117,64 @@ async def rate_limit_oi_data(user: dict = Depends(get_current_user)):
 
 @router.post("/run-async")
 async def run_backtest_async(request: BacktestRequest, user: dict = Depends(rate_limit_backtest)):
-    """Run backtest asynchronously with WebSocket progress updates"""
+    """
+    Queue a backtest with WebSocket progress updates.
+    Identical requests return the stored result (or attach to the running job).
+    """
+    return await _submit_backtest_job(user, "backtest", request.dict())
+
+
+@router.post("/walk-forward-async")
+async def run_walk_forward_async(request: WalkForwardRequest, user: dict = Depends(rate_limit_backtest)):
+    """Queue a walk-forward optimization (progress via /ws/backtest/{id})"""
+    params = request.dict()
+    params["param_ranges"] = request.param_ranges or DEFAULT_WALK_FORWARD_RANGES
+    return await _submit_backtest_job(user, "walk_forward", params)
+
+
+@router.get("/jobs/{backtest_id}")
+async def get_backtest_job(backtest_id: str, user: dict = Depends(get_current_user)):
+    """Status and result of a queued backtest"""
+    from webapp.services.backtest_jobs import backtest_jobs
+    
+    job = await backtest_jobs.get(backtest_id)
+    if job is None or (user["user_id"] not in job.subscribers and not user.get("is_admin")):
+        raise HTTPException(404, "Backtest job not found")
+    return {"success": True, **job.to_dict()}
+
+
+@router.delete("/jobs/{backtest_id}")
+async def cancel_backtest_job(backtest_id: str, user: dict = Depends(get_current_user)):
+    """Cancel a queued/running backtest"""
+    from webapp.services.backtest_jobs import backtest_jobs
+    
+    job = await backtest_jobs.get(backtest_id)
+    if job is None or user["user_id"] not in job.subscribers:
+        raise HTTPException(404, "Backtest job not found")
+    return {"success": backtest_jobs.cancel(backtest_id, user["user_id"])}
+
+
+async def _submit_backtest_job(user: dict, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    from webapp.services.backtest_jobs import backtest_jobs, resolve_tier, QuotaExceeded
+    
     try:
-        from webapp.api.backtest_ws import create_backtest_session, send_progress, send_result, send_error, is_backtest_cancelled
-        from webapp.services.backtest_engine import RealBacktestEngine
-        
-        # Create backtest session
-        backtest_id = create_backtest_session(request.dict())
-        
-        # Start backtest in background
-        safe_create_task(run_backtest_with_progress(backtest_id, request), name=f"backtest_{backtest_id}")
-        
-        return {
-            "success": True,
-            "backtest_id": backtest_id,
-            "message": "Backtest started. Connect to WebSocket for progress updates."
-        }
-        
+        tier = await resolve_tier(user)
+        job = await backtest_jobs.submit(user["user_id"], kind, params, tier=tier)
+    except QuotaExceeded as e:
+        raise HTTPException(429, str(e))
     except Exception as e:
         return {
             "success": False,
             "error": str(e)
         }
-
-
-async def run_backtest_with_progress(backtest_id: str, request: BacktestRequest):
-    """Run backtest with progress updates via WebSocket"""
-    try:
-        from webapp.api.backtest_ws import send_progress, send_result, send_error, is_backtest_cancelled
-        from webapp.services.backtest_engine import RealBacktestEngine
-        
-        engine = RealBacktestEngine()
-        all_results = {}
-        
-        total_strategies = len(request.strategies)
-        
-        for idx, strategy in enumerate(request.strategies):
-            # Check if cancelled
-            if is_backtest_cancelled(backtest_id):
-                await send_error(backtest_id, "Backtest cancelled by user")
-                return
-            
-            # Send progress
-            progress = (idx / total_strategies) * 100
-            await send_progress(
-                backtest_id,
-                progress,
-                f"Testing strategy: {strategy}",
-                {"current_strategy": strategy, "completed": idx, "total": total_strategies}
-            )
-            
-            # Run backtest for this strategy
-            result = await engine.run_backtest(
-                strategy=strategy,
-                symbol=request.symbol,
-                timeframe=request.timeframe,
-                days=request.days,
-                initial_balance=request.initial_balance,
-                risk_per_trade=request.risk_per_trade,
-                stop_loss_percent=request.stop_loss_percent,
-                take_profit_percent=request.take_profit_percent,
-                data_source=request.data_source
-            )
-            all_results[strategy] = result
-        
-        # Send final results
-        await send_progress(backtest_id, 100, "Completed", {"completed": total_strategies, "total": total_strategies})
-        await send_result(backtest_id, all_results)
-        
-    except Exception as e:
-        await send_error(backtest_id, str(e))
+    
+    return {
+        "success": True,
+        "backtest_id": job.id,
+        "status": job.status,
+        "cached": job.cached,
+        "message": "Backtest queued. Connect to WebSocket for progress updates."
+    }
 
 
 @router.post("/run")
@@ -415,11 +412,7 @@ async def run_walk_forward_optimization(request: WalkForwardRequest, user: dict
         engine = RealBacktestEngine()
         
         # Default param ranges if not provided
-        param_ranges = request.param_ranges or {
-            "stop_loss_percent": [1.0, 1.5, 2.0, 2.5, 3.0],
-            "take_profit_percent": [2.0, 3.0, 4.0, 5.0, 6.0],
-            "risk_per_trade": [0.5, 1.0, 1.5, 2.0]
-        }
+        param_ranges = request.param_ranges or DEFAULT_WALK_FORWARD_RANGES
         
         result = await engine.run_walk_forward_optimization(
             strategy=request.strategy,
@@ -1482,6 +1475,14 @@ class LiveBacktestManager:
             equity = initial_balance
             position = None
             
+            # Incremental indicators - O(1) per candle instead of re-scanning history
+            indicators = StreamingIndicatorSet({
+                "rsi": StreamingRSI(14, smoothing="simple"),
+                "ema20": StreamingEMA(20, seed="sma"),
+                "ema50": StreamingEMA(50, seed="sma"),
+            })
+            recent = deque(maxlen=20)
+            
             # Stream candles one by one
             for i, candle in enumerate(candles):
                 if not session.get("running", False):
@@ -1493,11 +1494,14 @@ class LiveBacktestManager:
                     "data": candle
                 })
                 
+                values = indicators.update(candle)
+                recent.append(candle)
+                
                 if i >= 20:
                     signal = all_signals.get(i, {})
                     
                     # Calculate indicators for this candle
-                    analysis = self._calculate_analysis(candles[:i+1])
+                    analysis = self._calculate_analysis(list(recent), values)
                     await ws.send_json({
                         "type": "analysis",
                         "data": analysis
@@ -1569,22 +1573,23 @@ class LiveBacktestManager:
             if session_id in self.active_sessions:
                 del self.active_sessions[session_id]
     
-    def _calculate_analysis(self, candles: List[Dict]) -> Dict:
-        """Calculate technical indicators for current candle"""
+    def _calculate_analysis(self, candles: List[Dict], indicator_values: Dict[str, Any]) -> Dict:
+        """
+        Build analysis for the current candle.
+        
+        Args:
+            candles: The last 20 candles (rolling window)
+            indicator_values: Latest values from the session's StreamingIndicatorSet
+        """
         if len(candles) < 20:
             return {}
         
         closes = [c["close"] for c in candles]
-        highs = [c["high"] for c in candles]
-        lows = [c["low"] for c in candles]
         volumes = [c["volume"] for c in candles]
         
-        # RSI
-        rsi = self._calc_rsi(closes, 14)
-        
-        # Simple EMA
-        ema20 = self._calc_ema(closes, 20)
-        ema50 = self._calc_ema(closes, 50) if len(closes) >= 50 else None
+        rsi = indicator_values.get("rsi")
+        ema20 = indicator_values.get("ema20")
+        ema50 = indicator_values.get("ema50")
         
         # Bollinger Bands
         bb = self._calc_bb(closes, 20, 2)
@@ -1622,35 +1627,6 @@ class LiveBacktestManager:
             "sentiment": max(-100, min(100, sentiment))
         }
     
-    def _calc_rsi(self, closes: List[float], period: int = 14) -> Optional[float]:
-        if len(closes) < period + 1:
-            return None
-        
-        deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
-        gains = [d if d > 0 else 0 for d in deltas[-period:]]
-        losses = [-d if d < 0 else 0 for d in deltas[-period:]]
-        
-        avg_gain = sum(gains) / period
-        avg_loss = sum(losses) / period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
-    
-    def _calc_ema(self, data: List[float], period: int) -> Optional[float]:
-        if len(data) < period:
-            return None
-        
-        multiplier = 2 / (period + 1)
-        ema = sum(data[:period]) / period
-        
-        for price in data[period:]:
-            ema = (price - ema) * multiplier + ema
-        
-        return ema
-    
     def _calc_bb(self, closes: List[float], period: int = 20, std_mult: float = 2) -> Optional[Dict]:
         if len(closes) < period:
             return None
@@ -1033,9 +1033,8 @@ async def live_signal_scanner(websocket: WebSocket):
         timeframes = config.get("timeframes", ["1h", "4h"])
         min_score = config.get("min_score", 70)
         
-        from webapp.services.signal_scanner import SignalScanner
-        
-        scanner = SignalScanner()
+        # Shared scanner: bundles and HTTP pool are reused across connections
+        from webapp.services.signal_scanner import signal_scanner as scanner
         
         while True:
             try:
@@ -37,6 +37,10 @@ async def backtest_websocket(websocket: WebSocket, backtest_id: str):
             "timestamp": datetime.now().isoformat()
         })
         
+        # Queued jobs may have progressed (or finished - e.g. cached results)
+        # before the client connected
+        await send_job_snapshot(websocket, backtest_id)
+        
         # Keep connection alive and listen for commands
         while True:
             try:
@@ -44,8 +48,30 @@ async def backtest_websocket(websocket: WebSocket, backtest_id: str):
                 msg_type = message.get('type')
                 
                 if msg_type == 'cancel':
-                    # Cancel backtest
-                    if backtest_id in active_backtests:
+                    # Cancel backtest - only a subscriber of the job (or an admin) may cancel it
+                    from webapp.services.backtest_jobs import backtest_jobs
+                    user = await authenticate_ws(websocket, message.get('token'))
+                    if user is None:
+                        await websocket.send_json({
+                            "type": "error",
+                            "error": "Authentication required to cancel",
+                            "timestamp": datetime.now().isoformat()
+                        })
+                        continue
+                    cancel_as = None if user.get("is_admin") else user["user_id"]
+                    if backtest_jobs.cancel(backtest_id, user_id=cancel_as):
+                        notice = {
+                            "type": "cancelled",
+                            "message": "Backtest cancelled by user",
+                            "timestamp": datetime.now().isoformat()
+                        }
+                        job = backtest_jobs.jobs.get(backtest_id)
+                        if job is not None and not job.cancelled:
+                            # Shared job keeps running for its other subscribers
+                            await websocket.send_json(notice)
+                        else:
+                            await broadcast_to_backtest(backtest_id, notice)
+                    elif backtest_id in active_backtests:
                         active_backtests[backtest_id]['cancelled'] = True
                         await broadcast_to_backtest(backtest_id, {
                             "type": "cancelled",
@@ -76,6 +102,48 @@ async def backtest_websocket(websocket: WebSocket, backtest_id: str):
         logger.info(f"Backtest WebSocket disconnected: {backtest_id}")
 
 
+async def authenticate_ws(websocket: WebSocket, token: str = None):
+    """User for a JWT sent in the message or the ?token= query param, or None"""
+    from webapp.api.auth import verify_ws_token
+    
+    token = token or websocket.query_params.get("token")
+    if not token:
+        return None
+    return await asyncio.to_thread(verify_ws_token, token)
+
+
+async def send_job_snapshot(websocket: WebSocket, backtest_id: str):
+    """Send current state of a queued backtest job to a newly connected client"""
+    from webapp.services.backtest_jobs import backtest_jobs
+    
+    if backtest_id in active_backtests:
+        return
+    job = await backtest_jobs.get(backtest_id)
+    if job is None:
+        return
+    
+    await websocket.send_json({
+        "type": "progress",
+        "progress": job.progress,
+        "stage": job.stage or job.status,
+        "status": job.status,
+        "timestamp": datetime.now().isoformat()
+    })
+    if job.status == "completed":
+        await websocket.send_json({
+            "type": "completed",
+            "results": job.result,
+            "cached": job.cached,
+            "timestamp": datetime.now().isoformat()
+        })
+    elif job.status in ("failed", "cancelled"):
+        await websocket.send_json({
+            "type": "error",
+            "error": job.error,
+            "timestamp": datetime.now().isoformat()
+        })
+
+
 async def broadcast_to_backtest(backtest_id: str, message: dict):
     """Broadcast message to all clients subscribed to this backtest"""
     if backtest_id not in active_connections:
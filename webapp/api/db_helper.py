@@ -131,8 +131,10 @@ class _DictCompatCursor:
         self.rowcount = self._cursor.rowcount
         self.description = self._cursor.description
         
-        # Get lastrowid for INSERT with RETURNING
-        if 'RETURNING' in pg_query.upper() and self._cursor.description:
+        # Get lastrowid for INSERT with RETURNING. UPDATE/DELETE ... RETURNING rows
+        # are left to the caller - pre-fetching would swallow the first one.
+        if (pg_query.lstrip().upper().startswith('INSERT')
+                and 'RETURNING' in pg_query.upper() and self._cursor.description):
             row = self._cursor.fetchone()
             if row:
                 self.lastrowid = row.get('id') if isinstance(row, dict) else row[0]
@@ -1,28 +1,42 @@
 """
 Home Page Data API - Real-time BTC/Gold/Platform Stats + Market Overview
+
+Payloads are kept warm by a background refresher (HomeDataCache) and served
+as pre-serialized JSON bytes. Requests never wait for upstream APIs once the
+cache is populated: stale entries are returned immediately while a single
+refresh runs in the background (stale-while-revalidate). With Redis available,
+workers share fresh payloads so only one of them hits the upstreams.
 """
 
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi.responses import Response
+from typing import Dict, Any, Optional
+from dataclasses import dataclass
 import aiohttp
 import asyncio
 from datetime import datetime
+import json
 import logging
+import os
 import re
+import time
+
+from core.tasks import safe_create_task
 
 router = APIRouter(prefix="/api/home", tags=["home"])
 logger = logging.getLogger(__name__)
 
-# Cache for data
-_cache = {
-    "btc": {"data": None, "updated": 0},
-    "gold": {"data": None, "updated": 0},
-    "stats": {"data": None, "updated": 0},
-    "market": {"data": None, "updated": 0},
-}
 CACHE_TTL = 60  # 60 seconds
 MARKET_CACHE_TTL = 120  # 2 minutes for market data (heavier fetch)
 
+HOME_CACHE_CONFIG = {
+    "refresh_ahead": 0.8,   # Background refresh at 80% of TTL, so requests see fresh data
+    "tick": 5.0,            # Refresher wake-up interval (seconds)
+    "use_redis": os.getenv("HOME_CACHE_REDIS", "1") == "1",
+    "redis_prefix": "home:",
+    "redis_ttl": 600,       # Shared copy outlives TTL so cold workers can serve stale
+}
+
 
 async def fetch_btc_data() -> Dict[str, Any]:
     """Fetch Bitcoin price and chart data from Binance"""
@@ -95,7 +109,11 @@ async def fetch_gold_data() -> Dict[str, Any]:
 
 
 async def fetch_platform_stats() -> Dict[str, Any]:
-    """Fetch platform statistics from database"""
+    """Fetch platform statistics from database (sync queries run off the event loop)"""
+    return await asyncio.to_thread(_query_platform_stats)
+
+
+def _query_platform_stats() -> Dict[str, Any]:
     try:
         from core.db_postgres import execute, execute_one
         
@@ -332,68 +350,211 @@ async def fetch_market_data() -> Dict[str, Any]:
     }
 
 
+# ═══════════════════════════════════════════════════════════════
+# BACKGROUND CACHE
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class CachedPayload:
+    """Serialized payload and the time it was fetched"""
+    body: bytes = b""
+    updated: float = 0.0
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.updated
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), default=str).encode()
+
+
+class HomeDataCache:
+    """
+    Keeps home payloads warm in memory (and optionally Redis).
+
+    - start() runs a refresher that re-fetches each source ahead of its TTL
+    - get() never blocks on a populated entry; stale entries trigger one
+      background refresh
+    - Concurrent refreshes of the same source share one upstream call
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, tuple],
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        # sources: name -> (async fetcher, ttl seconds)
+        self.sources: Dict[str, tuple] = sources
+        self.config = {**HOME_CACHE_CONFIG, **(config or {})}
+        self._entries: Dict[str, CachedPayload] = {name: CachedPayload() for name in sources}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "refreshes": 0, "shared": 0, "errors": 0}
+
+    # ── Lookup ──
+
+    async def get(self, name: str) -> CachedPayload:
+        entry = self._entries[name]
+        if entry.body:
+            if entry.age() >= self.sources[name][1]:
+                self.stats["stale"] += 1
+                self._schedule(name)
+            else:
+                self.stats["hits"] += 1
+            return entry
+
+        self.stats["misses"] += 1
+        shared = await self._load_shared(name)
+        if shared is not None:
+            if shared.age() >= self.sources[name][1]:
+                self._schedule(name)
+            return shared
+        entry = await self.refresh(name)
+        if not entry.body:
+            raise HTTPException(status_code=503, detail=f"{name} data unavailable")
+        return entry
+
+    async def all_body(self) -> bytes:
+        """Combined /all payload assembled from the cached bodies"""
+        names = list(self.sources)
+        entries = await asyncio.gather(*(self.get(name) for name in names))
+        parts = [b'"%s":%s' % (name.encode(), entry.body) for name, entry in zip(names, entries)]
+        parts.append(b'"timestamp":' + _dumps(datetime.now().isoformat()))
+        return b"{" + b",".join(parts) + b"}"
+
+    # ── Refresh ──
+
+    def _schedule(self, name: str) -> asyncio.Task:
+        task = self._inflight.get(name)
+        if task is None or task.done():
+            task = safe_create_task(self._refresh(name), name=f"home_refresh_{name}")
+            self._inflight[name] = task
+        return task
+
+    async def refresh(self, name: str) -> CachedPayload:
+        """Refresh one source (joins an in-flight refresh if there is one)"""
+        return await asyncio.shield(self._schedule(name))
+
+    async def _refresh(self, name: str) -> CachedPayload:
+        fetcher, ttl = self.sources[name]
+        # Another worker may have refreshed recently: adopt its copy instead of hitting upstream
+        shared = await self._load_shared(name)
+        if shared is not None and shared.age() < ttl * self.config["refresh_ahead"]:
+            self.stats["shared"] += 1
+            return shared
+
+        try:
+            data = await fetcher()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Home data refresh failed ({name}): {e}")
+            return self._entries[name]
+
+        entry = CachedPayload(body=_dumps(data), updated=time.time())
+        self._entries[name] = entry
+        self.stats["refreshes"] += 1
+        await self._store_shared(name, entry)
+        return entry
+
+    async def _run(self):
+        ahead = self.config["refresh_ahead"]
+        while True:
+            now = time.time()
+            for name, (_, ttl) in self.sources.items():
+                if self._entries[name].age(now) >= ttl * ahead:
+                    self._schedule(name)
+            await asyncio.sleep(self.config["tick"])
+
+    async def start(self):
+        """Start the background refresher (first pass fetches all sources concurrently)"""
+        if self._task is None or self._task.done():
+            self._task = safe_create_task(self._run(), name="home_data_refresher")
+
+    async def stop(self):
+        tasks = [t for t in [self._task, *self._inflight.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._inflight.clear()
+
+    # ── Redis (shared between workers) ──
+
+    async def _redis(self):
+        if not self.config["use_redis"]:
+            return None
+        try:
+            from core.redis_client import get_redis
+            redis = await get_redis()
+        except Exception:
+            return None
+        return redis if redis._connected else None
+
+    async def _load_shared(self, name: str) -> Optional[CachedPayload]:
+        redis = await self._redis()
+        if redis is None:
+            return None
+        raw = await redis.get(self.config["redis_prefix"] + name)
+        if not raw:
+            return None
+        # Stored as "<updated>|<json body>"
+        updated, _, body = raw.partition("|")
+        try:
+            entry = CachedPayload(body=body.encode(), updated=float(updated))
+        except ValueError:
+            return None
+        if entry.updated > self._entries[name].updated:
+            self._entries[name] = entry
+        return self._entries[name]
+
+    async def _store_shared(self, name: str, entry: CachedPayload):
+        redis = await self._redis()
+        if redis is not None:
+            await redis.set(
+                self.config["redis_prefix"] + name,
+                f"{entry.updated:.3f}|{entry.body.decode()}",
+                ttl=self.config["redis_ttl"],
+            )
+
+
+# Fetchers are looked up at call time (lambda) so they can be replaced in tests
+home_cache = HomeDataCache({
+    "btc": (lambda: fetch_btc_data(), CACHE_TTL),
+    "gold": (lambda: fetch_gold_data(), CACHE_TTL),
+    "stats": (lambda: fetch_platform_stats(), CACHE_TTL),
+    "market": (lambda: fetch_market_data(), MARKET_CACHE_TTL),
+})
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/market")
 async def get_market_data():
     """Get comprehensive market overview data (Fear & Greed, Dominance, S&P 500, etc.)"""
-    now = datetime.now().timestamp()
-    if _cache["market"]["data"] and (now - _cache["market"]["updated"]) < MARKET_CACHE_TTL:
-        return _cache["market"]["data"]
-
-    data = await fetch_market_data()
-    _cache["market"] = {"data": data, "updated": now}
-    return data
+    return _json_response((await home_cache.get("market")).body)
 
 
 @router.get("/btc")
 async def get_btc_data():
     """Get Bitcoin price and chart data"""
-    now = datetime.now().timestamp()
-    if _cache["btc"]["data"] and (now - _cache["btc"]["updated"]) < CACHE_TTL:
-        return _cache["btc"]["data"]
-    
-    data = await fetch_btc_data()
-    _cache["btc"] = {"data": data, "updated": now}
-    return data
+    return _json_response((await home_cache.get("btc")).body)
 
 
 @router.get("/gold")
 async def get_gold_data():
     """Get Gold price data"""
-    now = datetime.now().timestamp()
-    if _cache["gold"]["data"] and (now - _cache["gold"]["updated"]) < CACHE_TTL:
-        return _cache["gold"]["data"]
-    
-    data = await fetch_gold_data()
-    _cache["gold"] = {"data": data, "updated": now}
-    return data
+    return _json_response((await home_cache.get("gold")).body)
 
 
 @router.get("/stats")
 async def get_platform_stats():
     """Get platform statistics"""
-    now = datetime.now().timestamp()
-    if _cache["stats"]["data"] and (now - _cache["stats"]["updated"]) < CACHE_TTL:
-        return _cache["stats"]["data"]
-    
-    data = await fetch_platform_stats()
-    _cache["stats"] = {"data": data, "updated": now}
-    return data
+    return _json_response((await home_cache.get("stats")).body)
 
 
 @router.get("/all")
 async def get_all_home_data():
     """Get all home page data in one request"""
-    btc, gold, stats, market = await asyncio.gather(
-        get_btc_data(),
-        get_gold_data(),
-        get_platform_stats(),
-        get_market_data()
-    )
-    
-    return {
-        "btc": btc,
-        "gold": gold,
-        "stats": stats,
-        "market": market,
-        "timestamp": datetime.now().isoformat()
-    }
+    return _json_response(await home_cache.all_body())
@@ -20,6 +20,7 @@ from contextlib import contextmanager
 # Use PostgreSQL via centralized helper (NOT sqlite3!)
 from webapp.api.db_helper import get_db
 from webapp.api.auth import get_current_user, get_current_user_optional
+from webapp.api.response_cache import cache_response
 
 router = APIRouter()
 
@@ -751,6 +752,7 @@ async def rate_strategy(request: RatingRequest, user: dict = Depends(get_current
 
 
 @router.get("/rankings/top")
+@cache_response(ttl=60)
 async def get_top_strategies(
     strategy_type: str = "all",  # 'system', 'custom', 'all'
     limit: int = 20
@@ -818,6 +820,7 @@ async def get_custom_strategy_rankings(page: int = 1, limit: int = 50):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/market/overview")
+@cache_response(ttl=30)
 async def get_market_overview():
     """Get market overview with key metrics from exchanges"""
     import aiohttp
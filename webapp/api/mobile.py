@@ -20,6 +20,7 @@ import uuid
 import os
 
 from coin_params import ADMIN_ID
+from db import invalidate_user_cache
 from webapp.api.security_utils import safe_exception
 
 logger = logging.getLogger(__name__)
@@ -129,6 +130,15 @@ def get_db_connection():
         raise HTTPException(status_code=500, detail="Database connection failed")
 
 
+def _invalidate_push_cache(user_id: int):
+    """Drop APNs-cached preferences/devices so the next push sees the change"""
+    try:
+        from services.apns_service import invalidate_push_cache
+        invalidate_push_cache(user_id)
+    except ImportError:
+        pass
+
+
 def register_device(user_id: int, device_info: DeviceInfo) -> bool:
     """Register or update a device for push notifications"""
     try:
@@ -151,7 +161,8 @@ def register_device(user_id: int, device_info: DeviceInfo) -> bool:
                 device_info.device_model or f"{device_info.platform} {device_info.os_version or ''}".strip()
             ))
             conn.commit()
-            return True
+        _invalidate_push_cache(user_id)
+        return True
     except Exception as e:
         logger.error(f"Device registration error: {e}")
         return False
@@ -323,6 +334,7 @@ async def mobile_logout(
                     WHERE user_id = %s AND device_token = %s
                 """, (user_id, device_id))
                 conn.commit()
+            _invalidate_push_cache(user_id)
         
         return {"success": True, "message": "Logged out"}
         
@@ -462,6 +474,7 @@ async def update_user_settings(
                 WHERE user_id = %s
             """, values)
             conn.commit()
+        invalidate_user_cache(user_id)
         
         return {"success": True, "updated": list(updates.keys())}
         
@@ -498,6 +511,7 @@ async def register_push_token(
             """, (user_id, push_token, platform, platform))
             conn.commit()
         
+        _invalidate_push_cache(user_id)
         return {"success": True, "message": "Push token registered"}
         
     except Exception as e:
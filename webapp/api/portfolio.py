@@ -3,9 +3,10 @@ Portfolio API - Spot/Futures Balance, PnL Analytics, Chart Data with Cluster Ana
 """
 import os
 import sys
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 
@@ -331,232 +332,237 @@ async def get_futures_balance(user_id: int, account_type: str = "demo") -> Futur
         )
 
 
-def get_trades_for_period(user_id: int, start: datetime, end: datetime, 
-                          account_type: str = "demo", exchange: str = "bybit") -> List[Dict]:
-    """Get trade logs for period from database"""
-    from core.db_postgres import execute
+def iter_trades_for_period(user_id: int, start: datetime, end: datetime,
+                           account_type: str = "demo", exchange: str = "bybit",
+                           batch_size: int = 1000) -> Iterator[Dict]:
+    """Stream trade logs for period, oldest first (server-side cursor, constant memory)"""
+    from core.db_postgres import iter_query
     
     query = """
         SELECT id, symbol, side, entry_price, exit_price, pnl, pnl_pct, 
                strategy, ts, exit_reason, timeframe, account_type
         FROM trade_logs 
         WHERE user_id = %s 
+          AND exchange = %s
           AND account_type = %s
           AND ts >= %s 
           AND ts <= %s
-        ORDER BY ts ASC
+        ORDER BY ts ASC, id ASC
     """
     
-    rows = execute(query, (user_id, account_type, start, end))
-    return [dict(r) for r in rows] if rows else []
+    return iter_query(query, (user_id, exchange, account_type, start, end), batch_size=batch_size)
 
 
-def build_chart_data(trades: List[Dict], period: str) -> List[PnLDataPoint]:
-    """Build chart data points from trades"""
-    if not trades:
-        return []
-    
-    # Determine bucket size based on period
-    if period == "1d":
-        bucket_hours = 1
-    elif period == "1w":
-        bucket_hours = 6
-    elif period == "1m":
-        bucket_hours = 24
-    else:
-        bucket_hours = 12
-    
-    # Group trades by bucket
-    buckets = {}
-    for trade in trades:
-        ts = trade.get("ts")
-        if not ts:
-            continue
-        
-        if isinstance(ts, str):
-            ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-        
-        # Round to bucket
-        bucket_ts = ts.replace(
-            minute=0, second=0, microsecond=0,
-            hour=(ts.hour // bucket_hours) * bucket_hours
-        )
-        bucket_key = bucket_ts.isoformat()
-        
-        if bucket_key not in buckets:
-            buckets[bucket_key] = {"pnl": 0, "count": 0}
-        
-        buckets[bucket_key]["pnl"] += float(trade.get("pnl") or 0)
-        buckets[bucket_key]["count"] += 1
-    
-    # Build data points with cumulative PnL
-    data_points = []
-    cumulative = 0.0
+def get_trades_for_period(user_id: int, start: datetime, end: datetime, 
+                          account_type: str = "demo", exchange: str = "bybit") -> List[Dict]:
+    """Get trade logs for period from database (small windows - prefer iter_trades_for_period)"""
+    return list(iter_trades_for_period(user_id, start, end, account_type, exchange))
+
+
+def _bucket_key(ts, hours: int) -> Optional[str]:
+    """Round trade timestamp down to an N-hour bucket (ISO string)"""
+    if not ts:
+        return None
     
-    for ts_key in sorted(buckets.keys()):
-        bucket = buckets[ts_key]
-        cumulative += bucket["pnl"]
-        
-        data_points.append(PnLDataPoint(
-            timestamp=ts_key,
-            pnl=bucket["pnl"],
-            cumulative_pnl=cumulative,
-            trade_count=bucket["count"]
-        ))
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
     
-    return data_points
+    return ts.replace(
+        minute=0, second=0, microsecond=0,
+        hour=(ts.hour // hours) * hours
+    ).isoformat()
 
 
-def build_candle_clusters(trades: List[Dict], period: str) -> List[CandleCluster]:
-    """Build candle data with cluster analysis from trades"""
-    if not trades:
-        return []
+class _ChartAccumulator:
+    """Incremental PnL chart buckets (see build_chart_data)"""
     
-    # Determine candle duration based on period
-    if period == "1d":
-        candle_hours = 2
-    elif period == "1w":
-        candle_hours = 12
-    elif period == "1m":
-        candle_hours = 24
-    else:
-        candle_hours = 6
+    BUCKET_HOURS = {"1d": 1, "1w": 6, "1m": 24}
     
-    # Group trades by candle
-    candles_data = {}
+    def __init__(self, period: str):
+        self.hours = self.BUCKET_HOURS.get(period, 12)
+        self.buckets: Dict[str, Dict[str, float]] = {}
     
-    for trade in trades:
-        ts = trade.get("ts")
-        if not ts:
-            continue
-        
-        if isinstance(ts, str):
-            ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-        
-        # Round to candle period
-        candle_ts = ts.replace(
-            minute=0, second=0, microsecond=0,
-            hour=(ts.hour // candle_hours) * candle_hours
-        )
-        candle_key = candle_ts.isoformat()
+    def add(self, trade: Dict):
+        key = _bucket_key(trade.get("ts"), self.hours)
+        if key is None:
+            return
+        bucket = self.buckets.setdefault(key, {"pnl": 0, "count": 0})
+        bucket["pnl"] += float(trade.get("pnl") or 0)
+        bucket["count"] += 1
+    
+    def result(self) -> List[PnLDataPoint]:
+        # Build data points with cumulative PnL
+        data_points = []
+        cumulative = 0.0
         
-        if candle_key not in candles_data:
-            candles_data[candle_key] = {
-                "trades": [],
-                "pnls": [],
-            }
+        for ts_key in sorted(self.buckets.keys()):
+            bucket = self.buckets[ts_key]
+            cumulative += bucket["pnl"]
+            
+            data_points.append(PnLDataPoint(
+                timestamp=ts_key,
+                pnl=bucket["pnl"],
+                cumulative_pnl=cumulative,
+                trade_count=bucket["count"]
+            ))
         
-        pnl = float(trade.get("pnl") or 0)
-        candles_data[candle_key]["trades"].append(trade)
-        candles_data[candle_key]["pnls"].append(pnl)
+        return data_points
+
+
+class _CandleAccumulator:
+    """
+    Incremental candle clusters (see build_candle_clusters).
     
-    # Build candle clusters
-    candles = []
-    cumulative_pnl = 0.0
+    Keeps running aggregates per candle instead of the raw trade rows, so
+    only the simplified trades returned to the client stay in memory.
+    """
+    
+    CANDLE_HOURS = {"1d": 2, "1w": 12, "1m": 24}
+    
+    def __init__(self, period: str):
+        self.hours = self.CANDLE_HOURS.get(period, 6)
+        self.candles: Dict[str, Dict[str, Any]] = {}
     
-    for candle_key in sorted(candles_data.keys()):
-        data = candles_data[candle_key]
-        trades_in_candle = data["trades"]
-        pnls = data["pnls"]
+    def add(self, t: Dict):
+        key = _bucket_key(t.get("ts"), self.hours)
+        if key is None:
+            return
         
-        if not pnls:
-            continue
+        c = self.candles.get(key)
+        if c is None:
+            c = self.candles[key] = {
+                "running": 0.0, "high": 0.0, "low": 0.0, "volume": 0.0,
+                "long_count": 0, "short_count": 0, "long_pnl": 0.0, "short_pnl": 0.0,
+                "win_count": 0, "win_sum": 0.0, "loss_count": 0, "loss_sum": 0.0,
+                "strategies": {}, "symbols": {}, "trades": [],
+            }
         
-        # Calculate OHLC of PnL (cumulative within candle)
-        running_pnl = 0
-        pnl_progression = [0]
-        for p in pnls:
-            running_pnl += p
-            pnl_progression.append(running_pnl)
+        pnl = float(t.get("pnl") or 0)
         
-        open_pnl = cumulative_pnl
-        close_pnl = cumulative_pnl + running_pnl
-        high_pnl = cumulative_pnl + max(pnl_progression)
-        low_pnl = cumulative_pnl + min(pnl_progression)
+        # OHLC of PnL (cumulative within candle, starting from 0)
+        c["running"] += pnl
+        c["high"] = max(c["high"], c["running"])
+        c["low"] = min(c["low"], c["running"])
         
         # Cluster analysis
-        long_trades = [t for t in trades_in_candle if t.get("side", "").lower() in ("buy", "long")]
-        short_trades = [t for t in trades_in_candle if t.get("side", "").lower() in ("sell", "short")]
-        
-        wins = [t for t in trades_in_candle if (t.get("pnl") or 0) > 0]
-        losses = [t for t in trades_in_candle if (t.get("pnl") or 0) < 0]
+        side = (t.get("side") or "").lower()
+        if side in ("buy", "long"):
+            c["long_count"] += 1
+            c["long_pnl"] += pnl
+        elif side in ("sell", "short"):
+            c["short_count"] += 1
+            c["short_pnl"] += pnl
         
-        long_pnl = sum(float(t.get("pnl") or 0) for t in long_trades)
-        short_pnl = sum(float(t.get("pnl") or 0) for t in short_trades)
-        
-        avg_win = sum(float(t.get("pnl") or 0) for t in wins) / len(wins) if wins else 0
-        avg_loss = sum(float(t.get("pnl") or 0) for t in losses) / len(losses) if losses else 0
+        if (t.get("pnl") or 0) > 0:
+            c["win_count"] += 1
+            c["win_sum"] += pnl
+        elif (t.get("pnl") or 0) < 0:
+            c["loss_count"] += 1
+            c["loss_sum"] += pnl
         
         # Strategy breakdown
-        strategies = {}
-        for t in trades_in_candle:
-            strat = t.get("strategy") or "unknown"
-            if strat not in strategies:
-                strategies[strat] = {"count": 0, "pnl": 0, "wins": 0}
-            strategies[strat]["count"] += 1
-            strategies[strat]["pnl"] += float(t.get("pnl") or 0)
-            if (t.get("pnl") or 0) > 0:
-                strategies[strat]["wins"] += 1
-        
-        for strat in strategies:
-            cnt = strategies[strat]["count"]
-            strategies[strat]["win_rate"] = (strategies[strat]["wins"] / cnt * 100) if cnt > 0 else 0
+        strat = c["strategies"].setdefault(t.get("strategy") or "unknown", {"count": 0, "pnl": 0, "wins": 0})
+        strat["count"] += 1
+        strat["pnl"] += pnl
+        if (t.get("pnl") or 0) > 0:
+            strat["wins"] += 1
         
         # Symbol breakdown
-        symbols = {}
-        for t in trades_in_candle:
-            sym = t.get("symbol") or "unknown"
-            if sym not in symbols:
-                symbols[sym] = {"count": 0, "pnl": 0}
-            symbols[sym]["count"] += 1
-            symbols[sym]["pnl"] += float(t.get("pnl") or 0)
-        
-        # Calculate volume (sum of position sizes)
-        volume = sum(
-            abs(float(t.get("entry_price") or 0)) * abs(float(t.get("exit_price") or 0) - float(t.get("entry_price") or 1))
-            for t in trades_in_candle
+        sym = c["symbols"].setdefault(t.get("symbol") or "unknown", {"count": 0, "pnl": 0})
+        sym["count"] += 1
+        sym["pnl"] += pnl
+        
+        # Volume (sum of position sizes)
+        c["volume"] += abs(float(t.get("entry_price") or 0)) * abs(
+            float(t.get("exit_price") or 0) - float(t.get("entry_price") or 1)
         )
         
         # Simplified trade data for response
-        simplified_trades = [
-            {
-                "id": t.get("id"),
-                "symbol": t.get("symbol"),
-                "side": t.get("side"),
-                "pnl": float(t.get("pnl") or 0),
-                "pnl_pct": float(t.get("pnl_pct") or 0),
-                "strategy": t.get("strategy"),
-                "exit_reason": t.get("exit_reason"),
-                "ts": t.get("ts").isoformat() if hasattr(t.get("ts"), 'isoformat') else str(t.get("ts"))
-            }
-            for t in trades_in_candle
-        ]
-        
-        candle = CandleCluster(
-            timestamp=candle_key,
-            open_pnl=open_pnl,
-            high_pnl=high_pnl,
-            low_pnl=low_pnl,
-            close_pnl=close_pnl,
-            volume=volume,
-            trade_count=len(trades_in_candle),
-            long_count=len(long_trades),
-            short_count=len(short_trades),
-            long_pnl=long_pnl,
-            short_pnl=short_pnl,
-            win_count=len(wins),
-            loss_count=len(losses),
-            avg_win=avg_win,
-            avg_loss=avg_loss,
-            strategies=strategies,
-            symbols=symbols,
-            trades=simplified_trades
-        )
+        c["trades"].append({
+            "id": t.get("id"),
+            "symbol": t.get("symbol"),
+            "side": t.get("side"),
+            "pnl": pnl,
+            "pnl_pct": float(t.get("pnl_pct") or 0),
+            "strategy": t.get("strategy"),
+            "exit_reason": t.get("exit_reason"),
+            "ts": t.get("ts").isoformat() if hasattr(t.get("ts"), 'isoformat') else str(t.get("ts"))
+        })
+    
+    def result(self) -> List[CandleCluster]:
+        candles = []
+        cumulative_pnl = 0.0
         
-        candles.append(candle)
-        cumulative_pnl = close_pnl
+        for candle_key in sorted(self.candles.keys()):
+            c = self.candles[candle_key]
+            
+            for strat in c["strategies"].values():
+                strat["win_rate"] = (strat["wins"] / strat["count"] * 100) if strat["count"] > 0 else 0
+            
+            close_pnl = cumulative_pnl + c["running"]
+            candles.append(CandleCluster(
+                timestamp=candle_key,
+                open_pnl=cumulative_pnl,
+                high_pnl=cumulative_pnl + c["high"],
+                low_pnl=cumulative_pnl + c["low"],
+                close_pnl=close_pnl,
+                volume=c["volume"],
+                trade_count=len(c["trades"]),
+                long_count=c["long_count"],
+                short_count=c["short_count"],
+                long_pnl=c["long_pnl"],
+                short_pnl=c["short_pnl"],
+                win_count=c["win_count"],
+                loss_count=c["loss_count"],
+                avg_win=c["win_sum"] / c["win_count"] if c["win_count"] else 0,
+                avg_loss=c["loss_sum"] / c["loss_count"] if c["loss_count"] else 0,
+                strategies=c["strategies"],
+                symbols=c["symbols"],
+                trades=c["trades"]
+            ))
+            cumulative_pnl = close_pnl
+        
+        return candles
+
+
+def build_chart_data(trades: Iterable[Dict], period: str) -> List[PnLDataPoint]:
+    """Build chart data points from trades"""
+    chart = _ChartAccumulator(period)
+    for trade in trades:
+        chart.add(trade)
+    return chart.result()
+
+
+def build_candle_clusters(trades: Iterable[Dict], period: str) -> List[CandleCluster]:
+    """Build candle data with cluster analysis from trades"""
+    candles = _CandleAccumulator(period)
+    for trade in trades:
+        candles.add(trade)
+    return candles.result()
+
+
+def aggregate_trades(trades: Iterable[Dict], period: str) -> Dict[str, Any]:
+    """
+    Single pass over a trade stream: period PnL, chart data and candle
+    clusters. Accepts iter_trades_for_period() directly.
+    """
+    chart = _ChartAccumulator(period)
+    candles = _CandleAccumulator(period)
+    total_pnl = 0.0
+    trade_count = 0
     
-    return candles
+    for trade in trades:
+        trade_count += 1
+        total_pnl += float(trade.get("pnl") or 0)
+        chart.add(trade)
+        candles.add(trade)
+    
+    return {
+        "trade_count": trade_count,
+        "total_pnl": total_pnl,
+        "chart_data": chart.result(),
+        "candles": candles.result(),
+    }
 
 
 async def _get_hl_portfolio(user_id: int, account_type: str) -> tuple:
@@ -582,9 +588,8 @@ async def _get_hl_portfolio(user_id: int, account_type: str) -> tuple:
                 FuturesPortfolio(total_equity=0, available=0, position_margin=0, unrealized_pnl=0, realized_pnl=0, position_count=0)
             )
         
-        from hl_adapter import HLAdapter
-        adapter = HLAdapter(private_key=private_key, testnet=is_testnet)
-        await adapter.initialize()
+        from core.hl_adapter_pool import get_hl_adapter
+        adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
         
         # Get balance
         balance_data = await adapter.get_balance()
@@ -670,11 +675,12 @@ async def get_portfolio_summary(
         spot = await get_spot_balance(user_id, account_type)
         futures = await get_futures_balance(user_id, account_type)
     
-    # Get trades for period
-    trades = get_trades_for_period(user_id, start_date, end_date, account_type, exchange)
+    # Stream trades for period: PnL, chart data and candle clusters in one pass
+    trades = iter_trades_for_period(user_id, start_date, end_date, account_type, exchange)
+    aggregated = await asyncio.to_thread(aggregate_trades, trades, period)
     
     # Calculate period PnL from DB trades
-    period_pnl = sum(float(t.get("pnl") or 0) for t in trades)
+    period_pnl = aggregated["total_pnl"]
     total_equity = futures.total_equity if futures else 0
     period_pnl_pct = (period_pnl / total_equity * 100) if total_equity > 0 else 0
     
@@ -689,12 +695,6 @@ async def get_portfolio_summary(
             position_count=futures.position_count
         )
     
-    # Build chart data
-    chart_data = build_chart_data(trades, period)
-    
-    # Build candle clusters for interactive chart
-    candles = build_candle_clusters(trades, period)
-    
     return PortfolioSummary(
         spot=spot,
         futures=futures,
@@ -702,8 +702,8 @@ async def get_portfolio_summary(
         pnl_period=period_pnl,
         pnl_period_pct=period_pnl_pct,
         period=period,
-        chart_data=chart_data,
-        candles=candles
+        chart_data=aggregated["chart_data"],
+        candles=aggregated["candles"]
     )
 
 
@@ -748,16 +748,14 @@ async def get_pnl_chart(
         raise HTTPException(status_code=401, detail="User not found")
     
     start_date, end_date = get_period_dates(period, custom_start, custom_end)
-    trades = get_trades_for_period(user_id, start_date, end_date, account_type, exchange)
+    trades = iter_trades_for_period(user_id, start_date, end_date, account_type, exchange)
+    aggregated = await asyncio.to_thread(aggregate_trades, trades, period)
     
     return {
         "period": period,
         "start": start_date.isoformat(),
         "end": end_date.isoformat(),
-        "trade_count": len(trades),
-        "total_pnl": sum(float(t.get("pnl") or 0) for t in trades),
-        "chart_data": build_chart_data(trades, period),
-        "candles": build_candle_clusters(trades, period)
+        **aggregated
     }
 
 
@@ -22,6 +22,15 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
+def _invalidate_push_cache(user_id: int):
+    """Drop APNs-cached preferences/devices so the next push sees the change"""
+    try:
+        from services.apns_service import invalidate_push_cache
+        invalidate_push_cache(user_id)
+    except ImportError:
+        pass
+
+
 # ============================================================================
 # Models
 # ============================================================================
@@ -113,6 +122,7 @@ async def register_device(request: DeviceTokenRequest, user: dict = Depends(get_
                 request.device_name
             ))
         
+        _invalidate_push_cache(user_id)
         return {"status": "success", "message": "Device registered"}
     except Exception as e:
         logger.error(f"Failed to register device: {e}")
@@ -129,6 +139,7 @@ async def unregister_device(device_token: str, user: dict = Depends(get_current_
         WHERE user_id = %s AND device_token = %s
     """, (user_id, device_token))
     
+    _invalidate_push_cache(user_id)
     return {"status": "success"}
 
 
@@ -214,6 +225,7 @@ async def update_notification_preferences(
         prefs.partial_tp, prefs.margin_warning
     ))
     
+    _invalidate_push_cache(user_id)
     return {"status": "success"}
 
 
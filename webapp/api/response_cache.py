@@ -0,0 +1,187 @@
+"""
+Shared HTTP response cache
+Routes opt in with @cache_response(ttl); ResponseCacheMiddleware (webapp/app.py)
+serves them from:
+- a per-process LRU (core.cache.LRUCache, O(1) eviction)
+- Redis, shared between uvicorn/gunicorn workers (optional)
+
+Concurrent misses for the same key share one handler call, and every cached
+response carries an ETag so polling clients get 304 Not Modified.
+
+Usage:
+    @router.get("/leaderboard")
+    @cache_response(ttl=120)
+    async def get_leaderboard(...): ...
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_CONFIG = {
+    "max_entries": 1000,        # Per-process LRU size
+    "use_redis": os.getenv("RESPONSE_CACHE_REDIS", "1") == "1",
+    "redis_prefix": "resp:",
+}
+
+# Headers that must not be replayed from a cached response
+_SKIP_HEADERS = {"content-length", "set-cookie", "etag", "cache-control", "x-cache", "date"}
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: int
+    vary: Tuple[str, ...] = ()      # Request headers that are part of the key
+
+    @property
+    def cache_control(self) -> str:
+        scope = "private" if self.vary else "public"
+        return f"{scope}, max-age={self.ttl}"
+
+
+def cache_response(ttl: int, vary: Tuple[str, ...] = ()) -> Callable:
+    """
+    Mark a GET route as cacheable for `ttl` seconds.
+
+    Responses are shared between all callers, so only use it on public data.
+    For routes behind auth pass vary=("authorization",): each token gets its
+    own entry and a request without a valid token never hits the cache.
+    """
+    policy = CachePolicy(ttl=ttl, vary=tuple(h.lower() for h in vary))
+
+    def decorator(func: Callable) -> Callable:
+        func.__response_cache__ = policy
+        return func
+    return decorator
+
+
+def get_cache_policy(endpoint: Callable) -> Optional[CachePolicy]:
+    return getattr(endpoint, "__response_cache__", None)
+
+
+def make_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak validators are fine for GET revalidation
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    created: float = field(default_factory=time.time)
+
+    @classmethod
+    def capture(cls, body: bytes, headers) -> "CachedResponse":
+        """Cache entry for a freshly rendered response body and its headers"""
+        kept = {k: v for k, v in headers.items() if k.lower() not in _SKIP_HEADERS}
+        return cls(body=body, etag=make_etag(body), headers=kept)
+
+    def to_redis(self) -> str:
+        return json.dumps({"b": self.body.decode(), "e": self.etag, "h": self.headers, "t": self.created})
+
+    @classmethod
+    def from_redis(cls, raw: str) -> "CachedResponse":
+        data = json.loads(raw)
+        return cls(body=data["b"].encode(), etag=data["e"], headers=data["h"], created=data["t"])
+
+
+def build_key(policy: CachePolicy, path: str, query: str, headers) -> str:
+    key = f"{path}?{query}"
+    if policy.vary:
+        varied = "\n".join(headers.get(h, "") for h in policy.vary)
+        key += "#" + hashlib.blake2b(varied.encode(), digest_size=12).hexdigest()
+    return key
+
+
+class ResponseCache:
+    """Two-level store with in-flight miss coalescing"""
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**RESPONSE_CACHE_CONFIG, **(config or {})}
+        self._local: LRUCache[CachedResponse] = LRUCache(max_size=self.config["max_entries"])
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0}
+
+    async def _redis(self):
+        if not self.config["use_redis"]:
+            return None
+        try:
+            from core.redis_client import get_redis
+            redis = await get_redis()
+        except Exception:
+            return None
+        return redis if redis._connected else None
+
+    async def get(self, key: str, ttl: int) -> Optional[CachedResponse]:
+        entry = self._local.get(key)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry
+
+        redis = await self._redis()
+        if redis is not None:
+            raw = await redis.get(self.config["redis_prefix"] + key)
+            if raw:
+                try:
+                    entry = CachedResponse.from_redis(raw)
+                except (ValueError, KeyError):
+                    entry = None
+                if entry is not None:
+                    remaining = ttl - (time.time() - entry.created)
+                    if remaining > 0:
+                        self._local.set(key, entry, ttl=remaining)
+                        self.stats["shared_hits"] += 1
+                        return entry
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, entry: CachedResponse, ttl: int):
+        self._local.set(key, entry, ttl=ttl)
+        redis = await self._redis()
+        if redis is not None:
+            try:
+                payload = entry.to_redis()
+            except UnicodeDecodeError:
+                return      # Non-UTF-8 body: keep it process-local
+            await redis.set(self.config["redis_prefix"] + key, payload, ttl=ttl)
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """In-flight computation for key, if another request is already producing it"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        return future
+
+    def lead(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def finish(self, key: str, entry: Optional[CachedResponse]):
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(entry)
+
+    def invalidate(self, prefix: str) -> int:
+        """Drop process-local entries for a path prefix (Redis copies expire by TTL)"""
+        return self._local.delete_pattern(prefix)
+
+
+response_cache = ResponseCache()
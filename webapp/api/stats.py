@@ -1,9 +1,15 @@
 """
 Statistics API endpoints
 """
-from fastapi import APIRouter, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterable, Iterator, Optional
 from datetime import datetime, timedelta
+import asyncio
+import csv
+import io
+import itertools
+import json
 import sys
 import os
 import logging
@@ -13,6 +19,7 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from .auth import get_current_user
+from .response_cache import cache_response
 
 router = APIRouter(tags=["statistics"])
 
@@ -338,6 +345,33 @@ async def get_dashboard_stats(
         return {"success": False, "error": str(e)}
 
 
+def _daily_pnl(uid: int, exchange: Optional[str], start_date: datetime) -> dict:
+    """Realized PnL per YYYY-MM-DD since start_date (blocking - run in a thread)"""
+    import db
+    
+    daily_pnl = {}
+    for t in db.iter_trade_logs(uid, exchange=exchange, since=start_date):
+        trade_time_str = t.get("time", "")
+        if not trade_time_str:
+            continue
+        
+        try:
+            if isinstance(trade_time_str, (int, float)):
+                trade_time = datetime.fromtimestamp(trade_time_str)
+            else:
+                trade_time = datetime.fromisoformat(str(trade_time_str).replace("Z", "+00:00"))
+        except (ValueError, TypeError, OSError) as e:
+            logger.debug(f"Failed to parse trade time '{trade_time_str}': {e}")
+            continue
+        
+        if trade_time < start_date:
+            continue
+        
+        date_key = trade_time.strftime("%Y-%m-%d")
+        daily_pnl[date_key] = daily_pnl.get(date_key, 0) + float(t.get("pnl", 0))
+    return daily_pnl
+
+
 @router.get("/pnl-history")
 async def get_pnl_history(
     user = Depends(get_current_user),
@@ -346,7 +380,6 @@ async def get_pnl_history(
 ):
     """Get PnL history for chart display"""
     try:
-        import db
         uid = user["user_id"]
         logger.info(f"[PnL-API] Request from user {uid}, exchange={exchange}, period={period}")
         
@@ -356,36 +389,12 @@ async def get_pnl_history(
         
         start_date = datetime.now() - timedelta(days=days)
         
-        # Get trades from trade_logs table
+        # Stream trades for the period from trade_logs (no row cap); the
+        # server-side cursor blocks, so it is read off the event loop
         # Fix #9: Apply exchange filter if provided and column exists
-        trades = db.get_trade_logs_list(uid, limit=500, exchange=exchange if exchange != "all" else None) or []
-        logger.info(f"[PnL-API] User {uid}: fetched {len(trades)} trades (exchange filter: {exchange})")
-        
-        # Group by date
-        daily_pnl = {}
-        for t in trades:
-            trade_time_str = t.get("time", "")
-            if not trade_time_str:
-                continue
-            
-            try:
-                if isinstance(trade_time_str, (int, float)):
-                    trade_time = datetime.fromtimestamp(trade_time_str)
-                else:
-                    trade_time = datetime.fromisoformat(str(trade_time_str).replace("Z", "+00:00"))
-            except (ValueError, TypeError, OSError) as e:
-                logger.debug(f"Failed to parse trade time '{trade_time_str}': {e}")
-                continue
-            
-            if trade_time < start_date:
-                continue
-            
-            date_key = trade_time.strftime("%Y-%m-%d")
-            pnl = float(t.get("pnl", 0))
-            
-            if date_key not in daily_pnl:
-                daily_pnl[date_key] = 0
-            daily_pnl[date_key] += pnl
+        daily_pnl = await asyncio.to_thread(
+            _daily_pnl, uid, exchange if exchange != "all" else None, start_date
+        )
         
         # Sort by date and create arrays
         sorted_dates = sorted(daily_pnl.keys())
@@ -419,6 +428,121 @@ async def get_pnl_history(
         return {"labels": [], "values": [], "error": str(e)}
 
 
+TRADE_EXPORT_FIELDS = [
+    "id", "time", "symbol", "side", "entry_price", "exit_price", "pnl", "pnl_percent",
+    "strategy", "exit_reason", "account_type", "exchange", "signal_id",
+]
+
+
+def _trade_filters(strategy: str, exchange: str, account_type: Optional[str], period: str) -> dict:
+    return {
+        "strategy": strategy if strategy != "all" else None,
+        "exchange": exchange if exchange != "all" else None,
+        "account_type": account_type,
+        "period": period,
+    }
+
+
+def _ndjson_lines(trades: Iterable[dict]) -> Iterator[str]:
+    for t in trades:
+        yield json.dumps(_serialize_trade(t), default=str) + "\n"
+
+
+def _csv_lines(trades: Iterable[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=TRADE_EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for t in trades:
+        writer.writerow(_serialize_trade(t))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+async def _stream_in_thread(lines: Iterator[str], rows: Iterator[dict],
+                            batch_size: int = 200) -> AsyncIterator[str]:
+    """
+    Serve blocking export lines from a worker thread, batch_size at a time.
+    
+    When the response ends - including a client disconnect - the row
+    iterator is closed, which releases its server-side cursor and returns
+    the pooled connection.
+    """
+    def take() -> str:
+        return "".join(itertools.islice(lines, batch_size))
+    
+    step = None
+    try:
+        while True:
+            step = asyncio.ensure_future(asyncio.to_thread(take))
+            chunk = await asyncio.shield(step)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if step is not None and not step.done():
+            # A generator cannot be closed while a thread is still inside it
+            await asyncio.wait([step])
+        await asyncio.to_thread(lambda: (lines.close(), rows.close()))
+
+
+@router.get("/trades")
+async def get_trade_history(
+    user = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    strategy: str = Query("all"),
+    exchange: str = Query("all"),
+    account_type: Optional[str] = None,
+    period: str = Query("all")
+):
+    """
+    Keyset-paginated trade history, newest first.
+    Pass `next_cursor` back as `cursor` for the next page (null = last page).
+    """
+    import db
+    try:
+        trades, next_cursor = await asyncio.to_thread(
+            db.get_trade_logs_page, user["user_id"], limit=limit, cursor=cursor,
+            **_trade_filters(strategy, exchange, account_type, period)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "success": True,
+        "trades": [_serialize_trade(t) for t in trades],
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/trades/export")
+async def export_trade_history(
+    user = Depends(get_current_user),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    strategy: str = Query("all"),
+    exchange: str = Query("all"),
+    account_type: Optional[str] = None,
+    period: str = Query("all")
+):
+    """Stream full trade history as NDJSON or CSV (server-side cursor, constant memory)"""
+    import db
+    trades = db.iter_trade_logs(user["user_id"], **_trade_filters(strategy, exchange, account_type, period))
+    
+    if format == "csv":
+        body, media_type = _csv_lines(trades), "text/csv"
+    else:
+        body, media_type = _ndjson_lines(trades), "application/x-ndjson"
+    
+    return StreamingResponse(
+        _stream_in_thread(body, trades),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trades.{format}"'}
+    )
+
+
 @router.get("/strategy-report")
 async def get_strategy_report(
     user = Depends(get_current_user),
@@ -656,6 +780,7 @@ async def get_positions_summary(
 
 
 @router.get("/leaderboard")
+@cache_response(ttl=120)
 async def get_strategy_leaderboard(
     period: str = Query("30d"),   # 7d, 30d, 90d, all
     exchange: str = Query("all")  # all, bybit, hyperliquid
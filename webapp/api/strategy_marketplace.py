@@ -15,6 +15,7 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 from webapp.api.auth import get_current_user
+from webapp.api.response_cache import cache_response
 
 
 # ============================================================================
@@ -418,6 +419,7 @@ async def get_top_strategies(
 
 
 @router.get("/trending")
+@cache_response(ttl=60, vary=("authorization",))
 async def get_trending_strategies(
     limit: int = Query(10, ge=1, le=50),
     user: dict = Depends(get_current_user)
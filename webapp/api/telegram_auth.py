@@ -249,6 +249,7 @@ async def telegram_login(data: TelegramAuthData, request: Request):
                 logger.info(f"Created new user from Telegram login: {telegram_id} (@{data.username})")
     finally:
         pool.putconn(pg_conn)
+    db.invalidate_user_cache(telegram_id)
     
     # Generate JWT token
     is_admin = telegram_id == 511692487  # ADMIN_ID from coin_params
@@ -351,6 +352,7 @@ async def link_telegram_to_email(data: TelegramLinkRequest, request: Request):
             pg_conn.commit()
     finally:
         pool.putconn(pg_conn)
+    db.invalidate_user_cache(current_user_id)
     
     logger.info(f"Linked Telegram @{data.telegram_data.username} to user {current_user_id}")
     
@@ -538,6 +540,7 @@ async def link_email_to_telegram(data: LinkEmailRequest, request: Request):
                 raise HTTPException(status_code=404, detail="User not found")
     finally:
         pool.putconn(pg_conn)
+    db.invalidate_user_cache(current_user_id)
     
     logger.info(f"Linked email {data.email} to Telegram user {current_user_id}")
     
@@ -691,6 +694,7 @@ async def complete_telegram_link(
                 updated_at = NOW()
             WHERE user_id = %s
         """, (telegram_id, telegram_username, telegram_first_name, telegram_last_name, user_id))
+        db.invalidate_user_cache(user_id)
         
         # Add to mapping table
         execute("""
@@ -7,6 +7,7 @@ import time
 import json
 import hmac
 import asyncio
+import functools
 import hashlib
 import logging
 import aiohttp
@@ -18,13 +19,17 @@ logger = logging.getLogger(__name__)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 import db
-from hl_adapter import HLAdapter
+from core.hl_adapter_pool import get_hl_adapter
 
 # Bug #3 Fix: Use centralized account utilities
 from core.account_utils import (
     normalize_account_type as _normalize_both_account_type,
     get_hl_credentials_for_account as _get_hl_credentials_for_account
 )
+from core.bulk_close import close_accounts, close_bybit_account, close_hl_account
+from core.symbol_universe import symbol_universe
+from core.db_executor import adb
+from core.multitenancy_queries import fetch_active_positions
 
 # CROSS-PLATFORM: Import sync service for activity logging
 try:
@@ -262,7 +267,7 @@ async def bybit_request(
     account_type: str = "demo"
 ) -> dict:
     """Make authenticated Bybit API request"""
-    creds = db.get_all_user_credentials(user_id)
+    creds = await adb.get_all_user_credentials(user_id)
     
     if account_type == "real":
         api_key = creds.get("real_api_key")
@@ -375,11 +380,7 @@ async def get_balance(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             result = await adapter.get_balance()
             
             if result.get("success"):
@@ -399,7 +400,7 @@ async def get_balance(
     
     else:
         # Bybit balance
-        creds = db.get_all_user_credentials(user_id)
+        creds = await adb.get_all_user_credentials(user_id)
         
         # Use account_type from query param
         if account_type == "real":
@@ -481,11 +482,7 @@ async def get_spot_balance(
     
     adapter = None
     try:
-        adapter = HLAdapter(
-            private_key=private_key,
-            testnet=is_testnet
-        )
-        await adapter.initialize()  # Auto-discover main wallet
+        adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
         result = await adapter.get_spot_balance()
         
         if result.get("success"):
@@ -546,11 +543,7 @@ async def get_positions(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             result = await adapter.fetch_positions()
             
             positions = result.get("result", {}).get("list", [])
@@ -596,7 +589,7 @@ async def get_positions(
             # Filter by account_type and exchange for accurate matching
             db_positions = {}
             try:
-                active_pos = db.get_active_positions(
+                active_pos = await fetch_active_positions(
                     user_id, 
                     account_type=account_type, 
                     exchange=exchange,
@@ -680,11 +673,7 @@ async def get_orders(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             result = await adapter.fetch_open_orders()
             
             if result.get("success"):
@@ -803,11 +792,7 @@ async def close_position(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             # Get position info before closing
             pos_result = await adapter.fetch_positions()
             positions = pos_result.get("result", {}).get("list", [])
@@ -1018,123 +1003,23 @@ async def close_all_positions(
         if account_type and req.account_type == "demo":
             req.account_type = account_type
     
-    if req.exchange == "hyperliquid":
-        hl_creds = db.get_hl_credentials(user_id)
-        account_type = _normalize_both_account_type(req.account_type, "hyperliquid") or "testnet"
-        private_key, is_testnet, wallet_address = _get_hl_credentials_for_account(hl_creds, account_type)
-        
-        if not private_key:
-            raise HTTPException(status_code=400, detail=f"HL {account_type} not configured")
-        
-        adapter = None
-        try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
-            
-            hl_account_type = "testnet" if is_testnet else "mainnet"
-            
-            # Get all positions - create snapshot
-            positions_result = await adapter.fetch_positions()
-            positions = positions_result.get("result", {}).get("list", [])
-            
-            # Create snapshot (защита от race condition)
-            positions_snapshot = []
-            for pos in positions:
-                size = float(pos.get("size", 0))
-                if size > 0:
-                    positions_snapshot.append({
-                        "symbol": pos.get("symbol"),
-                        "side": pos.get("side", "Buy"),
-                        "size": size,
-                        "entry_price": float(pos.get("avgPrice", 0)),
-                        "mark_price": float(pos.get("markPrice", 0))
-                    })
+    adapter = None
+    try:
+        if req.exchange == "hyperliquid":
+            hl_creds = db.get_hl_credentials(user_id)
+            account_type = _normalize_both_account_type(req.account_type, "hyperliquid") or "testnet"
+            private_key, is_testnet, wallet_address = _get_hl_credentials_for_account(hl_creds, account_type)
             
-            if not positions_snapshot:
-                return {"success": True, "closed": 0, "total": 0, "total_pnl": 0}
+            if not private_key:
+                raise HTTPException(status_code=400, detail=f"HL {account_type} not configured")
             
-            closed = 0
-            total_pnl = 0
-            errors = []
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             
-            for snap in positions_snapshot:
-                symbol = snap["symbol"]
-                entry_price = snap["entry_price"]
-                size = snap["size"]
-                side = snap["side"]
-                
-                try:
-                    result = await adapter.close_position(symbol, size)
-                    
-                    if result.get("retCode") == 0 or result.get("success"):
-                        closed += 1
-                        
-                        # Try to get actual fill price from result
-                        exit_price = snap["mark_price"]  # Fallback
-                        if result.get("data", {}).get("avgPrice"):
-                            exit_price = float(result["data"]["avgPrice"])
-                        
-                        pnl_abs = (exit_price - entry_price) * size * (1 if side == "Buy" else -1)
-                        pnl_pct = ((exit_price / entry_price) - 1) * 100 * (1 if side == "Buy" else -1) if entry_price > 0 else 0
-                        total_pnl += pnl_abs
-                        
-                        try:
-                            db.add_trade_log(
-                                user_id=user_id,
-                                signal_id=None,
-                                symbol=symbol,
-                                side=side,
-                                entry_price=entry_price,
-                                exit_price=exit_price,
-                                exit_reason="webapp_close_all",
-                                pnl=pnl_abs,
-                                pnl_pct=pnl_pct,
-                                signal_source="webapp",
-                                strategy="manual",
-                                account_type=hl_account_type,
-                                exit_order_type="Market",
-                                exit_ts=int(time.time() * 1000),
-                                exchange="hyperliquid",
-                            )
-                        except Exception:
-                            pass
-                        
-                        try:
-                            db.remove_active_position(user_id, symbol, account_type=hl_account_type, exchange="hyperliquid")
-                        except Exception:
-                            pass
-                except Exception as e:
-                    error_msg = str(e)
-                    if "position" not in error_msg.lower():
-                        errors.append(f"{symbol}: {error_msg}")
-            
-            logger.info(f"[{user_id}] WebApp HL: Closed {closed}/{len(positions_snapshot)} positions, PnL: {total_pnl:.2f}")
-            return {
-                "success": closed > 0 or len(positions_snapshot) == 0,
-                "closed": closed,
-                "total": len(positions_snapshot),
-                "total_pnl": round(total_pnl, 2),
-                "errors": errors if errors else None
-            }
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        finally:
-            if adapter:
-                await adapter.close()
-    
-    else:
-        # Bybit close all positions
-        import uuid
-        try:
-            # Get all open positions - create snapshot
-            pos_data = await bybit_request(
-                user_id, "GET", "/v5/position/list",
-                params={"category": "linear", "settleCoin": "USDT"},
-                account_type=req.account_type
-            )
+            log_account_type = "testnet" if is_testnet else "mainnet"
+            db_positions = {}
+            closer = functools.partial(close_hl_account, adapter, log_account_type, limiter_key=str(user_id))
+        else:
+            log_account_type = req.account_type
             
             # Get DB positions for strategy info
             db_positions = {}
@@ -1145,132 +1030,78 @@ async def close_all_positions(
             except Exception:
                 pass
             
-            positions = pos_data.get("result", {}).get("list", [])
+            async def bybit_call(method, path, params=None, body=None):
+                return await bybit_request(user_id, method, path, params=params, body=body, account_type=req.account_type)
             
-            # Create snapshot of positions to close (защита от race condition)
-            positions_snapshot = []
-            for pos in positions:
-                size = float(pos.get("size", 0))
-                if size > 0:
-                    positions_snapshot.append({
-                        "symbol": pos.get("symbol"),
-                        "side": pos.get("side", "Buy"),
-                        "size": size,
-                        "entry_price": float(pos.get("avgPrice", 0)),
-                        "mark_price": float(pos.get("markPrice", 0))
-                    })
+            closer = functools.partial(close_bybit_account, bybit_call, req.account_type, limiter_key=str(user_id))
+        
+        # Positions are snapshotted once and every order goes out concurrently
+        report = await close_accounts({log_account_type: closer})
+        if report.errors:
+            raise HTTPException(status_code=500, detail=report.errors[log_account_type])
+        
+        errors = []
+        exit_ts = int(time.time() * 1000)
+        for result in report.results:
+            if not result.success:
+                error_msg = result.error or ""
+                # Если позиция уже закрыта - не считаем ошибкой
+                if "position" in error_msg.lower() or "reduce" in error_msg.lower():
+                    logger.info(f"[{user_id}] Position {result.symbol} already closed or changed")
+                else:
+                    errors.append(f"{result.symbol}: {error_msg}")
+                continue
             
-            if not positions_snapshot:
-                return {"success": True, "closed": 0, "total": 0, "total_pnl": 0}
+            db_pos = db_positions.get(result.symbol, {})
             
-            closed = 0
-            errors = []
-            total_pnl = 0
+            # Log trade
+            try:
+                db.add_trade_log(
+                    user_id=user_id,
+                    signal_id=db_pos.get("signal_id"),
+                    symbol=result.symbol,
+                    side=result.side,
+                    entry_price=result.entry_price,
+                    exit_price=result.exit_price,
+                    exit_reason="webapp_close_all",
+                    pnl=result.pnl,
+                    pnl_pct=result.pnl_pct,
+                    signal_source="webapp",
+                    strategy=db_pos.get("strategy", "manual"),
+                    account_type=log_account_type,
+                    exit_order_type="Market",
+                    exit_ts=exit_ts,
+                    exchange=req.exchange,
+                )
+            except Exception:
+                pass
             
-            for snap in positions_snapshot:
-                symbol = snap["symbol"]
-                side = snap["side"]
-                snapshot_size = snap["size"]
-                entry_price = snap["entry_price"]
-                close_side = "Sell" if side == "Buy" else "Buy"
-                
-                try:
-                    order_link_id = f"closeall_{uuid.uuid4().hex[:10]}"
-                    result = await bybit_request(
-                        user_id, "POST", "/v5/order/create",
-                        body={
-                            "category": "linear",
-                            "symbol": symbol,
-                            "side": close_side,
-                            "orderType": "Market",
-                            "qty": str(snapshot_size),
-                            "reduceOnly": True,  # Критично! Не откроет обратную позицию
-                            "orderLinkId": order_link_id,
-                            "timeInForce": "IOC"
-                        },
-                        account_type=req.account_type
-                    )
-                    
-                    # Get actual fill price
-                    order_id = result.get("result", {}).get("orderId")
-                    exit_price = snap["mark_price"]  # Fallback
-                    actual_size = snapshot_size
-                    
-                    if order_id:
-                        try:
-                            await asyncio.sleep(0.2)
-                            order_info = await bybit_request(
-                                user_id, "GET", "/v5/order/history",
-                                params={"category": "linear", "orderId": order_id},
-                                account_type=req.account_type
-                            )
-                            order_list = order_info.get("result", {}).get("list", [])
-                            if order_list:
-                                filled_order = order_list[0]
-                                avg_fill_price = float(filled_order.get("avgPrice", 0))
-                                filled_qty = float(filled_order.get("cumExecQty", 0))
-                                if avg_fill_price > 0:
-                                    exit_price = avg_fill_price
-                                if filled_qty > 0:
-                                    actual_size = filled_qty
-                        except Exception:
-                            pass
-                    
-                    closed += 1
-                    
-                    # Calculate PnL with actual fill price
-                    pnl_abs = (exit_price - entry_price) * actual_size * (1 if side == "Buy" else -1)
-                    pnl_pct = ((exit_price / entry_price) - 1) * 100 * (1 if side == "Buy" else -1) if entry_price > 0 else 0
-                    total_pnl += pnl_abs
-                    
-                    db_pos = db_positions.get(symbol, {})
-                    
-                    # Log trade
-                    try:
-                        db.add_trade_log(
-                            user_id=user_id,
-                            signal_id=db_pos.get("signal_id"),
-                            symbol=symbol,
-                            side=side,
-                            entry_price=entry_price,
-                            exit_price=exit_price,
-                            exit_reason="webapp_close_all",
-                            pnl=pnl_abs,
-                            pnl_pct=pnl_pct,
-                            signal_source="webapp",
-                            strategy=db_pos.get("strategy", "manual"),
-                            account_type=req.account_type,
-                            exit_order_type="Market",
-                            exit_ts=int(time.time() * 1000),
-                            exchange="bybit",
-                        )
-                    except Exception:
-                        pass
-                    
-                    # Remove from DB
-                    try:
-                        db.remove_active_position(user_id, symbol, account_type=req.account_type, exchange="bybit")
-                    except Exception:
-                        pass
-                        
-                except Exception as e:
-                    error_msg = str(e)
-                    # Если позиция уже закрыта - не считаем ошибкой
-                    if "position not found" in error_msg.lower() or "reduce only" in error_msg.lower():
-                        logger.info(f"[{user_id}] Position {symbol} already closed or changed")
-                    else:
-                        errors.append(f"{symbol}: {error_msg}")
-            
-            logger.info(f"[{user_id}] WebApp: Closed {closed}/{len(positions_snapshot)} positions, PnL: {total_pnl:.2f}")
-            return {
-                "success": closed > 0 or len(positions_snapshot) == 0,
-                "closed": closed,
-                "total": len(positions_snapshot),
-                "total_pnl": round(total_pnl, 2),
-                "errors": errors if errors else None
-            }
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+            # Remove from DB
+            try:
+                db.remove_active_position(user_id, result.symbol, account_type=log_account_type, exchange=req.exchange)
+            except Exception:
+                pass
+        
+        logger.info(
+            f"[{user_id}] WebApp {req.exchange}: Closed {report.closed}/{report.total} positions "
+            f"in {report.elapsed_ms:.0f}ms, PnL: {report.total_pnl:.2f}"
+        )
+        return {
+            "success": report.closed > 0 or report.total == 0,
+            "closed": report.closed,
+            "total": report.total,
+            "total_pnl": round(report.total_pnl, 2),
+            "elapsed_ms": round(report.elapsed_ms, 1),
+            "results": [r.to_dict() for r in report.results],
+            "errors": errors if errors else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if adapter:
+            await adapter.close()
 
 
 @router.get("/execution-history")
@@ -1297,11 +1128,7 @@ async def get_execution_history(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             
             # Fetch trade history using main_wallet_address for Unified Account support
             result = await adapter.fetch_trade_history(limit=limit)
@@ -1837,11 +1664,7 @@ async def _place_order_hyperliquid(user_id: int, req: PlaceOrderRequest, side: s
     
     adapter = None
     try:
-        adapter = HLAdapter(
-            private_key=private_key,
-            testnet=is_testnet
-        )
-        await adapter.initialize()  # Auto-discover main wallet
+        adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
         
         # Normalize symbol for HL (remove USDT/USDC suffix)
         hl_symbol = req.symbol.replace("USDT", "").replace("USDC", "")
@@ -1929,11 +1752,7 @@ async def set_leverage(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             await adapter.set_leverage(req.symbol.replace("USDT", "").replace("USDC", ""), req.leverage)
             return {"success": True, "leverage": req.leverage}
         except Exception as e:
@@ -1977,11 +1796,7 @@ async def cancel_order(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             result = await adapter.cancel_order(req.symbol, req.order_id)
             return {"success": result.get("retCode") == 0}
         except Exception as e:
@@ -2014,8 +1829,8 @@ async def get_account_info(
     """Get account info (configured exchanges, modes, etc.)"""
     user_id = user["user_id"]
     
-    creds = db.get_all_user_credentials(user_id)
-    hl_creds = db.get_hl_credentials(user_id)
+    creds = await adb.get_all_user_credentials(user_id)
+    hl_creds = await adb.get_hl_credentials(user_id)
     
     return {
         "bybit": {
@@ -2032,7 +1847,7 @@ async def get_account_info(
             "testnet": hl_creds.get("hl_testnet", True),
             "wallet_address": hl_creds.get("hl_wallet_address", "")[:10] + "..." if hl_creds.get("hl_wallet_address") else None
         },
-        "active_exchange": db.get_exchange_type(user_id)
+        "active_exchange": await adb.get_exchange_type(user_id)
     }
 
 
@@ -2072,7 +1887,7 @@ async def modify_position_tpsl(
         req.position_idx = 1 if normalized_side == "Buy" else 2
     
     if req.exchange == "hyperliquid":
-        hl_creds = db.get_hl_credentials(user_id)
+        hl_creds = await adb.get_hl_credentials(user_id)
         hl_account: str = getattr(req, 'account_type', 'testnet') or "testnet"
         private_key, is_testnet, wallet_address = _get_hl_credentials_for_account(hl_creds, hl_account)
         
@@ -2081,11 +1896,7 @@ async def modify_position_tpsl(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             
             # Get position to determine side
             pos_result = await adapter.fetch_positions()
@@ -2191,11 +2002,7 @@ async def cancel_order_by_id(
         
         adapter = None
         try:
-            adapter = HLAdapter(
-                private_key=private_key,
-                testnet=is_testnet
-            )
-            await adapter.initialize()  # Auto-discover main wallet
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             result = await adapter.cancel_order(req.symbol, req.order_id)
             
             if result.get("success"):
@@ -2256,13 +2063,12 @@ async def cancel_all_orders(
     if exchange == "hyperliquid":
         # HyperLiquid cancel all via HLAdapter
         try:
-            from hl_adapter import HLAdapter
             hl_creds = db.get_all_user_credentials(user_id) or {}
             private_key, is_testnet, wallet_address = _get_hl_credentials_for_account(hl_creds, account_type)
             if not private_key:
                 return {"success": False, "error": "HyperLiquid API key not configured"}
             
-            adapter = HLAdapter(private_key=private_key, testnet=is_testnet)
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             try:
                 await adapter.initialize()
                 result = await adapter.cancel_all_orders(symbol=symbol)
@@ -2448,7 +2254,7 @@ async def _set_leverage_for_symbol(user_id: int, symbol: str, leverage: int, exc
             is_testnet = hl_creds.get("hl_testnet", False)
         
         if private_key:
-            adapter = HLAdapter(private_key=private_key, testnet=is_testnet)
+            adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
             try:
                 await adapter.initialize()
                 await adapter.set_leverage(symbol.replace("USDT", "").replace("USDC", ""), leverage)
@@ -2501,7 +2307,7 @@ async def _place_single_order_hl(user_id: int, symbol: str, side: str, order_typ
         return {"success": False, "error": f"HL {account_type} not configured"}
     
     side_formatted = "Buy" if side.lower() in ["buy", "long"] else "Sell"
-    adapter = HLAdapter(private_key=private_key, testnet=is_testnet)
+    adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
     try:
         await adapter.initialize()
         result = await adapter.place_order(symbol=symbol, side=side_formatted, qty=size, order_type=order_type, price=price)
@@ -2602,37 +2408,27 @@ async def get_symbol_info(symbol: str):
     """Get symbol trading info (tick size, lot size, etc.)"""
     
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.bybit.com/v5/market/instruments-info?category=linear&symbol={symbol}"
-            async with session.get(url) as resp:
-                data = await resp.json()
-                
-                if data.get("retCode") == 0:
-                    instruments = data.get("result", {}).get("list", [])
-                    if instruments:
-                        inst = instruments[0]
-                        lot_size = inst.get("lotSizeFilter", {})
-                        price_filter = inst.get("priceFilter", {})
-                        leverage_filter = inst.get("leverageFilter", {})
-                        
-                        return {
-                            "symbol": symbol,
-                            "base_coin": inst.get("baseCoin"),
-                            "quote_coin": inst.get("quoteCoin"),
-                            "min_qty": float(lot_size.get("minOrderQty", 0)),
-                            "max_qty": float(lot_size.get("maxOrderQty", 0)),
-                            "qty_step": float(lot_size.get("qtyStep", 0)),
-                            "min_price": float(price_filter.get("minPrice", 0)),
-                            "max_price": float(price_filter.get("maxPrice", 0)),
-                            "tick_size": float(price_filter.get("tickSize", 0)),
-                            "min_leverage": float(leverage_filter.get("minLeverage", 1)),
-                            "max_leverage": float(leverage_filter.get("maxLeverage", 100)),
-                            "funding_interval": inst.get("fundingInterval")
-                        }
+        info = await symbol_universe.get("bybit", symbol)
     except Exception as e:
         return {"error": str(e)}
     
-    return {"error": "Symbol not found"}
+    if info is None:
+        return {"error": "Symbol not found"}
+    
+    return {
+        "symbol": symbol,
+        "base_coin": info.base,
+        "quote_coin": info.quote,
+        "min_qty": info.min_qty,
+        "max_qty": info.max_qty,
+        "qty_step": info.qty_step,
+        "min_price": info.min_price,
+        "max_price": info.max_price,
+        "tick_size": info.tick_size,
+        "min_leverage": info.min_leverage,
+        "max_leverage": info.max_leverage,
+        "funding_interval": info.funding_interval
+    }
 
 
 async def _fetch_price(symbol: str) -> dict:
@@ -2738,63 +2534,33 @@ async def get_recent_trades(symbol: str, limit: int = Query(50, ge=10, le=500)):
 @router.get("/symbols")
 async def search_symbols(
     query: Optional[str] = Query(None, description="Search query"),
-    limit: int = Query(50, ge=1, le=200)
+    limit: int = Query(50, ge=1, le=200),
+    exchange: str = Query("bybit", pattern="^(bybit|hyperliquid)$")
 ):
-    """Search and list available trading symbols with live prices"""
+    """Search and list available trading symbols with live prices (served from the symbol universe)"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Get tickers with prices
-            url = "https://api.bybit.com/v5/market/tickers?category=linear"
-            async with session.get(url) as resp:
-                data = await resp.json()
-                
-                if data.get("retCode") != 0:
-                    return {"symbols": [], "error": data.get("retMsg")}
-                
-                tickers = data.get("result", {}).get("list", [])
-                
-                # Filter and format
-                symbols = []
-                for t in tickers:
-                    symbol = t.get("symbol", "")
-                    
-                    # Skip non-USDT pairs and illiquid
-                    if not symbol.endswith("USDT"):
-                        continue
-                    
-                    # Filter by query if provided
-                    if query:
-                        base = symbol.replace("USDT", "").lower()
-                        if query.lower() not in base and query.lower() not in symbol.lower():
-                            continue
-                    
-                    price = float(t.get("lastPrice", 0))
-                    change = float(t.get("price24hPcnt", 0)) * 100
-                    volume = float(t.get("turnover24h", 0))
-                    
-                    symbols.append({
-                        "symbol": symbol,
-                        "base": symbol.replace("USDT", ""),
-                        "price": price,
-                        "change_24h": round(change, 2),
-                        "high_24h": float(t.get("highPrice24h", 0)),
-                        "low_24h": float(t.get("lowPrice24h", 0)),
-                        "volume_24h": volume,
-                        "volume_formatted": _format_volume(volume),
-                        "funding_rate": float(t.get("fundingRate", 0)) * 100 if t.get("fundingRate") else None,
-                        "open_interest": float(t.get("openInterest", 0)) if t.get("openInterest") else None
-                    })
-                
-                # Sort by volume (most liquid first)
-                symbols.sort(key=lambda x: x["volume_24h"], reverse=True)
-                
-                return {
-                    "symbols": symbols[:limit],
-                    "total": len(symbols)
-                }
-                
+        matches = await symbol_universe.search(exchange, query, limit=None)
     except Exception as e:
         return {"symbols": [], "error": str(e)}
+    
+    return {
+        "symbols": [
+            {
+                "symbol": info.symbol,
+                "base": info.base,
+                "price": info.price,
+                "change_24h": info.change_24h,
+                "high_24h": info.high_24h,
+                "low_24h": info.low_24h,
+                "volume_24h": info.volume_24h,
+                "volume_formatted": _format_volume(info.volume_24h),
+                "funding_rate": info.funding_rate,
+                "open_interest": info.open_interest
+            }
+            for info in matches[:limit]
+        ],
+        "total": len(matches)
+    }
 
 
 def _format_volume(volume: float) -> str:
@@ -2812,40 +2578,25 @@ def _format_volume(volume: float) -> str:
 async def get_funding_rates(limit: int = Query(30, ge=1, le=100)):
     """Get funding rates for top symbols"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = "https://api.bybit.com/v5/market/tickers?category=linear"
-            async with session.get(url) as resp:
-                data = await resp.json()
-                
-                if data.get("retCode") != 0:
-                    return {"rates": [], "error": data.get("retMsg")}
-                
-                tickers = data.get("result", {}).get("list", [])
-                
-                rates = []
-                for t in tickers:
-                    symbol = t.get("symbol", "")
-                    if not symbol.endswith("USDT"):
-                        continue
-                    
-                    funding = t.get("fundingRate")
-                    if funding is None:
-                        continue
-                    
-                    rates.append({
-                        "symbol": symbol,
-                        "funding_rate": float(funding) * 100,
-                        "price": float(t.get("lastPrice", 0)),
-                        "open_interest": float(t.get("openInterest", 0)) if t.get("openInterest") else 0
-                    })
-                
-                # Sort by absolute funding rate (highest first)
-                rates.sort(key=lambda x: abs(x["funding_rate"]), reverse=True)
-                
-                return {"rates": rates[:limit]}
-                
+        tickers = await symbol_universe.search("bybit", limit=None)
     except Exception as e:
         return {"rates": [], "error": str(e)}
+    
+    rates = [
+        {
+            "symbol": info.symbol,
+            "funding_rate": info.funding_rate,
+            "price": info.price,
+            "open_interest": info.open_interest or 0
+        }
+        for info in tickers
+        if info.funding_rate is not None
+    ]
+    
+    # Sort by absolute funding rate (highest first)
+    rates.sort(key=lambda x: abs(x["funding_rate"]), reverse=True)
+    
+    return {"rates": rates[:limit]}
 
 
 @router.get("/price/{symbol}")
@@ -13,6 +13,7 @@ import db
 
 # Bug #3 Fix: Use centralized account utilities instead of local definition
 from core.account_utils import normalize_account_type as _normalize_both_account_type
+from core.db_executor import adb
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -74,11 +75,11 @@ async def get_settings(
 ):
     """Get user settings for specified exchange."""
     user_id = user["user_id"]
-    creds = db.get_all_user_credentials(user_id)
-    hl_creds = db.get_hl_credentials(user_id)
+    creds = await adb.get_all_user_credentials(user_id)
+    hl_creds = await adb.get_hl_credentials(user_id)
     
     # Common global settings for all responses
-    exchange_type = db.get_exchange_type(user_id) or "bybit"
+    exchange_type = await adb.get_exchange_type(user_id) or "bybit"
     trading_mode = creds.get("trading_mode", "demo")
     hl_testnet = hl_creds.get("hl_testnet", False)
     user_lang = creds.get("lang", "en")
@@ -342,10 +343,9 @@ async def switch_exchange(
                 is_testnet = hl_creds.get("hl_testnet", False)
             
             if private_key:
-                from hl_adapter import HLAdapter
-                adapter = HLAdapter(private_key=private_key, testnet=is_testnet)
+                from core.hl_adapter_pool import get_hl_adapter
+                adapter = await get_hl_adapter(private_key, testnet=is_testnet, user_id=user_id)
                 try:
-                    await adapter.initialize()
                     balance_data = await adapter.get_balance(use_cache=False)
                     if balance_data.get("success"):
                         connection_status["connected"] = True
@@ -1023,13 +1023,12 @@ async def _test_bybit_key(api_key: str, api_secret: str, testnet: bool) -> bool:
         return False
 
 
-async def _test_hl_key(private_key: str, testnet: bool) -> bool:
+async def _test_hl_key(private_key: str, testnet: bool, user_id: Optional[int] = None) -> bool:
     """Test a single HyperLiquid private key. Returns True if valid."""
     try:
-        from hl_adapter import HLAdapter
-        adapter = HLAdapter(private_key=private_key, testnet=testnet)
+        from core.hl_adapter_pool import get_hl_adapter
+        adapter = await get_hl_adapter(private_key, testnet=testnet, user_id=user_id)
         try:
-            await adapter.initialize()
             bal = await adapter.get_balance()
             return bal.get("success", False)
         finally:
@@ -1079,9 +1078,9 @@ async def get_api_keys_status(user: dict = Depends(get_current_user)):
     if bybit_real_has:
         tasks["bybit_real"] = _test_bybit_key(real_key, real_secret, testnet=False)
     if hl_testnet_has:
-        tasks["hl_testnet"] = _test_hl_key(hl_test_pk, testnet=True)
+        tasks["hl_testnet"] = _test_hl_key(hl_test_pk, testnet=True, user_id=user_id)
     if hl_mainnet_has:
-        tasks["hl_mainnet"] = _test_hl_key(hl_main_pk, testnet=False)
+        tasks["hl_mainnet"] = _test_hl_key(hl_main_pk, testnet=False, user_id=user_id)
 
     results = {}
     if tasks:
@@ -101,81 +101,83 @@ class HackerDetectionMiddleware(BaseHTTPMiddleware):
 
 class ResponseCacheMiddleware(BaseHTTPMiddleware):
     """
-    Lightweight response cache for GET requests.
-    Caches frequent API responses to reduce DB/API load.
-    TTL-based expiration with per-endpoint configuration.
+    Shared response cache for GET routes marked with @cache_response(ttl).
+    Entries live in a per-process LRU backed by Redis (shared between workers),
+    concurrent misses run the handler once, and If-None-Match gets a 304.
+    See webapp/api/response_cache.py.
     """
     
-    # Endpoints to cache with TTL in seconds
-    CACHEABLE_ENDPOINTS = {
-        "/api/marketplace/overview": 30,      # Market data - 30s
-        "/api/marketplace/trending": 60,      # Trending - 1min
-        "/api/marketplace/top-performers": 60,
-        "/api/stats/leaderboard": 120,        # Leaderboard - 2min
-        "/health": 5,                          # Health check - 5s
-    }
-    
-    def __init__(self, app):
+    def __init__(self, app, cache=None):
         super().__init__(app)
-        self._cache: dict = {}  # key -> (response_body, headers, timestamp)
-        self._lock = Lock()
+        from webapp.api.response_cache import response_cache
+        self.cache = cache or response_cache
+        self._routes = None  # [(path_regex, CachePolicy)] built on first request
+    
+    def _policy_for(self, request: Request):
+        if self._routes is None:
+            from fastapi.routing import APIRoute
+            from webapp.api.response_cache import get_cache_policy
+            self._routes = [
+                (route.path_regex, get_cache_policy(route.endpoint))
+                for route in request.app.routes
+                if isinstance(route, APIRoute) and "GET" in route.methods and get_cache_policy(route.endpoint)
+            ]
+        path = request.url.path
+        for regex, policy in self._routes:
+            if regex.match(path):
+                return policy
+        return None
+    
+    def _respond(self, request: Request, entry, policy, status: str) -> Response:
+        from webapp.api.response_cache import etag_matches
+        headers = {"ETag": entry.etag, "Cache-Control": policy.cache_control, "X-Cache": status}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, headers={**entry.headers, **headers})
     
     async def dispatch(self, request: Request, call_next):
         # Only cache GET requests
         if request.method != "GET":
             return await call_next(request)
         
-        path = request.url.path
-        ttl = self.CACHEABLE_ENDPOINTS.get(path)
-        
-        if ttl is None:
+        policy = self._policy_for(request)
+        if policy is None:
             return await call_next(request)
         
-        cache_key = f"{path}?{request.url.query}"
-        now = time.time()
+        from webapp.api.response_cache import build_key
+        cache_key = build_key(policy, request.url.path, request.url.query, request.headers)
         
-        # Check cache
-        with self._lock:
-            if cache_key in self._cache:
-                body, headers, cached_at = self._cache[cache_key]
-                if now - cached_at < ttl:
-                    # Cache hit
-                    response = Response(
-                        content=body,
-                        media_type="application/json",
-                        headers={"X-Cache": "HIT", "Cache-Control": f"max-age={ttl}"}
-                    )
-                    for k, v in headers.items():
-                        if k.lower() not in ("content-length", "x-cache"):
-                            response.headers[k] = v
-                    return response
-        
-        # Cache miss - get response
-        response = await call_next(request)
+        entry = await self.cache.get(cache_key, policy.ttl)
+        if entry is not None:
+            return self._respond(request, entry, policy, "HIT")
+        
+        # Another request is already computing this response - wait for it
+        pending = self.cache.join(cache_key)
+        if pending is not None:
+            entry = await pending
+            if entry is not None:
+                return self._respond(request, entry, policy, "HIT")
+            return await call_next(request)
         
-        # Only cache successful JSON responses
-        if response.status_code == 200 and response.media_type == "application/json":
+        self.cache.lead(cache_key)
+        entry = None
+        try:
+            response = await call_next(request)
+            
+            # Only cache successful JSON responses
+            if response.status_code != 200 or not response.headers.get("content-type", "").startswith("application/json"):
+                return response
+            
             body = b""
             async for chunk in response.body_iterator:
                 body += chunk
             
-            with self._lock:
-                self._cache[cache_key] = (body, dict(response.headers), now)
-                # Cleanup old entries (max 1000)
-                if len(self._cache) > 1000:
-                    oldest_keys = sorted(self._cache.keys(), 
-                                        key=lambda k: self._cache[k][2])[:100]
-                    for k in oldest_keys:
-                        del self._cache[k]
-            
-            return Response(
-                content=body,
-                status_code=response.status_code,
-                headers={"X-Cache": "MISS", **dict(response.headers)},
-                media_type=response.media_type
-            )
-        
-        return response
+            from webapp.api.response_cache import CachedResponse
+            entry = CachedResponse.capture(body, response.headers)
+            await self.cache.set(cache_key, entry, policy.ttl)
+            return self._respond(request, entry, policy, "MISS")
+        finally:
+            self.cache.finish(cache_key, entry)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -356,6 +358,7 @@ def create_app() -> FastAPI:
     
     # API routers
     from webapp.api import auth, users, trading, admin
+    from webapp.api.response_cache import cache_response
     app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
     app.include_router(users.router, prefix="/api/users", tags=["users"])
     app.include_router(trading.router, prefix="/api/trading", tags=["trading"])
@@ -746,6 +749,7 @@ def create_app() -> FastAPI:
         return RedirectResponse(url="/terms", status_code=302)
     
     @app.get("/health")
+    @cache_response(ttl=5)
     async def health():
         """Basic health check"""
         return {"status": "healthy", "version": "2.0.0", "features": ["trading_terminal", "ai_agent", "backtesting", "statistics", "websocket", "multi_exchange", "marketplace", "screener", "realtime"]}
@@ -764,6 +768,45 @@ def create_app() -> FastAPI:
             logger.info("✅ Real-time workers started on application startup")
         except Exception as e:
             logger.error(f"Failed to start real-time workers: {e}", exc_info=True)
+        
+        try:
+            from webapp.services.backtest_jobs import backtest_jobs
+            await backtest_jobs.start()
+        except Exception as e:
+            logger.error(f"Failed to start backtest job queue: {e}")
+        
+        try:
+            from webapp.api.home_data import home_cache
+            await home_cache.start()
+        except Exception as e:
+            logger.error(f"Failed to start home data refresher: {e}")
+        
+        try:
+            from core.symbol_universe import symbol_universe
+            await symbol_universe.start()
+        except Exception as e:
+            logger.error(f"Failed to start symbol universe refresher: {e}")
+        
+        try:
+            from core.loop_profiler import loop_profiler
+            await loop_profiler.start()
+        except Exception as e:
+            logger.error(f"Failed to start event loop profiler: {e}")
+        
+        try:
+            from core.config_cache import config_cache
+            config_cache.start_listener()
+        except Exception as e:
+            logger.error(f"Failed to start config cache invalidation listener: {e}")
+        
+        try:
+            from core.tasks import safe_create_task
+            from core.hl_adapter_pool import periodic_hl_pool_cleanup
+            app.state.hl_pool_cleanup_task = safe_create_task(
+                periodic_hl_pool_cleanup(), name="hl_adapter_pool_cleanup"
+            )
+        except Exception as e:
+            logger.error(f"Failed to start HL adapter pool cleanup: {e}")
     
     @app.on_event("shutdown")
     async def shutdown_event():
@@ -774,6 +817,57 @@ def create_app() -> FastAPI:
             logger.info("✅ Real-time workers stopped")
         except Exception as e:
             logger.error(f"Error stopping workers: {e}")
+        
+        try:
+            from webapp.services.backtest_jobs import backtest_jobs
+            await backtest_jobs.stop()
+        except Exception as e:
+            logger.error(f"Error stopping backtest job queue: {e}")
+        
+        try:
+            from webapp.api.home_data import home_cache
+            await home_cache.stop()
+        except Exception as e:
+            logger.error(f"Error stopping home data refresher: {e}")
+        
+        try:
+            from core.symbol_universe import symbol_universe
+            await symbol_universe.stop()
+        except Exception as e:
+            logger.error(f"Error stopping symbol universe refresher: {e}")
+        
+        try:
+            from core.db_executor import db_executor
+            await db_executor.stop()
+        except Exception as e:
+            logger.error(f"Error stopping DB executor: {e}")
+        
+        try:
+            from core.loop_profiler import loop_profiler
+            await loop_profiler.stop()
+        except Exception as e:
+            logger.error(f"Error stopping event loop profiler: {e}")
+        
+        try:
+            from core.config_cache import config_cache
+            config_cache.stop_listener()
+        except Exception as e:
+            logger.error(f"Error stopping config cache listener: {e}")
+        
+        try:
+            from webapp.services.portfolio_backtest import shutdown_process_pool
+            shutdown_process_pool()
+        except Exception as e:
+            logger.error(f"Error stopping backtest process pool: {e}")
+        
+        try:
+            from core.hl_adapter_pool import hl_adapter_pool
+            task = getattr(app.state, "hl_pool_cleanup_task", None)
+            if task:
+                task.cancel()
+            await hl_adapter_pool.close_all()
+        except Exception as e:
+            logger.error(f"Error closing HL adapter pool: {e}")
     
     @app.get("/health/detailed")
     async def health_detailed():
@@ -786,16 +880,32 @@ def create_app() -> FastAPI:
     
     @app.get("/metrics")
     async def get_metrics():
-        """Prometheus-style metrics endpoint"""
+        """Prometheus text exposition (counters, gauges, latency histograms)"""
+        from core.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+        return Response(content=metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+    
+    @app.get("/metrics/json")
+    async def get_metrics_json():
+        """Metrics summary plus cache, pool, executor and event loop stats as JSON"""
         try:
             from core.metrics import metrics
             from core.cache import get_all_cache_stats
             from core.connection_pool import connection_pool
+            from core.hl_adapter_pool import hl_adapter_pool
+            from core.symbol_universe import symbol_universe
+            from core.db_executor import db_executor
+            from core.loop_profiler import loop_profiler
+            from core.config_cache import config_cache
             
             return {
                 "metrics": metrics.get_all_metrics(),
                 "cache": get_all_cache_stats(),
-                "connection_pool": connection_pool.stats
+                "connection_pool": connection_pool.stats,
+                "hl_adapter_pool": hl_adapter_pool.stats,
+                "symbol_universe": symbol_universe.info,
+                "db_executor": db_executor.stats,
+                "event_loop": loop_profiler.snapshot(limit=10),
+                "config_cache": config_cache.stats
             }
         except Exception as e:
             return {"error": str(e)}
@@ -43,6 +43,17 @@ def __getattr__(name):
         from webapp.services import indicators
         return getattr(indicators, name)
     
+    # Streaming Indicators
+    if name in ("StreamingIndicator", "StreamingIndicatorSet", "create_streaming_indicator"):
+        from webapp.services import streaming_indicators
+        return getattr(streaming_indicators, name)
+    
+    # Backtest Job Queue
+    if name in ("BacktestJobQueue", "BacktestJob", "backtest_jobs"):
+        import importlib
+        backtest_jobs = importlib.import_module("webapp.services.backtest_jobs")
+        return getattr(backtest_jobs, name)
+    
     # Legacy Backtest Engine
     if name in ("RealBacktestEngine",):
         from webapp.services import backtest_engine
@@ -92,6 +103,16 @@ __all__ = [
     # Indicators
     "IndicatorCalculator",
     
+    # Streaming Indicators
+    "StreamingIndicator",
+    "StreamingIndicatorSet",
+    "create_streaming_indicator",
+    
+    # Backtest Job Queue
+    "BacktestJobQueue",
+    "BacktestJob",
+    "backtest_jobs",
+    
     # Legacy
     "RealBacktestEngine"
 ]
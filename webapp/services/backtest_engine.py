@@ -708,11 +708,14 @@ class RealBacktestEngine:
         if not symbols:
             return self._empty_result(initial_balance)
         
-        # Fetch all symbol data concurrently from specified data source
-        data_tasks = [self.fetch_historical_data(s, timeframe, days, data_source=data_source) for s in symbols]
-        all_candles = await asyncio.gather(*data_tasks)
+        from webapp.services import portfolio_backtest
         
-        symbol_candles = {s: c for s, c in zip(symbols, all_candles) if c and len(c) >= 50}
+        # Fetch all symbol data concurrently (bounded) from specified data source
+        all_candles = await portfolio_backtest.fetch_all(
+            lambda s: self.fetch_historical_data(s, timeframe, days, data_source=data_source), symbols
+        )
+        
+        symbol_candles = {s: c for s, c in all_candles.items() if c and len(c) >= 50}
         
         if not symbol_candles:
             return self._empty_result(initial_balance)
@@ -722,10 +725,10 @@ class RealBacktestEngine:
         if not analyzer:
             return self._empty_result(initial_balance)
         
-        # Calculate signals for all symbols
-        symbol_signals = {}
-        for symbol, candles in symbol_candles.items():
-            symbol_signals[symbol] = analyzer.analyze(candles)
+        # Calculate signals for all symbols in the process pool
+        jobs = [{"strategy": strategy, "candles": c} for c in symbol_candles.values()]
+        signal_sets = await portfolio_backtest.map_jobs(portfolio_backtest.analyze_symbol_job, jobs)
+        symbol_signals = dict(zip(symbol_candles, signal_sets))
         
         # Determine allocation per symbol
         n_symbols = len(symbol_candles)
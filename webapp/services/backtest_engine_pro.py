@@ -16,11 +16,13 @@ import math
 import random
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from pathlib import Path
 import json
 
+import numpy as np
+
 
 # =============================================================================
 # ENUMS & DATA CLASSES
@@ -165,6 +167,13 @@ class Trade:
             "max_favorable": self.max_favorable,
             "max_adverse": self.max_adverse
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Trade":
+        """Inverse of to_dict (which exposes `side` as `direction`)"""
+        fields = dict(data)
+        fields["side"] = fields.pop("direction", fields.get("side"))
+        return cls(**fields)
 
 
 @dataclass
@@ -737,34 +746,32 @@ class ProBacktestEngine:
             position_sizing=kwargs.get("position_sizing", "fixed_percent")
         )
         
-        # Multi-symbol support
-        all_results = {}
-        combined_trades = []
-        combined_equity = [{"time": datetime.now().isoformat(), "equity": initial_balance}]
+        if not custom_strategy and strategy not in self.analyzers:
+            return self._empty_result(initial_balance)
         
+        # Fetch all symbols concurrently, then simulate each in the process pool
+        from webapp.services import portfolio_backtest
+        
+        symbol_candles = await portfolio_backtest.fetch_all(
+            lambda s: DataFetcher.fetch_candles(s, timeframe, days), symbols
+        )
+        jobs = []
         for symbol in symbols:
-            config.symbol = symbol
-            
-            # Fetch data
-            candles = await DataFetcher.fetch_candles(symbol, timeframe, days)
+            candles = symbol_candles.get(symbol)
             if not candles or len(candles) < 50:
                 continue
-            
-            # Get analyzer
-            if custom_strategy:
-                from webapp.services.backtest_engine import CustomStrategyAnalyzer
-                analyzer = CustomStrategyAnalyzer(custom_strategy, "custom")
-            elif strategy and strategy in self.analyzers:
-                analyzer = self.analyzers[strategy]
-            else:
-                continue
-            
-            # Run backtest for this symbol
-            result = await self._run_single(config, candles, analyzer)
-            all_results[symbol] = result
-            
-            if result.get("trades"):
-                combined_trades.extend(result["trades"])
+            jobs.append({
+                "config": replace(config, symbol=symbol),
+                "candles": candles,
+                "strategy": strategy,
+                "custom_strategy": custom_strategy,
+            })
+        
+        results = await portfolio_backtest.map_jobs(portfolio_backtest.run_pro_symbol_job, jobs)
+        all_results = {
+            job["config"].symbol: result
+            for job, result in zip(jobs, results) if result
+        }
         
         if not all_results:
             return self._empty_result(initial_balance)
@@ -780,11 +787,24 @@ class ProBacktestEngine:
         for symbol, result in all_results.items():
             trades = result.get("trades", [])
             for t in trades:
-                all_trades.append(Trade(**t) if isinstance(t, dict) else t)
+                all_trades.append(Trade.from_dict(t) if isinstance(t, dict) else t)
             
             pnl = result.get("metrics", {}).get("total_return", 0)
             final_equity += pnl / len(symbols) if symbols else 0  # Proportional allocation
         
+        # Portfolio curve on the union of all symbol timestamps (same 1/N allocation)
+        keys = list(all_results)
+        times, matrix = portfolio_backtest.align_equity_curves(
+            {s: all_results[s].get("equity_curve", []) for s in keys},
+            {s: initial_balance for s in keys}
+        )
+        combined_equity = portfolio_backtest.combine_equity(
+            times, matrix,
+            initial=np.full(len(keys), float(initial_balance)),
+            weights=np.full(len(keys), 1.0 / len(symbols)),
+            total_initial=initial_balance
+        ) or [{"time": datetime.now().isoformat(), "equity": initial_balance}]
+        
         # Recalculate metrics
         metrics = MetricsCalculator.calculate(
             all_trades, combined_equity, initial_balance, final_equity, days
@@ -797,7 +817,10 @@ class ProBacktestEngine:
             "equity_curve": combined_equity,
             "drawdown_curve": [],
             "monthly_returns": [],
-            "symbol_results": {s: r.get("metrics", {}) for s, r in all_results.items()}
+            "symbol_results": {s: r.get("metrics", {}) for s, r in all_results.items()},
+            "correlation_matrix": portfolio_backtest.matrix_to_dict(
+                keys, portfolio_backtest.correlation_matrix(matrix)
+            )
         }
     
     async def _run_single(self, config: BacktestConfig, candles: List[Dict], 
@@ -1103,86 +1126,106 @@ class ProBacktestEngine:
         if not strategies:
             return {"success": False, "error": "No strategies provided"}
         
-        # Run each strategy independently
-        strategy_results = {}
-        for strat_config in strategies:
-            strategy_name = strat_config.get("strategy", "elcaro")
-            result = await self.run(
-                strategy=strategy_name,
+        from webapp.services import portfolio_backtest
+        
+        # Warm the candle cache once so strategies don't race on the same downloads
+        await portfolio_backtest.fetch_all(
+            lambda s: DataFetcher.fetch_candles(s, timeframe, days), symbols
+        )
+        
+        # Run strategies concurrently; each fans its symbols out to the process pool
+        allocation = initial_balance / len(strategies)
+        names = [c.get("strategy", "elcaro") for c in strategies]
+        results = await asyncio.gather(*[
+            self.run(
+                strategy=name,
                 symbols=symbols,
                 timeframe=timeframe,
                 days=days,
-                initial_balance=initial_balance / len(strategies),
-                **strat_config
+                initial_balance=allocation,
+                **{k: v for k, v in strat_config.items() if k not in ("strategy", "initial_balance")}
             )
-            strategy_results[strategy_name] = result
+            for name, strat_config in zip(names, strategies)
+        ])
+        strategy_results = dict(zip(names, results))
+        keys = list(strategy_results)
+        
+        # Strategy equity curves on a common time index
+        times, matrix = portfolio_backtest.align_equity_curves(
+            {s: strategy_results[s].get("equity_curve", []) for s in keys},
+            {s: allocation for s in keys}
+        )
         
         # Calculate correlation matrix
-        correlation_matrix = self._calculate_correlation(strategy_results)
+        correlation_matrix = self._calculate_correlation(strategy_results, matrix)
         
         # Calculate optimal weights (simplified mean-variance)
         weights = self._calculate_weights(strategy_results, correlation_limit)
+        weight_vec = np.array([weights.get(s, 0.0) for s in keys])
         
         # Aggregate metrics
-        total_return = sum(
-            r.get("metrics", {}).get("total_return_percent", 0) * weights.get(s, 1/len(strategies))
-            for s, r in strategy_results.items()
-        )
+        returns = np.array([
+            strategy_results[s].get("metrics", {}).get("total_return_percent", 0) for s in keys
+        ], dtype=float)
+        contributions = returns * weight_vec
         
         return {
             "success": True,
             "portfolio_metrics": {
-                "total_return_percent": total_return,
+                "total_return_percent": float(contributions.sum()),
                 "strategies_count": len(strategies),
                 "symbols_count": len(symbols)
             },
             "strategy_contributions": {
-                s: r.get("metrics", {}).get("total_return_percent", 0) * weights.get(s, 0)
-                for s, r in strategy_results.items()
+                s: float(c) for s, c in zip(keys, contributions)
             },
             "correlation_matrix": correlation_matrix,
             "optimal_weights": weights,
-            "equity_curve": []
+            "equity_curve": portfolio_backtest.combine_equity(
+                times, matrix,
+                initial=np.full(len(keys), allocation),
+                weights=weight_vec,
+                total_initial=initial_balance
+            )
         }
     
-    def _calculate_correlation(self, results: Dict[str, Dict]) -> Dict[str, Dict[str, float]]:
+    def _calculate_correlation(self, results: Dict[str, Dict],
+                               equity_matrix: Optional[np.ndarray] = None) -> Dict[str, Dict[str, float]]:
         """Calculate correlation matrix between strategies"""
-        # Simplified - in reality would use daily returns
+        from webapp.services import portfolio_backtest
+        
         strategies = list(results.keys())
-        matrix = {}
         
-        for s1 in strategies:
-            matrix[s1] = {}
-            for s2 in strategies:
-                if s1 == s2:
-                    matrix[s1][s2] = 1.0
-                else:
-                    # Simplified correlation based on win rate similarity
-                    wr1 = results[s1].get("metrics", {}).get("win_rate", 50)
-                    wr2 = results[s2].get("metrics", {}).get("win_rate", 50)
-                    matrix[s1][s2] = 1 - abs(wr1 - wr2) / 100
+        # Correlation of aligned equity returns when curves are available
+        if equity_matrix is not None and equity_matrix.shape[1] >= 3:
+            corr = portfolio_backtest.correlation_matrix(equity_matrix)
+            return portfolio_backtest.matrix_to_dict(strategies, corr)
         
-        return matrix
+        # Fallback: similarity of win rates
+        wr = np.array([results[s].get("metrics", {}).get("win_rate", 50) for s in strategies], dtype=float)
+        matrix = 1 - np.abs(wr[:, None] - wr[None, :]) / 100
+        return {
+            s1: {s2: float(matrix[i, j]) for j, s2 in enumerate(strategies)}
+            for i, s1 in enumerate(strategies)
+        }
     
     def _calculate_weights(self, results: Dict[str, Dict], 
                           correlation_limit: float) -> Dict[str, float]:
         """Calculate optimal portfolio weights"""
+        from webapp.services import portfolio_backtest
+        
         strategies = list(results.keys())
-        n = len(strategies)
         
-        if n == 0:
+        if not strategies:
             return {}
         
         # Simple Sharpe-based weighting
-        sharpes = {
-            s: max(0.1, results[s].get("metrics", {}).get("sharpe_ratio", 0.1))
-            for s in strategies
-        }
-        
-        total_sharpe = sum(sharpes.values())
-        weights = {s: sharpes[s] / total_sharpe for s in strategies}
+        sharpes = np.array([
+            results[s].get("metrics", {}).get("sharpe_ratio", 0.1) for s in strategies
+        ], dtype=float)
+        weights = portfolio_backtest.sharpe_weights(sharpes)
         
-        return weights
+        return {s: float(w) for s, w in zip(strategies, weights)}
     
     # =========================================================================
     # API WRAPPER METHODS
@@ -0,0 +1,626 @@
+"""
+Enliko Backtest Job Queue
+Persistent async job subsystem for long-running backtests:
+- Jobs are stored in `backtest_jobs` and re-queued after a restart
+- Safe with several uvicorn workers: each active job is owned by one
+  process (heartbeat lease), orphaned jobs are claimed atomically, and
+  per-user quotas / in-flight dedup are checked in the database
+- Content-hash result cache: identical strategy/params/symbol/range
+  returns the stored result instantly (across users)
+- Identical in-flight requests attach to the running job
+- Priority and concurrent-job quotas per license tier
+- Simulation runs in the shared backtest process pool, so a heavy
+  walk-forward cannot starve the FastAPI event loop
+- Progress is streamed through /ws/backtest/{id}
+
+Usage:
+    from webapp.services.backtest_jobs import backtest_jobs
+    job = await backtest_jobs.submit(user_id, "backtest", params, tier="premium")
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core.tasks import safe_create_task
+from webapp.services.portfolio_backtest import get_process_pool, shutdown_process_pool
+from webapp.services.signal_scanner import TIMEFRAME_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+JOB_CONFIG = {
+    "workers": int(os.getenv("BACKTEST_JOB_WORKERS", "2")),
+    "result_ttl_hours": 24,         # Stored results reused for identical requests
+    "memory_ttl_seconds": 3600,     # Finished jobs kept in memory (DB keeps them longer)
+    "use_process_pool": True,       # False = worker threads (tests / no fork)
+    "heartbeat_seconds": 30,        # Owner refreshes its jobs' lease / claims orphans
+    "lease_seconds": 90,            # Jobs of an owner silent this long are taken over
+}
+
+# Lower priority value runs first
+TIER_LIMITS = {
+    "enterprise": {"priority": 0, "max_active": 10},
+    "premium":    {"priority": 1, "max_active": 4},
+    "basic":      {"priority": 2, "max_active": 2},
+    "trial":      {"priority": 3, "max_active": 1},
+    "none":       {"priority": 4, "max_active": 1},
+}
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class QuotaExceeded(Exception):
+    """User already has the maximum number of active jobs for their tier"""
+
+
+# =============================================================================
+# JOB RUNNERS (run in child processes - must be module-level)
+# =============================================================================
+
+def run_backtest_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    """One strategy of a /run-async request"""
+    from webapp.services.backtest_engine import RealBacktestEngine
+    return asyncio.run(RealBacktestEngine().run_backtest(**params))
+
+
+def run_walk_forward_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    from webapp.services.backtest_engine import RealBacktestEngine
+    return asyncio.run(RealBacktestEngine().run_walk_forward_optimization(**params))
+
+
+JOB_RUNNERS: Dict[str, Callable[[Dict], Dict]] = {
+    "backtest": run_backtest_job,
+    "walk_forward": run_walk_forward_job,
+}
+
+
+def split_job(kind: str, params: Dict[str, Any]) -> List[tuple]:
+    """
+    Break a job into (label, runner params) units; progress is reported
+    between units and cancellation is checked before each one.
+    """
+    if kind == "backtest":
+        base = {k: v for k, v in params.items() if k != "strategies"}
+        return [(s, {**base, "strategy": s}) for s in params.get("strategies", [])]
+    return [(params.get("strategy", kind), params)]
+
+
+def request_hash(kind: str, params: Dict[str, Any], now: float = None) -> str:
+    """
+    Content hash of a job request.
+
+    Ranges are relative ("last N days"), so the hash includes the open time
+    of the current bar: identical requests share a result until a new
+    candle closes.
+    """
+    now = time.time() if now is None else now
+    bar = TIMEFRAME_SECONDS.get(params.get("timeframe", "1h"), 3600)
+    payload = {"kind": kind, "params": params, "as_of": int(now // bar * bar)}
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class BacktestJob:
+    id: str
+    user_id: int
+    kind: str
+    params: Dict[str, Any]
+    request_hash: str
+    priority: int = 0
+    status: str = "queued"
+    progress: float = 0.0
+    stage: str = ""
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cached: bool = False
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    subscribers: Set[int] = field(default_factory=set)
+    cancelled: bool = False
+    owner: Optional[str] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "backtest_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "stage": self.stage,
+            "cached": self.cached,
+            "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            data["results"] = self.result
+        return data
+
+
+# =============================================================================
+# PERSISTENCE
+# =============================================================================
+
+def _ts(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value else None
+
+
+def _epoch(value) -> Optional[float]:
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+def _json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+class BacktestJobStore:
+    """
+    backtest_jobs table access (sync - call through asyncio.to_thread).
+    Failures are logged and swallowed: the queue keeps working in memory
+    if the database is unavailable.
+    """
+
+    def save(self, job: BacktestJob):
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                self._upsert(conn.cursor(), job)
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist backtest job {job.id}: {e}")
+
+    @staticmethod
+    def _upsert(cur, job: BacktestJob):
+        # A process whose job was taken over (lease expired / released) must
+        # not overwrite the new owner's state
+        cur.execute("""
+            INSERT INTO backtest_jobs
+                (id, user_id, kind, request_hash, params, status, priority, progress,
+                 result, error, created_at, started_at, finished_at, owner, heartbeat_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW())
+            ON CONFLICT (id) DO UPDATE SET
+                status = EXCLUDED.status, progress = EXCLUDED.progress,
+                result = EXCLUDED.result, error = EXCLUDED.error,
+                started_at = EXCLUDED.started_at, finished_at = EXCLUDED.finished_at
+            WHERE backtest_jobs.owner IS NOT DISTINCT FROM EXCLUDED.owner
+        """, (
+            job.id, job.user_id, job.kind, job.request_hash, json.dumps(job.params, default=str),
+            job.status, job.priority, job.progress,
+            json.dumps(job.result, default=str) if job.result is not None else None,
+            job.error, _ts(job.created_at), _ts(job.started_at), _ts(job.finished_at), job.owner,
+        ))
+
+    def create(self, job: BacktestJob, max_active: int) -> Optional[Tuple[str, Optional[BacktestJob]]]:
+        """
+        Insert a new job, checked against every worker's jobs:
+        ("existing", job) if an identical request is already active,
+        ("quota", None) if the user has max_active active jobs,
+        ("created", job) otherwise. None if the database is unavailable.
+
+        Advisory locks serialise identical requests and each user's
+        submissions across processes (request hash first, then user).
+        """
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(?))", (f"backtest_jobs:hash:{job.request_hash}",))
+                cur.execute("""
+                    SELECT * FROM backtest_jobs
+                    WHERE request_hash = ? AND status IN ('queued', 'running')
+                    ORDER BY created_at LIMIT 1
+                """, (job.request_hash,))
+                row = cur.fetchone()
+                if row:
+                    return "existing", self._from_row(dict(row))
+
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(?))", (f"backtest_jobs:user:{job.user_id}",))
+                cur.execute("""
+                    SELECT COUNT(*) AS active FROM backtest_jobs
+                    WHERE user_id = ? AND status IN ('queued', 'running')
+                """, (job.user_id,))
+                if cur.fetchone()["active"] >= max_active:
+                    return "quota", None
+
+                self._upsert(cur, job)
+                conn.commit()
+            return "created", job
+        except Exception as e:
+            logger.warning(f"Failed to create backtest job {job.id} in database: {e}")
+            return None
+
+    def find_result(self, request_hash: str, max_age_hours: float) -> Optional[Dict[str, Any]]:
+        """Latest completed result for this hash, if fresh enough"""
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT result FROM backtest_jobs
+                    WHERE request_hash = ? AND status = 'completed' AND finished_at > ?
+                    ORDER BY finished_at DESC LIMIT 1
+                """, (request_hash, datetime.now() - timedelta(hours=max_age_hours)))
+                row = cur.fetchone()
+            return _json(row["result"]) if row else None
+        except Exception as e:
+            logger.warning(f"Backtest result lookup failed: {e}")
+            return None
+
+    def load(self, job_id: str) -> Optional[BacktestJob]:
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT * FROM backtest_jobs WHERE id = ?", (job_id,))
+                row = cur.fetchone()
+            return self._from_row(dict(row)) if row else None
+        except Exception as e:
+            logger.warning(f"Failed to load backtest job {job_id}: {e}")
+            return None
+
+    def claim_pending(self, owner: str, lease_seconds: float) -> List[BacktestJob]:
+        """
+        Take over queued/running jobs that have no live owner: released on
+        shutdown, or the owning process stopped heartbeating (crash/restart).
+        SKIP LOCKED makes concurrent claims from several workers disjoint.
+        """
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    UPDATE backtest_jobs
+                    SET owner = ?, heartbeat_at = NOW(), status = 'queued', started_at = NULL
+                    WHERE id IN (
+                        SELECT id FROM backtest_jobs
+                        WHERE status IN ('queued', 'running')
+                          AND (owner IS NULL OR heartbeat_at IS NULL
+                               OR heartbeat_at < NOW() - ? * INTERVAL '1 second')
+                        ORDER BY priority, created_at
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING *
+                """, (owner, lease_seconds))
+                rows = cur.fetchall()
+                conn.commit()
+            return sorted((self._from_row(dict(r)) for r in rows), key=lambda j: (j.priority, j.created_at))
+        except Exception as e:
+            logger.warning(f"Failed to claim pending backtest jobs: {e}")
+            return []
+
+    def heartbeat(self, owner: str):
+        """Extend the lease on this process's active jobs"""
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    UPDATE backtest_jobs SET heartbeat_at = NOW()
+                    WHERE owner = ? AND status IN ('queued', 'running')
+                """, (owner,))
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Backtest job heartbeat failed: {e}")
+
+    def release(self, owner: str):
+        """Hand this process's unfinished jobs back for another worker to claim"""
+        try:
+            from webapp.api.db_helper import get_db
+            with get_db() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    UPDATE backtest_jobs SET owner = NULL, status = 'queued'
+                    WHERE owner = ? AND status IN ('queued', 'running')
+                """, (owner,))
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Failed to release backtest jobs: {e}")
+
+    @staticmethod
+    def _from_row(row: Dict[str, Any]) -> BacktestJob:
+        return BacktestJob(
+            id=row["id"],
+            user_id=row["user_id"],
+            kind=row["kind"],
+            params=_json(row["params"]) or {},
+            request_hash=row["request_hash"],
+            priority=row.get("priority") or 0,
+            status=row["status"],
+            progress=row.get("progress") or 0.0,
+            result=_json(row.get("result")),
+            error=row.get("error"),
+            created_at=_epoch(row.get("created_at")) or time.time(),
+            started_at=_epoch(row.get("started_at")),
+            finished_at=_epoch(row.get("finished_at")),
+            subscribers={row["user_id"]},
+            owner=row.get("owner"),
+        )
+
+
+# =============================================================================
+# QUEUE
+# =============================================================================
+
+class BacktestJobQueue:
+    """Priority queue + worker pool for backtest jobs"""
+
+    def __init__(self, store: Optional[BacktestJobStore] = None, workers: Optional[int] = None):
+        self.store = store or BacktestJobStore()
+        self.workers = workers or JOB_CONFIG["workers"]
+        self.jobs: Dict[str, BacktestJob] = {}
+        self._inflight: Dict[str, str] = {}     # request_hash -> job id
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Start workers and re-queue jobs interrupted by a restart"""
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        await self._claim()
+        self._tasks = [
+            safe_create_task(self._worker(), name=f"backtest_job_worker_{i}")
+            for i in range(self.workers)
+        ]
+        self._heartbeat_task = safe_create_task(self._heartbeat(), name="backtest_job_heartbeat")
+
+    async def stop(self):
+        if not self.running:
+            return
+        tasks = self._tasks + ([self._heartbeat_task] if self._heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks, self._heartbeat_task = [], None
+        # Let another worker pick up our unfinished jobs without waiting for the lease
+        await asyncio.to_thread(self.store.release, self.owner)
+
+    async def _claim(self):
+        """Queue orphaned jobs (restart, or another worker died) that this process won"""
+        claimed = await asyncio.to_thread(self.store.claim_pending, self.owner, JOB_CONFIG["lease_seconds"])
+        for job in claimed:
+            local = self.jobs.get(job.id)
+            if local is not None and local.is_active:
+                continue
+            job.status = "queued"
+            job.owner = self.owner
+            self._track(job)
+            self._inflight[job.request_hash] = job.id
+            self._enqueue(job)
+        if claimed:
+            logger.info(f"Recovered {len(claimed)} backtest jobs")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(JOB_CONFIG["heartbeat_seconds"])
+            try:
+                await asyncio.to_thread(self.store.heartbeat, self.owner)
+                await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Backtest job heartbeat error: {e}")
+
+    async def submit(
+        self,
+        user_id: int,
+        kind: str,
+        params: Dict[str, Any],
+        tier: str = "none",
+    ) -> BacktestJob:
+        """
+        Queue a job, or return an existing one for an identical request.
+
+        Raises QuotaExceeded if the user's tier allows no more active jobs.
+        """
+        if kind not in JOB_RUNNERS:
+            raise ValueError(f"Unknown backtest job kind: {kind}")
+        if not self.running:
+            await self.start()
+
+        limits = TIER_LIMITS.get(tier, TIER_LIMITS["none"])
+        digest = request_hash(kind, params)
+
+        async with self._lock:
+            self._prune()
+
+            # Identical request already queued/running - attach to it
+            existing = self.jobs.get(self._inflight.get(digest, ""))
+            if existing and existing.is_active:
+                existing.subscribers.add(user_id)
+                if limits["priority"] < existing.priority and existing.status == "queued":
+                    existing.priority = limits["priority"]
+                    self._enqueue(existing)
+                return existing
+
+            job = BacktestJob(
+                id=str(uuid.uuid4()), user_id=user_id, kind=kind, params=params,
+                request_hash=digest, priority=limits["priority"], subscribers={user_id},
+                owner=self.owner,
+            )
+
+            cached = await asyncio.to_thread(self.store.find_result, digest, JOB_CONFIG["result_ttl_hours"])
+            if cached is not None:
+                job.status, job.result, job.cached = "completed", cached, True
+                job.progress, job.stage = 100, "Completed"
+                job.finished_at = time.time()
+                self._track(job)
+                # Stored so GET /jobs/{id} works on every worker and after _prune
+                await asyncio.to_thread(self.store.save, job)
+                return job
+
+            created = await asyncio.to_thread(self.store.create, job, limits["max_active"])
+            if created is None:
+                # Database unavailable - this process's jobs are all we can see
+                active = sum(1 for j in self.jobs.values() if j.user_id == user_id and j.is_active)
+                outcome = "quota" if active >= limits["max_active"] else "created"
+            else:
+                outcome, existing = created
+                if outcome == "existing":
+                    # Queued/running in another worker; status is read from the database
+                    return existing
+            if outcome == "quota":
+                raise QuotaExceeded(
+                    f"Maximum {limits['max_active']} active backtests for {tier} license"
+                )
+
+            self._track(job)
+            self._inflight[digest] = job.id
+            self._enqueue(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[BacktestJob]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            job = await asyncio.to_thread(self.store.load, job_id)
+        return job
+
+    def cancel(self, job_id: str, user_id: Optional[int] = None) -> bool:
+        """
+        Cancel a job. A job shared by several users (dedup) keeps running
+        until every subscriber has cancelled.
+        """
+        job = self.jobs.get(job_id)
+        if not job or not job.is_active:
+            return False
+        if user_id is not None:
+            if user_id not in job.subscribers:
+                return False
+            job.subscribers.discard(user_id)
+            if job.subscribers:
+                return True
+        elif len(job.subscribers) > 1:
+            return False
+        job.cancelled = True
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self.jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": by_status,
+        }
+
+    def _track(self, job: BacktestJob):
+        self.jobs[job.id] = job
+
+    def _enqueue(self, job: BacktestJob):
+        # Re-prioritised jobs get a second entry; the stale one is skipped
+        self._queue.put_nowait((job.priority, next(self._seq), job.id))
+
+    def _prune(self):
+        cutoff = time.time() - JOB_CONFIG["memory_ttl_seconds"]
+        stale = [
+            job_id for job_id, job in self.jobs.items()
+            if not job.is_active and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in stale:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            priority, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is None or job.status != "queued" or priority != job.priority:
+                    continue
+                await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backtest job {job_id} crashed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: BacktestJob):
+        from webapp.api.backtest_ws import send_progress, send_result, send_error
+
+        job.status, job.started_at = "running", time.time()
+        await asyncio.to_thread(self.store.save, job)
+
+        units = split_job(job.kind, job.params)
+        runner = JOB_RUNNERS[job.kind]
+        results: Dict[str, Any] = {}
+        try:
+            for idx, (label, unit_params) in enumerate(units):
+                if job.cancelled:
+                    job.status, job.error = "cancelled", "Backtest cancelled by user"
+                    await send_error(job.id, job.error)
+                    return
+                job.progress = idx / len(units) * 100
+                job.stage = f"Testing strategy: {label}"
+                await send_progress(job.id, job.progress, job.stage, {
+                    "current_strategy": label, "completed": idx, "total": len(units),
+                })
+                results[label] = await self._run_unit(runner, unit_params)
+                # Progress for clients polling another worker
+                job.progress = (idx + 1) / len(units) * 100
+                await asyncio.to_thread(self.store.save, job)
+
+            job.result = results if job.kind == "backtest" else results.get(units[0][0]) if units else {}
+            job.status, job.progress, job.stage = "completed", 100, "Completed"
+            await send_progress(job.id, 100, "Completed", {"completed": len(units), "total": len(units)})
+            await send_result(job.id, job.result)
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+            await send_error(job.id, job.error)
+        finally:
+            job.finished_at = time.time()
+            self._inflight.pop(job.request_hash, None)
+            await asyncio.to_thread(self.store.save, job)
+
+    async def _run_unit(self, runner: Callable[[Dict], Dict], params: Dict[str, Any]) -> Dict[str, Any]:
+        if not JOB_CONFIG["use_process_pool"]:
+            return await asyncio.to_thread(runner, params)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(get_process_pool(), runner, params)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Backtest process pool unavailable ({e}), running job in a thread")
+            shutdown_process_pool()
+            return await asyncio.to_thread(runner, params)
+
+
+async def resolve_tier(user: Dict[str, Any]) -> str:
+    """License tier used for queue priority and quotas"""
+    if user.get("is_admin"):
+        return "enterprise"
+    try:
+        import db
+        info = await asyncio.to_thread(db.get_user_license, user["user_id"])
+        if info.get("is_active"):
+            return info.get("license_type") or "none"
+    except Exception as e:
+        logger.warning(f"License lookup failed for {user.get('user_id')}: {e}")
+    return "none"
+
+
+# Global instance
+backtest_jobs = BacktestJobQueue()
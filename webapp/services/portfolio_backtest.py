@@ -0,0 +1,226 @@
+"""
+Enliko Portfolio Backtest Runner
+Parallel multi-symbol backtesting:
+- Candle fetches run concurrently (bounded)
+- Per-symbol signal generation / simulation fans out to a process pool
+- Equity curves merged on a common time index with NumPy
+- Correlations and weights computed vectorized
+
+Used by ProBacktestEngine.run / run_portfolio and
+RealBacktestEngine.run_multi_symbol_backtest.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+PORTFOLIO_CONFIG = {
+    "max_workers": int(os.getenv("BACKTEST_PROCESS_WORKERS", "0")) or max(1, min(4, os.cpu_count() or 1)),
+    "fetch_concurrency": 10,        # Parallel candle downloads per request
+    "min_jobs_for_pool": 2,         # Below this, run inline (no IPC overhead)
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound backtest work (created lazily)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PORTFOLIO_CONFIG["max_workers"])
+    return _executor
+
+
+def shutdown_process_pool():
+    """Shut down the shared pool (app shutdown / tests)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# =============================================================================
+# WORKER FUNCTIONS (run in child processes - must be module-level)
+# =============================================================================
+
+_worker_engines: Dict[str, Any] = {}
+
+
+def _get_worker_engine(kind: str):
+    """One engine instance per worker process (analyzers are stateless)"""
+    engine = _worker_engines.get(kind)
+    if engine is None:
+        if kind == "pro":
+            from webapp.services.backtest_engine_pro import ProBacktestEngine
+            engine = ProBacktestEngine()
+        else:
+            from webapp.services.backtest_engine import RealBacktestEngine
+            engine = RealBacktestEngine()
+        _worker_engines[kind] = engine
+    return engine
+
+
+def _make_analyzer(engine, strategy: Optional[str], custom_strategy: Optional[Dict]):
+    if custom_strategy:
+        from webapp.services.backtest_engine import CustomStrategyAnalyzer
+        return CustomStrategyAnalyzer(custom_strategy, "custom")
+    return engine.analyzers.get(strategy) if strategy else None
+
+
+def run_pro_symbol_job(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Simulate one symbol with ProBacktestEngine._run_single"""
+    engine = _get_worker_engine("pro")
+    analyzer = _make_analyzer(engine, job.get("strategy"), job.get("custom_strategy"))
+    if analyzer is None:
+        return None
+    return asyncio.run(engine._run_single(job["config"], job["candles"], analyzer))
+
+
+def analyze_symbol_job(job: Dict[str, Any]) -> Dict[int, Dict]:
+    """Generate signals for one symbol with a RealBacktestEngine analyzer"""
+    engine = _get_worker_engine("real")
+    analyzer = _make_analyzer(engine, job.get("strategy"), job.get("custom_strategy"))
+    if analyzer is None:
+        return {}
+    return analyzer.analyze(job["candles"])
+
+
+async def map_jobs(func: Callable[[Dict], Any], jobs: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Run `func` over `jobs` in the process pool, preserving order.
+
+    Small batches run in a worker thread (no IPC overhead); if the pool is
+    broken (worker killed, fork unavailable) the batch is retried the same
+    way so the request still completes.
+    """
+    if len(jobs) < PORTFOLIO_CONFIG["min_jobs_for_pool"]:
+        return await asyncio.to_thread(_run_inline, func, jobs)
+
+    loop = asyncio.get_running_loop()
+    try:
+        pool = get_process_pool()
+        futures = [loop.run_in_executor(pool, func, job) for job in jobs]
+        return await asyncio.gather(*futures)
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"Backtest process pool unavailable ({e}), running {len(jobs)} jobs inline")
+        shutdown_process_pool()
+        return await asyncio.to_thread(_run_inline, func, jobs)
+
+
+def _run_inline(func: Callable[[Dict], Any], jobs: List[Dict[str, Any]]) -> List[Any]:
+    return [func(job) for job in jobs]
+
+
+async def fetch_all(fetch: Callable[[str], Any], symbols: List[str]) -> Dict[str, List[Dict]]:
+    """Fetch candles for all symbols with bounded concurrency"""
+    semaphore = asyncio.Semaphore(PORTFOLIO_CONFIG["fetch_concurrency"])
+
+    async def _one(symbol: str):
+        async with semaphore:
+            try:
+                return await fetch(symbol)
+            except Exception as e:
+                logger.warning(f"Candle fetch failed for {symbol}: {e}")
+                return []
+
+    results = await asyncio.gather(*[_one(s) for s in symbols])
+    return dict(zip(symbols, results))
+
+
+# =============================================================================
+# VECTORIZED AGGREGATION
+# =============================================================================
+
+def align_equity_curves(
+    curves: Dict[str, List[Dict]],
+    initial: Dict[str, float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Put equity curves on a common time index.
+
+    Returns (times, matrix) where matrix[k, t] is the equity of curve k at
+    times[t], forward-filled between points and equal to the curve's initial
+    balance before its first point.
+    """
+    keys = list(curves)
+    if not keys:
+        return np.array([], dtype="datetime64[s]"), np.zeros((0, 0))
+
+    parsed = {}
+    for k in keys:
+        points = curves[k] or []
+        t = np.array([p["time"] for p in points], dtype="datetime64[s]")
+        e = np.array([p["equity"] for p in points], dtype=float)
+        order = np.argsort(t, kind="stable")
+        parsed[k] = (t[order], e[order])
+
+    times = np.unique(np.concatenate([parsed[k][0] for k in keys]))
+    matrix = np.empty((len(keys), len(times)))
+
+    for row, k in enumerate(keys):
+        t, e = parsed[k]
+        if len(t) == 0:
+            matrix[row] = initial[k]
+            continue
+        # Index of the last point at or before each common timestamp
+        idx = np.searchsorted(t, times, side="right") - 1
+        matrix[row] = np.where(idx >= 0, e[np.clip(idx, 0, None)], initial[k])
+
+    return times, matrix
+
+
+def combine_equity(
+    times: np.ndarray,
+    matrix: np.ndarray,
+    initial: np.ndarray,
+    weights: np.ndarray,
+    total_initial: float
+) -> List[Dict]:
+    """Weighted portfolio curve: total_initial * (1 + sum_k w_k * return_k(t))"""
+    if matrix.size == 0:
+        return []
+    returns = matrix / initial[:, None] - 1.0
+    equity = total_initial * (1.0 + weights @ returns)
+    iso = np.datetime_as_string(times, unit="s")
+    return [{"time": str(t), "equity": float(e)} for t, e in zip(iso, equity)]
+
+
+def correlation_matrix(matrix: np.ndarray) -> np.ndarray:
+    """Pearson correlation of period returns; flat series correlate 0 with others"""
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros((0, 0))
+    if matrix.shape[1] < 3:
+        return np.eye(n)
+
+    prev = matrix[:, :-1]
+    returns = np.divide(np.diff(matrix, axis=1), prev, out=np.zeros_like(prev), where=prev != 0)
+
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    std = np.sqrt((centered ** 2).sum(axis=1))
+    denom = np.outer(std, std)
+    corr = np.divide(centered @ centered.T, denom, out=np.zeros((n, n)), where=denom > 0)
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def sharpe_weights(sharpes: np.ndarray, floor: float = 0.1) -> np.ndarray:
+    """Sharpe-proportional weights with a floor so no component gets zero"""
+    if sharpes.size == 0:
+        return sharpes
+    s = np.maximum(floor, sharpes)
+    return s / s.sum()
+
+
+def matrix_to_dict(keys: List[str], matrix: np.ndarray) -> Dict[str, Dict[str, float]]:
+    return {
+        a: {b: round(float(matrix[i, j]), 4) for j, b in enumerate(keys)}
+        for i, a in enumerate(keys)
+    }
@@ -8,17 +8,28 @@ Scans multiple symbols and strategies for trading signals:
 - Alert system integration
 """
 import asyncio
-from typing import List, Dict, Any, Optional, Callable, Set
+import time
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import logging
 
+import aiohttp
+
 from core.tasks import safe_create_task
 
 
 logger = logging.getLogger(__name__)
 
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+
+TIMEFRAME_SECONDS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "12h": 43200,
+    "1d": 86400, "1w": 604800,
+}
+
 
 class SignalType(Enum):
     LONG = "LONG"
@@ -81,6 +92,30 @@ class ScannerConfig:
     scan_interval: int = 60  # seconds
     max_signals_per_symbol: int = 3
     include_exit_signals: bool = True
+    max_concurrency: int = 20
+
+
+@dataclass
+class IndicatorBundle:
+    """
+    OHLCV columns and indicator series for one (symbol, timeframe).
+    
+    Shared by every strategy analyzer; analyzer results are memoized in
+    `signals` while the bundle is fresh. The last candle is still forming
+    (its close is the current price analyzers use for entry/TP/SL), so a
+    bundle lives for at most one scan interval, never past the bar.
+    """
+    symbol: str
+    timeframe: str
+    candles: List[Dict]
+    indicators: Dict[str, Any]
+    bar_open_ms: int
+    expires_at: float  # unix seconds - next bar open or one scan interval, whichever is first
+    signals: Dict[str, Optional[Signal]] = field(default_factory=dict)
+    
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
 
 
 class SignalScanner:
@@ -102,13 +137,18 @@ class SignalScanner:
         "support_resistance": "_analyze_support_resistance"
     }
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 20):
         self.running = False
         self.callbacks: List[Callable[[Signal], None]] = []
         self.recent_signals: Dict[str, List[Signal]] = {}
         self._scan_task: Optional[asyncio.Task] = None
         self.config: Optional[ScannerConfig] = None
-        self._data_cache: Dict[str, Any] = {}
+        self._data_cache: Dict[Tuple[str, str], IndicatorBundle] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._indicator_calc = None
     
     def add_callback(self, callback: Callable[[Signal], None]) -> None:
         """Add callback for new signals"""
@@ -125,29 +165,29 @@ class SignalScanner:
         strategies: List[str],
         timeframe: str = "1h",
         min_score: float = 50.0,
-        top_n: int = 10
+        top_n: int = 10,
+        timeframes: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Scan symbols for trading signals across multiple strategies.
         Returns top N signals sorted by score.
+        
+        All (symbol, timeframe) pairs are scheduled at once; network
+        concurrency is bounded by the scanner's semaphore and connection pool.
         """
         all_signals = []
         
-        # Scan in parallel batches
-        batch_size = 10
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i:i + batch_size]
-            
-            tasks = [
-                self._scan_symbol(symbol, strategies, timeframe)
-                for symbol in batch
-            ]
-            
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in batch_results:
-                if isinstance(result, list):
-                    all_signals.extend(result)
+        tasks = [
+            self._scan_symbol(symbol, strategies, tf)
+            for tf in (timeframes or [timeframe])
+            for symbol in symbols
+        ]
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for result in results:
+            if isinstance(result, list):
+                all_signals.extend(result)
         
         # Filter by minimum score
         filtered_signals = [s for s in all_signals if s.score >= min_score]
@@ -170,20 +210,25 @@ class SignalScanner:
         signals = []
         
         try:
-            # Fetch market data
-            data = await self._fetch_data(symbol, timeframe)
-            if not data or len(data) < 50:
+            bundle = await self._get_bundle(symbol, timeframe)
+            if bundle is None:
                 return signals
             
-            # Calculate indicators
-            indicators = await self._calculate_indicators(data)
+            data = bundle.candles
+            indicators = bundle.indicators
             
             # Current price and timestamp
             current_price = data[-1].get("close", 0)
             current_time = datetime.now()
             
-            # Run each strategy analyzer
+            # Run each strategy analyzer (memoized per bar)
             for strategy in strategies:
+                if strategy in bundle.signals:
+                    cached = bundle.signals[strategy]
+                    if cached:
+                        signals.append(cached)
+                    continue
+                
                 analyzer_method = self.STRATEGY_ANALYZERS.get(strategy)
                 if analyzer_method:
                     try:
@@ -191,6 +236,7 @@ class SignalScanner:
                         signal = await method(
                             symbol, data, indicators, current_price, current_time, timeframe
                         )
+                        bundle.signals[strategy] = signal
                         if signal:
                             signals.append(signal)
                     except Exception as e:
@@ -201,27 +247,98 @@ class SignalScanner:
         
         return signals
     
+    async def _get_bundle(self, symbol: str, timeframe: str) -> Optional[IndicatorBundle]:
+        """Return the indicator bundle for this scan, building it at most once"""
+        key = (symbol, timeframe)
+        
+        bundle = self._data_cache.get(key)
+        if bundle is not None and bundle.is_fresh:
+            return bundle
+        
+        # Coalesce concurrent requests for the same pair
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build_bundle(symbol, timeframe))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        
+        return await asyncio.shield(task)
+    
+    async def _build_bundle(self, symbol: str, timeframe: str) -> Optional[IndicatorBundle]:
+        """Fetch candles and compute the shared indicator bundle"""
+        data = await self._fetch_data(symbol, timeframe)
+        if not data or len(data) < 50:
+            return None
+        
+        indicators = await self._calculate_indicators(data)
+        
+        bar_open_ms = int(data[-1].get("timestamp", time.time() * 1000))
+        scan_interval = (self.config or ScannerConfig).scan_interval
+        bundle = IndicatorBundle(
+            symbol=symbol,
+            timeframe=timeframe,
+            candles=data,
+            indicators=indicators,
+            bar_open_ms=bar_open_ms,
+            expires_at=min(
+                bar_open_ms / 1000 + TIMEFRAME_SECONDS.get(timeframe, 3600),
+                time.time() + scan_interval,
+            ),
+        )
+        self._data_cache[(symbol, timeframe)] = bundle
+        return bundle
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session with a connection pool sized to the concurrency limit"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._max_concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
     async def _fetch_data(self, symbol: str, timeframe: str, limit: int = 200) -> List[Dict]:
         """Fetch OHLCV data for symbol"""
         try:
-            from webapp.services.backtest_engine_pro import DataFetcher
+            session = await self._get_session()
+            params = {"symbol": symbol, "interval": timeframe, "limit": limit}
             
-            fetcher = DataFetcher()
-            data = await fetcher.fetch_historical(
-                symbol=symbol,
-                interval=timeframe,
-                limit=limit
-            )
-            return data
+            async with self._semaphore:
+                async with session.get(BINANCE_KLINES_URL, params=params) as resp:
+                    if resp.status != 200:
+                        logger.warning(f"Klines {symbol} {timeframe}: HTTP {resp.status}")
+                        return []
+                    raw = await resp.json()
+            
+            return [
+                {
+                    "timestamp": k[0],
+                    "time": datetime.fromtimestamp(k[0] / 1000).isoformat(),
+                    "open": float(k[1]),
+                    "high": float(k[2]),
+                    "low": float(k[3]),
+                    "close": float(k[4]),
+                    "volume": float(k[5])
+                }
+                for k in raw
+            ]
         except Exception as e:
             logger.error(f"Error fetching data for {symbol}: {e}")
             return []
     
     async def _calculate_indicators(self, data: List[Dict]) -> Dict[str, Any]:
         """Calculate all indicators for the data"""
-        from webapp.services.indicators import IndicatorCalculator
+        if self._indicator_calc is None:
+            from webapp.services.indicators import IndicatorCalculator
+            self._indicator_calc = IndicatorCalculator()
         
-        calc = IndicatorCalculator()
+        calc = self._indicator_calc
         
         # Calculate common indicators
         indicators = {
@@ -238,7 +355,14 @@ class SignalScanner:
             "stochastic": calc.calculate("stochastic", data, k_period=14, d_period=3),
             "obv": calc.calculate("obv", data),
             "mfi": calc.calculate("mfi", data, period=14),
-            "cci": calc.calculate("cci", data, period=20)
+            "cci": calc.calculate("cci", data, period=20),
+            
+            # Raw columns so analyzers never re-walk the candle dicts
+            "open": [d.get("open", 0) for d in data],
+            "high": [d.get("high", 0) for d in data],
+            "low": [d.get("low", 0) for d in data],
+            "close": [d.get("close", 0) for d in data],
+            "volume": [d.get("volume", 0) for d in data],
         }
         
         return indicators
@@ -598,8 +722,8 @@ class SignalScanner:
             return None
         
         # Look for accumulation (low volume at support, increasing on rally)
-        volumes = [d.get("volume", 0) for d in data[-30:]]
-        closes = [d.get("close", 0) for d in data[-30:]]
+        volumes = indicators["volume"][-30:]
+        closes = indicators["close"][-30:]
         
         avg_volume = sum(volumes) / len(volumes)
         recent_avg_volume = sum(volumes[-5:]) / 5
@@ -754,7 +878,7 @@ class SignalScanner:
         price_change = (price - price_5) / price_5 * 100
         
         # Volume surge
-        volumes = [d.get("volume", 0) for d in data[-20:]]
+        volumes = indicators["volume"][-20:]
         avg_volume = sum(volumes[:-5]) / 15 if len(volumes) >= 20 else sum(volumes) / len(volumes)
         recent_volume = sum(volumes[-5:]) / 5
         volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 1
@@ -828,8 +952,8 @@ class SignalScanner:
             return None
         
         # Calculate recent highs and lows
-        highs = [d.get("high", 0) for d in data[-50:-1]]
-        lows = [d.get("low", 0) for d in data[-50:-1]]
+        highs = indicators["high"][-50:-1]
+        lows = indicators["low"][-50:-1]
         
         resistance = max(highs[-20:])
         support = min(lows[-20:])
@@ -904,7 +1028,7 @@ class SignalScanner:
             return None
         
         # Look for price making new lows but RSI making higher lows (bullish)
-        recent_prices = [d.get("close", 0) for d in data[-20:]]
+        recent_prices = indicators["close"][-20:]
         
         # Find recent swing lows
         price_low_1 = min(recent_prices[-10:])
@@ -981,8 +1105,8 @@ class SignalScanner:
             return None
         
         # Calculate key levels
-        highs = [d.get("high", 0) for d in data[-100:]]
-        lows = [d.get("low", 0) for d in data[-100:]]
+        highs = indicators["high"][-100:]
+        lows = indicators["low"][-100:]
         
         # Simple pivot calculation
         pivot = (max(highs[-20:]) + min(lows[-20:]) + data[-1].get("close", 0)) / 3
@@ -1051,6 +1175,10 @@ class SignalScanner:
         """Start continuous live scanning"""
         self.config = config
         self.running = True
+        if config.max_concurrency != self._max_concurrency:
+            self._max_concurrency = config.max_concurrency
+            self._semaphore = asyncio.Semaphore(config.max_concurrency)
+            await self.close()
         self._scan_task = safe_create_task(self._live_scan_loop(), name="signal_scanner_live")
     
     async def stop_live_scan(self) -> None:
@@ -1062,6 +1190,7 @@ class SignalScanner:
                 await self._scan_task
             except asyncio.CancelledError:
                 pass
+        await self.close()
     
     async def _live_scan_loop(self) -> None:
         """Main live scanning loop"""
@@ -0,0 +1,628 @@
+"""
+Streaming (Incremental) Indicators for Enliko Platform
+Stateful indicator objects for live strategy evaluation
+
+The batch functions in indicators.py / advanced_indicators.py recompute a full
+series from the candle list on every call. Live paths only need the latest
+value, so each class here keeps the minimal recursive state and advances it
+with update(candle). The cost of an update does not depend on how much
+history has been seen (rolling-window indicators touch only their window).
+
+Every indicator reproduces the batch value bit-for-bit:
+
+    ind = StreamingRSI(14)
+    for i, c in enumerate(candles):
+        ind.update(c) == Indicators.rsi(closes[:i + 1], 14)[-1]
+
+State is JSON-serializable via to_dict() / from_dict() so live workers can
+persist it and resume after a restart without re-seeding from history.
+"""
+import copy
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Type, Union
+
+Candle = Union[Dict[str, Any], float, int]
+
+
+class StreamingIndicator:
+    """
+    Base class for incremental indicators.
+
+    Subclasses declare `name`, `_state_fields` and implement `_step(candle)`.
+    Deques listed in `_state_fields` are serialized as lists and restored
+    with their original maxlen.
+    """
+
+    name: str = "base"
+    _state_fields: tuple = ()
+
+    def __init__(self, **params):
+        self.params = params
+        self.count = 0
+        self.value: Any = None
+
+    # ------------------------------------------------------------------ API
+
+    def update(self, candle: Candle) -> Any:
+        """Advance the indicator with a closed candle and return the latest value"""
+        self.count += 1
+        self.value = self._step(candle)
+        return self.value
+
+    def preview(self, candle: Candle) -> Any:
+        """Value the indicator would have if `candle` closed now (state is not modified)"""
+        return copy.deepcopy(self).update(candle)
+
+    def seed(self, candles: Iterable[Candle]) -> Any:
+        """Warm up from historical candles"""
+        for c in candles:
+            self.update(c)
+        return self.value
+
+    def reset(self):
+        """Drop all accumulated state"""
+        self.__init__(**self.params)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.value is not None
+
+    # -------------------------------------------------------- serialization
+
+    def get_state(self) -> Dict[str, Any]:
+        state = {"count": self.count, "value": self.value}
+        for field_name in self._state_fields:
+            val = getattr(self, field_name)
+            if isinstance(val, deque):
+                val = list(val)
+            elif isinstance(val, StreamingIndicator):
+                val = val.to_dict()
+            state[field_name] = val
+        return state
+
+    def set_state(self, state: Dict[str, Any]):
+        self.count = state.get("count", 0)
+        self.value = state.get("value")
+        for field_name in self._state_fields:
+            if field_name not in state:
+                continue
+            current = getattr(self, field_name)
+            val = state[field_name]
+            if isinstance(current, deque):
+                val = deque(val, maxlen=current.maxlen)
+            elif isinstance(current, StreamingIndicator):
+                val = StreamingIndicator.from_dict(val)
+            setattr(self, field_name, val)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.name, "params": dict(self.params), "state": self.get_state()}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "StreamingIndicator":
+        indicator = create_streaming_indicator(data["type"], **data.get("params", {}))
+        indicator.set_state(data.get("state", {}))
+        return indicator
+
+    # -------------------------------------------------------------- helpers
+
+    def _step(self, candle: Candle) -> Any:
+        raise NotImplementedError
+
+    @staticmethod
+    def _price(candle: Candle, source: str = "close") -> float:
+        if isinstance(candle, (int, float)):
+            return candle
+        return candle[source]
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.__class__.__name__}({params}) value={self.value}"
+
+
+# ==================== MOVING AVERAGES ====================
+
+class StreamingSMA(StreamingIndicator):
+    """Simple Moving Average - matches Indicators.sma"""
+
+    name = "sma"
+    _state_fields = ("window",)
+
+    def __init__(self, period: int = 20, source: str = "close"):
+        super().__init__(period=period, source=source)
+        self.period = period
+        self.source = source
+        self.window: deque = deque(maxlen=period)
+
+    def _step(self, candle: Candle) -> float:
+        price = self._price(candle, self.source)
+        self.window.append(price)
+        if len(self.window) < self.period:
+            return price
+        return sum(self.window) / self.period
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    Exponential Moving Average.
+
+    seed="first" matches Indicators.ema (starts from the first price),
+    seed="sma" matches advanced_indicators.ema (starts from SMA of the first
+    `period` prices and is None before that).
+    """
+
+    name = "ema"
+    _state_fields = ("_seed_sum", "_ema")
+
+    def __init__(self, period: int = 20, source: str = "close", seed: str = "first"):
+        if seed not in ("first", "sma"):
+            raise ValueError(f"Unknown EMA seed: {seed}")
+        super().__init__(period=period, source=source, seed=seed)
+        self.period = period
+        self.source = source
+        self.seed_mode = seed
+        self.multiplier = 2 / (period + 1)
+        self._seed_sum = 0
+        self._ema: Optional[float] = None
+
+    def _step(self, candle: Candle) -> Optional[float]:
+        price = self._price(candle, self.source)
+
+        if self.seed_mode == "first":
+            if self._ema is None:
+                self._ema = price
+            else:
+                self._ema = (price * self.multiplier) + (self._ema * (1 - self.multiplier))
+            return self._ema
+
+        if self.count < self.period:
+            self._seed_sum += price
+            return None
+        if self.count == self.period:
+            self._seed_sum += price
+            self._ema = self._seed_sum / self.period
+        else:
+            self._ema = (price - self._ema) * self.multiplier + self._ema
+        return self._ema
+
+
+# ==================== MOMENTUM ====================
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Relative Strength Index.
+
+    smoothing="wilder" matches Indicators.rsi (50.0 during warm-up),
+    smoothing="simple" matches advanced_indicators MomentumIndicators.rsi,
+    i.e. plain averages over the last `period` changes (None during warm-up).
+    """
+
+    name = "rsi"
+    _state_fields = ("_prev", "_deltas", "_sum_gain", "_sum_loss",
+                     "_avg_gain", "_avg_loss", "_gains", "_losses")
+
+    def __init__(self, period: int = 14, source: str = "close", smoothing: str = "wilder"):
+        if smoothing not in ("wilder", "simple"):
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+        super().__init__(period=period, source=source, smoothing=smoothing)
+        self.period = period
+        self.source = source
+        self.smoothing = smoothing
+        self._prev: Optional[float] = None
+        self._deltas = 0
+        self._sum_gain = 0
+        self._sum_loss = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._gains: deque = deque(maxlen=period)
+        self._losses: deque = deque(maxlen=period)
+
+    def _step(self, candle: Candle) -> Optional[float]:
+        price = self._price(candle, self.source)
+        prev, self._prev = self._prev, price
+        if prev is None:
+            return 50.0 if self.smoothing == "wilder" else None
+
+        delta = price - prev
+        gain = max(delta, 0)
+        loss = abs(min(delta, 0))
+        idx = self._deltas
+        self._deltas += 1
+
+        if self.smoothing == "simple":
+            self._gains.append(gain)
+            self._losses.append(loss)
+            if self._deltas < self.period:
+                return None
+            avg_gain = sum(self._gains) / self.period
+            avg_loss = sum(self._losses) / self.period
+            if avg_loss == 0:
+                return 100
+            return 100 - (100 / (1 + avg_gain / avg_loss))
+
+        period = self.period
+        if idx < period:
+            self._sum_gain += gain
+            self._sum_loss += loss
+            if idx == period - 1:
+                self._avg_gain = self._sum_gain / period
+                self._avg_loss = self._sum_loss / period
+            return 50.0
+
+        self._avg_gain = (self._avg_gain * (period - 1) + gain) / period
+        self._avg_loss = (self._avg_loss * (period - 1) + loss) / period
+
+        if self._avg_loss == 0:
+            return 50.0 if self._avg_gain == 0 else 100.0
+        rs = self._avg_gain / self._avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line, signal and histogram - matches Indicators.macd"""
+
+    name = "macd"
+    _state_fields = ("_fast", "_slow", "_signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9, source: str = "close"):
+        super().__init__(fast=fast, slow=slow, signal=signal, source=source)
+        self.source = source
+        self._fast = StreamingEMA(fast)
+        self._slow = StreamingEMA(slow)
+        self._signal = StreamingEMA(signal)
+
+    def _step(self, candle: Candle) -> Dict[str, float]:
+        price = self._price(candle, self.source)
+        macd_line = self._fast.update(price) - self._slow.update(price)
+        signal_line = self._signal.update(macd_line)
+        return {"macd": macd_line, "signal": signal_line, "histogram": macd_line - signal_line}
+
+
+class StreamingStochastic(StreamingIndicator):
+    """Stochastic %K / %D - matches Indicators.stochastic"""
+
+    name = "stochastic"
+    _state_fields = ("_highs", "_lows", "_k_values")
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        super().__init__(k_period=k_period, d_period=d_period)
+        self.k_period = k_period
+        self.d_period = d_period
+        self._highs: deque = deque(maxlen=k_period)
+        self._lows: deque = deque(maxlen=k_period)
+        self._k_values: deque = deque(maxlen=d_period)
+
+    def _step(self, candle: Candle) -> Dict[str, float]:
+        self._highs.append(candle["high"])
+        self._lows.append(candle["low"])
+
+        if self.count < self.k_period:
+            self._k_values.append(50.0)
+            return {"k": 50.0, "d": 50.0}
+
+        highest = max(self._highs)
+        lowest = min(self._lows)
+        if highest - lowest > 0:
+            k = 100 * (candle["close"] - lowest) / (highest - lowest)
+        else:
+            k = 50.0
+        self._k_values.append(k)
+
+        if self.count < self.d_period:
+            d = k
+        else:
+            d = sum(self._k_values) / self.d_period
+        return {"k": k, "d": d}
+
+
+# ==================== VOLATILITY ====================
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range (Wilder) - matches Indicators.atr"""
+
+    name = "atr"
+    _state_fields = ("_prev_close", "_tr_sum", "_atr")
+
+    def __init__(self, period: int = 14):
+        super().__init__(period=period)
+        self.period = period
+        self._prev_close: Optional[float] = None
+        self._tr_sum = 0.0
+        self._atr = 0.0
+
+    def _step(self, candle: Candle) -> float:
+        high, low, close = candle["high"], candle["low"], candle["close"]
+        i = self.count - 1
+
+        if self._prev_close is None:
+            tr = high - low
+            self._tr_sum = tr
+            self._atr = tr
+            self._prev_close = close
+            # Batch ATR needs two candles before it reports anything
+            return 0.0
+
+        prev_close = self._prev_close
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if i < self.period:
+            self._tr_sum += tr
+            self._atr = self._tr_sum / (i + 1)
+        else:
+            self._atr = (self._atr * (self.period - 1) + tr) / self.period
+        self._prev_close = close
+        return self._atr
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """Bollinger Bands - matches Indicators.bollinger_bands"""
+
+    name = "bollinger_bands"
+    _state_fields = ("window",)
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0, source: str = "close"):
+        super().__init__(period=period, std_dev=std_dev, source=source)
+        self.period = period
+        self.std_dev = std_dev
+        self.source = source
+        self.window: deque = deque(maxlen=period)
+
+    def _step(self, candle: Candle) -> Dict[str, float]:
+        price = self._price(candle, self.source)
+        self.window.append(price)
+        if len(self.window) < self.period:
+            return {"upper": price, "middle": price, "lower": price}
+
+        middle = sum(self.window) / self.period
+        std = math.sqrt(sum((p - middle) ** 2 for p in self.window) / self.period)
+        return {
+            "upper": middle + self.std_dev * std,
+            "middle": middle,
+            "lower": middle - self.std_dev * std,
+        }
+
+
+# ==================== TREND ====================
+
+class StreamingSupertrend(StreamingIndicator):
+    """Supertrend value and direction (1=up, -1=down) - matches Indicators.supertrend"""
+
+    name = "supertrend"
+    _state_fields = ("_atr", "_supertrend", "_direction")
+
+    def __init__(self, period: int = 10, multiplier: float = 3.0):
+        super().__init__(period=period, multiplier=multiplier)
+        self.period = period
+        self.multiplier = multiplier
+        self._atr = StreamingATR(period)
+        self._supertrend = 0.0
+        self._direction = 1
+
+    def _step(self, candle: Candle) -> Dict[str, float]:
+        self._atr.update(candle)
+        # The first band uses the chained ATR (first true range); batch output for a
+        # single candle uses ATR=0, which only affects what is reported here.
+        atr = self._atr._atr
+        hl2 = (candle["high"] + candle["low"]) / 2
+        upper_band = hl2 + self.multiplier * atr
+        lower_band = hl2 - self.multiplier * atr
+
+        if self.count == 1:
+            self._supertrend = lower_band
+            self._direction = 1
+            return {"value": hl2, "direction": 1}
+
+        prev_st = self._supertrend
+        if self._direction == 1:
+            if candle["close"] < prev_st:
+                self._supertrend, self._direction = upper_band, -1
+            else:
+                self._supertrend, self._direction = max(lower_band, prev_st), 1
+        else:
+            if candle["close"] > prev_st:
+                self._supertrend, self._direction = lower_band, 1
+            else:
+                self._supertrend, self._direction = min(upper_band, prev_st), -1
+        return {"value": self._supertrend, "direction": self._direction}
+
+
+class StreamingADX(StreamingIndicator):
+    """ADX with +DI / -DI (Wilder) - matches Indicators.adx"""
+
+    name = "adx"
+    _state_fields = ("_prev", "_moves", "_sum_pdm", "_sum_mdm", "_sum_tr",
+                     "_s_pdm", "_s_mdm", "_s_tr", "_dx_count", "_dx_sum", "_adx")
+
+    def __init__(self, period: int = 14):
+        super().__init__(period=period)
+        self.period = period
+        self._prev: Optional[List[float]] = None  # [high, low, close]
+        self._moves = 0
+        self._sum_pdm = 0
+        self._sum_mdm = 0
+        self._sum_tr = 0
+        self._s_pdm = 0.0
+        self._s_mdm = 0.0
+        self._s_tr = 0.0
+        self._dx_count = 0
+        self._dx_sum = 0
+        self._adx = 0.0
+
+    def _step(self, candle: Candle) -> Dict[str, float]:
+        high, low, close = candle["high"], candle["low"], candle["close"]
+        prev, self._prev = self._prev, [high, low, close]
+        zeros = {"adx": 0.0, "plus_di": 0.0, "minus_di": 0.0}
+        if prev is None:
+            return zeros
+
+        prev_high, prev_low, prev_close = prev
+        up_move = high - prev_high
+        down_move = prev_low - low
+        pdm = up_move if up_move > down_move and up_move > 0 else 0
+        mdm = down_move if down_move > up_move and down_move > 0 else 0
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        period = self.period
+        self._moves += 1
+        if self._moves < period:
+            self._sum_pdm += pdm
+            self._sum_mdm += mdm
+            self._sum_tr += tr
+            return zeros
+
+        if self._moves == period:
+            self._s_pdm = self._sum_pdm + pdm
+            self._s_mdm = self._sum_mdm + mdm
+            self._s_tr = self._sum_tr + tr
+        else:
+            self._s_pdm = self._s_pdm - self._s_pdm / period + pdm
+            self._s_mdm = self._s_mdm - self._s_mdm / period + mdm
+            self._s_tr = self._s_tr - self._s_tr / period + tr
+
+        if self._s_tr > 0:
+            pdi = 100 * self._s_pdm / self._s_tr
+            mdi = 100 * self._s_mdm / self._s_tr
+        else:
+            pdi = 0
+            mdi = 0
+        dx = 100 * abs(pdi - mdi) / (pdi + mdi) if pdi + mdi > 0 else 0
+
+        j = self._dx_count
+        self._dx_count += 1
+        self._dx_sum += dx
+        if j == 0:
+            self._adx = 0.0
+        elif j < period:
+            self._adx = self._dx_sum / (j + 1)
+        else:
+            self._adx = (self._adx * (period - 1) + dx) / period
+        return {"adx": self._adx, "plus_di": pdi, "minus_di": mdi}
+
+
+# ==================== VOLUME ====================
+
+class StreamingVWAP(StreamingIndicator):
+    """Cumulative VWAP - matches Indicators.vwap"""
+
+    name = "vwap"
+    _state_fields = ("_tpv", "_volume")
+
+    def __init__(self):
+        super().__init__()
+        self._tpv = 0
+        self._volume = 0
+
+    def _step(self, candle: Candle) -> float:
+        typical_price = (candle["high"] + candle["low"] + candle["close"]) / 3
+        self._tpv += typical_price * candle["volume"]
+        self._volume += candle["volume"]
+        if self._volume > 0:
+            return self._tpv / self._volume
+        return candle["close"]
+
+
+class StreamingOBV(StreamingIndicator):
+    """On-Balance Volume - matches Indicators.obv"""
+
+    name = "obv"
+    _state_fields = ("_prev_close",)
+
+    def __init__(self):
+        super().__init__()
+        self._prev_close: Optional[float] = None
+
+    def _step(self, candle: Candle) -> float:
+        close, volume = candle["close"], candle["volume"]
+        prev_close, self._prev_close = self._prev_close, close
+        if prev_close is None:
+            return volume
+        if close > prev_close:
+            return self.value + volume
+        if close < prev_close:
+            return self.value - volume
+        return self.value
+
+
+# ==================== REGISTRY ====================
+
+STREAMING_INDICATORS: Dict[str, Type[StreamingIndicator]] = {
+    cls.name: cls for cls in (
+        StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD, StreamingStochastic,
+        StreamingATR, StreamingBollingerBands, StreamingSupertrend, StreamingADX,
+        StreamingVWAP, StreamingOBV,
+    )
+}
+
+
+def create_streaming_indicator(indicator_type: str, **params) -> StreamingIndicator:
+    """Create a streaming indicator by type name (same names as IndicatorCalculator)"""
+    cls = STREAMING_INDICATORS.get(indicator_type)
+    if cls is None:
+        raise ValueError(f"No streaming implementation for indicator: {indicator_type}")
+    return cls(**params)
+
+
+class StreamingIndicatorSet:
+    """
+    Named group of streaming indicators fed from one candle stream.
+
+    Live pollers typically re-fetch the last N candles every cycle; catch_up()
+    only applies candles newer than the last one seen (by `timestamp`), so the
+    same closed bar is never counted twice.
+
+    Usage:
+        stream = StreamingIndicatorSet({
+            "rsi": StreamingRSI(14),
+            "ema20": StreamingEMA(20),
+        })
+        stream.seed(history)
+        values = stream.catch_up(await fetch_candles(symbol, tf, limit=5))
+    """
+
+    def __init__(self, indicators: Optional[Dict[str, StreamingIndicator]] = None):
+        self.indicators: Dict[str, StreamingIndicator] = dict(indicators or {})
+        self.last_timestamp: Optional[int] = None
+
+    def add(self, key: str, indicator: StreamingIndicator) -> StreamingIndicator:
+        self.indicators[key] = indicator
+        return indicator
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        return {key: ind.value for key, ind in self.indicators.items()}
+
+    def update(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a closed candle to every indicator"""
+        ts = candle.get("timestamp")
+        if ts is not None:
+            if self.last_timestamp is not None and ts <= self.last_timestamp:
+                return self.values
+            self.last_timestamp = ts
+        for ind in self.indicators.values():
+            ind.update(candle)
+        return self.values
+
+    def seed(self, candles: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        for c in candles:
+            self.update(c)
+        return self.values
+
+    catch_up = seed
+
+    def preview(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """Values for a still-forming candle without committing it"""
+        return {key: ind.preview(candle) for key, ind in self.indicators.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "last_timestamp": self.last_timestamp,
+            "indicators": {key: ind.to_dict() for key, ind in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingIndicatorSet":
+        stream = cls({
+            key: StreamingIndicator.from_dict(payload)
+            for key, payload in data.get("indicators", {}).items()
+        })
+        stream.last_timestamp = data.get("last_timestamp")
+        return stream